@@ -37,6 +37,7 @@
 #include <string>
 #include <deque>
 #include <map>
+#include <vector>
 
 #ifdef GR_CTRLPORT
 #include <gnuradio/rpcregisterhelpers.h>
@@ -59,11 +60,27 @@ namespace gr {
                                      public boost::enable_shared_from_this<basic_block>
   {
     typedef boost::function<void(pmt::pmt_t)> msg_handler_t;
+    typedef boost::function<void(const std::vector<pmt::pmt_t> &)> msg_batch_handler_t;
 
   private:
     typedef std::map<pmt::pmt_t , msg_handler_t, pmt::comparator> d_msg_handlers_t;
     d_msg_handlers_t d_msg_handlers;
 
+    typedef std::map<pmt::pmt_t , msg_batch_handler_t, pmt::comparator> d_msg_batch_handlers_t;
+    d_msg_batch_handlers_t d_msg_batch_handlers;
+
+    struct msg_port_state {
+      msg_port_state() : limit(0), timeout_ms(0), queued(0), dropped(0), high_water(0) {}
+      size_t limit;             // queue size at which _post blocks, 0 for none
+      long timeout_ms;          // longest _post blocks before dropping, 0 for ever
+      uint64_t queued;          // messages posted
+      uint64_t dropped;         // messages dropped from the front
+      size_t high_water;        // most messages ever waiting
+    };
+    typedef std::map<pmt::pmt_t, msg_port_state, pmt::comparator> msg_port_state_map_t;
+    msg_port_state_map_t d_msg_port_state;
+    boost::condition_variable d_msg_space;  // a limited queue got shorter
+
     typedef std::deque<pmt::pmt_t> msg_queue_t;
     typedef std::map<pmt::pmt_t, msg_queue_t, pmt::comparator> msg_queue_map_t;
     typedef std::map<pmt::pmt_t, msg_queue_t, pmt::comparator>::iterator msg_queue_map_itr;
@@ -118,7 +135,8 @@ namespace gr {
      * \brief Tests if there is a handler attached to port \p which_port
      */
     virtual bool has_msg_handler(pmt::pmt_t which_port) {
-      return (d_msg_handlers.find(which_port) != d_msg_handlers.end());
+      return (d_msg_handlers.find(which_port) != d_msg_handlers.end() ||
+              d_msg_batch_handlers.find(which_port) != d_msg_batch_handlers.end());
     }
 
     /*
@@ -131,8 +149,28 @@ namespace gr {
     {
       // AA Update this
       if(has_msg_handler(which_port)) {  // Is there a handler?
-        d_msg_handlers[which_port](msg); // Yes, invoke it.
+        d_msg_handlers_t::iterator h = d_msg_handlers.find(which_port);
+        if(h != d_msg_handlers.end())
+          h->second(msg);               // Yes, invoke it.
+        else
+          d_msg_batch_handlers[which_port](std::vector<pmt::pmt_t>(1, msg));
+      }
+    }
+
+    /*
+     * Called by the runtime system with all the messages taken from
+     * a port at once. They go to the batch handler of the port in one
+     * call if it has one, else one by one to dispatch_msg.
+     */
+    virtual void dispatch_msgs(pmt::pmt_t which_port, const std::vector<pmt::pmt_t> &msgs)
+    {
+      d_msg_batch_handlers_t::iterator h = d_msg_batch_handlers.find(which_port);
+      if(h != d_msg_batch_handlers.end()) {
+        h->second(msgs);
+        return;
       }
+      for(size_t i = 0; i < msgs.size(); i++)
+        dispatch_msg(which_port, msgs[i]);
     }
 
     // Message passing interface
@@ -259,6 +297,19 @@ namespace gr {
      */
     pmt::pmt_t delete_head_blocking(pmt::pmt_t which_port, unsigned int millisec = 0);
 
+    /*!
+     * \brief Move all messages queued on \p which_port to \p msgs.
+     * \returns false if the queue was empty
+     */
+    bool delete_all_nowait(pmt::pmt_t which_port, std::vector<pmt::pmt_t> &msgs);
+
+    /*!
+     * \brief Drop messages from the head of the queue of \p which_port
+     * until at most \p max_nmsgs are left.
+     * \returns the number of messages dropped
+     */
+    size_t prune_msgs(pmt::pmt_t which_port, size_t max_nmsgs);
+
     msg_queue_t::iterator get_iterator(pmt::pmt_t which_port) {
       return msg_queue[which_port].begin();
     }
@@ -373,9 +424,63 @@ namespace gr {
       if(msg_queue.find(which_port) == msg_queue.end()) {
         throw std::runtime_error("attempt to set_msg_handler() on bad input message port!");
       }
+      d_msg_batch_handlers.erase(which_port);
       d_msg_handlers[which_port] = msg_handler_t(msg_handler);
     }
 
+    /*!
+     * \brief Set a callback that gets all the messages available on
+     * a port in one call.
+     *
+     * \p msg_handler has the signature:
+     * <pre>
+     *    void msg_handler(const std::vector<pmt::pmt_t> &msgs);
+     * </pre>
+     *
+     * The messages are in the order they were posted. A block that
+     * handles many small messages saves the locking and the call per
+     * message. The thread-safety guarantees are the same as for
+     * set_msg_handler. A port has either kind of handler, not both.
+     */
+    template <typename T> void set_msg_batch_handler(pmt::pmt_t which_port, T msg_handler) {
+      if(msg_queue.find(which_port) == msg_queue.end()) {
+        throw std::runtime_error("attempt to set_msg_batch_handler() on bad input message port!");
+      }
+      d_msg_handlers.erase(which_port);
+      d_msg_batch_handlers[which_port] = msg_batch_handler_t(msg_handler);
+    }
+
+    /*!
+     * \brief Bound the queue of an input message port.
+     *
+     * While \p limit messages are waiting on \p which_port, posting
+     * another one blocks the sender until the block has handled some,
+     * instead of letting the queue grow. Ports without a handler are
+     * never drained and keep dropping their oldest messages beyond
+     * the [DEFAULT] max_messages option. 0, the default, removes the
+     * limit; the default for new ports is the [DEFAULT]
+     * msg_queue_limit option.
+     *
+     * A sender waits at most [DEFAULT] msg_queue_timeout milliseconds
+     * (default 1000, 0 waits for ever); then the message is dropped
+     * and counted by nmsgs_dropped(). This matters for cycles: a block
+     * posting to itself, or two blocks posting to each other (such as
+     * a request/response pair) with full queues, each wait for the
+     * other to drain, and only the timeout gets them going again.
+     */
+    void set_msg_queue_limit(pmt::pmt_t which_port, size_t limit);
+    size_t msg_queue_limit(pmt::pmt_t which_port);
+
+    //! Number of messages posted to \p which_port so far
+    uint64_t nmsgs_queued(pmt::pmt_t which_port);
+
+    //! Number of messages dropped from \p which_port because it was full
+    //! or a sender timed out
+    uint64_t nmsgs_dropped(pmt::pmt_t which_port);
+
+    //! Largest number of messages that were waiting on \p which_port
+    size_t nmsgs_high_water(pmt::pmt_t which_port);
+
     virtual void set_processor_affinity(const std::vector<int> &mask)
     { throw std::runtime_error("set_processor_affinity not overloaded in child class."); }
 
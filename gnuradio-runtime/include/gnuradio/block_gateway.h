@@ -115,6 +115,21 @@ namespace gr {
     //! Provide access to the shared message object
     virtual block_gw_message_type &block_message(void) = 0;
 
+    //! Enable or disable timing of the calls into the python handler
+    virtual void set_dispatch_timing(bool enable) = 0;
+
+    //! Reset the accumulated handler call times
+    virtual void reset_dispatch_timing(void) = 0;
+
+    /*!
+     * Wall clock seconds spent in handler calls for an action type.
+     * This includes the time spent waiting to acquire the GIL.
+     */
+    virtual double dispatch_wall_time(block_gw_message_type::action_type action) = 0;
+
+    //! Thread CPU seconds spent in handler calls for an action type
+    virtual double dispatch_cpu_time(block_gw_message_type::action_type action) = 0;
+
     long block__unique_id(void) const {
       return gr::block::unique_id();
     }
@@ -147,6 +162,14 @@ namespace gr {
       return gr::block::output_multiple();
     }
 
+    void block__set_min_noutput_items(int m) {
+      return gr::block::set_min_noutput_items(m);
+    }
+
+    int block__min_noutput_items(void) const {
+      return gr::block::min_noutput_items();
+    }
+
     void block__consume(int which_input, int how_many_items) {
       return gr::block::consume(which_input, how_many_items);
     }
@@ -28,7 +28,7 @@
 #include <gnuradio/tags.h>
 #include <boost/weak_ptr.hpp>
 #include <gnuradio/thread/thread.h>
-#include <map>
+#include <vector>
 
 namespace gr {
 
@@ -130,10 +130,10 @@ namespace gr {
      */
     void prune_tags(uint64_t max_time);
 
-    std::multimap<uint64_t,tag_t>::iterator get_tags_begin() { return d_item_tags.begin(); }
-    std::multimap<uint64_t,tag_t>::iterator get_tags_end() { return d_item_tags.end(); }
-    std::multimap<uint64_t,tag_t>::iterator get_tags_lower_bound(uint64_t x) { return d_item_tags.lower_bound(x); }
-    std::multimap<uint64_t,tag_t>::iterator get_tags_upper_bound(uint64_t x) { return d_item_tags.upper_bound(x); }
+    std::vector<tag_t>::iterator get_tags_begin() { return d_item_tags.begin() + d_tags_begin; }
+    std::vector<tag_t>::iterator get_tags_end() { return d_item_tags.end(); }
+    std::vector<tag_t>::iterator get_tags_lower_bound(uint64_t x);
+    std::vector<tag_t>::iterator get_tags_upper_bound(uint64_t x);
 
     // -------------------------------------------------------------------------
 
@@ -164,7 +164,10 @@ namespace gr {
     unsigned int			d_write_index;	// in items [0,d_bufsize)
     uint64_t                            d_abs_write_offset; // num items written since the start
     bool				d_done;
-    std::multimap<uint64_t,tag_t>                   d_item_tags;
+    // Tags sorted by offset from d_tags_begin on; the pruned tags in
+    // front of it are dropped once they are half of the vector.
+    std::vector<tag_t>                  d_item_tags;
+    size_t                              d_tags_begin;
     uint64_t                            d_last_min_items_read;
 
     unsigned index_add(unsigned a, unsigned b)
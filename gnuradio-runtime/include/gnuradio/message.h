@@ -46,6 +46,7 @@ namespace gr {
     long	 d_type;	// type of the message
     double	 d_arg1;	// optional arg1
     double 	 d_arg2;	// optional arg2
+    double	 d_insert_time;	// set by msg_queue::insert_tail
 
     unsigned char *d_buf_start;	// start of allocated buffer
     unsigned char *d_msg_start;	// where the msg starts
@@ -79,6 +80,12 @@ namespace gr {
     void set_arg1(double arg1) { d_arg1 = arg1; }
     void set_arg2(double arg2) { d_arg2 = arg2; }
 
+    /*!
+     * \brief Seconds since the Unix epoch when the message was last
+     * inserted in a msg_queue, 0 if it never was.
+     */
+    double insert_time() const { return d_insert_time; }
+
     unsigned char *msg() const { return d_msg_start; }
     size_t length() const { return d_msg_end - d_msg_start; }
     std::string to_string() const;
@@ -74,6 +74,13 @@ namespace gr {
      */
     message::sptr delete_head_nowait();
 
+    /*!
+     * \brief Wait until a message is available.
+     * \param millisec timeout (0=no timeout)
+     * \returns true if a message is available, false on timeout
+     */
+    bool wait_not_empty(unsigned int millisec = 0);
+
     //! Delete all messages from the queue
     void flush();
 
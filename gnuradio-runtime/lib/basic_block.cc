@@ -31,6 +31,8 @@
 #include <gnuradio/basic_block.h>
 #include <gnuradio/block_registry.h>
 #include <gnuradio/logger.h>
+#include <gnuradio/prefs.h>
+#include <algorithm>
 #include <stdexcept>
 #include <sstream>
 #include <iostream>
@@ -101,6 +103,11 @@ namespace gr {
     }
     msg_queue[port_id] = msg_queue_t();
     msg_queue_ready[port_id] = boost::shared_ptr<boost::condition_variable>(new boost::condition_variable());
+    d_msg_port_state[port_id] = msg_port_state();
+    d_msg_port_state[port_id].limit = static_cast<size_t>
+      (prefs::singleton()->get_long("DEFAULT", "msg_queue_limit", 0));
+    d_msg_port_state[port_id].timeout_ms =
+      prefs::singleton()->get_long("DEFAULT", "msg_queue_timeout", 1000);
     #ifdef POTHOS_SUPPORT
     Pothos::Block *b = extractPothosBlock(this);
     if (b != nullptr)
@@ -235,7 +242,28 @@ namespace gr {
       throw std::runtime_error("attempted to insert_tail on invalid queue!");
     }
 
-    msg_queue[which_port].push_back(msg);
+    msg_queue_t &queue = msg_queue[which_port];
+    msg_port_state &state = d_msg_port_state[which_port];
+
+    // A bounded queue holds up the sender until the block catches
+    // up. Blocks posting to each other could wait on each other
+    // forever, so past the timeout the message is dropped instead.
+    if(state.limit > 0 && has_msg_handler(which_port)) {
+      boost::system_time const deadline = boost::get_system_time() +
+        boost::posix_time::milliseconds(state.timeout_ms);
+      while(queue.size() >= state.limit) {
+        if(state.timeout_ms <= 0)
+          d_msg_space.wait(guard);
+        else if(!d_msg_space.timed_wait(guard, deadline) && queue.size() >= state.limit) {
+          state.dropped++;
+          return;
+        }
+      }
+    }
+
+    queue.push_back(msg);
+    state.queued++;
+    state.high_water = std::max(state.high_water, queue.size());
     msg_queue_ready[which_port]->notify_one();
 
     // wake up thread if BLKD_IN or BLKD_OUT
@@ -253,6 +281,8 @@ namespace gr {
 
     pmt::pmt_t m(msg_queue[which_port].front());
     msg_queue[which_port].pop_front();
+    if(d_msg_port_state[which_port].limit > 0)
+      d_msg_space.notify_all();
 
     return m;
   }
@@ -277,9 +307,97 @@ namespace gr {
 
     pmt::pmt_t m(msg_queue[which_port].front());
     msg_queue[which_port].pop_front();
+    if(d_msg_port_state[which_port].limit > 0)
+      d_msg_space.notify_all();
     return m;
   }
 
+  bool
+  basic_block::delete_all_nowait(pmt::pmt_t which_port, std::vector<pmt::pmt_t> &msgs)
+  {
+    gr::thread::scoped_lock guard(mutex);
+
+    msgs.clear();
+    if(empty_p(which_port)) {
+      return false;
+    }
+
+    msg_queue_t &queue = msg_queue[which_port];
+    msgs.assign(queue.begin(), queue.end());
+    queue.clear();
+    if(d_msg_port_state[which_port].limit > 0)
+      d_msg_space.notify_all();
+
+    return true;
+  }
+
+  size_t
+  basic_block::prune_msgs(pmt::pmt_t which_port, size_t max_nmsgs)
+  {
+    gr::thread::scoped_lock guard(mutex);
+
+    size_t ndropped = 0;
+    msg_queue_t &queue = msg_queue[which_port];
+    while(queue.size() > max_nmsgs) {
+      queue.pop_front();
+      ndropped++;
+    }
+
+    msg_port_state &state = d_msg_port_state[which_port];
+    state.dropped += ndropped;
+    if(ndropped > 0 && state.limit > 0)
+      d_msg_space.notify_all();
+
+    return ndropped;
+  }
+
+  void
+  basic_block::set_msg_queue_limit(pmt::pmt_t which_port, size_t limit)
+  {
+    gr::thread::scoped_lock guard(mutex);
+
+    if(msg_queue.find(which_port) == msg_queue.end())
+      throw std::runtime_error("attempt to set_msg_queue_limit() on bad input message port!");
+    d_msg_port_state[which_port].limit = limit;
+    d_msg_space.notify_all();
+  }
+
+  size_t
+  basic_block::msg_queue_limit(pmt::pmt_t which_port)
+  {
+    gr::thread::scoped_lock guard(mutex);
+    if(msg_queue.find(which_port) == msg_queue.end())
+      throw std::runtime_error("port does not exist!");
+    return d_msg_port_state[which_port].limit;
+  }
+
+  uint64_t
+  basic_block::nmsgs_queued(pmt::pmt_t which_port)
+  {
+    gr::thread::scoped_lock guard(mutex);
+    if(msg_queue.find(which_port) == msg_queue.end())
+      throw std::runtime_error("port does not exist!");
+    return d_msg_port_state[which_port].queued;
+  }
+
+  uint64_t
+  basic_block::nmsgs_dropped(pmt::pmt_t which_port)
+  {
+    gr::thread::scoped_lock guard(mutex);
+    if(msg_queue.find(which_port) == msg_queue.end())
+      throw std::runtime_error("port does not exist!");
+    return d_msg_port_state[which_port].dropped;
+  }
+
+  size_t
+  basic_block::nmsgs_high_water(pmt::pmt_t which_port)
+  {
+    gr::thread::scoped_lock guard(mutex);
+    if(msg_queue.find(which_port) == msg_queue.end())
+      throw std::runtime_error("port does not exist!");
+    return d_msg_port_state[which_port].high_water;
+  }
+
   pmt::pmt_t
   basic_block::message_subscribers(pmt::pmt_t port)
   {
@@ -38,6 +38,35 @@
 
 namespace gr {
 
+#ifdef POTHOS_SUPPORT
+  //
+  // Tags travel through Pothos as labels holding the tag's pmt, so
+  // a GNU Radio block downstream gets the value back without any
+  // conversion. Labels posted by other Pothos blocks are converted.
+  //
+  static void
+  labels_to_tags(std::vector<tag_t> &v, const Pothos::InputPort *inputPort,
+                 uint64_t delay, uint64_t start, uint64_t end,
+                 const pmt::pmt_t &key)
+  {
+    v.clear();
+    const bool match_key = pmt::is_symbol(key);
+    const std::string key_str = match_key ? pmt::symbol_to_string(key) : std::string();
+    const uint64_t nread = inputPort->totalElements() + delay;
+    for (const auto &label : inputPort->labels())
+    {
+        const uint64_t offset = label.index + nread;
+        if (offset < start or offset >= end) continue;
+        if (match_key and label.id != key_str) continue;
+        tag_t tag;
+        tag.key = match_key ? key : pmt::string_to_symbol(label.id);
+        tag.value = obj_to_pmt(label.data);
+        tag.offset = offset;
+        v.push_back(tag);
+    }
+  }
+#endif
+
   block::block(const std::string &name,
                io_signature::sptr input_signature,
                io_signature::sptr output_signature)
@@ -288,7 +317,7 @@ namespace gr {
         auto outputPort = b->output(which_output);
         Pothos::Label label;
         label.id = pmt::symbol_to_string(tag.key);
-        label.data = pmt_to_obj(tag.value);
+        label.data = Pothos::Object(tag.value);
         assert(tag.offset >= outputPort->totalElements());
         label.index = tag.offset - outputPort->totalElements();
         outputPort->postLabel(label);
@@ -324,6 +353,14 @@ namespace gr {
                            unsigned int which_input,
                            uint64_t start, uint64_t end)
   {
+    #ifdef POTHOS_SUPPORT
+    Pothos::Block *b = extractPothosBlock(this);
+    if (b != nullptr)
+    {
+        labels_to_tags(v, b->input(which_input), d_attr_delay, start, end, pmt::PMT_NIL);
+        return;
+    }
+    #endif
     d_detail->get_tags_in_range(v, which_input, start, end, unique_id());
   }
 
@@ -337,19 +374,7 @@ namespace gr {
     Pothos::Block *b = extractPothosBlock(this);
     if (b != nullptr)
     {
-        v.clear();
-        auto inputPort = b->input(which_input);
-        for (const auto &label : inputPort->labels())
-        {
-            auto offset = label.index + inputPort->totalElements() + d_attr_delay;
-            if (offset < start or offset >= end) continue;
-            tag_t tag;
-            tag.key = pmt::string_to_symbol(label.id);
-            if (pmt::is_symbol(key) and key != tag.key) continue;
-            tag.value = obj_to_pmt(label.data);
-            tag.offset = offset;
-            v.push_back(tag);
-        }
+        labels_to_tags(v, b->input(which_input), d_attr_delay, start, end, key);
         return;
     }
     #endif
@@ -361,10 +386,9 @@ namespace gr {
                             unsigned int which_input,
                             uint64_t start, uint64_t end)
   {
-    d_detail->get_tags_in_range(v, which_input,
-                                nitems_read(which_input) + start,
-                                nitems_read(which_input) + end,
-                                unique_id());
+    get_tags_in_range(v, which_input,
+                      nitems_read(which_input) + start,
+                      nitems_read(which_input) + end);
   }
 
   void
@@ -373,10 +397,10 @@ namespace gr {
                             uint64_t start, uint64_t end,
                             const pmt::pmt_t &key)
   {
-    d_detail->get_tags_in_range(v, which_input,
-                                nitems_read(which_input) + start,
-                                nitems_read(which_input) + end,
-                                key, unique_id());
+    get_tags_in_range(v, which_input,
+                      nitems_read(which_input) + start,
+                      nitems_read(which_input) + end,
+                      key);
   }
 
   block::tag_propagation_policy_t
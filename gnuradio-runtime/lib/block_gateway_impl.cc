@@ -39,6 +39,18 @@ namespace gr {
     }
   }
 
+  static inline high_res_timer_type
+  thread_cpu_ticks(void)
+  {
+#ifdef GNURADIO_HRT_USE_CLOCK_GETTIME
+    timespec ts;
+    clock_gettime(CLOCK_THREAD_CPUTIME_ID, &ts);
+    return ts.tv_sec*high_res_timer_tps() + ts.tv_nsec;
+#else
+    return 0; //no per-thread clock on this platform
+#endif
+  }
+
 
   block_gateway::sptr
   block_gateway::make(feval_ll *handler,
@@ -61,8 +73,11 @@ namespace gr {
                                          const unsigned factor)
     : block(name, in_sig, out_sig),
       _handler(handler),
+      _dispatch_timing(false),
       _work_type(work_type)
   {
+    reset_dispatch_timing();
+
     switch(_work_type) {
     case GR_BLOCK_GW_WORK_GENERAL:
       _decim = 1; //not relevant, but set anyway
@@ -97,7 +112,7 @@ namespace gr {
       _message.action = block_gw_message_type::ACTION_FORECAST;
       _message.forecast_args_noutput_items = noutput_items;
       _message.forecast_args_ninput_items_required = ninput_items_required;
-      _handler->calleval(0);
+      call_handler();
       ninput_items_required = _message.forecast_args_ninput_items_required;
       return;
 
@@ -122,7 +137,7 @@ namespace gr {
       _message.general_work_args_ninput_items = ninput_items;
       copy_pointers(_message.general_work_args_input_items, input_items);
       _message.general_work_args_output_items = output_items;
-      _handler->calleval(0);
+      call_handler();
       return _message.general_work_args_return_value;
 
     default:
@@ -145,7 +160,7 @@ namespace gr {
     _message.work_args_noutput_items = noutput_items;
     copy_pointers(_message.work_args_input_items, input_items);
     _message.work_args_output_items = output_items;
-    _handler->calleval(0);
+    call_handler();
     return _message.work_args_return_value;
   }
 
@@ -165,7 +180,7 @@ namespace gr {
   block_gateway_impl::start(void)
   {
     _message.action = block_gw_message_type::ACTION_START;
-    _handler->calleval(0);
+    call_handler();
     return _message.start_args_return_value;
   }
 
@@ -173,7 +188,7 @@ namespace gr {
   block_gateway_impl::stop(void)
   {
     _message.action = block_gw_message_type::ACTION_STOP;
-    _handler->calleval(0);
+    call_handler();
     return _message.stop_args_return_value;
   }
 
@@ -183,4 +198,47 @@ namespace gr {
     return _message;
   }
 
+  void
+  block_gateway_impl::call_handler(void)
+  {
+    if(!_dispatch_timing) {
+      _handler->calleval(0);
+      return;
+    }
+
+    const block_gw_message_type::action_type action = _message.action;
+    const high_res_timer_type wall0 = high_res_timer_now();
+    const high_res_timer_type cpu0 = thread_cpu_ticks();
+    _handler->calleval(0);
+    _dispatch_cpu_ticks[action] += thread_cpu_ticks() - cpu0;
+    _dispatch_wall_ticks[action] += high_res_timer_now() - wall0;
+  }
+
+  void
+  block_gateway_impl::set_dispatch_timing(bool enable)
+  {
+    _dispatch_timing = enable;
+  }
+
+  void
+  block_gateway_impl::reset_dispatch_timing(void)
+  {
+    for(size_t i = 0; i < NUM_ACTIONS; i++) {
+      _dispatch_wall_ticks[i] = 0;
+      _dispatch_cpu_ticks[i] = 0;
+    }
+  }
+
+  double
+  block_gateway_impl::dispatch_wall_time(block_gw_message_type::action_type action)
+  {
+    return double(_dispatch_wall_ticks[action])/high_res_timer_tps();
+  }
+
+  double
+  block_gateway_impl::dispatch_cpu_time(block_gw_message_type::action_type action)
+  {
+    return double(_dispatch_cpu_ticks[action])/high_res_timer_tps();
+  }
+
 } /* namespace gr */
@@ -24,6 +24,7 @@
 #define INCLUDED_RUNTIME_BLOCK_GATEWAY_IMPL_H
 
 #include <gnuradio/block_gateway.h>
+#include <gnuradio/high_res_timer.h>
 
 namespace gr {
 
@@ -33,6 +34,8 @@ namespace gr {
   class block_gateway_impl : public block_gateway
   {
   public:
+    static const size_t NUM_ACTIONS = block_gw_message_type::ACTION_STOP + 1;
+
     block_gateway_impl(feval_ll *handler,
                        const std::string &name,
                        gr::io_signature::sptr in_sig,
@@ -63,8 +66,18 @@ namespace gr {
 
     block_gw_message_type& block_message(void);
 
+    void set_dispatch_timing(bool enable);
+    void reset_dispatch_timing(void);
+    double dispatch_wall_time(block_gw_message_type::action_type action);
+    double dispatch_cpu_time(block_gw_message_type::action_type action);
+
   private:
+    void call_handler(void);
+
     feval_ll *_handler;
+    bool _dispatch_timing;
+    high_res_timer_type _dispatch_wall_ticks[NUM_ACTIONS];
+    high_res_timer_type _dispatch_cpu_ticks[NUM_ACTIONS];
     block_gw_message_type _message;
     const block_gw_work_type _work_type;
     unsigned _decim, _interp;
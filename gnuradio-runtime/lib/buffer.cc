@@ -83,7 +83,7 @@ namespace gr {
     : d_base(0), d_bufsize(0), d_max_reader_delay(0), d_vmcircbuf(0),
       d_sizeof_item(sizeof_item), d_link(link),
       d_write_index(0), d_abs_write_offset(0), d_done(false),
-      d_last_min_items_read(0)
+      d_tags_begin(0), d_last_min_items_read(0)
   {
     if(!allocate_buffer (nitems, sizeof_item))
       throw std::bad_alloc ();
@@ -162,7 +162,9 @@ namespace gr {
       }
 
       if(min_items_read != d_last_min_items_read) {
-        prune_tags(d_last_min_items_read);
+        // readers see tags d_max_reader_delay items later, keep those
+        prune_tags(d_last_min_items_read - std::min<uint64_t>(d_last_min_items_read,
+                                                             d_max_reader_delay));
         d_last_min_items_read = min_items_read;
       }
 
@@ -221,20 +223,49 @@ namespace gr {
     d_readers.erase(result);
   }
 
+  static bool
+  tag_before(const tag_t &tag, uint64_t offset)
+  {
+    return tag.offset < offset;
+  }
+
+  static bool
+  tag_after(uint64_t offset, const tag_t &tag)
+  {
+    return offset < tag.offset;
+  }
+
+  std::vector<tag_t>::iterator
+  buffer::get_tags_lower_bound(uint64_t x)
+  {
+    return std::lower_bound(get_tags_begin(), get_tags_end(), x, tag_before);
+  }
+
+  std::vector<tag_t>::iterator
+  buffer::get_tags_upper_bound(uint64_t x)
+  {
+    return std::upper_bound(get_tags_begin(), get_tags_end(), x, tag_after);
+  }
+
   void
   buffer::add_item_tag(const tag_t &tag)
   {
     gr::thread::scoped_lock guard(*mutex());
-    d_item_tags.insert(std::pair<uint64_t,tag_t>(tag.offset,tag));
+    // tags nearly always arrive in order and are simply appended
+    if(d_item_tags.size() == d_tags_begin || d_item_tags.back().offset <= tag.offset)
+      d_item_tags.push_back(tag);
+    else
+      d_item_tags.insert(get_tags_upper_bound(tag.offset), tag);
   }
 
   void
   buffer::remove_item_tag(const tag_t &tag, long id)
   {
     gr::thread::scoped_lock guard(*mutex());
-    for(std::multimap<uint64_t,tag_t>::iterator it = d_item_tags.lower_bound(tag.offset); it != d_item_tags.upper_bound(tag.offset); ++it) {
-      if((*it).second == tag) {
-        (*it).second.marked_deleted.push_back(id);
+    std::vector<tag_t>::iterator it_end = get_tags_upper_bound(tag.offset);
+    for(std::vector<tag_t>::iterator it = get_tags_lower_bound(tag.offset); it != it_end; ++it) {
+      if(*it == tag) {
+        it->marked_deleted.push_back(id);
       }
     }
   }
@@ -250,9 +281,20 @@ namespace gr {
        If this function is used elsewhere, remember to lock the
        buffer's mutex al la the scoped_lock line below.
     */
-    std::multimap<uint64_t, tag_t>::iterator end_itr = d_item_tags.lower_bound(max_time);
-    std::multimap<uint64_t, tag_t>::iterator begin_itr = d_item_tags.begin();
-    d_item_tags.erase(begin_itr, end_itr);
+    while(d_tags_begin < d_item_tags.size() && d_item_tags[d_tags_begin].offset < max_time)
+      d_tags_begin++;
+
+    // Drop the pruned tags once they are at least half of the vector,
+    // so each tag is moved at most once on average. The capacity is
+    // kept, there are no allocations once the vector has grown.
+    if(d_tags_begin == d_item_tags.size()) {
+      d_item_tags.clear();
+      d_tags_begin = 0;
+    }
+    else if(2*d_tags_begin >= d_item_tags.size()) {
+      d_item_tags.erase(d_item_tags.begin(), d_item_tags.begin() + d_tags_begin);
+      d_tags_begin = 0;
+    }
   }
 
   long
@@ -322,24 +364,24 @@ namespace gr {
     gr::thread::scoped_lock guard(*mutex());
 
     v.resize(0);
-    std::multimap<uint64_t,tag_t>::iterator itr = d_buffer->get_tags_lower_bound(abs_start);
-    std::multimap<uint64_t,tag_t>::iterator itr_end   = d_buffer->get_tags_upper_bound(abs_end);
-
-    uint64_t item_time;
-    while(itr != itr_end) {
-      item_time = (*itr).second.offset + d_attr_delay;
-      if((item_time >= abs_start) && (item_time < abs_end)) {
-        std::vector<long>::iterator id_itr;
-        id_itr = std::find(itr->second.marked_deleted.begin(), itr->second.marked_deleted.end(), id);
-        // If id is not in the vector of marked blocks
-        if(id_itr == itr->second.marked_deleted.end()) {
-          tag_t t = (*itr).second;
-          t.offset += d_attr_delay;
-          v.push_back(t);
-          v.back().marked_deleted.clear();
-        }
+
+    // tags are stored at their offset before this reader's delay
+    uint64_t start = (abs_start > d_attr_delay) ? abs_start - d_attr_delay : 0;
+    uint64_t end = (abs_end > d_attr_delay) ? abs_end - d_attr_delay : 0;
+    std::vector<tag_t>::iterator itr = d_buffer->get_tags_lower_bound(start);
+    std::vector<tag_t>::iterator itr_end = d_buffer->get_tags_lower_bound(end);
+
+    for(; itr != itr_end; itr++) {
+      // If id is not in the vector of marked blocks
+      if(std::find(itr->marked_deleted.begin(), itr->marked_deleted.end(), id)
+         == itr->marked_deleted.end()) {
+        v.push_back(tag_t());
+        tag_t &t = v.back();
+        t.offset = itr->offset + d_attr_delay;
+        t.key = itr->key;
+        t.value = itr->value;
+        t.srcid = itr->srcid;
       }
-      itr++;
     }
   }
 
@@ -47,7 +47,7 @@ namespace gr {
   }
 
   message::message(long type, double arg1, double arg2, size_t length)
-    : d_type(type), d_arg1(arg1), d_arg2(arg2)
+    : d_type(type), d_arg1(arg1), d_arg2(arg2), d_insert_time(0)
   {
     if(length == 0)
       d_buf_start = d_msg_start = d_msg_end = d_buf_end = 0;
@@ -26,6 +26,7 @@
 
 #include <gnuradio/msg_queue.h>
 #include <stdexcept>
+#include <boost/date_time/posix_time/posix_time.hpp>
 
 namespace gr {
 
@@ -52,6 +53,10 @@ namespace gr {
     if(msg->d_next)
       throw std::invalid_argument("gr::msg_queue::insert_tail: msg already in queue");
 
+    static const boost::posix_time::ptime epoch(boost::posix_time::from_time_t(0));
+    msg->d_insert_time = (boost::posix_time::microsec_clock::universal_time() - epoch)
+      .total_microseconds()*1e-6;
+
     gr::thread::scoped_lock guard(d_mutex);
 
     while(full_p())
@@ -69,7 +74,8 @@ namespace gr {
       msg->d_next.reset();
     }
     d_count++;
-    d_not_empty.notify_one();
+    // wake every waiter, one may be in wait_not_empty() and not take it
+    d_not_empty.notify_all();
   }
 
   message::sptr
@@ -118,6 +124,26 @@ namespace gr {
     return m;
   }
 
+  bool
+  msg_queue::wait_not_empty(unsigned int millisec)
+  {
+    gr::thread::scoped_lock guard(d_mutex);
+
+    if(millisec) {
+      boost::system_time const timeout = boost::get_system_time() +
+        boost::posix_time::milliseconds(millisec);
+      while(d_head == 0) {
+        if(!d_not_empty.timed_wait(guard, timeout))
+          return d_head != 0;
+      }
+    }
+    else {
+      while(d_head == 0)
+        d_not_empty.wait(guard);
+    }
+    return true;
+  }
+
   void
   msg_queue::flush()
   {
@@ -0,0 +1,215 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2014 Free Software Foundation, Inc.
+ *
+ * This file is part of GNU Radio
+ *
+ * GNU Radio is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * GNU Radio is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GNU Radio; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+/*
+ * Stream throughput of a chain of blocks with history and an
+ * output_multiple, run by the GNU Radio scheduler and by Pothos
+ * with and without the circular buffers of GrPothosBlock:
+ *
+ *   source -> moving sum x nblocks -> sink
+ *
+ * usage: benchmark_pothos_buffers [nblocks [history [multiple [seconds]]]]
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include <gnuradio/sync_block.h>
+#include <gnuradio/top_block.h>
+#include <gnuradio/io_signature.h>
+#include <gnuradio/high_res_timer.h>
+#include <gnuradio/prefs.h>
+#include <Pothos/Framework.hpp>
+#include <Pothos/Proxy.hpp>
+#include <Pothos/Init.hpp>
+#include <boost/thread/thread.hpp>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <vector>
+
+class stream_source : public gr::sync_block
+{
+public:
+  stream_source()
+    : gr::sync_block("stream_source",
+                     gr::io_signature::make(0, 0, 0),
+                     gr::io_signature::make(1, 1, sizeof(gr_complex)))
+  {}
+
+  int work(int noutput_items,
+           gr_vector_const_void_star &input_items,
+           gr_vector_void_star &output_items)
+  {
+    gr_complex *out = (gr_complex *)output_items[0];
+    for(int i = 0; i < noutput_items; i++)
+      out[i] = gr_complex(1.0f, -1.0f);
+    return noutput_items;
+  }
+};
+
+class moving_sum : public gr::sync_block
+{
+public:
+  moving_sum(unsigned history, int multiple)
+    : gr::sync_block("moving_sum",
+                     gr::io_signature::make(1, 1, sizeof(gr_complex)),
+                     gr::io_signature::make(1, 1, sizeof(gr_complex)))
+  {
+    set_history(history);
+    set_output_multiple(multiple);
+  }
+
+  int work(int noutput_items,
+           gr_vector_const_void_star &input_items,
+           gr_vector_void_star &output_items)
+  {
+    const gr_complex *in = (const gr_complex *)input_items[0];
+    gr_complex *out = (gr_complex *)output_items[0];
+    const unsigned h = history();
+    gr_complex sum(0, 0);
+    for(unsigned j = 0; j < h - 1; j++)
+      sum += in[j];
+    for(int i = 0; i < noutput_items; i++) {
+      sum += in[i + h - 1];
+      out[i] = sum;
+      sum -= in[i];
+    }
+    return noutput_items;
+  }
+};
+
+class stream_sink : public gr::sync_block
+{
+public:
+  uint64_t items;
+
+  stream_sink()
+    : gr::sync_block("stream_sink",
+                     gr::io_signature::make(1, 1, sizeof(gr_complex)),
+                     gr::io_signature::make(0, 0, 0)),
+      items(0)
+  {}
+
+  int work(int noutput_items,
+           gr_vector_const_void_star &input_items,
+           gr_vector_void_star &output_items)
+  {
+    items += noutput_items;
+    return noutput_items;
+  }
+};
+
+typedef boost::shared_ptr<stream_sink> stream_sink_sptr;
+
+static std::vector<gr::block_sptr>
+make_chain(int nblocks, unsigned history, int multiple, stream_sink_sptr &sink)
+{
+  std::vector<gr::block_sptr> chain;
+  chain.push_back(gr::block_sptr(new stream_source()));
+  for(int i = 0; i < nblocks; i++)
+    chain.push_back(gr::block_sptr(new moving_sum(history, multiple)));
+  sink = stream_sink_sptr(new stream_sink());
+  chain.push_back(sink);
+  return chain;
+}
+
+static double
+elapsed_since(gr::high_res_timer_type start)
+{
+  return (double)(gr::high_res_timer_now() - start) / gr::high_res_timer_tps();
+}
+
+static double
+run_gnuradio(int nblocks, unsigned history, int multiple, double seconds)
+{
+  stream_sink_sptr sink;
+  std::vector<gr::block_sptr> chain = make_chain(nblocks, history, multiple, sink);
+
+  gr::top_block_sptr tb = gr::make_top_block("benchmark_pothos_buffers");
+  for(size_t i = 1; i < chain.size(); i++)
+    tb->connect(chain[i-1], 0, chain[i], 0);
+
+  gr::high_res_timer_type start = gr::high_res_timer_now();
+  tb->start();
+  boost::this_thread::sleep(boost::posix_time::milliseconds(long(seconds*1000)));
+  tb->stop();
+  tb->wait();
+  return sink->items / elapsed_since(start);
+}
+
+static double
+run_pothos(int nblocks, unsigned history, int multiple, double seconds, bool circular)
+{
+  gr::prefs::singleton()->set_bool("Pothos", "circular_buffers", circular);
+
+  stream_sink_sptr sink;
+  std::vector<gr::block_sptr> chain = make_chain(nblocks, history, multiple, sink);
+
+  auto env = Pothos::ProxyEnvironment::make("managed");
+  auto registry = env->findProxy("Pothos/BlockRegistry");
+  std::vector<Pothos::Proxy> blocks;
+  for(size_t i = 0; i < chain.size(); i++)
+    blocks.push_back(registry.callProxy("/gnuradio/block", chain[i]));
+
+  auto topology = Pothos::Topology::make();
+  for(size_t i = 1; i < blocks.size(); i++)
+    topology->connect(blocks[i-1], 0, blocks[i], 0);
+
+  gr::high_res_timer_type start = gr::high_res_timer_now();
+  topology->commit();
+  boost::this_thread::sleep(boost::posix_time::milliseconds(long(seconds*1000)));
+  topology->disconnectAll();
+  topology->commit();
+  return sink->items / elapsed_since(start);
+}
+
+int
+main(int argc, char **argv)
+{
+  int nblocks = argc > 1 ? atoi(argv[1]) : 8;
+  unsigned history = argc > 2 ? atoi(argv[2]) : 64;
+  int multiple = argc > 3 ? atoi(argv[3]) : 1024;
+  double seconds = argc > 4 ? atof(argv[4]) : 5.0;
+
+  if(nblocks < 0 || history < 1 || multiple < 1) {
+    fprintf(stderr, "usage: %s [nblocks [history [multiple [seconds]]]]\n", argv[0]);
+    return 1;
+  }
+
+  Pothos::ScopedInit init;
+  printf("%d blocks, history %u, output_multiple %d, %g seconds\n",
+         nblocks, history, multiple, seconds);
+
+  const double gr_rate = run_gnuradio(nblocks, history, multiple, seconds);
+  printf("%-16s %10.3f Msamps/s\n", "gnuradio", gr_rate / 1e6);
+
+  const bool circular[] = {true, false};
+  const char *names[] = {"pothos circular", "pothos generic"};
+  for(int i = 0; i < 2; i++) {
+    const double rate = run_pothos(nblocks, history, multiple, seconds, circular[i]);
+    printf("%-16s %10.3f Msamps/s  (%5.1f%% of gnuradio)\n",
+           names[i], rate / 1e6, 100.0 * rate / gr_rate);
+  }
+  return 0;
+}
@@ -0,0 +1,252 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2014 Free Software Foundation, Inc.
+ *
+ * This file is part of GNU Radio
+ *
+ * GNU Radio is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * GNU Radio is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GNU Radio; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+/*
+ * Tag throughput of a chain of blocks, run by the GNU Radio
+ * scheduler and by Pothos through GrPothosBlock:
+ *
+ *   source -> copy x ncopies -> keep 1 in 2 -> copy -> counter
+ *
+ * The source puts an rx_time and a packet_len tag on every
+ * period'th item. The counter checks that every tag arrives on a
+ * multiple of period/2, ie that offsets were scaled by the
+ * decimator.
+ *
+ * usage: benchmark_pothos_tags [period [ncopies [seconds]]]
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include <gnuradio/sync_block.h>
+#include <gnuradio/sync_decimator.h>
+#include <gnuradio/top_block.h>
+#include <gnuradio/io_signature.h>
+#include <gnuradio/high_res_timer.h>
+#include <Pothos/Framework.hpp>
+#include <Pothos/Proxy.hpp>
+#include <Pothos/Init.hpp>
+#include <boost/thread/thread.hpp>
+#include <cstdio>
+#include <cstdlib>
+#include <cstring>
+#include <vector>
+
+class tag_source : public gr::sync_block
+{
+  uint64_t d_period;
+  pmt::pmt_t d_time_key;
+  pmt::pmt_t d_len_key;
+  pmt::pmt_t d_len;
+
+public:
+  tag_source(uint64_t period)
+    : gr::sync_block("tag_source",
+                     gr::io_signature::make(0, 0, 0),
+                     gr::io_signature::make(1, 1, sizeof(float))),
+      d_period(period),
+      d_time_key(pmt::string_to_symbol("rx_time")),
+      d_len_key(pmt::string_to_symbol("packet_len")),
+      d_len(pmt::from_long(period))
+  {}
+
+  int work(int noutput_items,
+           gr_vector_const_void_star &input_items,
+           gr_vector_void_star &output_items)
+  {
+    memset(output_items[0], 0, noutput_items*sizeof(float));
+    const uint64_t start = nitems_written(0);
+    const uint64_t end = start + noutput_items;
+    for(uint64_t n = ((start + d_period - 1) / d_period) * d_period; n < end; n += d_period) {
+      add_item_tag(0, n, d_time_key,
+                   pmt::make_tuple(pmt::from_uint64(n), pmt::from_double(0.0)));
+      add_item_tag(0, n, d_len_key, d_len);
+    }
+    return noutput_items;
+  }
+};
+
+class tag_copy : public gr::sync_block
+{
+public:
+  tag_copy()
+    : gr::sync_block("tag_copy",
+                     gr::io_signature::make(1, 1, sizeof(float)),
+                     gr::io_signature::make(1, 1, sizeof(float)))
+  {}
+
+  int work(int noutput_items,
+           gr_vector_const_void_star &input_items,
+           gr_vector_void_star &output_items)
+  {
+    memcpy(output_items[0], input_items[0], noutput_items*sizeof(float));
+    return noutput_items;
+  }
+};
+
+class tag_keep_half : public gr::sync_decimator
+{
+public:
+  tag_keep_half()
+    : gr::sync_decimator("tag_keep_half",
+                         gr::io_signature::make(1, 1, sizeof(float)),
+                         gr::io_signature::make(1, 1, sizeof(float)), 2)
+  {}
+
+  int work(int noutput_items,
+           gr_vector_const_void_star &input_items,
+           gr_vector_void_star &output_items)
+  {
+    const float *in = (const float *)input_items[0];
+    float *out = (float *)output_items[0];
+    for(int i = 0; i < noutput_items; i++)
+      out[i] = in[2*i];
+    return noutput_items;
+  }
+};
+
+class tag_counter : public gr::sync_block
+{
+  uint64_t d_period;
+  std::vector<gr::tag_t> d_tags;
+
+public:
+  uint64_t items;
+  uint64_t tags;
+  uint64_t misplaced;
+
+  tag_counter(uint64_t period)
+    : gr::sync_block("tag_counter",
+                     gr::io_signature::make(1, 1, sizeof(float)),
+                     gr::io_signature::make(0, 0, 0)),
+      d_period(period), items(0), tags(0), misplaced(0)
+  {}
+
+  int work(int noutput_items,
+           gr_vector_const_void_star &input_items,
+           gr_vector_void_star &output_items)
+  {
+    const uint64_t start = nitems_read(0);
+    get_tags_in_range(d_tags, 0, start, start + noutput_items);
+    for(size_t i = 0; i < d_tags.size(); i++) {
+      if(d_tags[i].offset % d_period != 0)
+        misplaced++;
+    }
+    tags += d_tags.size();
+    items += noutput_items;
+    return noutput_items;
+  }
+};
+
+typedef boost::shared_ptr<tag_counter> tag_counter_sptr;
+
+static std::vector<gr::block_sptr>
+make_chain(uint64_t period, int ncopies, tag_counter_sptr &counter)
+{
+  std::vector<gr::block_sptr> chain;
+  chain.push_back(gr::block_sptr(new tag_source(period)));
+  for(int i = 0; i < ncopies; i++)
+    chain.push_back(gr::block_sptr(new tag_copy()));
+  chain.push_back(gr::block_sptr(new tag_keep_half()));
+  chain.push_back(gr::block_sptr(new tag_copy()));
+  counter = tag_counter_sptr(new tag_counter(period / 2));
+  chain.push_back(counter);
+  return chain;
+}
+
+static void
+report(const char *name, const tag_counter_sptr &counter, double elapsed)
+{
+  printf("%-8s %10.3f Mitems/s %10.3f Mtags/s  (%llu tags, %llu misplaced)\n",
+         name, counter->items / elapsed / 1e6, counter->tags / elapsed / 1e6,
+         (unsigned long long)counter->tags,
+         (unsigned long long)counter->misplaced);
+}
+
+static double
+elapsed_since(gr::high_res_timer_type start)
+{
+  return (double)(gr::high_res_timer_now() - start) / gr::high_res_timer_tps();
+}
+
+static void
+run_gnuradio(uint64_t period, int ncopies, double seconds)
+{
+  tag_counter_sptr counter;
+  std::vector<gr::block_sptr> chain = make_chain(period, ncopies, counter);
+
+  gr::top_block_sptr tb = gr::make_top_block("benchmark_pothos_tags");
+  for(size_t i = 1; i < chain.size(); i++)
+    tb->connect(chain[i-1], 0, chain[i], 0);
+
+  gr::high_res_timer_type start = gr::high_res_timer_now();
+  tb->start();
+  boost::this_thread::sleep(boost::posix_time::milliseconds(long(seconds*1000)));
+  tb->stop();
+  tb->wait();
+  report("gnuradio", counter, elapsed_since(start));
+}
+
+static void
+run_pothos(uint64_t period, int ncopies, double seconds)
+{
+  tag_counter_sptr counter;
+  std::vector<gr::block_sptr> chain = make_chain(period, ncopies, counter);
+
+  auto env = Pothos::ProxyEnvironment::make("managed");
+  auto registry = env->findProxy("Pothos/BlockRegistry");
+  std::vector<Pothos::Proxy> blocks;
+  for(size_t i = 0; i < chain.size(); i++)
+    blocks.push_back(registry.callProxy("/gnuradio/block", chain[i]));
+
+  auto topology = Pothos::Topology::make();
+  for(size_t i = 1; i < blocks.size(); i++)
+    topology->connect(blocks[i-1], 0, blocks[i], 0);
+
+  gr::high_res_timer_type start = gr::high_res_timer_now();
+  topology->commit();
+  boost::this_thread::sleep(boost::posix_time::milliseconds(long(seconds*1000)));
+  topology->disconnectAll();
+  topology->commit();
+  report("pothos", counter, elapsed_since(start));
+}
+
+int
+main(int argc, char **argv)
+{
+  uint64_t period = argc > 1 ? strtoull(argv[1], NULL, 0) : 64;
+  int ncopies = argc > 2 ? atoi(argv[2]) : 4;
+  double seconds = argc > 3 ? atof(argv[3]) : 5.0;
+
+  if(period < 2 || period % 2 != 0) {
+    fprintf(stderr, "period must be even\n");
+    return 1;
+  }
+
+  Pothos::ScopedInit init;
+  printf("tag every %llu items, %d copies, %g seconds\n",
+         (unsigned long long)period, ncopies, seconds);
+  run_gnuradio(period, ncopies, seconds);
+  run_pothos(period, ncopies, seconds);
+  return 0;
+}
@@ -30,10 +30,13 @@
 #include "pothos_block_executor.h"
 #include "pothos_support.h"
 #include <Pothos/Util/MathCompat.hpp>
+#include <gnuradio/prefs.h>
 #include <cmath>
 #include <cassert>
 #include <cctype>
 #include <iostream>
+#include <stdexcept>
+#include <vector>
 
 /***********************************************************************
  * try our best to infer the data type given the info at hand
@@ -101,6 +104,7 @@ public:
 private:
     boost::shared_ptr<gr::block> d_block;
     gr::pothos_block_executor *d_exec;
+    std::vector<pmt::pmt_t> d_msgs;
 };
 
 /***********************************************************************
@@ -167,6 +171,13 @@ void GrPothosBlock::activate(void)
 {
     auto block = gr::cast_to_block_sptr(d_block->shared_from_this());
     d_exec = new gr::pothos_block_executor(block);
+
+    //work() posts and drains the queues on the same thread,
+    //the Pothos ports already hold messages back so never block
+    for (const auto &i : d_block->get_msg_map())
+    {
+        d_block->set_msg_queue_limit(i.first, 0);
+    }
 }
 
 void GrPothosBlock::deactivate(void)
@@ -189,15 +200,14 @@ void GrPothosBlock::work(void)
     }
 
     // handle any queued up messages
-    pmt::pmt_t msg;
     for (const auto &i : d_block->get_msg_map())
     {
         // Check if we have a message handler attached before getting
         // any messages. This is mostly a protection for the unknown
         // startup sequence of the threads.
         if(d_block->has_msg_handler(i.first)) {
-          while((msg = d_block->delete_head_nowait(i.first))) {
-            d_block->dispatch_msg(i.first,msg);
+          while(d_block->delete_all_nowait(i.first, d_msgs)) {
+            d_block->dispatch_msgs(i.first, d_msgs);
           }
         }
     }
@@ -215,6 +225,7 @@ void GrPothosBlock::work(void)
     const auto &workInfo = Pothos::Block::workInfo();
     if (workInfo.minInElements < reserve) return;
     if (workInfo.minOutElements == 0) return;
+    if (workInfo.minOutElements < size_t(d_block->output_multiple())) return;
     if (d_block->fixed_rate() and int(workInfo.minOutElements) < d_block->fixed_rate_ninput_to_noutput(reserve)) return;
 
     //run the executor for one iteration to call into derived class's work()
@@ -226,57 +237,74 @@ void GrPothosBlock::work(void)
  **********************************************************************/
 void GrPothosBlock::propagateLabels(const Pothos::InputPort *inputPort)
 {
-    switch (d_block->tag_propagation_policy())
-    {
-    case gr::block::TPP_DONT: return;
-    case gr::block::TPP_ONE_TO_ONE:
-    {
-        if (inputPort->index() == -1) return;
-        const auto portIndex = size_t(inputPort->index());
-        if (portIndex >= Pothos::Block::outputs().size()) return;
-        auto outputPort = Pothos::Block::output(portIndex);
-        for (const auto &label : inputPort->labels())
-        {
-            auto newLabel = label;
-            newLabel.index += d_block->sample_delay(inputPort->index());
-            newLabel.index = std::llround(newLabel.index*d_block->relative_rate());
-            outputPort->postLabel(label);
-        }
-    }
-    case gr::block::TPP_ALL_TO_ALL:
-    {
-        for (const auto &label : inputPort->labels())
-        {
-            auto newLabel = label;
-            newLabel.index += d_block->sample_delay(inputPort->index());
-            newLabel.index = std::llround(newLabel.index*d_block->relative_rate());
-            for (auto outputPort : Pothos::Block::outputs()) outputPort->postLabel(label);
-        }
-    }
-    default: return;
-    }
+    d_exec->propagate_labels(inputPort);
 }
 
 /***********************************************************************
- * custom buffer managers - circular buffers for blocks with history
+ * custom buffer managers - circular buffers like GNU Radio's
+ *
+ * With circular buffers on both sides of a connection consecutive
+ * chunks are contiguous, so the input never has to copy items into
+ * an accumulator to satisfy history, and the output always offers
+ * the whole free space so output_multiple can be met. This can be
+ * turned off with the [Pothos] circular_buffers option.
  **********************************************************************/
+//same as flat_flowgraph.cc, buffers hold twice this many bytes
+static const size_t GR_FIXED_BUFFER_SIZE = 32*(1L<<10);
+
+static bool useCircularBuffers(void)
+{
+    return gr::prefs::singleton()->get_bool("Pothos", "circular_buffers", true);
+}
+
+static Pothos::BufferManager::Sptr makeCircularBufferManager(const size_t itemSize, const size_t nitems)
+{
+    Pothos::BufferManagerArgs args;
+    args.bufferSize = std::max(args.bufferSize, nitems*itemSize);
+    return Pothos::BufferManager::make("circular", args);
+}
+
 Pothos::BufferManager::Sptr GrPothosBlock::getInputBufferManager(const std::string &name, const std::string &domain)
 {
     //install circular buffer when history is enabled
     const size_t d_history = d_block->history();
-    if (d_history > 1)
+    if (d_history > 1 or useCircularBuffers())
     {
-        Pothos::BufferManagerArgs args;
-        const auto require = (d_history+1)*Pothos::Block::input(name)->dtype().size();
-        args.bufferSize = std::max(args.bufferSize, require*8/*factor*/);
-        return Pothos::BufferManager::make("circular", args);
+        const size_t itemSize = Pothos::Block::input(name)->dtype().size();
+        const double decimation = 1.0/d_block->relative_rate();
+        const size_t multiple = d_block->output_multiple();
+        size_t nitems = 2*GR_FIXED_BUFFER_SIZE/itemSize;
+        nitems = std::max(nitems, size_t(2*(decimation*multiple + d_history)));
+        if (d_history > 1) nitems = std::max(nitems, (d_history+1)*8/*factor*/);
+        return makeCircularBufferManager(itemSize, nitems);
     }
     return Pothos::Block::getInputBufferManager(name, domain);
 }
 
 Pothos::BufferManager::Sptr GrPothosBlock::getOutputBufferManager(const std::string &name, const std::string &domain)
 {
-    return Pothos::Block::getOutputBufferManager(name, domain);
+    if (not useCircularBuffers()) return Pothos::Block::getOutputBufferManager(name, domain);
+
+    //sized the way flat_flowgraph::allocate_buffer() does, except that
+    //downstream blocks are not known here: blocks downstream with a long
+    //history may need min_output_buffer set on this block
+    const int port = Pothos::Block::output(name)->index();
+    const size_t itemSize = Pothos::Block::output(name)->dtype().size();
+    const long multiple = d_block->output_multiple();
+    long nitems = 2*GR_FIXED_BUFFER_SIZE/itemSize;
+    nitems = std::max(nitems, 2*multiple);
+    if (d_block->max_output_buffer(port) > 0)
+    {
+        nitems = std::min(nitems, d_block->max_output_buffer(port));
+        nitems -= nitems%multiple;
+    }
+    else if (d_block->min_output_buffer(port) > 0)
+    {
+        nitems = std::max(nitems, d_block->min_output_buffer(port));
+        nitems -= nitems%multiple;
+    }
+    if (nitems < 1) throw std::runtime_error("problems allocating a buffer with the given max output buffer constraint!");
+    return makeCircularBufferManager(itemSize, size_t(nitems));
 }
 
 /***********************************************************************
@@ -91,71 +91,33 @@ namespace gr {
     return min_space;
   }
 
-  static bool
-  propagate_tags(block::tag_propagation_policy_t policy, Pothos::Block *d,
-                 const std::vector<uint64_t> &start_nitems_read, double rrate,
-                 std::vector<tag_t> &rtags, long block_id)
+  //
+  // Move the labels consumed on an input to an output the way
+  // tags are moved: the absolute offset of each label is scaled by
+  // the relative rate. Input labels are indexed from the front of
+  // the input buffer and output labels from the next item written.
+  // Only the index is rewritten, the label data is shared.
+  //
+  static void
+  post_labels(const Pothos::InputPort *input, Pothos::OutputPort *output,
+              uint64_t delay, double rrate)
   {
-    // Move tags downstream
-    // if a sink, we don't need to move downstream
-    if(d->outputs().empty()) {
-      return true;
-    }
-
-    switch(policy) {
-    case block::TPP_DONT:
-      return true;
-      break;
-    case block::TPP_ALL_TO_ALL:
-      // every tag on every input propogates to everyone downstream
-      for(size_t i = 0; i < d->inputs().size(); i++) {
-        //TODO d->get_tags_in_range(rtags, i, start_nitems_read[i],
-        //                     d->nitems_read(i), block_id);
-
-        std::vector<tag_t>::iterator t;
-        if(rrate == 1.0) {
-          for(t = rtags.begin(); t != rtags.end(); t++) {
-            //for(size_t o = 0; o < d->outputs().size(); o++)
-              //TODO d->output(o)->add_item_tag(*t);
-          }
-        }
-        else {
-          for(t = rtags.begin(); t != rtags.end(); t++) {
-            tag_t new_tag = *t;
-            new_tag.offset = ((double)new_tag.offset * rrate) + 0.5;
-            //for(size_t o = 0; o < d->outputs().size(); o++)
-              //TODO d->output(o)->add_item_tag(new_tag);
-          }
-        }
-      }
-      break;
-    case block::TPP_ONE_TO_ONE:
-      // tags from input i only go to output i
-      // this requires d->inputs().size() == d->noutputs; this is checked when this
-      // type of tag-propagation system is selected in block_detail
-      if(d->inputs().size() == d->outputs().size()) {
-        for(size_t i = 0; i < d->inputs().size(); i++) {
-          //TODO d->get_tags_in_range(rtags, i, start_nitems_read[i],
-          //                     d->nitems_read(i), block_id);
-
-          std::vector<tag_t>::iterator t;
-          for(t = rtags.begin(); t != rtags.end(); t++) {
-            tag_t new_tag = *t;
-            new_tag.offset = ((double)new_tag.offset * rrate) + 0.5;
-            //TODO d->output(i)->add_item_tag(new_tag);
-          }
-        }
+    const uint64_t nread = input->totalElements() + delay;
+    const uint64_t nwritten = output->totalElements();
+    for(const auto &label : input->labels()) {
+      uint64_t offset = nread + label.index;
+      if(rrate != 1.0)
+        offset = ((double)offset * rrate) + 0.5;
+      const uint64_t index = (offset > nwritten) ? offset - nwritten : 0;
+      if(index == label.index) {
+        output->postLabel(label);
       }
-      else  {
-        std::cerr << "Error: pothos_block_executor: propagation_policy 'ONE-TO-ONE' requires ninputs == noutputs" << std::endl;
-        return false;
+      else {
+        Pothos::Label new_label(label);
+        new_label.index = index;
+        output->postLabel(new_label);
       }
-
-      break;
-    default:
-      return true;
     }
-    return true;
   }
 
   pothos_block_executor::pothos_block_executor(block_sptr block, int max_noutput_items)
@@ -471,13 +433,9 @@ namespace gr {
         if(rrate > 0)
           m->set_relative_rate(rrate);
       }
-/*
-      // Now propagate the tags based on the new relative rate
-      if(!propagate_tags(m->tag_propagation_policy(), d,
-                         d_start_nitems_read, m->relative_rate(),
-                         d_returned_tags, m->unique_id()))
-        goto were_done;
-*/
+      // Tags are moved downstream by Pothos after work returns, it
+      // calls propagate_labels() for every input that was consumed.
+
       if(n == block::WORK_DONE)
         goto were_done;
 
@@ -512,4 +470,38 @@ namespace gr {
     return DONE;
   }
 
+  void
+  pothos_block_executor::propagate_labels(const Pothos::InputPort *input)
+  {
+    block        *m = d_block.get();
+    Pothos::Block *d = extractPothosBlock(m);
+
+    // if a sink, we don't need to move downstream
+    if(d->outputs().empty() || input->index() < 0)
+      return;
+
+    const size_t i = size_t(input->index());
+    const double rrate = m->relative_rate();
+    switch(m->tag_propagation_policy()) {
+    case block::TPP_DONT:
+      break;
+    case block::TPP_ALL_TO_ALL:
+      // every label on every input propagates to everyone downstream
+      for(size_t o = 0; o < d->outputs().size(); o++)
+        post_labels(input, d->output(o), m->sample_delay(i), rrate);
+      break;
+    case block::TPP_ONE_TO_ONE:
+      // labels from input i only go to output i
+      if(d->inputs().size() == d->outputs().size()) {
+        post_labels(input, d->output(i), m->sample_delay(i), rrate);
+      }
+      else {
+        std::cerr << "Error: pothos_block_executor: propagation_policy 'ONE-TO-ONE' requires ninputs == noutputs" << std::endl;
+      }
+      break;
+    default:
+      break;
+    }
+  }
+
 } /* namespace gr */
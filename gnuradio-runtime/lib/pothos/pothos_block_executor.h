@@ -28,6 +28,10 @@
 #include <gnuradio/tags.h>
 #include <fstream>
 
+namespace Pothos {
+  class InputPort;
+}
+
 namespace gr {
 
   /*!
@@ -48,7 +52,6 @@ namespace gr {
     std::vector<bool>		d_input_done;
     gr_vector_void_star		d_output_items;
     std::vector<uint64_t>       d_start_nitems_read; //stores where tag counts are before work
-    std::vector<tag_t>          d_returned_tags;
     int                         d_max_noutput_items;
 
 #ifdef GR_PERFORMANCE_COUNTERS
@@ -71,6 +74,12 @@ namespace gr {
      * \brief Run one iteration.
      */
     state run_one_iteration();
+
+    /*
+     * \brief Move the labels consumed on \p input to the outputs
+     * according to the block's tag propagation policy.
+     */
+    void propagate_labels(const Pothos::InputPort *input);
   };
 
 } /* namespace gr */
@@ -35,6 +35,9 @@ pmt::pmt_t obj_to_pmt(const Pothos::Object &obj)
     //the container is null
     if (not obj) return pmt::pmt_t();
 
+    //is it already a pmt? (stream tags are carried this way)
+    if (obj.type() == typeid(pmt::pmt_t)) return obj.extract<pmt::pmt_t>();
+
     //Packet support
     if (obj.type() == typeid(Pothos::Packet))
     {
@@ -144,9 +147,6 @@ pmt::pmt_t obj_to_pmt(const Pothos::Object &obj)
         return l;
     }
 
-    //is it already a pmt?
-    if (obj.type() == typeid(pmt::pmt_t)) return obj.extract<pmt::pmt_t>();
-
     //backup plan... boost::any
     return pmt::make_any(obj);
 }
@@ -193,7 +193,12 @@ Pothos::Object pmt_to_obj(const pmt::pmt_t &p)
 
     //numeric types
     //long can typedef to int64, force this to int32
-    if (pmt::is_integer(p)) return Pothos::Object(int32_t(pmt::to_long(p)));
+    if (pmt::is_integer(p))
+    {
+        const long v = pmt::to_long(p);
+        if (v == long(int32_t(v))) return Pothos::Object(int32_t(v));
+        return Pothos::Object(int64_t(v));
+    }
     //decl_pmt_to_obj(pmt::is_integer, pmt::to_long);
     decl_pmt_to_obj(pmt::is_uint64, pmt::to_uint64);
     decl_pmt_to_obj(pmt::is_real, pmt::to_double);
@@ -213,7 +218,16 @@ Pothos::Object pmt_to_obj(const pmt::pmt_t &p)
         return Pothos::Object(pr);
     }
 
-    //skipping tuples -- not really used
+    //tuple container (rx_time is carried this way)
+    if (pmt::is_tuple(p))
+    {
+        std::vector<Pothos::Object> l(pmt::length(p));
+        for (size_t i = 0; i < l.size(); i++)
+        {
+            l[i] = pmt_to_obj(pmt::tuple_ref(p, i));
+        }
+        return Pothos::Object(l);
+    }
 
     //vector container
     if (pmt::is_vector(p))
@@ -275,6 +289,37 @@ Pothos::Object pmt_to_obj(const pmt::pmt_t &p)
  **********************************************************************/
 #include <Pothos/Plugin.hpp>
 #include <Pothos/Callable.hpp>
+#include <Pothos/Exception.hpp>
+
+/***********************************************************************
+ * Stream tags travel through Pothos as labels holding the tag's pmt.
+ * These conversions let a native Pothos block read such a label with
+ * Object::convert(), so the value is only converted when it is used.
+ **********************************************************************/
+static int pmt_to_int32(const pmt::pmt_t &p)
+{
+    return int(pmt::to_long(p));
+}
+
+static long long pmt_to_int64(const pmt::pmt_t &p)
+{
+    return (long long)(pmt::to_long(p));
+}
+
+static std::string pmt_to_string(const pmt::pmt_t &p)
+{
+    return pmt::symbol_to_string(p);
+}
+
+static std::vector<Pothos::Object> pmt_to_obj_vector(const pmt::pmt_t &p)
+{
+    const Pothos::Object obj = pmt_to_obj(p);
+    if (obj.type() != typeid(std::vector<Pothos::Object>))
+    {
+        throw Pothos::InvalidArgumentException("pmt_to_obj_vector()", "not a tuple or vector");
+    }
+    return obj.extract<std::vector<Pothos::Object>>();
+}
 
 pothos_static_block(pothosObjectRegisterPMTSupport)
 {
@@ -284,4 +329,13 @@ pothos_static_block(pothosObjectRegisterPMTSupport)
     Pothos::PluginRegistry::add("/object/convert/gr/uint64_to_pmt", Pothos::Callable(&pmt::from_uint64));
     Pothos::PluginRegistry::add("/object/convert/gr/double_to_pmt", Pothos::Callable(&pmt::from_double));
     Pothos::PluginRegistry::add("/object/convert/gr/complex_to_pmt", Pothos::Callable::make<const std::complex<double> &>(&pmt::from_complex));
+
+    Pothos::PluginRegistry::add("/object/convert/gr/pmt_to_bool", Pothos::Callable(&pmt::to_bool));
+    Pothos::PluginRegistry::add("/object/convert/gr/pmt_to_string", Pothos::Callable(&pmt_to_string));
+    Pothos::PluginRegistry::add("/object/convert/gr/pmt_to_int", Pothos::Callable(&pmt_to_int32));
+    Pothos::PluginRegistry::add("/object/convert/gr/pmt_to_int64", Pothos::Callable(&pmt_to_int64));
+    Pothos::PluginRegistry::add("/object/convert/gr/pmt_to_uint64", Pothos::Callable(&pmt::to_uint64));
+    Pothos::PluginRegistry::add("/object/convert/gr/pmt_to_double", Pothos::Callable(&pmt::to_double));
+    Pothos::PluginRegistry::add("/object/convert/gr/pmt_to_complex", Pothos::Callable(&pmt::to_complex));
+    Pothos::PluginRegistry::add("/object/convert/gr/pmt_to_vector", Pothos::Callable(&pmt_to_obj_vector));
 }
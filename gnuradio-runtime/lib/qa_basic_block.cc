@@ -0,0 +1,157 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2014 Free Software Foundation, Inc.
+ *
+ * This file is part of GNU Radio
+ *
+ * GNU Radio is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * GNU Radio is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GNU Radio; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include <config.h>
+#endif
+
+#include <qa_basic_block.h>
+#include <gnuradio/block.h>
+#include <gnuradio/io_signature.h>
+#include <gnuradio/prefs.h>
+#include <gnuradio/thread/thread.h>
+#include <boost/bind.hpp>
+#include <vector>
+
+// A block whose queues the test drains by hand, like the scheduler
+class msg_block : public gr::block
+{
+public:
+  std::vector<std::vector<pmt::pmt_t> > batches;
+  std::vector<pmt::pmt_t> singles;
+
+  msg_block()
+    : gr::block("msg_block",
+                gr::io_signature::make(0, 0, 0),
+                gr::io_signature::make(0, 0, 0))
+  {
+    message_port_register_in(pmt::mp("batch"));
+    message_port_register_in(pmt::mp("single"));
+    set_msg_batch_handler(pmt::mp("batch"), boost::bind(&msg_block::handle_batch, this, _1));
+    set_msg_handler(pmt::mp("single"), boost::bind(&msg_block::handle_single, this, _1));
+  }
+
+  void handle_batch(const std::vector<pmt::pmt_t> &msgs) { batches.push_back(msgs); }
+  void handle_single(pmt::pmt_t msg) { singles.push_back(msg); }
+
+  bool drain(pmt::pmt_t port)
+  {
+    std::vector<pmt::pmt_t> msgs;
+    if(!delete_all_nowait(port, msgs))
+      return false;
+    dispatch_msgs(port, msgs);
+    return true;
+  }
+
+  int general_work(int noutput_items,
+                   gr_vector_int &ninput_items,
+                   gr_vector_const_void_star &input_items,
+                   gr_vector_void_star &output_items)
+  {
+    return 0;
+  }
+};
+
+static void
+post_one(boost::shared_ptr<msg_block> b, pmt::pmt_t msg, bool *done)
+{
+  b->_post(pmt::mp("batch"), msg);
+  *done = true;
+}
+
+void
+qa_basic_block::t0()
+{
+  // all waiting messages reach the batch handler in one call, in order
+  boost::shared_ptr<msg_block> b(new msg_block());
+  for(long i = 0; i < 5; i++)
+    b->_post(pmt::mp("batch"), pmt::from_long(i));
+
+  CPPUNIT_ASSERT(b->drain(pmt::mp("batch")));
+  CPPUNIT_ASSERT(!b->drain(pmt::mp("batch")));
+  CPPUNIT_ASSERT_EQUAL((size_t)1, b->batches.size());
+  CPPUNIT_ASSERT_EQUAL((size_t)5, b->batches[0].size());
+  for(long i = 0; i < 5; i++)
+    CPPUNIT_ASSERT_EQUAL(i, pmt::to_long(b->batches[0][i]));
+
+  CPPUNIT_ASSERT_EQUAL((uint64_t)5, b->nmsgs_queued(pmt::mp("batch")));
+  CPPUNIT_ASSERT_EQUAL((size_t)5, b->nmsgs_high_water(pmt::mp("batch")));
+  CPPUNIT_ASSERT_EQUAL((uint64_t)0, b->nmsgs_dropped(pmt::mp("batch")));
+}
+
+void
+qa_basic_block::t1()
+{
+  // a port with a plain handler gets the batch one message at a time
+  boost::shared_ptr<msg_block> b(new msg_block());
+  for(long i = 0; i < 3; i++)
+    b->_post(pmt::mp("single"), pmt::from_long(i));
+
+  CPPUNIT_ASSERT(b->drain(pmt::mp("single")));
+  CPPUNIT_ASSERT_EQUAL((size_t)0, b->batches.size());
+  CPPUNIT_ASSERT_EQUAL((size_t)3, b->singles.size());
+  for(long i = 0; i < 3; i++)
+    CPPUNIT_ASSERT_EQUAL(i, pmt::to_long(b->singles[i]));
+}
+
+void
+qa_basic_block::t2()
+{
+  // _post blocks on a full queue until the block drains it
+  boost::shared_ptr<msg_block> b(new msg_block());
+  b->set_msg_queue_limit(pmt::mp("batch"), 2);
+  b->_post(pmt::mp("batch"), pmt::from_long(0));
+  b->_post(pmt::mp("batch"), pmt::from_long(1));
+
+  bool done = false;
+  gr::thread::thread sender(boost::bind(post_one, b, pmt::from_long(2), &done));
+  boost::this_thread::sleep(boost::posix_time::milliseconds(100));
+  CPPUNIT_ASSERT(!done);
+  CPPUNIT_ASSERT_EQUAL((size_t)2, b->nmsgs(pmt::mp("batch")));
+
+  CPPUNIT_ASSERT(b->drain(pmt::mp("batch")));
+  sender.join();
+  CPPUNIT_ASSERT(done);
+  CPPUNIT_ASSERT_EQUAL((size_t)1, b->nmsgs(pmt::mp("batch")));
+  CPPUNIT_ASSERT_EQUAL((uint64_t)3, b->nmsgs_queued(pmt::mp("batch")));
+  CPPUNIT_ASSERT_EQUAL((uint64_t)0, b->nmsgs_dropped(pmt::mp("batch")));
+}
+
+void
+qa_basic_block::t3()
+{
+  // a sender that waits too long drops its message, so blocks
+  // posting to each other can not deadlock
+  gr::prefs *p = gr::prefs::singleton();
+  long timeout = p->get_long("DEFAULT", "msg_queue_timeout", 1000);
+  p->set_long("DEFAULT", "msg_queue_timeout", 50);
+  boost::shared_ptr<msg_block> b(new msg_block());
+  p->set_long("DEFAULT", "msg_queue_timeout", timeout);
+
+  b->set_msg_queue_limit(pmt::mp("batch"), 1);
+  b->_post(pmt::mp("batch"), pmt::from_long(0));
+  b->_post(pmt::mp("batch"), pmt::from_long(1));
+
+  CPPUNIT_ASSERT_EQUAL((size_t)1, b->nmsgs(pmt::mp("batch")));
+  CPPUNIT_ASSERT_EQUAL((uint64_t)1, b->nmsgs_queued(pmt::mp("batch")));
+  CPPUNIT_ASSERT_EQUAL((uint64_t)1, b->nmsgs_dropped(pmt::mp("batch")));
+}
@@ -267,6 +267,77 @@ t3_body()
 }
 
 
+// ----------------------------------------------------------------------------
+// test the tag store: ordering, removal, pruning and reader delay
+//
+
+static gr::tag_t
+make_tag(uint64_t offset)
+{
+  gr::tag_t tag;
+  tag.offset = offset;
+  tag.key = pmt::intern("key");
+  tag.value = pmt::from_uint64(offset);
+  return tag;
+}
+
+static void
+t6_body()
+{
+  gr::buffer_sptr buf(gr::make_buffer(4096, sizeof(int), gr::block_sptr()));
+  gr::buffer_reader_sptr r(gr::buffer_add_reader(buf, 0, gr::block_sptr()));
+  std::vector<gr::tag_t> tags;
+  gr::tag_t tag3 = make_tag(3);
+
+  // out of order tags are sorted in
+  buf->add_item_tag(make_tag(5));
+  buf->add_item_tag(make_tag(1));
+  buf->add_item_tag(tag3);
+  r->get_tags_in_range(tags, 0, 10, 1);
+  CPPUNIT_ASSERT_EQUAL((size_t)3, tags.size());
+  CPPUNIT_ASSERT_EQUAL((uint64_t)1, tags[0].offset);
+  CPPUNIT_ASSERT_EQUAL((uint64_t)3, tags[1].offset);
+  CPPUNIT_ASSERT_EQUAL((uint64_t)5, tags[2].offset);
+
+  r->get_tags_in_range(tags, 3, 5, 1);
+  CPPUNIT_ASSERT_EQUAL((size_t)1, tags.size());
+  CPPUNIT_ASSERT_EQUAL((uint64_t)3, tags[0].offset);
+
+  // removed tags are only hidden from the block that removed them
+  buf->remove_item_tag(tag3, 1);
+  r->get_tags_in_range(tags, 0, 10, 1);
+  CPPUNIT_ASSERT_EQUAL((size_t)2, tags.size());
+  r->get_tags_in_range(tags, 0, 10, 2);
+  CPPUNIT_ASSERT_EQUAL((size_t)3, tags.size());
+
+  buf->prune_tags(4);
+  r->get_tags_in_range(tags, 0, 10, 2);
+  CPPUNIT_ASSERT_EQUAL((size_t)1, tags.size());
+  CPPUNIT_ASSERT_EQUAL((uint64_t)5, tags[0].offset);
+
+  // a reader with a delay sees the tags later
+  gr::buffer_reader_sptr rd(gr::buffer_add_reader(buf, 0, gr::block_sptr(), 3));
+  rd->get_tags_in_range(tags, 0, 8, 2);
+  CPPUNIT_ASSERT_EQUAL((size_t)0, tags.size());
+  rd->get_tags_in_range(tags, 8, 9, 2);
+  CPPUNIT_ASSERT_EQUAL((size_t)1, tags.size());
+  CPPUNIT_ASSERT_EQUAL((uint64_t)8, tags[0].offset);
+
+  // many tags appended and pruned as a flowgraph would
+  buf->prune_tags(100);
+  for(uint64_t i = 100; i < 100000; i++) {
+    buf->add_item_tag(make_tag(i));
+    if(i % 100 == 99) {
+      r->get_tags_in_range(tags, i - 99, i + 1, 2);
+      CPPUNIT_ASSERT_EQUAL((size_t)100, tags.size());
+      CPPUNIT_ASSERT_EQUAL(i - 99, tags[0].offset);
+      CPPUNIT_ASSERT(pmt::eqv(pmt::from_uint64(i), tags[99].value));
+      buf->prune_tags(i + 1);
+    }
+  }
+  CPPUNIT_ASSERT(buf->get_tags_begin() == buf->get_tags_end());
+}
+
 // ----------------------------------------------------------------------------
 
 void
@@ -302,3 +373,9 @@ void
 qa_buffer::t5()
 {
 }
+
+void
+qa_buffer::t6()
+{
+  leak_check(t6_body);
+}
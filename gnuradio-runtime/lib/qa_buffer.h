@@ -35,6 +35,7 @@ class qa_buffer : public CppUnit::TestCase
   CPPUNIT_TEST(t3);
   CPPUNIT_TEST(t4);
   CPPUNIT_TEST(t5);
+  CPPUNIT_TEST(t6);
   CPPUNIT_TEST_SUITE_END();
 
  private:
@@ -44,6 +45,7 @@ class qa_buffer : public CppUnit::TestCase
   void t3();
   void t4();
   void t5();
+  void t6();
 };
 
 #endif /* INCLUDED_QA_GR_BUFFER_H */
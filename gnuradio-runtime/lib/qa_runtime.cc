@@ -30,6 +30,7 @@
 #endif
 
 #include <qa_runtime.h>
+#include <qa_basic_block.h>
 #include <qa_buffer.h>
 #include <qa_io_signature.h>
 #include <qa_circular_file.h>
@@ -47,6 +48,7 @@ qa_runtime::suite()
 {
   CppUnit::TestSuite *s = new CppUnit::TestSuite("runtime");
 
+  s->addTest(qa_basic_block::suite());
   s->addTest(qa_buffer::suite());
   s->addTest(qa_io_signature::suite());
   s->addTest(qa_circular_file::suite());
@@ -46,7 +46,7 @@ namespace gr {
 
     block_detail *d = block->detail().get();
     block_executor::state s;
-    pmt::pmt_t msg;
+    std::vector<pmt::pmt_t> msgs;
 
     d->threaded = true;
     d->thread = gr::thread::get_current_thread_id();
@@ -102,16 +102,15 @@ namespace gr {
         // any messages. This is mostly a protection for the unknown
         // startup sequence of the threads.
         if(block->has_msg_handler(i.first)) {
-          while((msg = block->delete_head_nowait(i.first))) {
-            block->dispatch_msg(i.first,msg);
+          while(block->delete_all_nowait(i.first, msgs)) {
+            block->dispatch_msgs(i.first, msgs);
           }
         }
         else {
           // If we don't have a handler but are building up messages,
           // prune the queue from the front to keep memory in check.
-          if(block->nmsgs(i.first) > max_nmsgs){
+          if(block->prune_msgs(i.first, max_nmsgs) > 0){
             GR_LOG_WARN(LOG,"asynchronous message buffer overflowing, dropping message");
-            msg = block->delete_head_nowait(i.first);
           }
         }
       }
@@ -159,18 +158,17 @@ namespace gr {
           // handle all pending messages
           BOOST_FOREACH(basic_block::msg_queue_map_t::value_type &i, block->msg_queue) {
             if(block->has_msg_handler(i.first)) {
-              while((msg = block->delete_head_nowait(i.first))) {
-                guard.unlock();			// release lock while processing msg
-                block->dispatch_msg(i.first, msg);
+              while(block->delete_all_nowait(i.first, msgs)) {
+                guard.unlock();			// release lock while processing msgs
+                block->dispatch_msgs(i.first, msgs);
                 guard.lock();
               }
             }
             else {
               // leave msg in queue if no handler is defined
               // start dropping if we have too many
-              if(block->nmsgs(i.first) > max_nmsgs){
+              if(block->prune_msgs(i.first, max_nmsgs) > 0){
                 GR_LOG_WARN(LOG,"asynchronous message buffer overflowing, dropping message");
-                msg = block->delete_head_nowait(i.first);
               }
             }
           }
@@ -192,18 +190,17 @@ namespace gr {
 	  // handle all pending messages
           BOOST_FOREACH(basic_block::msg_queue_map_t::value_type &i, block->msg_queue) {
             if(block->has_msg_handler(i.first)) {
-                while((msg = block->delete_head_nowait(i.first))) {
-                  guard.unlock();			// release lock while processing msg
-                  block->dispatch_msg(i.first, msg);
+                while(block->delete_all_nowait(i.first, msgs)) {
+                  guard.unlock();			// release lock while processing msgs
+                  block->dispatch_msgs(i.first, msgs);
                   guard.lock();
                 }
             }
             else {
                 // leave msg in queue if no handler is defined
                 // start dropping if we have too many
-                if(block->nmsgs(i.first) > max_nmsgs){
+                if(block->prune_msgs(i.first, max_nmsgs) > 0){
                   GR_LOG_WARN(LOG,"asynchronous message buffer overflowing, dropping message");
-                  msg = block->delete_head_nowait(i.first);
                 }
             }
           }
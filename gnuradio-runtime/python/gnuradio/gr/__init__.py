@@ -45,6 +45,7 @@ from top_block import *
 from hier_block2 import *
 from tag_utils import *
 from gateway import basic_block, sync_block, decim_block, interp_block
+from gateway_profile import gateway_profiles, gateway_profiles_json
 
 # Force the preference database to be initialized
 prefs = prefs.singleton
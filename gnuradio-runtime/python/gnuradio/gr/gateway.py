@@ -23,7 +23,16 @@ import runtime_swig as gr
 from runtime_swig import io_signature, io_signaturev
 from runtime_swig import block_gw_message_type
 from runtime_swig import block_gateway
+import gateway_profile
 import numpy
+import time
+
+#the action types are looked up on every call, keep them handy
+ACTION_GENERAL_WORK = block_gw_message_type.ACTION_GENERAL_WORK
+ACTION_WORK = block_gw_message_type.ACTION_WORK
+ACTION_FORECAST = block_gw_message_type.ACTION_FORECAST
+ACTION_START = block_gw_message_type.ACTION_START
+ACTION_STOP = block_gw_message_type.ACTION_STOP
 
 ########################################################################
 # Magic to turn pointers into numpy arrays
@@ -41,6 +50,38 @@ def pointer_to_ndarray(addr, dtype, nitems):
         }
     return numpy.asarray(array_like()).view(dtype.base)
 
+class ndarray_view_cache(object):
+    """
+    Reuse the ndarrays made by pointer_to_ndarray for a single port.
+
+    The scheduler keeps handing a block the same few addresses as it
+    walks around its circular buffers, so a view is only rebuilt when
+    the buffer address changes or more items are requested than the
+    cached view covers. Otherwise a slice of the cached view is returned.
+    """
+
+    def __init__(self, dtype, max_views=64):
+        self._dtype = dtype
+        self._max_views = max_views
+        self._views = dict()
+
+    def __call__(self, addr, nitems):
+        addr = int(addr)
+        view = self._views.get(addr)
+        if view is None or len(view) < nitems:
+            if len(self._views) >= self._max_views: self._views.clear()
+            view = pointer_to_ndarray(addr, self._dtype, nitems)
+            self._views[addr] = view
+        if len(view) == nitems: return view
+        return view[:nitems]
+
+    def clear(self):
+        self._views.clear()
+
+def ndarray_view_maker(dtype):
+    """Make an uncached view factory with the same call signature."""
+    return lambda addr, nitems: pointer_to_ndarray(addr, dtype, nitems)
+
 ########################################################################
 # Handler that does callbacks from C++
 ########################################################################
@@ -91,9 +132,8 @@ class gateway_block(object):
         self.__in_sig = sig_to_dtype_sig(in_sig)
         self.__out_sig = sig_to_dtype_sig(out_sig)
 
-        #cache the ranges to iterate when dispatching work
-        self.__in_indexes = range(len(self.__in_sig))
-        self.__out_indexes = range(len(self.__out_sig))
+        #per-port view factories used when dispatching work
+        self.set_view_cache(False)
 
         #convert the signatures into gr.io_signatures
         def sig_to_gr_io_sigv(sig):
@@ -108,6 +148,7 @@ class gateway_block(object):
         self.__gateway = block_gateway(
             self.__handler, name, gr_in_sig, gr_out_sig, work_type, factor)
         self.__message = self.__gateway.block_message()
+        self.__profile = None
 
         #dict to keep references to all message handlers
         self.__msg_handlers = {}
@@ -124,53 +165,127 @@ class gateway_block(object):
         """
         return self.__gateway.to_basic_block()
 
+    def set_view_cache(self, enable):
+        """
+        Reuse the numpy arrays passed to work and general_work.
+
+        When enabled, the views onto the scheduler buffers are kept
+        between calls and only rebuilt when a buffer address changes.
+        The arrays are then only valid for the duration of the call,
+        which is the contract for work anyway. Pair this with
+        set_min_noutput_items() to keep the per-call overhead amortized
+        over a reasonable number of items.
+        """
+        if enable:
+            self.__in_views = [ndarray_view_cache(s) for s in self.__in_sig]
+            self.__out_views = [ndarray_view_cache(s) for s in self.__out_sig]
+        else:
+            self.__in_views = [ndarray_view_maker(s) for s in self.__in_sig]
+            self.__out_views = [ndarray_view_maker(s) for s in self.__out_sig]
+        self.__view_cache = enable
+
+    def view_cache(self):
+        return self.__view_cache
+
+    def __clear_view_cache(self):
+        if not self.__view_cache: return
+        for views in self.__in_views + self.__out_views: views.clear()
+
+    def set_profiling(self, enable):
+        """
+        Enable or disable profiling of the calls into this block.
+
+        While enabled, call counts, items per call, python, CPU and GIL
+        wait times are recorded for work, general_work and forecast.
+        See profile() and gr.gateway_profiles_json().
+        """
+        if enable and self.__profile is None:
+            self.__profile = gateway_profile.gateway_profile(
+                '%s%d'%(self.__gateway.name(), self.__gateway.unique_id()),
+                self.__gateway)
+            gateway_profile.register(self.__profile)
+            self.__gateway.set_dispatch_timing(True)
+            self.__handler.init(self.__gr_block_handle_profiled)
+        elif not enable and self.__profile is not None:
+            self.__handler.init(self.__gr_block_handle)
+            self.__gateway.set_dispatch_timing(False)
+            gateway_profile.unregister(self.__profile)
+            self.__profile = None
+
+    def profile(self):
+        """
+        Get a snapshot of the profiling statistics, None when disabled.
+        """
+        if self.__profile is None: return None
+        return self.__profile.snapshot()
+
+    def reset_profile(self):
+        if self.__profile is not None: self.__profile.reset()
+
+    def __gr_block_handle_profiled(self):
+        """
+        Dispatch through __gr_block_handle and record the call.
+        """
+        failed = True
+        t0 = time.time()
+        try:
+            self.__gr_block_handle()
+            failed = False
+        finally:
+            self.__profile.record(self.__message, time.time() - t0, failed)
+
     def __gr_block_handle(self):
         """
         Dispatch tasks according to the action type specified in the message.
         """
-        if self.__message.action == gr.block_gw_message_type.ACTION_GENERAL_WORK:
-            self.__message.general_work_args_return_value = self.general_work(
-
-                input_items=[pointer_to_ndarray(
-                    self.__message.general_work_args_input_items[i],
-                    self.__in_sig[i],
-                    self.__message.general_work_args_ninput_items[i]
-                ) for i in self.__in_indexes],
-
-                output_items=[pointer_to_ndarray(
-                    self.__message.general_work_args_output_items[i],
-                    self.__out_sig[i],
-                    self.__message.general_work_args_noutput_items
-                ) for i in self.__out_indexes],
+        msg = self.__message
+        action = msg.action
+
+        if action == ACTION_GENERAL_WORK:
+            noutput_items = msg.general_work_args_noutput_items
+            msg.general_work_args_return_value = self.general_work(
+
+                input_items=[view(addr, nitems) for view, addr, nitems in zip(
+                    self.__in_views,
+                    msg.general_work_args_input_items,
+                    msg.general_work_args_ninput_items
+                )],
+
+                output_items=[view(addr, noutput_items) for view, addr in zip(
+                    self.__out_views,
+                    msg.general_work_args_output_items
+                )],
             )
 
-        elif self.__message.action == gr.block_gw_message_type.ACTION_WORK:
-            self.__message.work_args_return_value = self.work(
+        elif action == ACTION_WORK:
+            ninput_items = msg.work_args_ninput_items
+            noutput_items = msg.work_args_noutput_items
+            msg.work_args_return_value = self.work(
 
-                input_items=[pointer_to_ndarray(
-                    self.__message.work_args_input_items[i],
-                    self.__in_sig[i],
-                    self.__message.work_args_ninput_items
-                ) for i in self.__in_indexes],
+                input_items=[view(addr, ninput_items) for view, addr in zip(
+                    self.__in_views,
+                    msg.work_args_input_items
+                )],
 
-                output_items=[pointer_to_ndarray(
-                    self.__message.work_args_output_items[i],
-                    self.__out_sig[i],
-                    self.__message.work_args_noutput_items
-                ) for i in self.__out_indexes],
+                output_items=[view(addr, noutput_items) for view, addr in zip(
+                    self.__out_views,
+                    msg.work_args_output_items
+                )],
             )
 
-        elif self.__message.action == gr.block_gw_message_type.ACTION_FORECAST:
+        elif action == ACTION_FORECAST:
             self.forecast(
-                noutput_items=self.__message.forecast_args_noutput_items,
-                ninput_items_required=self.__message.forecast_args_ninput_items_required,
+                noutput_items=msg.forecast_args_noutput_items,
+                ninput_items_required=msg.forecast_args_ninput_items_required,
             )
 
-        elif self.__message.action == gr.block_gw_message_type.ACTION_START:
-            self.__message.start_args_return_value = self.start()
+        elif action == ACTION_START:
+            self.__clear_view_cache()
+            msg.start_args_return_value = self.start()
 
-        elif self.__message.action == gr.block_gw_message_type.ACTION_STOP:
-            self.__message.stop_args_return_value = self.stop()
+        elif action == ACTION_STOP:
+            msg.stop_args_return_value = self.stop()
+            self.__clear_view_cache()
 
     def forecast(self, noutput_items, ninput_items_required):
         """
@@ -0,0 +1,157 @@
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+"""
+Opt-in profiling of the calls made into python gateway blocks.
+
+The gateway times each handler call from C++ (wall clock and thread
+CPU time), while the python side counts calls, failures and the number
+of items produced per call. The difference between the C++ wall time
+and the time spent inside the python handler is the time spent waiting
+for the GIL plus the director overhead.
+"""
+
+import json
+import time
+import weakref
+
+from runtime_swig import block_gw_message_type
+
+ACTIONS = (
+    (block_gw_message_type.ACTION_GENERAL_WORK, 'general_work'),
+    (block_gw_message_type.ACTION_WORK, 'work'),
+    (block_gw_message_type.ACTION_FORECAST, 'forecast'),
+    (block_gw_message_type.ACTION_START, 'start'),
+    (block_gw_message_type.ACTION_STOP, 'stop'),
+)
+
+#number of power of two buckets in the items per call histogram
+HISTOGRAM_BUCKETS = 32
+
+#profiles of all live blocks with profiling enabled, keyed by block name and unique id
+_profiles = weakref.WeakValueDictionary()
+
+class gateway_profile(object):
+    """
+    Call statistics for one gateway block.
+
+    Updates happen from the block's thread while holding the GIL, so a
+    snapshot taken from another thread is consistent to within a call.
+    """
+
+    def __init__(self, name, gateway):
+        self._name = name
+        self._gateway = gateway
+        self.reset()
+
+    def name(self):
+        return self._name
+
+    def reset(self):
+        self._calls = dict((action, 0) for action, _ in ACTIONS)
+        self._errors = dict((action, 0) for action, _ in ACTIONS)
+        self._python_time = dict((action, 0.0) for action, _ in ACTIONS)
+        self._histogram = [0]*HISTOGRAM_BUCKETS
+        self._items = 0
+        self._gateway.reset_dispatch_timing()
+
+    def record(self, message, elapsed, failed):
+        """
+        Account for one handler call.
+        \param message the gateway message that was dispatched
+        \param elapsed seconds spent in the python handler
+        \param failed true when the handler raised
+        """
+        action = message.action
+        self._calls[action] += 1
+        self._python_time[action] += elapsed
+        if failed: self._errors[action] += 1
+
+        #the return value is stale when the handler raised
+        if failed: return
+        if action == block_gw_message_type.ACTION_WORK:
+            nitems = message.work_args_return_value
+        elif action == block_gw_message_type.ACTION_GENERAL_WORK:
+            nitems = message.general_work_args_return_value
+        else: return
+        #WORK_DONE and the other negative returns produce nothing
+        if nitems < 0: return
+        self._items += nitems
+        self._histogram[min(nitems.bit_length(), HISTOGRAM_BUCKETS-1)] += 1
+
+    def histogram(self):
+        """
+        Get the items per call histogram as (low, high, count) tuples.
+        Only buckets with a non-zero count are returned.
+        """
+        buckets = list()
+        for i, count in enumerate(self._histogram):
+            if not count: continue
+            low = (1 << (i-1)) if i else 0
+            high = (1 << i) - 1
+            buckets.append((low, high, count))
+        return buckets
+
+    def snapshot(self):
+        """
+        Get the current statistics as a dictionary of plain python types.
+        """
+        actions = dict()
+        for action, action_name in ACTIONS:
+            calls = self._calls[action]
+            if not calls: continue
+            python_time = self._python_time[action]
+            wall_time = self._gateway.dispatch_wall_time(action)
+            actions[action_name] = {
+                'calls' : calls,
+                'errors' : self._errors[action],
+                'python_time' : python_time,
+                'wall_time' : wall_time,
+                'cpu_time' : self._gateway.dispatch_cpu_time(action),
+                'gil_wait_time' : max(0.0, wall_time - python_time),
+            }
+        return {
+            'name' : self._name,
+            'timestamp' : time.time(),
+            'items' : self._items,
+            'items_per_call' : self.histogram(),
+            'actions' : actions,
+        }
+
+def register(profile):
+    _profiles[profile.name()] = profile
+
+def unregister(profile):
+    _profiles.pop(profile.name(), None)
+
+def gateway_profiles():
+    """
+    Snapshot the profiles of every python block with profiling enabled.
+    \return a dictionary of block name and unique id to snapshot dictionary
+    """
+    return dict((name, profile.snapshot()) for name, profile in _profiles.items())
+
+def gateway_profiles_json(**kwargs):
+    """
+    Snapshot every profiled python block as a JSON string.
+    Keyword arguments are passed to json.dumps.
+    """
+    return json.dumps(gateway_profiles(), **kwargs)
@@ -2,12 +2,14 @@
 
 # Import gru stuff
 from daemon import *
+from file_sample_source import *
 from freqz import *
 from gnuplot_freqz import *
 from hexint import *
 from listmisc import *
 from mathmisc import *
 from msgq_runner import *
+from msgq_pool_runner import *
 from os_read_exactly import *
 from seq_with_cursor import *
 from socket_stuff import *
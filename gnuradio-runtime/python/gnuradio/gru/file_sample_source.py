@@ -0,0 +1,324 @@
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+"""
+Memory mapped access to raw sample files for the file plotters.
+
+Samples are read straight out of a memory map of the file, so stepping
+through a capture never reopens or rereads it. For overviews the source
+keeps a decimation pyramid: level 1 holds the min, max and mean of every
+first_block samples and each further level reduces the previous one by
+factor, until a level has fewer than top_size blocks. summary() answers
+a (start, stop, npoints) query from the coarsest level that still has
+at least npoints blocks in the range, so the cost of a query does not
+depend on the size of the file.
+
+The pyramid is built on first use and cached in a directory next to the
+file (filename + '.pyramid'), keyed on the size and modification time
+of the file. For complex samples min and max are taken separately on
+the real and imaginary parts.
+"""
+
+__all__ = ['file_sample_source']
+
+import json
+import math
+import os
+
+import numpy
+
+#samples of the raw file or blocks of a level reduced per chunk
+_CHUNK = 1 << 20
+
+#version of the on disk pyramid layout
+_PYRAMID_VERSION = 1
+
+def _reduceat(op, x, idx):
+    """
+    Apply op.reduceat to x, separately on the real and imaginary parts
+    of complex samples.
+    """
+    if numpy.iscomplexobj(x):
+        return op.reduceat(x.real, idx) + 1j*op.reduceat(x.imag, idx)
+    return op.reduceat(x, idx)
+
+def _reduce(mins, maxs, means, counts, factor):
+    """
+    Reduce factor consecutive blocks into one.
+
+    Args:
+        mins, maxs, means: per block statistics
+        counts: number of samples in each block, weights the means
+
+    Returns:
+        (mins, maxs, means, counts) of the reduced blocks
+    """
+    idx = numpy.arange(0, len(mins), factor)
+    mn = _reduceat(numpy.minimum, mins, idx)
+    mx = _reduceat(numpy.maximum, maxs, idx)
+    total = numpy.add.reduceat(counts, idx)
+    mean = numpy.add.reduceat(means*counts, idx)/total
+    return mn, mx, mean, total
+
+class file_sample_source(object):
+
+    def __init__(self, filename, dtype, cache=True, first_block=64,
+                 factor=8, top_size=1024):
+        """
+        Args:
+            filename: raw sample file
+            dtype: numpy type of the samples
+            cache: keep the pyramid on disk next to the file
+            first_block: samples per block in level 1 of the pyramid
+            factor: blocks of a level reduced into one of the next level
+            top_size: stop adding levels below this many blocks
+        """
+        self._filename = filename
+        self._dtype = numpy.dtype(dtype)
+        self._cache = cache
+        self._first_block = max(2, first_block)
+        self._factor = max(2, factor)
+        self._top_size = max(1, top_size)
+        self._mean_dtype = numpy.result_type(self._dtype, numpy.float32)
+
+        stat = os.stat(filename)
+        self._stamp = [stat.st_size, stat.st_mtime]
+        nsamples = stat.st_size // self._dtype.itemsize
+        if nsamples:
+            self._data = numpy.memmap(filename, dtype=self._dtype,
+                                      mode='r', shape=(nsamples,))
+        else:
+            self._data = numpy.zeros(0, dtype=self._dtype)
+        self._levels = None
+
+    def __len__(self):
+        return len(self._data)
+
+    def filename(self):
+        return self._filename
+
+    def dtype(self):
+        return self._dtype
+
+    def read(self, start, count):
+        """
+        Get up to count samples starting at sample start.
+        The result is a view of the memory map, copy it to keep it
+        past the lifetime of the source.
+        """
+        start = min(max(0, start), len(self._data))
+        return self._data[start:start+max(0, count)]
+
+    def pyramid_dir(self):
+        return self._filename + '.pyramid'
+
+    def block_size(self, level):
+        """
+        Samples per block of a pyramid level, level 0 is the raw samples.
+        """
+        if level == 0: return 1
+        return self._first_block*self._factor**(level-1)
+
+    def nlevels(self):
+        """
+        Number of levels in the pyramid, not counting the raw samples.
+        """
+        return len(self._get_levels())
+
+    def summary(self, start, stop, npoints=2048):
+        """
+        Min, max and mean of the samples in [start, stop) in about
+        npoints blocks of equal size.
+
+        When the range holds no more than npoints samples the blocks
+        are single samples and min, max and mean are the samples.
+
+        Returns:
+            (positions, mins, maxs, means) as numpy arrays, positions
+            is the first sample of each block
+        """
+        start = min(max(0, start), len(self._data))
+        stop = min(max(start, stop), len(self._data))
+        npoints = max(1, npoints)
+        if stop == start:
+            empty = numpy.zeros(0, dtype=self._dtype)
+            return numpy.zeros(0, dtype=numpy.int64), empty, empty, empty
+
+        need = int(math.ceil(float(stop - start)/npoints))
+        level = 0
+        if need >= self._first_block:
+            levels = self._get_levels()
+            while level < len(levels) and self.block_size(level+1) <= need:
+                level += 1
+
+        bsize = self.block_size(level)
+        first = start // bsize
+        last = (stop + bsize - 1) // bsize
+        if level == 0:
+            data = self._data[first:last]
+            mins, maxs, means = data, data, data
+            counts = numpy.ones(len(data))
+        else:
+            mins, maxs, means = [numpy.asarray(a[first:last]) for a in self._levels[level-1]]
+            counts = numpy.empty(len(mins))
+            counts.fill(bsize)
+            if last*bsize > len(self._data):
+                counts[-1] = len(self._data) - (last-1)*bsize
+
+        step = max(1, need // bsize)
+        if step > 1:
+            mins, maxs, means, counts = _reduce(mins, maxs, means, counts, step)
+        mins, maxs, means = numpy.array(mins), numpy.array(maxs), numpy.array(means)
+        positions = (first + step*numpy.arange(len(mins), dtype=numpy.int64))*bsize
+        positions[0] = start
+
+        #the first and last blocks are cut to [start, stop) when unaligned,
+        #take them from the samples
+        width = step*bsize
+        for i in sorted(set((0, len(mins)-1))):
+            lo = (first + i*step)*bsize
+            hi = min(lo + width, last*bsize, len(self._data))
+            a = positions[i]
+            b = positions[i+1] if i+1 < len(positions) else stop
+            if (lo, hi) != (a, b):
+                mins[i], maxs[i], means[i] = self._stats(a, b)
+        return positions, mins, maxs, means
+
+    def _stats(self, start, stop):
+        """
+        Min, max and mean of the samples in [start, stop).
+        """
+        x = self._data[start:stop]
+        return (_reduceat(numpy.minimum, x, [0])[0],
+                _reduceat(numpy.maximum, x, [0])[0],
+                numpy.mean(x, dtype=self._mean_dtype))
+
+    def build_pyramid(self, force=False):
+        """
+        Build the pyramid now instead of on the first summary().
+        """
+        if force:
+            self._levels = None
+            self._remove_cache()
+        self._get_levels()
+
+    def _get_levels(self):
+        if self._levels is None:
+            if self._cache:
+                self._levels = self._load_cache()
+            if self._levels is None:
+                self._levels = self._build()
+        return self._levels
+
+    def _info(self):
+        return {
+            'version' : _PYRAMID_VERSION,
+            'stamp' : self._stamp,
+            'dtype' : self._dtype.str,
+            'first_block' : self._first_block,
+            'factor' : self._factor,
+            'top_size' : self._top_size,
+        }
+
+    def _level_file(self, level, name):
+        return os.path.join(self.pyramid_dir(), 'level%d_%s.npy' % (level, name))
+
+    def _load_cache(self):
+        try:
+            with open(os.path.join(self.pyramid_dir(), 'info.json'), 'r') as f:
+                info = json.load(f)
+            nlevels = info.pop('nlevels')
+            if info != json.loads(json.dumps(self._info())):
+                return None
+            return [[numpy.load(self._level_file(level, name), mmap_mode='r')
+                     for name in ('min', 'max', 'mean')]
+                    for level in range(1, nlevels+1)]
+        except (IOError, OSError, ValueError, KeyError):
+            return None
+
+    def _remove_cache(self):
+        try:
+            os.remove(os.path.join(self.pyramid_dir(), 'info.json'))
+        except OSError:
+            pass
+
+    def _new_level(self, level, nblocks):
+        """
+        Allocate the arrays of a level, on disk when caching.
+        """
+        dtypes = (self._dtype, self._dtype, self._mean_dtype)
+        if self._cache:
+            try:
+                return [numpy.lib.format.open_memmap(self._level_file(level, name),
+                                                     mode='w+', dtype=dtype, shape=(nblocks,))
+                        for name, dtype in zip(('min', 'max', 'mean'), dtypes)]
+            except (IOError, OSError):
+                self._cache = False
+        return [numpy.zeros(nblocks, dtype=dtype) for dtype in dtypes]
+
+    def _build(self):
+        if self._cache:
+            try:
+                if not os.path.isdir(self.pyramid_dir()):
+                    os.mkdir(self.pyramid_dir())
+                self._remove_cache()
+            except OSError:
+                self._cache = False
+
+        levels = list()
+        nsamples = len(self._data)
+        src = (self._data, self._data, self._data)
+        src_bsize = 1
+        level = 1
+        while nsamples > self._first_block and (level == 1 or len(src[0]) > self._top_size):
+            bsize = self.block_size(level)
+            step = bsize // src_bsize
+            nblocks = (nsamples + bsize - 1) // bsize
+            dst = self._new_level(level, nblocks)
+
+            #chunks are a whole number of destination blocks
+            chunk = max(1, _CHUNK // step)*step
+            for i in range(0, len(src[0]), chunk):
+                j = min(len(src[0]), i + chunk)
+                counts = numpy.empty(j - i)
+                counts.fill(src_bsize)
+                if j == len(src[0]):
+                    counts[-1] = nsamples - (j-1)*src_bsize
+                reduced = _reduce(src[0][i:j], src[1][i:j], src[2][i:j], counts, step)
+                for d, r in zip(dst, reduced):
+                    d[i//step:i//step+len(r)] = r
+
+            levels.append(dst)
+            src = dst
+            src_bsize = bsize
+            level += 1
+
+        if self._cache:
+            for arrays in levels:
+                for a in arrays: a.flush()
+            info = self._info()
+            info['nlevels'] = len(levels)
+            try:
+                with open(os.path.join(self.pyramid_dir(), 'info.json'), 'w') as f:
+                    json.dump(info, f)
+            except (IOError, OSError):
+                pass
+        return levels
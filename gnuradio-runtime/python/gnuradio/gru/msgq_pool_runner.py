@@ -0,0 +1,360 @@
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+"""
+Service many gr.msg_queues with a bounded pool of worker threads.
+
+There is no thread per queue: the workers of the pool also wait for
+messages. An idle worker takes whatever is queued in any serviced queue
+with delete_head_nowait(), and when every queue is empty it waits in one
+of them with wait_not_empty() for at most poll_interval seconds before
+looking at the others again. Each queue is waited in by at most one
+worker at a time, so with fewer workers than queues a message can wait
+up to poll_interval seconds before a worker sees it. Each queue has its
+own callback. As with msgq_runner, a message whose type is not 0 tells
+the runner to stop servicing that queue.
+
+In ordered mode (the default) the callbacks of a queue run one at a
+time, in the order the messages were queued, while different queues
+are serviced in parallel. In unordered mode any idle worker may run the
+next message of a queue. A queue added with batch=True is ordered and
+its callback gets the list of all messages pending at that time.
+
+At most max_pending messages per queue are taken from the gr.msg_queue
+and not yet handled; past that the messages stay in the gr.msg_queue,
+so its limit applies backpressure to the producer as before.
+
+An exception raised by a callback is printed and counted. When the queue
+was added with exit_on_error, the runner also stops servicing the queue
+and keeps the exception for exit_error().
+
+Per queue statistics are available from stats(). The wait time of a
+message runs from its insertion in the gr.msg_queue to its callback.
+"""
+
+__all__ = ['msgq_pool_runner']
+
+import gnuradio.gr.gr_threading as _threading
+import collections
+import Queue
+import time
+import traceback
+
+class _msgq_entry(object):
+    """
+    State and statistics for one serviced queue.
+    """
+
+    def __init__(self, msgq, callback, batch, exit_on_error):
+        self.msgq = msgq
+        self.callback = callback
+        self.batch = batch
+        self.exit_on_error = exit_on_error
+        self.claimed = False
+        self.pending = collections.deque()
+        self.running = 0
+        self.scheduled = False
+        self.removed = False
+        self.received = 0
+        self.handled = 0
+        self.errors = 0
+        self.wait_time = 0.0
+        self.max_wait_time = 0.0
+        self.callback_time = 0.0
+        self.max_callback_time = 0.0
+
+class msgq_pool_runner(object):
+
+    def __init__(self, nthreads=4, ordered=True, max_pending=16,
+                 poll_interval=0.01, exit_on_error=False):
+        """
+        Args:
+            nthreads: number of worker threads running callbacks
+            ordered: run the callbacks of a queue one at a time, in order
+            max_pending: per queue limit of messages taken but not handled
+            poll_interval: seconds an idle worker waits in one empty queue
+                           before checking the other queues and whether
+                           it should stop
+            exit_on_error: default for add(), stop servicing a queue whose
+                           callback raised
+        """
+        self._ordered = ordered
+        self._max_pending = max(1, max_pending)
+        self._poll_interval = max(0.001, poll_interval)
+        self._wait_ms = max(1, int(poll_interval*1000))
+        self._exit_on_error = exit_on_error
+        self._lock = _threading.Lock()
+        self._entries = collections.OrderedDict()
+        self._exit_errors = dict()
+        self._work = Queue.Queue()
+        self._done = False
+
+        self._workers = [_threading.Thread(target=self._work_loop) for i in range(nthreads)]
+        for thread in self._workers:
+            thread.setDaemon(1)
+            thread.start()
+
+    def add(self, msgq, callback, batch=False, exit_on_error=None):
+        """
+        Start servicing a message queue.
+
+        Args:
+            msgq: the gr.msg_queue to read
+            callback: called with each message, or with a list of
+                      messages when batch is True
+            batch: hand all pending messages to one callback call
+            exit_on_error: stop servicing the queue when the callback raises
+        """
+        if exit_on_error is None:
+            exit_on_error = self._exit_on_error
+        entry = _msgq_entry(msgq, callback, batch, exit_on_error)
+        with self._lock:
+            if self._done:
+                raise RuntimeError, "msgq_pool_runner has been stopped"
+            if id(msgq) in self._entries:
+                raise ValueError, "message queue is already serviced"
+            self._entries[id(msgq)] = entry
+
+    def remove(self, msgq):
+        """
+        Stop servicing a message queue, pending messages are dropped.
+        """
+        with self._lock:
+            entry = self._entries.pop(id(msgq), None)
+            if entry is not None:
+                entry.removed = True
+                entry.pending.clear()
+
+    def exit_error(self, msgq):
+        """
+        Get the exception that made the runner stop servicing a queue.
+        """
+        with self._lock:
+            return self._exit_errors.get(id(msgq))
+
+    def stop(self, timeout=None):
+        """
+        Stop the workers.
+
+        Args:
+            timeout: seconds to wait for the threads to exit, None waits forever
+
+        Returns:
+            True when every thread has exited
+        """
+        with self._lock:
+            self._done = True
+            for entry in self._entries.itervalues():
+                entry.pending.clear()
+        for thread in self._workers:
+            self._work.put(None)
+
+        deadline = None if timeout is None else time.time() + timeout
+        for thread in self._workers:
+            if deadline is None:
+                thread.join()
+            else:
+                thread.join(max(0.0, deadline - time.time()))
+        return not self.running()
+
+    def running(self):
+        return any(t.isAlive() for t in self._workers)
+
+    def stats(self):
+        """
+        Get the statistics of every serviced queue.
+
+        Returns:
+            list of dictionaries, one per queue; times are in seconds,
+            wait_time is from insertion in the gr.msg_queue to the callback
+        """
+        stats = list()
+        with self._lock:
+            for entry in self._entries.itervalues():
+                handled = max(1, entry.handled)
+                stats.append({
+                    'msgq' : entry.msgq,
+                    'depth' : entry.msgq.count(),
+                    'pending' : len(entry.pending) + entry.running,
+                    'received' : entry.received,
+                    'handled' : entry.handled,
+                    'errors' : entry.errors,
+                    'avg_wait_time' : entry.wait_time/handled,
+                    'max_wait_time' : entry.max_wait_time,
+                    'avg_callback_time' : entry.callback_time/handled,
+                    'max_callback_time' : entry.max_callback_time,
+                })
+        return stats
+
+    def _space(self, entry):
+        return self._max_pending - len(entry.pending) - entry.running
+
+    def _claim(self):
+        """
+        Claim every queue that no other worker reads and that has room
+        for more pending messages. The first one is moved to the end,
+        so the next wait is in another queue. Called with the lock held.
+        """
+        claimed = [e for e in self._entries.itervalues()
+                   if not e.claimed and self._space(e) > 0]
+        for entry in claimed:
+            entry.claimed = True
+        if claimed:
+            self._entries[id(claimed[0].msgq)] = self._entries.pop(id(claimed[0].msgq))
+        return claimed
+
+    def _take(self, entry, space):
+        """
+        Take up to space messages off a claimed queue without blocking.
+        The lock is not held, the claim makes this worker the only
+        reader, so a queue that is not empty has a head.
+        """
+        msgs = list()
+        while len(msgs) < space and not entry.msgq.empty_p():
+            msg = entry.msgq.delete_head_nowait()
+            msgs.append(msg)
+            if msg.type() != 0:
+                break
+        return msgs
+
+    def _deliver(self, entry, msgs):
+        """
+        Move taken messages to the pending list. Called with the lock held.
+        """
+        for msg in msgs:
+            if entry.removed:
+                return
+            if msg.type() != 0:
+                #the messages already taken are still handled
+                entry.removed = True
+                self._entries.pop(id(entry.msgq), None)
+                return
+            entry.received += 1
+            entry.pending.append((msg.insert_time(), msg))
+            if not (self._ordered or entry.batch):
+                self._work.put(entry)
+            elif not entry.scheduled:
+                entry.scheduled = True
+                self._work.put(entry)
+
+    def _release(self, entry, msgs):
+        """
+        Give up the claim on a queue and deliver what was taken from it.
+        Called with the lock held.
+        """
+        entry.claimed = False
+        if msgs and not self._done:
+            self._deliver(entry, msgs)
+
+    def _poll(self):
+        """
+        Take the messages queued in every unclaimed queue, or wait in
+        one of them when they are all empty.
+        """
+        with self._lock:
+            if self._done:
+                return False
+            entries = self._claim()
+            spaces = [self._space(e) for e in entries]
+        if not entries:
+            #every queue is read by another worker or is full
+            self._handle(self._get_work(self._poll_interval))
+            return True
+
+        taken = [self._take(e, n) for e, n in zip(entries, spaces)]
+        waiting = None if any(taken) else entries[0]
+        with self._lock:
+            for entry, msgs in zip(entries, taken):
+                if entry is not waiting:
+                    self._release(entry, msgs)
+        if waiting is not None:
+            msgs = list()
+            if waiting.msgq.wait_not_empty(self._wait_ms):
+                msgs = self._take(waiting, spaces[0])
+            with self._lock:
+                self._release(waiting, msgs)
+        return True
+
+    def _get_work(self, timeout=None):
+        try:
+            if timeout is None:
+                return self._work.get_nowait()
+            return self._work.get(timeout=timeout)
+        except Queue.Empty:
+            return None
+
+    def _work_loop(self):
+        while True:
+            entry = self._get_work()
+            if entry is not None:
+                self._handle(entry)
+            elif not self._poll():
+                return
+
+    def _handle(self, entry):
+        if entry is None:
+            return
+        with self._lock:
+            if not entry.pending:
+                entry.scheduled = False
+                return
+            if entry.batch:
+                items = list(entry.pending)
+                entry.pending.clear()
+            else:
+                items = [entry.pending.popleft()]
+            entry.running += len(items)
+        self._run(entry, items)
+        with self._lock:
+            entry.running -= len(items)
+            if self._ordered or entry.batch:
+                if entry.pending and not self._done:
+                    self._work.put(entry)
+                else:
+                    entry.scheduled = False
+
+    def _run(self, entry, items):
+        start = time.time()
+        try:
+            if entry.batch:
+                entry.callback([msg for t, msg in items])
+            else:
+                entry.callback(items[0][1])
+            error = None
+        except Exception, e:
+            print "msgq_pool_runner: callback raised: %s" % (e,)
+            traceback.print_exc()
+            error = e
+        end = time.time()
+
+        with self._lock:
+            entry.handled += len(items)
+            for t, msg in items:
+                entry.wait_time += start - t
+                entry.max_wait_time = max(entry.max_wait_time, start - t)
+            entry.callback_time += end - start
+            entry.max_callback_time = max(entry.max_callback_time, end - start)
+            if error is not None:
+                entry.errors += 1
+        if error is not None and entry.exit_on_error:
+            with self._lock:
+                self._exit_errors[id(entry.msgq)] = error
+            self.remove(entry.msgq)
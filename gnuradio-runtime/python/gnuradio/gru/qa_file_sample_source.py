@@ -0,0 +1,120 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr_unittest
+from gnuradio.gru import file_sample_source
+import os, shutil, tempfile
+import numpy
+
+#odd length so the last block of every level is partial
+NSAMPLES = 100003
+
+def make_samples(dtype):
+    rng = numpy.random.RandomState(0)
+    if dtype == numpy.int16:
+        return rng.randint(-32768, 32768, NSAMPLES).astype(dtype)
+    x = rng.randn(NSAMPLES)
+    if dtype == numpy.complex64:
+        x = x + 1j*rng.randn(NSAMPLES)
+    return x.astype(dtype)
+
+def brute_summary(data, positions, stop):
+    """
+    Min, max and mean of data between consecutive positions, the last
+    block runs to stop. Complex min and max are taken separately on
+    the real and imaginary parts.
+    """
+    edges = list(positions[1:]) + [stop]
+    mins, maxs, means = list(), list(), list()
+    for a, b in zip(positions, edges):
+        block = data[a:b]
+        if numpy.iscomplexobj(block):
+            mins.append(block.real.min() + 1j*block.imag.min())
+            maxs.append(block.real.max() + 1j*block.imag.max())
+        else:
+            mins.append(block.min())
+            maxs.append(block.max())
+        means.append(block.mean(dtype=numpy.complex128 if numpy.iscomplexobj(block) else numpy.float64))
+    return numpy.array(mins, dtype=data.dtype), numpy.array(maxs, dtype=data.dtype), numpy.array(means)
+
+class test_file_sample_source(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write_file(self, dtype):
+        data = make_samples(dtype)
+        filename = os.path.join(self.dir, 'samples_%s.dat' % numpy.dtype(dtype).name)
+        data.tofile(filename)
+        return filename, data
+
+    def check_summary(self, dtype, cache):
+        filename, data = self.write_file(dtype)
+        src = file_sample_source(filename, dtype, cache=cache,
+                                 first_block=16, factor=4, top_size=8)
+        self.assertEqual(len(src), NSAMPLES)
+        self.assertGreater(src.nlevels(), 3)
+        #aligned and unaligned ranges
+        ranges = ((0, NSAMPLES), (src.block_size(2)*5, NSAMPLES),
+                  (33333, NSAMPLES), (33333, NSAMPLES - 777), (17, 5000))
+        for start, stop in ranges:
+            for npoints in (10, 100, 1000, 10000):
+                positions, mins, maxs, means = src.summary(start, stop, npoints)
+                self.assertEqual(positions[0], start)
+                self.assertTrue(numpy.all(numpy.diff(positions) > 0))
+                self.assertTrue(positions[-1] < stop)
+                bmins, bmaxs, bmeans = brute_summary(data, positions, stop)
+                self.assertTrue(numpy.array_equal(mins, bmins))
+                self.assertTrue(numpy.array_equal(maxs, bmaxs))
+                self.assertTrue(numpy.allclose(means, bmeans, rtol=1e-4, atol=1e-4))
+        return src
+
+    def test_001_float32(self):
+        self.check_summary(numpy.float32, False)
+
+    def test_002_complex64(self):
+        self.check_summary(numpy.complex64, False)
+
+    def test_003_int16(self):
+        self.check_summary(numpy.int16, False)
+
+    def test_004_cached(self):
+        for dtype in (numpy.float32, numpy.complex64, numpy.int16):
+            self.check_summary(dtype, True)
+            #the second source loads the pyramid from disk
+            src = self.check_summary(dtype, True)
+            self.assertTrue(os.path.isdir(src.pyramid_dir()))
+
+    def test_005_raw_samples(self):
+        filename, data = self.write_file(numpy.float32)
+        src = file_sample_source(filename, numpy.float32, cache=False)
+        positions, mins, maxs, means = src.summary(1000, 1100, 200)
+        self.assertTrue(numpy.array_equal(positions, numpy.arange(1000, 1100)))
+        self.assertTrue(numpy.array_equal(mins, data[1000:1100]))
+        self.assertTrue(numpy.array_equal(maxs, data[1000:1100]))
+        self.assertTrue(numpy.array_equal(src.read(1000, 100), data[1000:1100]))
+
+if __name__ == '__main__':
+    gr_unittest.run(test_file_sample_source, "test_file_sample_source.xml")
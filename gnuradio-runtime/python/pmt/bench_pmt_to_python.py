@@ -0,0 +1,79 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+"""
+Micro-benchmark of the python <-> pmt conversions.
+
+Times pmt.to_pmt and pmt.to_python on scalars, nested dicts and
+vectors, next to the linear search over type_mappings that the
+conversions used before the dispatch tables.
+"""
+
+from optparse import OptionParser
+import timeit
+
+import pmt
+import pmt_to_python as pmt2py
+
+def _scan_to_pmt(p):
+    return pmt2py._python_to_pmt_scan(p)(p)
+
+def cases():
+    metadata = {
+        'rx_time': (1400000000L, 0.25),
+        'rx_rate': 1e6,
+        'rx_freq': 2.4e9,
+        'antenna': 'RX2',
+        'gain': {'lna': 10, 'mixer': 5, 'vga': 20.5},
+        'flags': [True, False, True],
+    }
+    return (
+        ('int', 42),
+        ('float', 3.25),
+        ('str', 'packet_len'),
+        ('metadata dict', metadata),
+        ('dict of 100 floats', dict(('key%d' % i, float(i)) for i in range(100))),
+        ('list of 1000 ints', range(1000)),
+        ('list of 100 mixed', [i if i % 2 else str(i) for i in range(100)]),
+    )
+
+def run(number):
+    print "%-20s %12s %12s %12s %12s" % ('case', 'to_pmt', 'scan', 'to_python', 'scan')
+    for name, value in cases():
+        p = pmt.to_pmt(value)
+        times = [
+            timeit.timeit(lambda: pmt.to_pmt(value), number=number),
+            timeit.timeit(lambda: _scan_to_pmt(value), number=number),
+            timeit.timeit(lambda: pmt.to_python(p), number=number),
+            timeit.timeit(lambda: pmt2py._pmt_to_python_scan(p), number=number),
+        ]
+        print "%-20s %s" % (name, ' '.join('%9.2f us' % (1e6*t/number) for t in times))
+
+def main():
+    parser = OptionParser(usage="%prog: [options]")
+    parser.add_option("-n", "--number", type="int", default=1000,
+                      help="conversions per case [default=%default]")
+    (options, args) = parser.parse_args()
+    run(options.number)
+
+if __name__ == '__main__':
+    main()
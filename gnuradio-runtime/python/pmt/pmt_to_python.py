@@ -38,69 +38,113 @@ def pmt_from_tuple(p):
     return pmt.make_tuple(*args)
 
 def pmt_to_vector(p):
-    v = list()
-    for i in range(pmt.length(p)):
-        elem = pmt.vector_ref(p, i)
-        v.append(pmt_to_python(elem))
-    return v
+    return [pmt_to_python(pmt.vector_ref(p, i)) for i in xrange(pmt.length(p))]
 
 def pmt_from_vector(p):
     v = pmt.make_vector(len(p), PMT_NIL)
+    if not p: return v
+    #homogeneous vectors look up the conversion once
+    from_python = _from_python.get(type(p[0]))
+    if from_python is None or not all(type(elem) is type(p[0]) for elem in p):
+        from_python = python_to_pmt
     for i, elem in enumerate(p):
-        pmt.vector_set(v, i, python_to_pmt(elem))
+        pmt.vector_set(v, i, from_python(elem))
     return v
 
 def pmt_to_dict(p):
     d = dict()
     items = pmt.dict_items(p)
-    for i in range(pmt.length(items)):
-        pair = pmt.nth(i, items)
-        k = pmt.car(pair)
-        v = pmt.cdr(pair)
-        d[pmt_to_python(k)] = pmt_to_python(v)
+    while not pmt.is_null(items):
+        pair = pmt.car(items)
+        d[pmt_to_python(pmt.car(pair))] = pmt_to_python(pmt.cdr(pair))
+        items = pmt.cdr(items)
     return d
 
 def pmt_from_dict(p):
     d = pmt.make_dict()
     for k, v in p.iteritems():
+        #dicts of scalars skip the generic dispatch
+        from_key = _from_python.get(type(k), python_to_pmt)
+        from_value = _from_python.get(type(v), python_to_pmt)
         #dict is immutable -> therefore pmt_dict_add returns the new dict
-        d = pmt.dict_add(d, python_to_pmt(k), python_to_pmt(v))
+        d = pmt.dict_add(d, from_key(k), from_value(v))
     return d
 
+# dtype: (make uniform vector, fill value, check uniform vector type)
 numpy_mappings = {
-    numpy.dtype(numpy.float32): (pmt.init_f32vector, float, pmt.f32vector_elements, pmt.is_f32vector),
-    numpy.dtype(numpy.float64): (pmt.init_f64vector, float, pmt.f64vector_elements, pmt.is_f64vector),
-    numpy.dtype(numpy.complex64): (pmt.init_c32vector, complex, pmt.c32vector_elements, pmt.is_c32vector),
-    numpy.dtype(numpy.complex128): (pmt.init_c64vector, complex, pmt.c64vector_elements, pmt.is_c64vector),
-    numpy.dtype(numpy.int8): (pmt.init_s8vector, int, pmt.s8vector_elements, pmt.is_s8vector),
-    numpy.dtype(numpy.int16): (pmt.init_s16vector, int, pmt.s16vector_elements, pmt.is_s16vector),
-    numpy.dtype(numpy.int32): (pmt.init_s32vector, int, pmt.s32vector_elements, pmt.is_s32vector),
-#    numpy.dtype(numpy.int64): (pmt.init_s64vector, int, pmt.s64vector_elements, pmt.is_s64vector),
-    numpy.dtype(numpy.uint8): (pmt.init_u8vector, int, pmt.u8vector_elements, pmt.is_u8vector),
-    numpy.dtype(numpy.uint16): (pmt.init_u16vector, int, pmt.u16vector_elements, pmt.is_u16vector),
-    numpy.dtype(numpy.uint32): (pmt.init_u32vector, int, pmt.u32vector_elements, pmt.is_u32vector),
-#    numpy.dtype(numpy.uint64): (pmt.init_u64vector, int, pmt.u64vector_elements, pmt.is_u64vector),
-    numpy.dtype(numpy.byte): (pmt.init_u8vector, int, pmt.u8vector_elements, pmt.is_u8vector),
+    numpy.dtype(numpy.float32): (pmt.make_f32vector, 0.0, pmt.is_f32vector),
+    numpy.dtype(numpy.float64): (pmt.make_f64vector, 0.0, pmt.is_f64vector),
+    numpy.dtype(numpy.complex64): (pmt.make_c32vector, 0j, pmt.is_c32vector),
+    numpy.dtype(numpy.complex128): (pmt.make_c64vector, 0j, pmt.is_c64vector),
+    numpy.dtype(numpy.int8): (pmt.make_s8vector, 0, pmt.is_s8vector),
+    numpy.dtype(numpy.int16): (pmt.make_s16vector, 0, pmt.is_s16vector),
+    numpy.dtype(numpy.int32): (pmt.make_s32vector, 0, pmt.is_s32vector),
+    numpy.dtype(numpy.int64): (pmt.make_s64vector, 0, pmt.is_s64vector),
+    numpy.dtype(numpy.uint8): (pmt.make_u8vector, 0, pmt.is_u8vector),
+    numpy.dtype(numpy.uint16): (pmt.make_u16vector, 0, pmt.is_u16vector),
+    numpy.dtype(numpy.uint32): (pmt.make_u32vector, 0, pmt.is_u32vector),
+    numpy.dtype(numpy.uint64): (pmt.make_u64vector, 0, pmt.is_u64vector),
 }
 
-uvector_mappings = dict([ (numpy_mappings[key][3], (numpy_mappings[key][2], key)) for key in numpy_mappings ])
+uvector_mappings = [ (numpy_mappings[key][2], key) for key in numpy_mappings ]
+
+class uvector_buffer(object):
+    """
+    Expose the elements of a uniform vector through the numpy array
+    interface. numpy.asarray() of a buffer is a view of the elements that
+    holds a reference to the uniform vector, so nothing is copied and the
+    elements stay valid as long as the array is alive.
+    """
+    def __init__(self, uvector, dtype, writable=False):
+        self.uvector = uvector
+        if writable: address = pmt.uniform_vector_writable_address(uvector)
+        else: address = pmt.uniform_vector_address(uvector)
+        self.__array_interface__ = {
+            'version': 3,
+            'shape': (pmt.length(uvector),),
+            'typestr': numpy.dtype(dtype).str,
+            'data': (address, not writable),
+        }
 
 def numpy_to_uvector(numpy_array):
     try:
         mapping = numpy_mappings[numpy_array.dtype]
-        pc = map(mapping[1], numpy.ravel(numpy_array))
-        return mapping[0](numpy_array.size, pc)
     except KeyError:
         raise ValueError("unsupported numpy array dtype for converstion to pmt %s"%(numpy_array.dtype))
+    uvector = mapping[0](numpy_array.size, mapping[1])
+    if numpy_array.size:
+        #copy straight into the elements of the uniform vector
+        elements = numpy.asarray(uvector_buffer(uvector, numpy_array.dtype, writable=True))
+        elements.reshape(numpy_array.shape)[...] = numpy_array
+    return uvector
+
+def uvector_to_numpy(uvector, copy=False):
+    """
+    Get the elements of a uniform vector as a numpy array.
+    Unless copy is set, the array is a read-only view of the elements.
+    """
+    dtype = _uvector_dtypes.get(pmt.type_tag(uvector))
+    if dtype is None:
+        raise ValueError("unsupported uvector data type for conversion to numpy array %s"%(uvector))
+    if pmt.length(uvector):
+        arr = numpy.asarray(uvector_buffer(uvector, dtype))
+    else:
+        arr = numpy.zeros(0, dtype=dtype)
+        arr.flags.writeable = False
+    return arr.copy() if copy else arr
+
+def pmt_to_pair(p):
+    return (pmt_to_python(pmt.car(p)), pmt_to_python(pmt.cdr(p)))
 
-def uvector_to_numpy(uvector):
-	match = None
-	for test_func in uvector_mappings.keys():
-		if test_func(uvector):
-			match = uvector_mappings[test_func]
-			return numpy.array(match[0](uvector), dtype = match[1])
-	else:
-		raise ValueError("unsupported uvector data type for conversion to numpy array %s"%(uvector))
+def pmt_from_pair(p):
+    return pmt.cons(python_to_pmt(p[0]), python_to_pmt(p[1]))
+
+def pmt_pair_to_python(p):
+    #a dict is a list of pairs, anything else is a plain pair
+    try:
+        return pmt_to_dict(p)
+    except:
+        return pmt_to_pair(p)
 
 type_mappings = ( #python type, check pmt type, to python, from python
     (None, pmt.is_null, lambda x: None, lambda x: PMT_NIL),
@@ -114,11 +158,45 @@ type_mappings = ( #python type, check pmt type, to python, from python
     (tuple, pmt.is_tuple, pmt_to_tuple, pmt_from_tuple),
     (list, pmt.is_vector, pmt_to_vector, pmt_from_vector),
     (dict, pmt.is_dict, pmt_to_dict, pmt_from_dict),
-    (tuple, pmt.is_pair, lambda x: (pmt_to_python(pmt.car(x)), pmt_to_python(pmt.cdr(x))), lambda x: pmt.cons(python_to_pmt(x[0]), python_to_pmt(x[1]))),
+    (tuple, pmt.is_pair, pmt_to_pair, pmt_from_pair),
     (numpy.ndarray, pmt.is_uniform_vector, uvector_to_numpy, numpy_to_uvector),
 )
 
-def pmt_to_python(p):
+# dispatch tables, pmt type tag -> to python and python type -> from python
+_uvector_dtypes = {
+    pmt.TYPE_TAG_U8VECTOR: numpy.dtype(numpy.uint8),
+    pmt.TYPE_TAG_S8VECTOR: numpy.dtype(numpy.int8),
+    pmt.TYPE_TAG_U16VECTOR: numpy.dtype(numpy.uint16),
+    pmt.TYPE_TAG_S16VECTOR: numpy.dtype(numpy.int16),
+    pmt.TYPE_TAG_U32VECTOR: numpy.dtype(numpy.uint32),
+    pmt.TYPE_TAG_S32VECTOR: numpy.dtype(numpy.int32),
+    pmt.TYPE_TAG_U64VECTOR: numpy.dtype(numpy.uint64),
+    pmt.TYPE_TAG_S64VECTOR: numpy.dtype(numpy.int64),
+    pmt.TYPE_TAG_F32VECTOR: numpy.dtype(numpy.float32),
+    pmt.TYPE_TAG_F64VECTOR: numpy.dtype(numpy.float64),
+    pmt.TYPE_TAG_C32VECTOR: numpy.dtype(numpy.complex64),
+    pmt.TYPE_TAG_C64VECTOR: numpy.dtype(numpy.complex128),
+}
+
+_to_python = {
+    pmt.TYPE_TAG_NULL: lambda x: None,
+    pmt.TYPE_TAG_BOOL: pmt.to_bool,
+    pmt.TYPE_TAG_SYMBOL: pmt.symbol_to_string,
+    pmt.TYPE_TAG_INTEGER: pmt.to_long,
+    pmt.TYPE_TAG_UINT64: lambda x: long(pmt.to_uint64(x)),
+    pmt.TYPE_TAG_REAL: pmt.to_double,
+    pmt.TYPE_TAG_COMPLEX: pmt.to_complex,
+    pmt.TYPE_TAG_PAIR: pmt_pair_to_python,
+    pmt.TYPE_TAG_TUPLE: pmt_to_tuple,
+    pmt.TYPE_TAG_VECTOR: pmt_to_vector,
+}
+for tag in _uvector_dtypes: _to_python[tag] = uvector_to_numpy
+
+_from_python = dict()
+for python_type, pmt_check, to_python, from_python in reversed(type_mappings):
+    _from_python[type(None) if python_type is None else python_type] = from_python
+
+def _pmt_to_python_scan(p):
     for python_type, pmt_check, to_python, from_python in type_mappings:
         if pmt_check(p):
             try:
@@ -127,9 +205,26 @@ def pmt_to_python(p):
                 pass
     raise ValueError("can't convert %s type to pmt (%s)"%(type(p),p))
 
-def python_to_pmt(p):
+def _python_to_pmt_scan(p):
     for python_type, pmt_check, to_python, from_python in type_mappings:
         if python_type is None:
-            if p == None: return from_python(p)
-        elif isinstance(p, python_type): return from_python(p)
+            if p is None: return from_python
+        elif isinstance(p, python_type): return from_python
     raise ValueError("can't convert %s type to pmt (%s)"%(type(p),p))
+
+def pmt_to_python(p):
+    to_python = _to_python.get(pmt.type_tag(p))
+    if to_python is not None:
+        try:
+            return to_python(p)
+        except:
+            pass
+    #unknown types and failed conversions get the full search
+    return _pmt_to_python_scan(p)
+
+def python_to_pmt(p):
+    from_python = _from_python.get(type(p))
+    if from_python is None:
+        #subclasses are searched once, then dispatched like their base
+        from_python = _from_python[type(p)] = _python_to_pmt_scan(p)
+    return from_python(p)
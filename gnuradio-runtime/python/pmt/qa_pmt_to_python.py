@@ -42,6 +42,62 @@ class test_pmt_to_python(unittest.TestCase):
         self.assertTrue(nparr.dtype==narr.dtype)
         self.assertTrue(np.alltrue(nparr == narr))
 
+    def test_numpy_to_uvector_all_types(self):
+        import numpy as np
+        for dtype in pmt2py.numpy_mappings.keys():
+            narr = (np.arange(24) % 100).astype(dtype).reshape(4, 6)[:, ::2]
+            uvector = pmt2py.numpy_to_uvector(narr)
+            self.assertEqual(pmt.length(uvector), narr.size)
+            nparr = pmt2py.uvector_to_numpy(uvector)
+            self.assertEqual(nparr.dtype, narr.dtype)
+            self.assertTrue(np.alltrue(nparr == narr.ravel()))
+
+    def test_uvector_to_numpy_view(self):
+        import numpy as np
+        uvector = pmt.init_s64vector(3, [1, -2, 2**40])
+        nparr = pmt2py.uvector_to_numpy(uvector)
+        self.assertFalse(nparr.flags.writeable)
+        self.assertEqual(nparr.tolist(), [1, -2, 2**40])
+        # the array is a view of the elements
+        pmt.s64vector_set(uvector, 0, 7)
+        self.assertEqual(nparr[0], 7)
+        # and keeps the uniform vector alive
+        del uvector
+        self.assertEqual(nparr.tolist(), [7, -2, 2**40])
+        nparr = pmt2py.uvector_to_numpy(pmt.make_u64vector(0, 0), copy=True)
+        self.assertEqual(nparr.size, 0)
+        self.assertEqual(nparr.dtype, np.uint64)
+
+    def test_nested_round_trip(self):
+        values = [
+            None, True, 'abc', 7, 2**40L, 1.5, 2+3j,
+            (1, 'a', 2.0),
+            [1, 2, 3],
+            [1, 'x', 2.0, [None, False]],
+            {'a': 1, 'b': [1.0, 2.0], 'c': {'d': (1, 'e')}},
+        ]
+        for value in values:
+            self.assertEqual(pmt.to_python(pmt.to_pmt(value)), value)
+        pair = pmt.cons(pmt.from_long(1), pmt.intern('a'))
+        self.assertEqual(pmt.to_python(pair), (1, 'a'))
+
+    def test_subclass_to_pmt(self):
+        import collections
+        import numpy as np
+        d = collections.OrderedDict([('a', 1), ('b', 2.0)])
+        self.assertEqual(pmt.to_python(pmt.to_pmt(d)), {'a': 1, 'b': 2.0})
+        self.assertTrue(pmt.is_real(pmt.to_pmt(np.float64(2.5))))
+        self.assertRaises(ValueError, pmt.to_pmt, object())
+
+    def test_type_tag(self):
+        import numpy as np
+        self.assertEqual(pmt.type_tag(pmt.PMT_NIL), pmt.TYPE_TAG_NULL)
+        self.assertEqual(pmt.type_tag(pmt.from_long(1)), pmt.TYPE_TAG_INTEGER)
+        self.assertEqual(pmt.type_tag(pmt.make_dict()), pmt.TYPE_TAG_NULL)
+        for dtype in pmt2py.numpy_mappings.keys():
+            uvector = pmt2py.numpy_to_uvector(np.zeros(2, dtype=dtype))
+            self.assertEqual(pmt2py._uvector_dtypes[pmt.type_tag(uvector)], dtype)
+
 
 
 if __name__ == '__main__':
@@ -53,6 +53,11 @@ namespace gr {
     pmt::pmt_t message_ports_in();
     pmt::pmt_t message_ports_out();
     pmt::pmt_t message_subscribers(pmt::pmt_t which_port);
+    void set_msg_queue_limit(pmt::pmt_t which_port, size_t limit);
+    size_t msg_queue_limit(pmt::pmt_t which_port);
+    uint64_t nmsgs_queued(pmt::pmt_t which_port);
+    uint64_t nmsgs_dropped(pmt::pmt_t which_port);
+    size_t nmsgs_high_water(pmt::pmt_t which_port);
   };
 
   %rename(block_ncurrently_allocated) basic_block_ncurrently_allocated;
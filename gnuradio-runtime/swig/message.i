@@ -55,6 +55,8 @@ namespace gr {
     void set_arg1(double arg1);
     void set_arg2(double arg2);
 
+    double insert_time() const;
+
     size_t length() const;
     std::string to_string() const;
   };
@@ -57,6 +57,13 @@ namespace gr {
      */
     gr::message::sptr delete_head_nowait();
 
+    /*!
+     * \brief Wait until a message is available.
+     * \param millisec timeout (0=no timeout)
+     * \returns true if a message is available, false on timeout
+     */
+    //bool wait_not_empty(unsigned int millisec = 0);
+
     //! is the queue empty?
     bool empty_p() const;
 
@@ -75,8 +82,8 @@ namespace gr {
  * The following kludge-o-rama releases the Python global interpreter
  * lock around these potentially blocking calls.  We don't want
  * libgnuradio-runtime to be dependent on Python, thus we create these
- * functions that serve as replacements for the normal C++ delete_head
- * and insert_tail methods.  The %pythoncode smashes these new C++
+ * functions that serve as replacements for the normal C++ delete_head,
+ * wait_not_empty and insert_tail methods.  The %pythoncode smashes these new C++
  * functions into the gr.msg_queue wrapper class, so that everything
  * appears normal.  (An evil laugh is heard in the distance...)
  */
@@ -90,6 +97,14 @@ namespace gr {
     return msg;
   }
 
+  bool py_msg_queue__wait_not_empty(gr::msg_queue::sptr q, unsigned int millisec = 0) {
+    bool ready;
+    GR_PYTHON_BLOCKING_CODE(
+        ready = q->wait_not_empty(millisec);
+    )
+    return ready;
+  }
+
   void py_msg_queue__insert_tail(gr::msg_queue::sptr q, gr::message::sptr msg) {
     GR_PYTHON_BLOCKING_CODE(
         q->insert_tail(msg);
@@ -101,6 +116,7 @@ namespace gr {
 %template(msg_queue_sptr) boost::shared_ptr<gr::msg_queue>;
 %pythoncode %{
 msg_queue_sptr.delete_head = py_msg_queue__delete_head
+msg_queue_sptr.wait_not_empty = py_msg_queue__wait_not_empty
 msg_queue_sptr.insert_tail = py_msg_queue__insert_tail
 msg_queue_sptr.handle = py_msg_queue__insert_tail
 msg_queue = msg_queue.make
@@ -53,6 +53,8 @@
 %template(pmt_vector_uint16) std::vector<uint16_t>;
 %template(pmt_vector_int32) std::vector<int32_t>;
 %template(pmt_vector_uint32) std::vector<uint32_t>;
+%template(pmt_vector_int64) std::vector<int64_t>;
+%template(pmt_vector_uint64) std::vector<uint64_t>;
 %template(pmt_vector_float) std::vector<float>;
 %template(pmt_vector_double) std::vector<double>;
 %template(pmt_vector_cfloat) std::vector< std::complex<float> >;
@@ -195,6 +197,8 @@ namespace pmt{
   pmt_t init_s16vector(size_t k, const std::vector<int16_t> &data);
   pmt_t init_u32vector(size_t k, const std::vector<uint32_t> &data);
   pmt_t init_s32vector(size_t k, const std::vector<int32_t> &data);
+  pmt_t init_u64vector(size_t k, const std::vector<uint64_t> &data);
+  pmt_t init_s64vector(size_t k, const std::vector<int64_t> &data);
   pmt_t init_f32vector(size_t k, const std::vector<float> &data);
   pmt_t init_f64vector(size_t k, const std::vector<double> &data);
   pmt_t init_c32vector(size_t k, const std::vector<std::complex<float> > &data);
@@ -233,6 +237,8 @@ namespace pmt{
   const std::vector<int16_t>  s16vector_elements(pmt_t v);
   const std::vector<uint32_t> u32vector_elements(pmt_t v);
   const std::vector<int32_t>  s32vector_elements(pmt_t v);
+  const std::vector<uint64_t> u64vector_elements(pmt_t v);
+  const std::vector<int64_t>  s64vector_elements(pmt_t v);
   const std::vector<float>    f32vector_elements(pmt_t v);
   const std::vector<double>   f64vector_elements(pmt_t v);
   const std::vector<std::complex<float> > c32vector_elements(pmt_t v);
@@ -300,3 +306,73 @@ namespace pmt{
   pmt_t deserialize_str(std::string str);
 
 } //namespace pmt
+
+// Addresses of the elements of a uniform vector, used by pmt_to_python
+// to view and fill uniform vectors through the numpy array interface.
+// The type tag of a PMT lets pmt_to_python dispatch on the type with one
+// call instead of probing the is_* predicates one after the other.
+%inline %{
+  enum pmt_type_tag_t {
+    TYPE_TAG_NULL = 0,
+    TYPE_TAG_BOOL,
+    TYPE_TAG_SYMBOL,
+    TYPE_TAG_INTEGER,
+    TYPE_TAG_UINT64,
+    TYPE_TAG_REAL,
+    TYPE_TAG_COMPLEX,
+    TYPE_TAG_PAIR,
+    TYPE_TAG_TUPLE,
+    TYPE_TAG_VECTOR,
+    TYPE_TAG_U8VECTOR,
+    TYPE_TAG_S8VECTOR,
+    TYPE_TAG_U16VECTOR,
+    TYPE_TAG_S16VECTOR,
+    TYPE_TAG_U32VECTOR,
+    TYPE_TAG_S32VECTOR,
+    TYPE_TAG_U64VECTOR,
+    TYPE_TAG_S64VECTOR,
+    TYPE_TAG_F32VECTOR,
+    TYPE_TAG_F64VECTOR,
+    TYPE_TAG_C32VECTOR,
+    TYPE_TAG_C64VECTOR,
+    TYPE_TAG_OTHER
+  };
+
+  int type_tag(pmt::pmt_t x) {
+    if (pmt::is_null(x)) return TYPE_TAG_NULL;
+    if (pmt::is_bool(x)) return TYPE_TAG_BOOL;
+    if (pmt::is_symbol(x)) return TYPE_TAG_SYMBOL;
+    if (pmt::is_integer(x)) return TYPE_TAG_INTEGER;
+    if (pmt::is_uint64(x)) return TYPE_TAG_UINT64;
+    if (pmt::is_real(x)) return TYPE_TAG_REAL;
+    if (pmt::is_complex(x)) return TYPE_TAG_COMPLEX;
+    if (pmt::is_pair(x)) return TYPE_TAG_PAIR;
+    if (pmt::is_tuple(x)) return TYPE_TAG_TUPLE;
+    if (pmt::is_vector(x)) return TYPE_TAG_VECTOR;
+    if (pmt::is_uniform_vector(x)) {
+      if (pmt::is_u8vector(x)) return TYPE_TAG_U8VECTOR;
+      if (pmt::is_s8vector(x)) return TYPE_TAG_S8VECTOR;
+      if (pmt::is_u16vector(x)) return TYPE_TAG_U16VECTOR;
+      if (pmt::is_s16vector(x)) return TYPE_TAG_S16VECTOR;
+      if (pmt::is_u32vector(x)) return TYPE_TAG_U32VECTOR;
+      if (pmt::is_s32vector(x)) return TYPE_TAG_S32VECTOR;
+      if (pmt::is_u64vector(x)) return TYPE_TAG_U64VECTOR;
+      if (pmt::is_s64vector(x)) return TYPE_TAG_S64VECTOR;
+      if (pmt::is_f32vector(x)) return TYPE_TAG_F32VECTOR;
+      if (pmt::is_f64vector(x)) return TYPE_TAG_F64VECTOR;
+      if (pmt::is_c32vector(x)) return TYPE_TAG_C32VECTOR;
+      if (pmt::is_c64vector(x)) return TYPE_TAG_C64VECTOR;
+    }
+    return TYPE_TAG_OTHER;
+  }
+
+  size_t uniform_vector_address(pmt::pmt_t v) {
+    size_t len;
+    return reinterpret_cast<size_t>(pmt::uniform_vector_elements(v, len));
+  }
+
+  size_t uniform_vector_writable_address(pmt::pmt_t v) {
+    size_t len;
+    return reinterpret_cast<size_t>(pmt::uniform_vector_writable_elements(v, len));
+  }
+%}
@@ -49,10 +49,14 @@ namespace gr {
        * \param payload_size UDP payload size by default set to
        *                     1472 = (1500 MTU - (8 byte UDP header) - (20 byte IP header))
        * \param eof          Send zero-length packet on disconnect
+       * \param seq_header   Start each packet with a 64-bit big-endian
+       *                     sequence number and send whole items only,
+       *                     for a udp_source with seq_header set
        */
       static sptr make(size_t itemsize,
                        const std::string &host, int port,
-                       int payload_size=1472, bool eof=true);
+                       int payload_size=1472, bool eof=true,
+                       bool seq_header=false);
 
       /*! \brief return the PAYLOAD_SIZE of the socket */
       virtual int payload_size() = 0;
@@ -51,11 +51,17 @@ namespace gr {
        * \param payload_size UDP payload size by default set to 1472 =
        *                     (1500 MTU - (8 byte UDP header) - (20 byte IP header))
        * \param eof          Interpret zero-length packet as EOF (default: true)
+       * \param seq_header   Each packet starts with a 64-bit big-endian
+       *                     sequence number, as sent by udp_sink; a
+       *                     gap is tagged "udp_gap" on the first item
+       *                     of the packet after it, with a tuple of
+       *                     the expected and the received number
        */
       static sptr make(size_t itemsize,
                        const std::string &host, int port,
                        int payload_size=1472,
-                       bool eof=true);
+                       bool eof=true,
+                       bool seq_header=false);
 
       /*! \brief Change the connection to a new destination
        *
@@ -76,6 +82,16 @@ namespace gr {
 
       /*! \brief return the port number of the socket */
       virtual int get_port() = 0;
+
+      /*! \brief Number of packets received */
+      virtual uint64_t packets_received() const = 0;
+
+      /*! \brief Number of packets missing from the sequence numbers */
+      virtual uint64_t packets_lost() const = 0;
+
+      /*! \brief Number of packets the kernel dropped because the
+       *  socket buffer was full (Linux only) */
+      virtual uint64_t packets_dropped() const = 0;
     };
 
   } /* namespace blocks */
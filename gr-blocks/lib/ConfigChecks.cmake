@@ -89,3 +89,20 @@ CHECK_CXX_SOURCE_COMPILES("
     " HAVE_COSF
 )
 GR_ADD_COND_DEF(HAVE_COSF)
+
+########################################################################
+CHECK_CXX_SOURCE_COMPILES("
+    #define _GNU_SOURCE
+    #include <sys/socket.h>
+    int main(){recvmmsg(0, 0, 0, 0, 0); return 0;}
+    " HAVE_RECVMMSG
+)
+GR_ADD_COND_DEF(HAVE_RECVMMSG)
+
+CHECK_CXX_SOURCE_COMPILES("
+    #define _GNU_SOURCE
+    #include <sys/socket.h>
+    int main(){sendmmsg(0, 0, 0, 0); return 0;}
+    " HAVE_SENDMMSG
+)
+GR_ADD_COND_DEF(HAVE_SENDMMSG)
@@ -31,31 +31,49 @@
 #include <boost/format.hpp>
 #include <gnuradio/thread/thread.h>
 #include <stdexcept>
+#include <errno.h>
 #include <stdio.h>
 #include <string.h>
+#ifdef HAVE_SENDMMSG
+#include <sys/socket.h>
+#endif
 
 namespace gr {
   namespace blocks {
 
+    const int udp_sink_impl::SEND_BATCH = 64;
+
+    static const int SEQ_BYTES = 8;
+
     udp_sink::sptr
     udp_sink::make(size_t itemsize,
                    const std::string &host, int port,
-                   int payload_size, bool eof)
+                   int payload_size, bool eof, bool seq_header)
     {
       return gnuradio::get_initial_sptr
         (new udp_sink_impl(itemsize, host, port,
-                           payload_size, eof));
+                           payload_size, eof, seq_header));
     }
 
     udp_sink_impl::udp_sink_impl(size_t itemsize,
                                  const std::string &host, int port,
-                                 int payload_size, bool eof)
+                                 int payload_size, bool eof, bool seq_header)
       : sync_block("udp_sink",
                       io_signature::make(1, 1, itemsize),
                       io_signature::make(0, 0, 0)),
         d_itemsize(itemsize), d_payload_size(payload_size), d_eof(eof),
-        d_connected(false)
+        d_seq_header(seq_header), d_connected(false), d_seq(0)
     {
+      d_packet_bytes = d_payload_size;
+      if(d_seq_header) {
+        // whole items only, so that a lost packet does not shift the
+        // items of the ones after it
+        d_packet_bytes = ((d_payload_size - SEQ_BYTES)/d_itemsize)*d_itemsize;
+        if(d_payload_size <= SEQ_BYTES || d_packet_bytes == 0)
+          throw std::invalid_argument("udp_sink: payload_size too small for the sequence header");
+        d_headers.resize(SEND_BATCH*SEQ_BYTES);
+      }
+
       // Get the destination address
       connect(host, port);
     }
@@ -112,34 +130,97 @@ namespace gr {
       d_connected = false;
     }
 
+    void
+    udp_sink_impl::put_header(unsigned char *hdr)
+    {
+      for(int i = SEQ_BYTES-1; i >= 0; i--) {
+        hdr[i] = (unsigned char)(d_seq >> (8*(SEQ_BYTES-1-i)));
+      }
+      d_seq++;
+    }
+
     int
     udp_sink_impl::work (int noutput_items,
                          gr_vector_const_void_star &input_items,
                          gr_vector_void_star &output_items)
     {
       const char *in = (const char *) input_items[0];
-      ssize_t r=0, bytes_sent=0, bytes_to_send=0;
+      ssize_t bytes_sent=0, bytes_to_send=0;
       ssize_t total_size = noutput_items*d_itemsize;
 
       gr::thread::scoped_lock guard(d_mutex);  // protect d_socket
 
-      while(bytes_sent <  total_size) {
-        bytes_to_send = std::min((ssize_t)d_payload_size, (total_size-bytes_sent));
-
-        if(d_connected) {
-          try {
-            r = d_socket->send_to(boost::asio::buffer((void*)(in+bytes_sent), bytes_to_send),
-                                 d_endpoint);
+      if(!d_connected)
+        return noutput_items;  // discarded for lack of connection
+
+#ifdef HAVE_SENDMMSG
+      // Hand the kernel up to SEND_BATCH packets per call
+      const int fd = d_socket->native_handle();
+      struct mmsghdr msgs[SEND_BATCH];
+      struct iovec iovs[2*SEND_BATCH];
+      const int niov = d_seq_header ? 2 : 1;
+
+      while(bytes_sent < total_size) {
+        int n = 0;
+        ssize_t offset = bytes_sent;
+        memset(msgs, 0, sizeof(msgs));
+        while(n < SEND_BATCH && offset < total_size) {
+          bytes_to_send = std::min((ssize_t)d_packet_bytes, (total_size-offset));
+          struct iovec *iov = &iovs[2*n];
+          if(d_seq_header) {
+            put_header(&d_headers[n*SEQ_BYTES]);
+            iov->iov_base = &d_headers[n*SEQ_BYTES];
+            iov->iov_len = SEQ_BYTES;
+            iov++;
           }
-          catch(std::exception& e) {
-            GR_LOG_ERROR(d_logger, boost::format("send error: %s") % e.what());
+          iov->iov_base = (void*)(in+offset);
+          iov->iov_len = bytes_to_send;
+          msgs[n].msg_hdr.msg_name = d_endpoint.data();
+          msgs[n].msg_hdr.msg_namelen = d_endpoint.size();
+          msgs[n].msg_hdr.msg_iov = &iovs[2*n];
+          msgs[n].msg_hdr.msg_iovlen = niov;
+          offset += bytes_to_send;
+          n++;
+        }
+
+        int sent = 0;
+        while(sent < n) {
+          int r = sendmmsg(fd, &msgs[sent], n-sent, 0);
+          if(r < 0) {
+            if(errno == EINTR)
+              continue;
+            GR_LOG_ERROR(d_logger, boost::format("send error: %s") % strerror(errno));
             return -1;
           }
+          sent += r;
+        }
+        bytes_sent = offset;
+      }
+#else
+      unsigned char header[SEQ_BYTES];
+      while(bytes_sent <  total_size) {
+        bytes_to_send = std::min((ssize_t)d_packet_bytes, (total_size-bytes_sent));
+
+        try {
+          if(d_seq_header) {
+            put_header(header);
+            boost::array<boost::asio::const_buffer, 2> bufs = {{
+                boost::asio::buffer(header, SEQ_BYTES),
+                boost::asio::buffer((const void*)(in+bytes_sent), bytes_to_send) }};
+            d_socket->send_to(bufs, d_endpoint);
+          }
+          else {
+            d_socket->send_to(boost::asio::buffer((void*)(in+bytes_sent), bytes_to_send),
+                              d_endpoint);
+          }
+        }
+        catch(std::exception& e) {
+          GR_LOG_ERROR(d_logger, boost::format("send error: %s") % e.what());
+          return -1;
         }
-        else
-          r = bytes_to_send;  // discarded for lack of connection
-        bytes_sent += r;
+        bytes_sent += bytes_to_send;
       }
+#endif /* HAVE_SENDMMSG */
 
       return noutput_items;
     }
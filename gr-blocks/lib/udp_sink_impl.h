@@ -25,6 +25,7 @@
 
 #include <gnuradio/blocks/udp_sink.h>
 #include <boost/asio.hpp>
+#include <vector>
 
 namespace gr {
   namespace blocks {
@@ -36,17 +37,26 @@ namespace gr {
 
       int    d_payload_size;    // maximum transmission unit (packet length)
       bool   d_eof;             // send zero-length packet on disconnect
+      bool   d_seq_header;      // start packets with a sequence number
       bool   d_connected;       // are we connected?
       gr::thread::mutex  d_mutex;    // protects d_socket and d_connected
 
+      size_t d_packet_bytes;    // data bytes per packet
+      uint64_t d_seq;           // sequence number of the next packet
+
+      static const int SEND_BATCH;  //!< most packets given to one sendmmsg
+      std::vector<unsigned char> d_headers;
+
       boost::asio::ip::udp::socket *d_socket;          // handle to socket
       boost::asio::ip::udp::endpoint d_endpoint;
       boost::asio::io_service d_io_service;
 
+      void put_header(unsigned char *hdr);
+
     public:
       udp_sink_impl(size_t itemsize,
                     const std::string &host, int port,
-                    int payload_size, bool eof);
+                    int payload_size, bool eof, bool seq_header);
       ~udp_sink_impl();
 
       int payload_size() { return d_payload_size; }
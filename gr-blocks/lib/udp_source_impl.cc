@@ -27,38 +27,54 @@
 #include "udp_source_impl.h"
 #include <gnuradio/io_signature.h>
 #include <gnuradio/math.h>
+#include <algorithm>
 #include <stdexcept>
 #include <errno.h>
 #include <stdio.h>
 #include <string.h>
+#ifdef HAVE_RECVMMSG
+#include <sys/socket.h>
+#include <poll.h>
+#endif
 
 namespace gr {
   namespace blocks {
 
-    const int udp_source_impl::BUF_SIZE_PAYLOADS = 50;
+    const int udp_source_impl::RING_BYTES = 4*1024*1024;
+    const int udp_source_impl::RECV_BATCH = 64;
+
+    static const int SEQ_BYTES = 8;
 
     udp_source::sptr
     udp_source::make(size_t itemsize,
                      const std::string &ipaddr, int port,
-                     int payload_size, bool eof)
+                     int payload_size, bool eof, bool seq_header)
     {
       return gnuradio::get_initial_sptr
         (new udp_source_impl(itemsize, ipaddr, port,
-                             payload_size, eof));
+                             payload_size, eof, seq_header));
     }
 
     udp_source_impl::udp_source_impl(size_t itemsize,
                                      const std::string &host, int port,
-                                     int payload_size, bool eof)
+                                     int payload_size, bool eof, bool seq_header)
       : sync_block("udp_source",
                       io_signature::make(0, 0, 0),
                       io_signature::make(1, 1, itemsize)),
         d_itemsize(itemsize), d_payload_size(payload_size),
-        d_eof(eof), d_connected(false), d_residual(0), d_sent(0), d_offset(0)
+        d_eof(eof), d_seq_header(seq_header), d_connected(false),
+        d_head(0), d_tail(0), d_slot_offset(0), d_rx_running(false),
+        d_npartial(0), d_next_seq(0), d_seq_valid(false),
+        d_gap_key(pmt::intern("udp_gap")),
+        d_packets(0), d_lost(0), d_dropped(0), d_ovfl(0)
     {
-      // Give us some more room to play.
-      d_rxbuf = new char[4*d_payload_size];
-      d_residbuf = new char[BUF_SIZE_PAYLOADS*d_payload_size];
+      if(d_seq_header && d_payload_size <= SEQ_BYTES)
+        throw std::invalid_argument("udp_source: payload_size too small for the sequence header");
+
+      d_nslots = std::max(16, RING_BYTES/d_payload_size);
+      d_ring.resize(d_nslots*d_payload_size);
+      d_ring_len.resize(d_nslots, 0);
+      d_partial.resize(d_itemsize);
 
       connect(host, port);
     }
@@ -67,9 +83,6 @@ namespace gr {
     {
       if(d_connected)
         disconnect();
-
-      delete [] d_rxbuf;
-      delete [] d_residbuf;
     }
 
     void
@@ -101,8 +114,19 @@ namespace gr {
 
         d_socket->bind(d_endpoint);
 
+        d_rx_running = true;
+        d_ovfl = 0;
+#ifdef HAVE_RECVMMSG
+#ifdef SO_RXQ_OVFL
+        // have the kernel report the packets it dropped for lack of room
+        int one = 1;
+        setsockopt(d_socket->native_handle(), SOL_SOCKET, SO_RXQ_OVFL, &one, sizeof(one));
+#endif
+        d_udp_thread = gr::thread::thread(boost::bind(&udp_source_impl::run_recvmmsg, this));
+#else
         start_receive();
         d_udp_thread = gr::thread::thread(boost::bind(&udp_source_impl::run_io_service, this));
+#endif
         d_connected = true;
       }
     }
@@ -115,8 +139,15 @@ namespace gr {
       if(!d_connected)
         return;
 
+      {
+        gr::thread::scoped_lock guard(d_udp_mutex);
+        d_rx_running = false;
+        d_cond_space.notify_all();
+      }
+#ifndef HAVE_RECVMMSG
       d_io_service.reset();
       d_io_service.stop();
+#endif
       d_udp_thread.join();
 
       d_socket->close();
@@ -133,10 +164,58 @@ namespace gr {
       return d_socket->local_endpoint().port();
     }
 
+    uint64_t
+    udp_source_impl::packets_received() const
+    {
+      gr::thread::scoped_lock guard(d_udp_mutex);
+      return d_packets;
+    }
+
+    uint64_t
+    udp_source_impl::packets_lost() const
+    {
+      gr::thread::scoped_lock guard(d_udp_mutex);
+      return d_lost;
+    }
+
+    uint64_t
+    udp_source_impl::packets_dropped() const
+    {
+      gr::thread::scoped_lock guard(d_udp_mutex);
+      return d_dropped;
+    }
+
+    // Wait until the ring has a free slot and return how many it
+    // has, 0 once disconnect() was called. A full ring holds up the
+    // receive thread; packets then queue in the socket buffer.
+    size_t
+    udp_source_impl::wait_for_space()
+    {
+      gr::thread::scoped_lock guard(d_udp_mutex);
+      while(d_rx_running && d_head - d_tail == d_nslots)
+        d_cond_space.wait(guard);
+      return d_rx_running ? d_nslots - (size_t)(d_head - d_tail) : 0;
+    }
+
+    // Hand npackets slots filled at d_head over to work()
+    void
+    udp_source_impl::commit(int npackets, uint64_t ndropped)
+    {
+      gr::thread::scoped_lock guard(d_udp_mutex);
+      d_head += npackets;
+      d_packets += npackets;
+      d_dropped += ndropped;
+      d_cond_wait.notify_one();
+    }
+
     void
     udp_source_impl::start_receive()
     {
-      d_socket->async_receive_from(boost::asio::buffer((void*)d_rxbuf, d_payload_size), d_endpoint_rcvd,
+      if(wait_for_space() == 0)
+        return;
+
+      char *slot = &d_ring[(d_head % d_nslots)*d_payload_size];
+      d_socket->async_receive_from(boost::asio::buffer((void*)slot, d_payload_size), d_endpoint_rcvd,
                                    boost::bind(&udp_source_impl::handle_read, this,
                                                boost::asio::placeholders::error,
                                                boost::asio::placeholders::bytes_transferred));
@@ -147,34 +226,75 @@ namespace gr {
                                  size_t bytes_transferred)
     {
       if(!error) {
-        {
-          boost::lock_guard<gr::thread::mutex> lock(d_udp_mutex);
-          if(d_eof && (bytes_transferred == 1) && (d_rxbuf[0] == 0x00)) {
-            // If we are using EOF notification, test for it and don't
-            // add anything to the output.
-            d_residual = WORK_DONE;
-            d_cond_wait.notify_one();
-            return;
-          }
-          else {
-            // Make sure we never go beyond the boundary of the
-            // residual buffer.  This will just drop the last bit of
-            // data in the buffer if we've run out of room.
-            if((int)(d_residual + bytes_transferred) >= (BUF_SIZE_PAYLOADS*d_payload_size)) {
-              GR_LOG_WARN(d_logger, "Too much data; dropping packet.");
-            }
-            else {
-              // otherwise, copy received data into local buffer for
-              // copying later.
-              memcpy(d_residbuf+d_residual, d_rxbuf, bytes_transferred);
-              d_residual += bytes_transferred;
-            }
+        d_ring_len[d_head % d_nslots] = (int)bytes_transferred;
+        commit(1, 0);
+      }
+      start_receive();
+    }
+
+#ifdef HAVE_RECVMMSG
+    void
+    udp_source_impl::run_recvmmsg()
+    {
+      const int fd = d_socket->native_handle();
+      std::vector<struct mmsghdr> msgs(RECV_BATCH);
+      std::vector<struct iovec> iovs(RECV_BATCH);
+#ifdef SO_RXQ_OVFL
+      const size_t cmsg_size = CMSG_SPACE(sizeof(uint32_t));
+      std::vector<char> cmsgs(RECV_BATCH*cmsg_size);
+#endif
+
+      while(true) {
+        const size_t nfree = wait_for_space();
+        if(nfree == 0)
+          return;
+
+        // poll with a timeout so that disconnect() gets through
+        struct pollfd pfd;
+        pfd.fd = fd;
+        pfd.events = POLLIN;
+        pfd.revents = 0;
+        if(poll(&pfd, 1, 100) <= 0)
+          continue;
+
+        // receive into the free slots up to the end of the ring
+        const size_t first = d_head % d_nslots;
+        const int n = (int)std::min(std::min(nfree, d_nslots - first), (size_t)RECV_BATCH);
+        memset(&msgs[0], 0, n*sizeof(struct mmsghdr));
+        for(int i = 0; i < n; i++) {
+          iovs[i].iov_base = &d_ring[(first + i)*d_payload_size];
+          iovs[i].iov_len = d_payload_size;
+          msgs[i].msg_hdr.msg_iov = &iovs[i];
+          msgs[i].msg_hdr.msg_iovlen = 1;
+#ifdef SO_RXQ_OVFL
+          msgs[i].msg_hdr.msg_control = &cmsgs[i*cmsg_size];
+          msgs[i].msg_hdr.msg_controllen = cmsg_size;
+#endif
+        }
+
+        int r = recvmmsg(fd, &msgs[0], n, MSG_DONTWAIT, NULL);
+        if(r < 0) {
+          if(errno != EAGAIN && errno != EWOULDBLOCK && errno != EINTR)
+            GR_LOG_ERROR(d_logger, boost::format("recvmmsg error: %s") % strerror(errno));
+          continue;
+        }
+
+        uint32_t ovfl = d_ovfl;
+        for(int i = 0; i < r; i++) {
+          d_ring_len[first + i] = (int)msgs[i].msg_len;
+#ifdef SO_RXQ_OVFL
+          struct msghdr *hdr = &msgs[i].msg_hdr;
+          for(struct cmsghdr *c = CMSG_FIRSTHDR(hdr); c != NULL; c = CMSG_NXTHDR(hdr, c)) {
+            if(c->cmsg_level == SOL_SOCKET && c->cmsg_type == SO_RXQ_OVFL)
+              memcpy(&ovfl, CMSG_DATA(c), sizeof(ovfl));
           }
-          d_cond_wait.notify_one();
+#endif
         }
+        commit(r, (uint32_t)(ovfl - d_ovfl));
+        d_ovfl = ovfl;
       }
-      start_receive();
     }
+#endif /* HAVE_RECVMMSG */
 
     int
     udp_source_impl::work(int noutput_items,
@@ -184,38 +304,118 @@ namespace gr {
       gr::thread::scoped_lock l(d_setlock);
 
       char *out = (char*)output_items[0];
+      const size_t nwanted = noutput_items*d_itemsize;
+
+      // The receive thread fills the ring and signals d_cond_wait;
+      // use timed_wait to avoid permanent blocking in the work function
+      uint64_t head;
+      {
+        gr::thread::scoped_lock lock(d_udp_mutex);
+        if(d_tail == d_head)
+          d_cond_wait.timed_wait(lock, boost::posix_time::milliseconds(10));
+        head = d_head;
+      }
 
-      // Use async receive_from to get data from UDP buffer and wait
-      // on a conditional signal before proceeding. We use this
-      // because the conditional wait is interruptable while a
-      // synchronous receive_from is not.
-      boost::unique_lock<boost::mutex> lock(d_udp_mutex);
-
-      //use timed_wait to avoid permanent blocking in the work function
-      d_cond_wait.timed_wait(lock, boost::posix_time::milliseconds(10));
+      // start with the bytes of an item the last call could not finish
+      size_t nbytes = d_npartial;
+      memcpy(out, &d_partial[0], d_npartial);
 
-      if (d_residual < 0) {
-        return d_residual;
-      }
+      uint64_t tail = d_tail;
+      uint64_t lost = 0;
+      bool eof = false;
+      while(tail != head && nbytes < nwanted) {
+        const char *pkt = &d_ring[(tail % d_nslots)*d_payload_size];
+        const int len = d_ring_len[tail % d_nslots];
 
-      int bytes_left_in_buffer = (int)(d_residual - d_sent);
-      int bytes_to_send        = std::min<int>(d_itemsize * noutput_items, bytes_left_in_buffer);
+        if(d_slot_offset == 0) {
+          if(d_eof && (len == 1) && (pkt[0] == 0x00)) {
+            // If we are using EOF notification, test for it and don't
+            // add anything to the output. Data before it goes out first.
+            eof = true;
+            if(nbytes < d_itemsize) {
+              tail++;
+              d_seq_valid = false;
+            }
+            break;
+          }
 
-      // Copy the received data in the residual buffer to the output stream
-      memcpy(out, d_residbuf+d_sent, bytes_to_send);
-      int nitems = bytes_to_send/d_itemsize;
+          if(d_seq_header) {
+            if(len < SEQ_BYTES) {
+              tail++;
+              continue;
+            }
+            uint64_t seq = 0;
+            for(int i = 0; i < SEQ_BYTES; i++)
+              seq = (seq << 8) | (unsigned char)pkt[i];
+            if(d_seq_valid && seq != d_next_seq) {
+              if(seq > d_next_seq)
+                lost += seq - d_next_seq;
+              add_item_tag(0, nitems_written(0) + nbytes/d_itemsize, d_gap_key,
+                           pmt::make_tuple(pmt::from_uint64(d_next_seq),
+                                           pmt::from_uint64(seq)));
+            }
+            d_next_seq = seq + 1;
+            d_seq_valid = true;
+            d_slot_offset = SEQ_BYTES;
+          }
+        }
 
-      // Keep track of where we are if we don't have enough output
-      // space to send all the data in the residbuf.
-      if (bytes_to_send == bytes_left_in_buffer) {
-        d_residual = 0;
-        d_sent = 0;
+        // Copy the received data straight from the ring to the output
+        const size_t n = std::min((size_t)len - d_slot_offset, nwanted - nbytes);
+        memcpy(out + nbytes, pkt + d_slot_offset, n);
+        nbytes += n;
+        d_slot_offset += n;
+        if(d_slot_offset == (size_t)len) {
+          tail++;
+          d_slot_offset = 0;
+        }
       }
-      else {
-        d_sent += bytes_to_send;
+
+      {
+        gr::thread::scoped_lock lock(d_udp_mutex);
+        d_tail = tail;
+        d_lost += lost;
+        d_cond_space.notify_one();
       }
 
-      return nitems;
+      if(eof && nbytes < d_itemsize)
+        return WORK_DONE;
+
+      // Keep the bytes of an item split across packets for next time
+      d_npartial = nbytes % d_itemsize;
+      memcpy(&d_partial[0], out + nbytes - d_npartial, d_npartial);
+
+      return nbytes/d_itemsize;
+    }
+
+    void
+    udp_source_impl::setup_rpc()
+    {
+#ifdef GR_CTRLPORT
+      add_rpc_variable(
+        rpcbasic_sptr(new rpcbasic_register_get<udp_source, uint64_t>(
+          alias(), "packets_received",
+          &udp_source::packets_received,
+          pmt::mp(0), pmt::mp(1000000), pmt::mp(0),
+          "packets", "Packets received",
+          RPC_PRIVLVL_MIN, DISPTIME | DISPOPTSTRIP)));
+
+      add_rpc_variable(
+        rpcbasic_sptr(new rpcbasic_register_get<udp_source, uint64_t>(
+          alias(), "packets_lost",
+          &udp_source::packets_lost,
+          pmt::mp(0), pmt::mp(1000), pmt::mp(0),
+          "packets", "Packets missing from the sequence numbers",
+          RPC_PRIVLVL_MIN, DISPTIME | DISPOPTSTRIP)));
+
+      add_rpc_variable(
+        rpcbasic_sptr(new rpcbasic_register_get<udp_source, uint64_t>(
+          alias(), "packets_dropped",
+          &udp_source::packets_dropped,
+          pmt::mp(0), pmt::mp(1000), pmt::mp(0),
+          "packets", "Packets dropped by the kernel",
+          RPC_PRIVLVL_MIN, DISPTIME | DISPOPTSTRIP)));
+#endif /* GR_CTRLPORT */
     }
 
   } /* namespace blocks */
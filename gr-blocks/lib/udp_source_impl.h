@@ -27,6 +27,7 @@
 #include <boost/asio.hpp>
 #include <boost/format.hpp>
 #include <gnuradio/thread/thread.h>
+#include <vector>
 
 namespace gr {
   namespace blocks {
@@ -37,14 +38,34 @@ namespace gr {
       size_t  d_itemsize;
       int     d_payload_size; // maximum transmission unit (packet length)
       bool    d_eof;          // look for an EOF signal
+      bool    d_seq_header;   // packets start with a sequence number
       bool    d_connected;    // are we connected?
-      char   *d_rxbuf;        // get UDP buffer items
-      char   *d_residbuf;     // hold buffer between calls
-      ssize_t d_residual;     // hold information about number of bytes stored in residbuf
-      ssize_t d_sent;         // track how much of d_residbuf we've outputted
-      size_t  d_offset;       // point to residbuf location offset
 
-      static const int BUF_SIZE_PAYLOADS; //!< The d_residbuf size in multiples of d_payload_size
+      // Packets are received straight into a ring of d_nslots slots
+      // of d_payload_size bytes. The receive thread fills slots at
+      // d_head, work() empties them at d_tail; d_udp_mutex is only
+      // held to move the indices, never while copying.
+      static const int RING_BYTES;  //!< upper bound on the ring size
+      static const int RECV_BATCH;  //!< most packets taken per recvmmsg
+      size_t  d_nslots;
+      std::vector<char> d_ring;     // packet payloads
+      std::vector<int> d_ring_len;  // packet lengths
+      uint64_t d_head;              // next slot to receive into
+      uint64_t d_tail;              // next slot to read from
+      size_t  d_slot_offset;        // bytes already read from d_tail
+      bool    d_rx_running;         // receive thread keeps going
+
+      std::vector<char> d_partial;  // bytes of an item split by work()
+      size_t  d_npartial;
+
+      uint64_t d_next_seq;          // sequence number expected next
+      bool    d_seq_valid;          // d_next_seq is known
+      pmt::pmt_t d_gap_key;
+
+      uint64_t d_packets;
+      uint64_t d_lost;
+      uint64_t d_dropped;
+      uint32_t d_ovfl;              // drops the socket reported so far
 
       std::string d_host;
       unsigned short d_port;
@@ -54,19 +75,26 @@ namespace gr {
       boost::asio::ip::udp::endpoint d_endpoint_rcvd;
       boost::asio::io_service d_io_service;
 
-      gr::thread::condition_variable d_cond_wait;
-      gr::thread::mutex d_udp_mutex;
+      gr::thread::condition_variable d_cond_wait;   // a packet came in
+      gr::thread::condition_variable d_cond_space;  // a slot was freed
+      mutable gr::thread::mutex d_udp_mutex;
       gr::thread::thread d_udp_thread;
 
+      size_t wait_for_space();
+      void commit(int npackets, uint64_t ndropped);
+
       void start_receive();
       void handle_read(const boost::system::error_code& error,
                        size_t bytes_transferred);
       void run_io_service() { d_io_service.run(); }
+#ifdef HAVE_RECVMMSG
+      void run_recvmmsg();
+#endif
 
     public:
       udp_source_impl(size_t itemsize,
                       const std::string &host, int port,
-                      int payload_size, bool eof);
+                      int payload_size, bool eof, bool seq_header);
       ~udp_source_impl();
 
       void connect(const std::string &host, int port);
@@ -75,6 +103,12 @@ namespace gr {
       int payload_size() { return d_payload_size; }
       int get_port();
 
+      uint64_t packets_received() const;
+      uint64_t packets_lost() const;
+      uint64_t packets_dropped() const;
+
+      void setup_rpc();
+
       int work(int noutput_items,
                gr_vector_const_void_star &input_items,
                gr_vector_void_star &output_items);
@@ -21,6 +21,11 @@
 #
 
 import sys
+import os
+import math
+import json
+import bisect
+import numpy
 from gnuradio import gr, blocks
 import pmt
 
@@ -180,3 +185,292 @@ def parse_extra_dict(p, info, VERBOSE=False):
             print "{0}: {1}".format(key, val)
 
     return info
+
+ftype_to_dtype = {blocks.GR_FILE_BYTE: numpy.int8,
+                  blocks.GR_FILE_SHORT: numpy.int16,
+                  blocks.GR_FILE_INT: numpy.int32,
+                  blocks.GR_FILE_LONG: numpy.int32,
+                  blocks.GR_FILE_LONG_LONG: numpy.int64,
+                  blocks.GR_FILE_FLOAT: numpy.float32,
+                  blocks.GR_FILE_DOUBLE: numpy.float64}
+
+def segment_dtype(ftype, cplx, itemsize):
+    """
+    Get the numpy dtype of one item of a segment.
+
+    Complex floats map to numpy complex types, complex integers to pairs
+    of integers. Items larger than that are treated as vectors.
+    """
+    base = numpy.dtype(ftype_to_dtype[ftype])
+    if cplx and base.kind == 'f':
+        base = numpy.dtype('c%d'%(2*base.itemsize))
+    elif cplx:
+        base = numpy.dtype((base, 2))
+    if itemsize > base.itemsize:
+        return numpy.dtype((base, itemsize // base.itemsize))
+    return base
+
+def split_time(t):
+    """
+    Split a time into (integer seconds, fractional seconds in [0, 1)).
+
+    The time is either in seconds or a (full seconds, fractional
+    seconds) pair like rx_time. At epoch scale a single float only
+    resolves about 0.2 us, so use the pair to locate samples exactly.
+    """
+    if isinstance(t, (tuple, list)):
+        secs, fracs = t
+    else:
+        secs, fracs = 0, t
+    whole = math.floor(fracs)
+    return (long(secs) + long(whole), float(fracs - whole))
+
+def _ceil_items(x):
+    # offsets a rounding error away from a whole item are that item
+    n = round(x)
+    if abs(x - n) < 1e-6:
+        return int(n)
+    return int(math.ceil(x))
+
+class file_meta_segment(object):
+    """
+    One segment of a metadata file: a header and the data it describes.
+
+    The start time is kept as integer and fractional seconds, rx_time is
+    the same time as a float for display.
+    """
+
+    def __init__(self, index, hdr_offset, extra_len, data_offset, nbytes,
+                 secs, fracs, rx_rate, size, ftype, cplx):
+        self.index = index
+        self.hdr_offset = hdr_offset
+        self.extra_len = extra_len
+        self.data_offset = data_offset
+        self.nbytes = nbytes
+        self.rx_time_secs = secs
+        self.rx_time_fracs = fracs
+        self.rx_time = secs + fracs
+        self.rx_rate = rx_rate
+        self.size = size
+        self.ftype = ftype
+        self.type = ftype_to_string[ftype]
+        self.cplx = cplx
+        self.nitems = nbytes // size
+        self.dtype = segment_dtype(ftype, cplx, size)
+
+    def start_time(self):
+        """Time of the first item as (secs, fracs)."""
+        return (self.rx_time_secs, self.rx_time_fracs)
+
+    def item_time(self, n):
+        """Time of item n of the segment as (secs, fracs)."""
+        return split_time((self.rx_time_secs, self.rx_time_fracs + n/self.rx_rate))
+
+    def end_time(self):
+        """Time just past the last item of the segment as (secs, fracs)."""
+        return self.item_time(self.nitems)
+
+    def offset(self, t):
+        """
+        Position of time t in the segment, in items (a float).
+        """
+        secs, fracs = split_time(t)
+        return ((secs - self.rx_time_secs) + (fracs - self.rx_time_fracs))*self.rx_rate
+
+    def to_list(self):
+        return [self.hdr_offset, self.extra_len, self.data_offset, self.nbytes,
+                self.rx_time_secs, self.rx_time_fracs, self.rx_rate,
+                self.size, self.ftype, self.cplx]
+
+    def __repr__(self):
+        return "<file_meta_segment %d: %d %s items at %.6f>"%(
+            self.index, self.nitems, self.type, self.rx_time)
+
+class file_meta_reader(object):
+    """
+    Indexed, memory mapped reader for files written by file_meta_sink.
+
+    The headers are walked once to build an index of the segments, which
+    is cached next to the data file (filename + '.idx') and reused as
+    long as the data and header files are unchanged. The data of each
+    segment is returned as a read-only numpy.memmap, so no samples are
+    read until they are used.
+    """
+
+    INDEX_VERSION = 1
+
+    def __init__(self, filename, detached=False, hdr_filename=None, use_cache=True):
+        """
+        Args:
+            filename: the data file
+            detached: True if the headers are stored in a separate file
+            hdr_filename: the header file, defaults to filename + '.hdr'
+            use_cache: read and write the index sidecar file
+        """
+        self._filename = filename
+        self._detached = detached
+        if not detached:
+            self._hdr_filename = filename
+        elif hdr_filename is None:
+            self._hdr_filename = filename + ".hdr"
+        else:
+            self._hdr_filename = hdr_filename
+        self._index_filename = filename + ".idx"
+        self._extras = dict()
+
+        segments = None
+        if use_cache:
+            segments = self._load_index()
+        if segments is None:
+            segments = self._build_index()
+            if use_cache:
+                self._save_index(segments)
+        self._segments = [file_meta_segment(i, *s) for i, s in enumerate(segments)]
+
+        self._by_time = sorted(self._segments, key=lambda s: s.start_time())
+        self._start_times = [s.start_time() for s in self._by_time]
+
+    def _file_stamp(self):
+        stamp = list()
+        for name in set((self._filename, self._hdr_filename)):
+            st = os.stat(name)
+            stamp.append([name, st.st_size, st.st_mtime])
+        return sorted(stamp)
+
+    def _load_index(self):
+        try:
+            with open(self._index_filename, "r") as f:
+                index = json.load(f)
+        except (IOError, ValueError):
+            return None
+        if index.get("version") != self.INDEX_VERSION or \
+           index.get("detached") != self._detached or \
+           index.get("files") != self._file_stamp():
+            return None
+        return index["segments"]
+
+    def _save_index(self, segments):
+        index = {"version": self.INDEX_VERSION,
+                 "detached": self._detached,
+                 "files": self._file_stamp(),
+                 "segments": segments}
+        try:
+            with open(self._index_filename, "w") as f:
+                json.dump(index, f)
+        except IOError:
+            pass # read-only location, just don't cache
+
+    def _build_index(self):
+        """
+        Walk the headers once, returns a list of segment descriptions.
+        """
+        segments = list()
+        data_size = os.path.getsize(self._filename)
+        hdr_size = os.path.getsize(self._hdr_filename)
+        data_offset = 0
+        hdr_offset = 0
+        with open(self._hdr_filename, "rb") as handle:
+            while hdr_offset + HEADER_LENGTH <= hdr_size:
+                handle.seek(hdr_offset)
+                try:
+                    header = pmt.to_python(pmt.deserialize_str(handle.read(HEADER_LENGTH)))
+                    secs, fracs = header["rx_time"]
+                    hdr_len = header["strt"]
+                    size = header["size"]
+                    nbytes = header["bytes"]
+                    segment = [hdr_offset, hdr_len - HEADER_LENGTH, 0, nbytes,
+                               long(secs), float(fracs), float(header["rx_rate"]),
+                               size, header["type"], bool(header["cplx"])]
+                except (RuntimeError, ValueError, KeyError, TypeError):
+                    raise ValueError("Could not parse header at offset %d of %s: "
+                                     "invalid or corrupt data file"%(hdr_offset, self._hdr_filename))
+
+                if self._detached:
+                    hdr_offset += hdr_len
+                else:
+                    data_offset = hdr_offset + hdr_len
+                    hdr_offset = data_offset + nbytes
+
+                # a segment cut short by an interrupted recording
+                available = max(0, data_size - data_offset)
+                segment[2] = data_offset
+                segment[3] = min(nbytes, available - available % size)
+                segments.append(segment)
+
+                if self._detached:
+                    data_offset += nbytes
+        return segments
+
+    def segments(self):
+        """Get the segments in file order."""
+        return list(self._segments)
+
+    def __len__(self):
+        return len(self._segments)
+
+    def __getitem__(self, i):
+        return self._segments[i]
+
+    def nitems(self):
+        return sum(s.nitems for s in self._segments)
+
+    def extras(self, segment):
+        """
+        Get the extra dictionary of a segment as {key: PMT}.
+        """
+        if segment.index not in self._extras:
+            info = dict()
+            if segment.extra_len > 0:
+                with open(self._hdr_filename, "rb") as handle:
+                    handle.seek(segment.hdr_offset + HEADER_LENGTH)
+                    extra = pmt.deserialize_str(handle.read(segment.extra_len))
+                info = parse_extra_dict(extra, info)
+            self._extras[segment.index] = info
+        return self._extras[segment.index]
+
+    def data(self, segment):
+        """
+        Get the items of a segment as a read-only memory map.
+        """
+        if not segment.nitems:
+            return numpy.zeros(0, segment.dtype)
+        return numpy.memmap(self._filename, dtype=segment.dtype, mode="r",
+                            offset=segment.data_offset, shape=(segment.nitems,))
+
+    def find(self, start, stop):
+        """
+        Get the segments holding items with rx_time in [start, stop).
+
+        The times are in seconds or (secs, fracs) pairs, see split_time().
+        """
+        start, stop = split_time(start), split_time(stop)
+        i = max(0, bisect.bisect_right(self._start_times, start) - 1)
+        found = list()
+        for segment in self._by_time[i:]:
+            if segment.start_time() >= stop:
+                break
+            if segment.end_time() > start:
+                found.append(segment)
+        return found
+
+    def read(self, start, stop):
+        """
+        Get the items with rx_time in [start, stop).
+
+        The times are in seconds or (secs, fracs) pairs, see split_time().
+        Item positions are computed relative to the integer seconds of
+        each segment, so they stay exact at epoch times and high rates
+        when the times are given as pairs.
+
+        Returns:
+            list of ((secs, fracs) of first item, memory mapped items) per segment
+        """
+        chunks = list()
+        for segment in self.find(start, stop):
+            first = max(0, _ceil_items(segment.offset(start)))
+            last = min(segment.nitems, _ceil_items(segment.offset(stop)))
+            if last <= first:
+                continue
+            chunks.append((segment.item_time(first),
+                           self.data(segment)[first:last]))
+        return chunks
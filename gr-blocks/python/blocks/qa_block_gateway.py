@@ -24,6 +24,8 @@ import numpy
 import pmt
 
 from gnuradio import gr, gr_unittest, blocks
+from gnuradio.gr.gateway import ndarray_view_cache, ndarray_view_maker
+from gnuradio.gr import gateway_profile
 
 class add_2_f32_1_f32(gr.sync_block):
     def __init__(self):
@@ -194,6 +196,21 @@ class vector_to_stream(gr.interp_block):
 
         return len(output_items[0])
 
+class cached_copy_f32(gr.sync_block):
+    def __init__(self, min_items):
+        gr.sync_block.__init__(
+            self,
+            name = "cached copy f32",
+            in_sig = [numpy.float32],
+            out_sig = [numpy.float32],
+        )
+        self.set_view_cache(True)
+        self.set_min_noutput_items(min_items)
+
+    def work(self, input_items, output_items):
+        output_items[0][:] = input_items[0]
+        return len(output_items[0])
+
 class test_block_gateway(gr_unittest.TestCase):
 
     def test_add_f32(self):
@@ -275,5 +292,87 @@ class test_block_gateway(gr_unittest.TestCase):
         tb.run()
         self.assertEqual(sink.data(), (1, 2, 3, 4, 5, 6, 7, 8, 9, 10))
 
+    def test_view_cache(self):
+        tb = gr.top_block()
+        data = numpy.arange(100000, dtype=numpy.float32)
+        src = blocks.vector_source_f(data.tolist(), False)
+        cp = cached_copy_f32(256)
+        sink = blocks.vector_sink_f()
+        tb.connect(src, cp, sink)
+        tb.run()
+        self.assertTrue(cp.view_cache())
+        self.assertEqual(cp.min_noutput_items(), 256)
+        self.assertFloatTuplesAlmostEqual(sink.data(), data.tolist())
+
+    def test_view_cache(self):
+        buf = numpy.arange(4*1024, dtype=numpy.float32)
+        addrs = [buf.ctypes.data + 4*1024*i for i in range(4)]
+        dtype = numpy.dtype(numpy.float32)
+        cached = ndarray_view_cache(dtype, max_views=4)
+        uncached = ndarray_view_maker(dtype)
+
+        # both views see the buffer
+        for view in (cached, uncached):
+            self.assertTrue((view(addrs[1], 1024) == buf[1024:2048]).all())
+            self.assertTrue((view(addrs[1], 10) == buf[1024:1034]).all())
+
+        # the scheduler hands out the same few addresses, their views are reused
+        views = [cached(addr, 1024) for addr in addrs]
+        for i in range(8):
+            self.assertTrue(cached(addrs[i % 4], 1024) is views[i % 4])
+        self.assertTrue((cached(addrs[2], 100) == buf[2048:2148]).all())
+        self.assertTrue(cached(addrs[2], 1024) is views[2])
+        self.assertFalse(uncached(addrs[2], 1024) is uncached(addrs[2], 1024))
+
+        # asking for more items than a view covers makes a new one
+        bigger = cached(addrs[2], 2048)
+        self.assertFalse(bigger is views[2])
+        self.assertTrue(cached(addrs[2], 2048) is bigger)
+
+        # a new address past max_views starts over
+        cached(addrs[0] + 4, 10)
+        self.assertFalse(cached(addrs[1], 1024) is views[1])
+
+    def test_profiling(self):
+        tb = gr.top_block()
+        src = blocks.vector_source_f(range(10000), False)
+        cp = cached_copy_f32(1)
+        cp.set_profiling(True)
+        sink = blocks.vector_sink_f()
+        tb.connect(src, cp, sink)
+        tb.run()
+        profile = cp.profile()
+        work = profile['actions']['work']
+        self.assertTrue(work['calls'] > 0)
+        self.assertEqual(work['errors'], 0)
+        self.assertEqual(profile['items'], 10000)
+        self.assertEqual(sum(b[2] for b in profile['items_per_call']), work['calls'])
+        self.assertTrue(profile['name'] in gr.gateway_profiles())
+        cp.set_profiling(False)
+        self.assertEqual(cp.profile(), None)
+
+    def test_profiling_errors(self):
+        class gateway(object):
+            def reset_dispatch_timing(self): pass
+            def dispatch_wall_time(self, action): return 0.0
+            def dispatch_cpu_time(self, action): return 0.0
+        class message(object):
+            action = dict((name, action) for action, name in gateway_profile.ACTIONS)['work']
+        profile = gateway_profile.gateway_profile('qa', gateway())
+        msg = message()
+        # the items produced are counted, a failed call counts as an error
+        for produced in (16, 100, -1):
+            msg.work_args_return_value = produced
+            profile.record(msg, 0.0, False)
+        msg.work_args_return_value = 1000
+        profile.record(msg, 0.0, True)
+        snapshot = profile.snapshot()
+        self.assertEqual(4, snapshot['actions']['work']['calls'])
+        self.assertEqual(1, snapshot['actions']['work']['errors'])
+        self.assertEqual(116, snapshot['items'])
+        self.assertEqual([(16, 31, 1), (64, 127, 1)], snapshot['items_per_call'])
+        profile.reset()
+        self.assertEqual({}, profile.snapshot()['actions'])
+
 if __name__ == '__main__':
     gr_unittest.run(test_block_gateway, "test_block_gateway.xml")
@@ -21,6 +21,7 @@
 #
 
 import os, math
+import numpy
 
 from gnuradio import gr, gr_unittest, blocks
 import pmt
@@ -202,5 +203,85 @@ class test_file_metadata(gr_unittest.TestCase):
 	os.remove(outfile)
 	os.remove(outfile_hdr)
 
+    def test_003_reader(self):
+        N = 1000
+        outfile = "test_out_reader.dat"
+
+        samp_rate = 200000
+        extras = pmt.make_dict()
+        extras = pmt.dict_add(extras, pmt.intern("samp_rate"), pmt.from_double(samp_rate))
+        extras_str = pmt.serialize_str(extras)
+
+        data = sig_source_c(samp_rate, 1000, 1, N)
+        src  = blocks.vector_source_c(data)
+        fsnk = blocks.file_meta_sink(gr.sizeof_gr_complex, outfile,
+                                     samp_rate, 1,
+                                     blocks.GR_FILE_FLOAT, True,
+                                     300, extras_str, False)
+        fsnk.set_unbuffered(True)
+        self.tb.connect(src, fsnk)
+        self.tb.run()
+        fsnk.close()
+
+        for use_cache in (True, True, False):
+            reader = parse_file_metadata.file_meta_reader(outfile, use_cache=use_cache)
+            self.assertEqual(len(reader), 4)
+            self.assertEqual(reader.nitems(), N)
+            self.assertTrue(os.path.exists(outfile + ".idx"))
+
+            read_data = numpy.concatenate([reader.data(s) for s in reader.segments()])
+            self.assertComplexTuplesAlmostEqual(read_data, data, 5)
+            self.assertEqual(pmt.to_double(reader.extras(reader[1])["samp_rate"]), samp_rate)
+
+            t0 = reader[1].rx_time
+            chunks = reader.read(t0 + 9.5/samp_rate, t0 + 399.5/samp_rate)
+            self.assertEqual([len(c[1]) for c in chunks], [290, 100])
+            self.assertComplexTuplesAlmostEqual(chunks[1][1], data[600:700], 5)
+
+        os.remove(outfile)
+        os.remove(outfile + ".idx")
+
+    def test_004_reader_epoch_time(self):
+        N = 10000
+        outfile = "test_out_reader_epoch.dat"
+
+        # at an epoch rx_time and 10 MHz a float time is off by samples
+        samp_rate = 10e6
+        secs, fracs = 1400000000, 0.25
+        tag = gr.tag_t()
+        tag.offset = 0
+        tag.key = pmt.intern("rx_time")
+        tag.value = pmt.make_tuple(pmt.from_uint64(secs), pmt.from_double(fracs))
+
+        data = [float(i) for i in xrange(N)]
+        src  = blocks.vector_source_f(data, False, 1, (tag,))
+        fsnk = blocks.file_meta_sink(gr.sizeof_float, outfile,
+                                     samp_rate, 1,
+                                     blocks.GR_FILE_FLOAT, False,
+                                     3000, pmt.serialize_str(pmt.make_dict()), False)
+        fsnk.set_unbuffered(True)
+        self.tb.connect(src, fsnk)
+        self.tb.run()
+        fsnk.close()
+
+        reader = parse_file_metadata.file_meta_reader(outfile, use_cache=False)
+        self.assertEqual(len(reader), 4)
+        self.assertEqual(reader[0].start_time(), (secs, fracs))
+
+        chunks = reader.read((secs, fracs + 4000.5/samp_rate),
+                             (secs, fracs + 7000.5/samp_rate))
+        self.assertEqual([len(c[1]) for c in chunks], [1999, 1001])
+        self.assertEqual(list(numpy.concatenate([c[1] for c in chunks])), data[4001:7001])
+        self.assertEqual(chunks[0][0][0], secs)
+        self.assertAlmostEqual(chunks[0][0][1], fracs + 4001/samp_rate, 12)
+
+        # a time on a sample starts at that sample
+        chunks = reader.read((secs, fracs + 3000/samp_rate), (secs, fracs + 3010/samp_rate))
+        self.assertEqual(list(chunks[0][1]), data[3000:3010])
+        self.assertEqual([reader[2]], reader.find((secs, fracs + 6000.5/samp_rate),
+                                                  (secs, fracs + 6001/samp_rate)))
+
+        os.remove(outfile)
+
 if __name__ == '__main__':
     gr_unittest.run(test_file_metadata, "test_file_metadata.xml")
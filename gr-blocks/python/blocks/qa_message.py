@@ -144,6 +144,22 @@ class test_message(gr_unittest.TestCase):
         rec_msg = snk.get_message(0)
         self.assertTrue(pmt.eqv(rec_msg, msg))
 
+    def test_debug_402(self):
+        # messages posted to a block that is not running wait in its
+        # queue and are counted
+        snk = blocks.message_debug()
+        port = pmt.intern("store")
+        self.assertEqual(0, snk.msg_queue_limit(port))
+        snk.set_msg_queue_limit(port, 16)
+        self.assertEqual(16, snk.msg_queue_limit(port))
+        snk.set_msg_queue_limit(port, 0)
+
+        for i in range(10):
+            snk._post(port, pmt.from_long(i))
+        self.assertEqual(10, snk.nmsgs_queued(port))
+        self.assertEqual(10, snk.nmsgs_high_water(port))
+        self.assertEqual(0, snk.nmsgs_dropped(port))
+
 
 if __name__ == '__main__':
     gr_unittest.run(test_message, "test_message.xml")
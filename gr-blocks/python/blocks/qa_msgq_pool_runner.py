@@ -0,0 +1,166 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+import time
+
+from gnuradio import gr, gr_unittest
+from gnuradio.gru import msgq_pool_runner
+
+def wait_for(cond, timeout=5.0):
+    deadline = time.time() + timeout
+    while not cond() and time.time() < deadline:
+        time.sleep(0.01)
+    return cond()
+
+class test_msgq_pool_runner(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.runner = None
+
+    def tearDown(self):
+        if self.runner is not None:
+            self.runner.stop(timeout=5.0)
+        self.runner = None
+
+    def fill(self, msgq, n):
+        for i in range(n):
+            msgq.insert_tail(gr.message_from_string(str(i)))
+
+    def test_001_ordered(self):
+        self.runner = msgq_pool_runner(nthreads=4, max_pending=4)
+        qs = [gr.msg_queue(), gr.msg_queue()]
+        got = [list(), list()]
+        for q, g in zip(qs, got):
+            self.runner.add(q, lambda msg, g=g: g.append(msg.to_string()))
+        for q in qs:
+            self.fill(q, 100)
+        self.assertTrue(wait_for(lambda: len(got[0]) == 100 and len(got[1]) == 100))
+        expected = [str(i) for i in range(100)]
+        self.assertEqual(got[0], expected)
+        self.assertEqual(got[1], expected)
+        for stats in self.runner.stats():
+            self.assertEqual(stats['received'], 100)
+            self.assertEqual(stats['handled'], 100)
+            self.assertEqual(stats['errors'], 0)
+
+    def test_002_batch(self):
+        self.runner = msgq_pool_runner(nthreads=2, max_pending=8)
+        q = gr.msg_queue()
+        batches = list()
+        def handler(msgs):
+            batches.append([msg.to_string() for msg in msgs])
+            time.sleep(0.001)
+        self.runner.add(q, handler, batch=True)
+        self.fill(q, 200)
+        self.assertTrue(wait_for(lambda: sum(len(b) for b in batches) == 200))
+        self.assertTrue(all(0 < len(b) <= 8 for b in batches))
+        self.assertEqual(sum(batches, []), [str(i) for i in range(200)])
+
+    def test_003_unordered(self):
+        self.runner = msgq_pool_runner(nthreads=4, ordered=False)
+        q = gr.msg_queue()
+        got = list()
+        self.runner.add(q, lambda msg: got.append(msg.to_string()))
+        self.fill(q, 100)
+        self.assertTrue(wait_for(lambda: len(got) == 100))
+        self.assertEqual(sorted(got, key=int), [str(i) for i in range(100)])
+
+    def test_004_stop(self):
+        runner = msgq_pool_runner(nthreads=2, poll_interval=0.05)
+        q = gr.msg_queue()
+        got = list()
+        runner.add(q, lambda msg: got.append(msg.to_string()))
+        self.fill(q, 10)
+        self.assertTrue(wait_for(lambda: len(got) == 10))
+        self.assertTrue(runner.running())
+        # the workers wait in the empty queue, stop() still returns promptly
+        start = time.time()
+        self.assertTrue(runner.stop(timeout=2.0))
+        self.assertTrue(time.time() - start < 1.0)
+        self.assertFalse(runner.running())
+        self.assertRaises(RuntimeError, runner.add, gr.msg_queue(), None)
+
+        # messages queued after stop() are left alone
+        self.fill(q, 3)
+        time.sleep(0.1)
+        self.assertEqual(3, q.count())
+
+    def test_005_exit_message(self):
+        self.runner = msgq_pool_runner(nthreads=1)
+        q = gr.msg_queue()
+        got = list()
+        self.runner.add(q, lambda msg: got.append(msg.to_string()))
+        self.fill(q, 5)
+        q.insert_tail(gr.message(1))
+        self.fill(q, 5)
+        self.assertTrue(wait_for(lambda: len(got) == 5))
+        time.sleep(0.1)
+        self.assertEqual(got, [str(i) for i in range(5)])
+        self.assertEqual([], self.runner.stats())
+        self.assertEqual(5, q.count())
+
+    def test_006_errors(self):
+        self.runner = msgq_pool_runner(nthreads=1)
+        q0, q1 = gr.msg_queue(), gr.msg_queue()
+        def fail(msg):
+            raise ValueError(msg.to_string())
+        self.runner.add(q0, fail)
+        self.runner.add(q1, fail, exit_on_error=True)
+        self.fill(q0, 3)
+        self.fill(q1, 3)
+        self.assertTrue(wait_for(lambda: self.runner.exit_error(q1) is not None))
+        self.assertTrue(isinstance(self.runner.exit_error(q1), ValueError))
+        self.assertTrue(wait_for(lambda: self.runner.stats()[0]['handled'] == 3))
+        stats = self.runner.stats()
+        self.assertEqual(1, len(stats))
+        self.assertEqual(3, stats[0]['errors'])
+        self.assertEqual(None, self.runner.exit_error(q0))
+
+    def test_007_wait_time(self):
+        # the wait time starts when the message is queued
+        q = gr.msg_queue()
+        self.fill(q, 3)
+        time.sleep(0.2)
+        self.runner = msgq_pool_runner(nthreads=1)
+        got = list()
+        self.runner.add(q, lambda msg: got.append(msg.to_string()))
+        self.assertTrue(wait_for(lambda: len(got) == 3))
+        stats = self.runner.stats()[0]
+        self.assertTrue(stats['avg_wait_time'] >= 0.2)
+        self.assertTrue(stats['max_wait_time'] >= stats['avg_wait_time'])
+
+    def test_008_more_queues_than_workers(self):
+        self.runner = msgq_pool_runner(nthreads=2)
+        qs = [gr.msg_queue() for i in range(8)]
+        got = [list() for q in qs]
+        for q, g in zip(qs, got):
+            self.runner.add(q, lambda msg, g=g: g.append(msg.to_string()))
+        for i in range(20):
+            for q in qs:
+                self.fill(q, 1)
+            time.sleep(0.001)
+        self.assertTrue(wait_for(lambda: all(len(g) == 20 for g in got)))
+        for g in got:
+            self.assertEqual(g, ['0']*20)
+
+if __name__ == '__main__':
+    gr_unittest.run(test_msgq_pool_runner, "test_msgq_pool_runner.xml")
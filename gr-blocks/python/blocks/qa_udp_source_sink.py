@@ -113,6 +113,39 @@ class test_udp_sink_source(gr_unittest.TestCase):
         self.assertEqual(expected_result, result_data)
         self.assert_(self.timeout)  # source ignores EOF?
 
+    def test_004(self):
+        # Packets with sequence numbers arrive in order and whole
+        udp_rcv = blocks.udp_source(gr.sizeof_float, '127.0.0.1', 0,
+                                    payload_size=108, seq_header=True)
+        rcv_port = udp_rcv.get_port()
+
+        n_data = 1000
+        src_data = [float(x) for x in range(n_data)]
+        expected_result = tuple(src_data)
+        src = blocks.vector_source_f(src_data, False)
+        udp_snd = blocks.udp_sink(gr.sizeof_float, '127.0.0.1', rcv_port,
+                                  payload_size=108, seq_header=True)
+        self.tb_snd.connect(src, udp_snd)
+
+        dst = blocks.vector_sink_f()
+        self.tb_rcv.connect(udp_rcv, dst)
+
+        self.tb_rcv.start()
+        self.tb_snd.run()
+        udp_snd.disconnect()
+        self.timeout = False
+        q = Timer(2.0,self.stop_rcv)
+        q.start()
+        self.tb_rcv.wait()
+        q.cancel()
+
+        result_data = dst.data()
+        self.assertEqual(expected_result, result_data)
+        self.assertEqual(0, len(dst.tags()))
+        self.assert_(udp_rcv.packets_received() >= 40)
+        self.assertEqual(0, udp_rcv.packets_lost())
+        self.assert_(not self.timeout)
+
     def stop_rcv(self):
         self.timeout = True
         self.tb_rcv.stop()
@@ -0,0 +1,118 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2014 Free Software Foundation, Inc.
+ *
+ * This file is part of GNU Radio
+ *
+ * GNU Radio is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * GNU Radio is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GNU Radio; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include <stdio.h>
+#include <gnuradio/top_block.h>
+#include <gnuradio/buffer.h>
+#include <gnuradio/high_res_timer.h>
+#include <gnuradio/blocks/tags_strobe.h>
+#include <gnuradio/blocks/head.h>
+#include <gnuradio/blocks/copy.h>
+#include <gnuradio/blocks/tag_debug.h>
+
+#define NITEMS 20000000
+#define NCOPIES 4
+#define BUFFER_TAGS 20000000
+#define TAGS_PER_READ 64
+
+static double
+seconds_since(gr::high_res_timer_type start)
+{
+  return (double)(gr::high_res_timer_now() - start) / gr::high_res_timer_tps();
+}
+
+// ----------------------------------------------------------------
+// Tags added, read and pruned on a single buffer, the way a writer
+// and one reader use it.
+
+static void
+benchmark_buffer()
+{
+  gr::buffer_sptr buf(gr::make_buffer(4096, sizeof(float), gr::block_sptr()));
+  gr::buffer_reader_sptr reader(gr::buffer_add_reader(buf, 0));
+  std::vector<gr::tag_t> tags;
+
+  gr::tag_t tag;
+  tag.key = pmt::intern("rx_time");
+  tag.value = pmt::make_tuple(pmt::from_uint64(0), pmt::from_double(0.0));
+
+  gr::high_res_timer_type start = gr::high_res_timer_now();
+  for(uint64_t i = 0; i < BUFFER_TAGS; i++) {
+    tag.offset = i;
+    buf->add_item_tag(tag);
+    if(i % TAGS_PER_READ == TAGS_PER_READ - 1) {
+      reader->get_tags_in_range(tags, i + 1 - TAGS_PER_READ, i + 1, 0);
+      buf->prune_tags(i + 1);
+    }
+  }
+  double total = seconds_since(start);
+
+  printf("%24s:  time: %6.3f  tags/sec: %10.3e\n",
+         "buffer", total, BUFFER_TAGS / total);
+}
+
+// ----------------------------------------------------------------
+// Tags through a flowgraph: tags_strobe -> head -> copy x NCOPIES
+// -> tag_debug, with a tag every period items.
+
+static void
+benchmark_flowgraph(uint64_t period)
+{
+  gr::top_block_sptr tb = gr::make_top_block("benchmark_tags");
+  gr::block_sptr src = gr::blocks::tags_strobe::make(sizeof(float), pmt::PMT_T,
+                                                     period, pmt::intern("packet_len"));
+  gr::block_sptr head = gr::blocks::head::make(sizeof(float), NITEMS);
+  gr::blocks::tag_debug::sptr snk = gr::blocks::tag_debug::make(sizeof(float), "benchmark");
+  snk->set_display(false);
+
+  tb->connect(src, 0, head, 0);
+  gr::block_sptr last = head;
+  for(int i = 0; i < NCOPIES; i++) {
+    gr::block_sptr copy = gr::blocks::copy::make(sizeof(float));
+    tb->connect(last, 0, copy, 0);
+    last = copy;
+  }
+  tb->connect(last, 0, snk, 0);
+
+  gr::high_res_timer_type start = gr::high_res_timer_now();
+  tb->run();
+  double total = seconds_since(start);
+
+  char name[64];
+  snprintf(name, sizeof(name), "flowgraph period %llu", (unsigned long long)period);
+  printf("%24s:  time: %6.3f  tags/sec: %10.3e  items/sec: %10.3e\n",
+         name, total, (NITEMS / period) / total, NITEMS / total);
+}
+
+int
+main(int argc, char **argv)
+{
+  benchmark_buffer();
+
+  uint64_t periods[] = {1, 10, 100, 1000};
+  for(size_t i = 0; i < sizeof(periods) / sizeof(periods[0]); i++)
+    benchmark_flowgraph(periods[i]);
+}
@@ -0,0 +1,97 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2014 Free Software Foundation, Inc.
+ *
+ * This file is part of GNU Radio
+ *
+ * GNU Radio is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * GNU Radio is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GNU Radio; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_CHANNELS_IMPAIRMENTS_MODEL_H
+#define INCLUDED_CHANNELS_IMPAIRMENTS_MODEL_H
+
+#include <gnuradio/channels/api.h>
+#include <gnuradio/sync_block.h>
+#include <gnuradio/types.h>
+
+namespace gr {
+  namespace channels {
+
+    /*!
+     * \brief Radio impairments model in a single block
+     * \ingroup channel_models_blk
+     *
+     * \details
+     * Applies the same model as the channels.impairments hierarchical
+     * block in one pass over each buffer. The input is mixed down by
+     * the frequency offset, rotated by a low pass filtered gaussian
+     * phase noise, passed through the third and second order
+     * distortions and the IQ imbalance, offset by the DC offset and
+     * mixed back up by the frequency offset.
+     *
+     * The phase noise uses the same generator and seed as the
+     * hierarchical block, so both produce the same output to within
+     * float precision.
+     */
+    class CHANNELS_API impairments_model : virtual public sync_block
+    {
+    public:
+      // gr::channels::impairments_model::sptr
+      typedef boost::shared_ptr<impairments_model> sptr;
+
+      /*! \brief Build the impairments model
+       *
+       * \param phase_noise_mag Phase noise magnitude in dB
+       * \param magbal IQ magnitude imbalance in dB
+       * \param phasebal IQ phase imbalance in degrees
+       * \param q_ofs Quadrature DC offset
+       * \param i_ofs Inphase DC offset
+       * \param freq_offset Frequency offset, normalized to the sample rate
+       * \param gamma Second order distortion
+       * \param beta Third order distortion
+       * \param phase_noise_alpha Taps of the phase noise low pass filter
+       * \param noise_seed A random number generator seed for the phase noise.
+       */
+      static sptr make(double phase_noise_mag=0, double magbal=0,
+                       double phasebal=0, double q_ofs=0, double i_ofs=0,
+                       double freq_offset=0, double gamma=0, double beta=0,
+                       double phase_noise_alpha=0.01, long noise_seed=42);
+
+      virtual void set_phase_noise_mag(double phase_noise_mag) = 0;
+      virtual void set_magbal(double magbal) = 0;
+      virtual void set_phasebal(double phasebal) = 0;
+      virtual void set_q_ofs(double q_ofs) = 0;
+      virtual void set_i_ofs(double i_ofs) = 0;
+      virtual void set_freq_offset(double freq_offset) = 0;
+      virtual void set_gamma(double gamma) = 0;
+      virtual void set_beta(double beta) = 0;
+      virtual void set_phase_noise_alpha(double alpha) = 0;
+
+      virtual double phase_noise_mag() const = 0;
+      virtual double magbal() const = 0;
+      virtual double phasebal() const = 0;
+      virtual double q_ofs() const = 0;
+      virtual double i_ofs() const = 0;
+      virtual double freq_offset() const = 0;
+      virtual double gamma() const = 0;
+      virtual double beta() const = 0;
+      virtual double phase_noise_alpha() const = 0;
+    };
+
+  } /* namespace channels */
+} /* namespace gr */
+
+#endif /* INCLUDED_CHANNELS_IMPAIRMENTS_MODEL_H */
@@ -0,0 +1,213 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2014 Free Software Foundation, Inc.
+ *
+ * This file is part of GNU Radio
+ *
+ * GNU Radio is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * GNU Radio is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GNU Radio; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include "impairments_model_impl.h"
+#include <gnuradio/io_signature.h>
+#include <volk/volk.h>
+#include <algorithm>
+#include <cmath>
+
+namespace gr {
+  namespace channels {
+
+    impairments_model::sptr
+    impairments_model::make(double phase_noise_mag, double magbal,
+                            double phasebal, double q_ofs, double i_ofs,
+                            double freq_offset, double gamma, double beta,
+                            double phase_noise_alpha, long noise_seed)
+    {
+      return gnuradio::get_initial_sptr
+        (new impairments_model_impl(phase_noise_mag, magbal, phasebal,
+                                    q_ofs, i_ofs, freq_offset, gamma, beta,
+                                    phase_noise_alpha, noise_seed));
+    }
+
+    impairments_model_impl::impairments_model_impl(double phase_noise_mag, double magbal,
+                                                   double phasebal, double q_ofs, double i_ofs,
+                                                   double freq_offset, double gamma, double beta,
+                                                   double phase_noise_alpha, long noise_seed)
+      : sync_block("impairments_model",
+                   io_signature::make(1, 1, sizeof(gr_complex)),
+                   io_signature::make(1, 1, sizeof(gr_complex))),
+        d_q_ofs(q_ofs), d_i_ofs(i_ofs), d_gamma(gamma), d_beta(beta),
+        d_rng(noise_seed), d_iir(phase_noise_alpha), d_chunk(8192)
+    {
+      set_phase_noise_mag(phase_noise_mag);
+      set_magbal(magbal);
+      set_phasebal(phasebal);
+      set_i_ofs(i_ofs);
+      set_freq_offset(freq_offset);
+      d_alpha = phase_noise_alpha;
+
+      size_t alignment = volk_get_alignment();
+      d_carrier = (gr_complex*)volk_malloc(d_chunk*sizeof(gr_complex), alignment);
+      d_rotation = (gr_complex*)volk_malloc(d_chunk*sizeof(gr_complex), alignment);
+      d_tmp = (gr_complex*)volk_malloc(d_chunk*sizeof(gr_complex), alignment);
+      d_mag2 = (float*)volk_malloc(d_chunk*sizeof(float), alignment);
+
+      const int alignment_multiple = alignment / sizeof(gr_complex);
+      set_alignment(std::max(1, alignment_multiple));
+    }
+
+    impairments_model_impl::~impairments_model_impl()
+    {
+      volk_free(d_carrier);
+      volk_free(d_rotation);
+      volk_free(d_tmp);
+      volk_free(d_mag2);
+    }
+
+    void
+    impairments_model_impl::set_phase_noise_mag(double phase_noise_mag)
+    {
+      gr::thread::scoped_lock guard(d_mutex);
+      d_phase_noise_mag = phase_noise_mag;
+      d_noise_ampl = pow(10.0, phase_noise_mag/20.0);
+    }
+
+    void
+    impairments_model_impl::set_magbal(double magbal)
+    {
+      gr::thread::scoped_lock guard(d_mutex);
+      d_magbal = magbal;
+      d_iq_mag = pow(10.0, magbal/20.0);
+    }
+
+    void
+    impairments_model_impl::set_phasebal(double phasebal)
+    {
+      gr::thread::scoped_lock guard(d_mutex);
+      d_phasebal = phasebal;
+      d_iq_phase = sin(phasebal*M_PI/180.0);
+    }
+
+    void
+    impairments_model_impl::set_q_ofs(double q_ofs)
+    {
+      gr::thread::scoped_lock guard(d_mutex);
+      d_q_ofs = q_ofs;
+      d_dc = gr_complex(d_i_ofs, d_q_ofs);
+    }
+
+    void
+    impairments_model_impl::set_i_ofs(double i_ofs)
+    {
+      gr::thread::scoped_lock guard(d_mutex);
+      d_i_ofs = i_ofs;
+      d_dc = gr_complex(d_i_ofs, d_q_ofs);
+    }
+
+    void
+    impairments_model_impl::set_freq_offset(double freq_offset)
+    {
+      gr::thread::scoped_lock guard(d_mutex);
+      d_freq_offset = freq_offset;
+      d_nco.set_freq(2 * M_PI * freq_offset);
+    }
+
+    void
+    impairments_model_impl::set_gamma(double gamma)
+    {
+      gr::thread::scoped_lock guard(d_mutex);
+      d_gamma = gamma;
+    }
+
+    void
+    impairments_model_impl::set_beta(double beta)
+    {
+      gr::thread::scoped_lock guard(d_mutex);
+      d_beta = beta;
+    }
+
+    void
+    impairments_model_impl::set_phase_noise_alpha(double alpha)
+    {
+      gr::thread::scoped_lock guard(d_mutex);
+      d_iir.set_taps(alpha);
+      d_alpha = alpha;
+    }
+
+    int
+    impairments_model_impl::work(int noutput_items,
+                                 gr_vector_const_void_star &input_items,
+                                 gr_vector_void_star &output_items)
+    {
+      const gr_complex *in = (const gr_complex*)input_items[0];
+      gr_complex *out = (gr_complex*)output_items[0];
+
+      gr::thread::scoped_lock guard(d_mutex);
+
+      const gr_complex beta(d_beta, 0);
+      const gr_complex gamma(d_gamma, 0);
+
+      for(int i = 0; i < noutput_items; i += d_chunk) {
+        const int n = std::min(d_chunk, noutput_items - i);
+        const gr_complex *x = &in[i];
+        gr_complex *y = &out[i];
+
+        // mix down by the frequency offset
+        d_nco.sincos(d_carrier, n, 1.0);
+        volk_32fc_x2_multiply_conjugate_32fc(y, x, d_carrier, n);
+
+        // phase noise, the generator and the filter run sample by sample
+        for(int j = 0; j < n; j++) {
+          float phase = d_iir.filter((float)(d_noise_ampl * d_rng.gasdev()));
+          d_rotation[j] = gr_complex(cosf(phase), sinf(phase));
+        }
+        volk_32fc_x2_multiply_32fc(y, y, d_rotation, n);
+
+        // third order distortion: y + beta*y*|y|^2
+        if(d_beta != 0) {
+          volk_32fc_magnitude_squared_32f(d_mag2, y, n);
+          volk_32fc_32f_multiply_32fc(d_tmp, y, d_mag2, n);
+          volk_32fc_s32fc_multiply_32fc(d_tmp, d_tmp, beta, n);
+          volk_32f_x2_add_32f((float*)y, (float*)y, (float*)d_tmp, 2*n);
+        }
+
+        // second order distortion: y + gamma*(y*y + y*conj(y))
+        if(d_gamma != 0) {
+          volk_32fc_x2_multiply_32fc(d_tmp, y, y, n);
+          volk_32fc_x2_multiply_conjugate_32fc(d_rotation, y, y, n);
+          volk_32f_x2_add_32f((float*)d_tmp, (float*)d_tmp, (float*)d_rotation, 2*n);
+          volk_32fc_s32fc_multiply_32fc(d_tmp, d_tmp, gamma, n);
+          volk_32f_x2_add_32f((float*)y, (float*)y, (float*)d_tmp, 2*n);
+        }
+
+        // IQ imbalance and DC offset
+        for(int j = 0; j < n; j++) {
+          float re = y[j].real();
+          y[j] = gr_complex(re*d_iq_mag, d_iq_phase*re + y[j].imag()) + d_dc;
+        }
+
+        // mix back up by the frequency offset
+        volk_32fc_x2_multiply_32fc(y, d_carrier, y, n);
+      }
+
+      return noutput_items;
+    }
+
+  } /* namespace channels */
+} /* namespace gr */
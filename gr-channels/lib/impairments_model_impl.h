@@ -0,0 +1,101 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2014 Free Software Foundation, Inc.
+ *
+ * This file is part of GNU Radio
+ *
+ * GNU Radio is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * GNU Radio is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GNU Radio; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_CHANNELS_IMPAIRMENTS_MODEL_IMPL_H
+#define INCLUDED_CHANNELS_IMPAIRMENTS_MODEL_IMPL_H
+
+#include <gnuradio/channels/impairments_model.h>
+#include <gnuradio/filter/single_pole_iir.h>
+#include <gnuradio/fxpt_nco.h>
+#include <gnuradio/random.h>
+#include <gnuradio/thread/thread.h>
+
+namespace gr {
+  namespace channels {
+
+    class CHANNELS_API impairments_model_impl : public impairments_model
+    {
+    private:
+      double d_phase_noise_mag;
+      double d_magbal;
+      double d_phasebal;
+      double d_q_ofs;
+      double d_i_ofs;
+      double d_freq_offset;
+      double d_gamma;
+      double d_beta;
+      double d_alpha;
+
+      // the derived constants applied in work
+      float d_noise_ampl;
+      float d_iq_mag;
+      float d_iq_phase;
+      gr_complex d_dc;
+
+      gr::thread::mutex d_mutex;
+      gr::fxpt_nco d_nco;
+      gr::random d_rng;
+      filter::single_pole_iir<float,float,double> d_iir;
+
+      // scratch buffers of d_chunk samples
+      int d_chunk;
+      gr_complex *d_carrier;
+      gr_complex *d_rotation;
+      gr_complex *d_tmp;
+      float *d_mag2;
+
+    public:
+      impairments_model_impl(double phase_noise_mag, double magbal,
+                             double phasebal, double q_ofs, double i_ofs,
+                             double freq_offset, double gamma, double beta,
+                             double phase_noise_alpha, long noise_seed);
+      ~impairments_model_impl();
+
+      void set_phase_noise_mag(double phase_noise_mag);
+      void set_magbal(double magbal);
+      void set_phasebal(double phasebal);
+      void set_q_ofs(double q_ofs);
+      void set_i_ofs(double i_ofs);
+      void set_freq_offset(double freq_offset);
+      void set_gamma(double gamma);
+      void set_beta(double beta);
+      void set_phase_noise_alpha(double alpha);
+
+      double phase_noise_mag() const { return d_phase_noise_mag; }
+      double magbal() const { return d_magbal; }
+      double phasebal() const { return d_phasebal; }
+      double q_ofs() const { return d_q_ofs; }
+      double i_ofs() const { return d_i_ofs; }
+      double freq_offset() const { return d_freq_offset; }
+      double gamma() const { return d_gamma; }
+      double beta() const { return d_beta; }
+      double phase_noise_alpha() const { return d_alpha; }
+
+      int work(int noutput_items,
+               gr_vector_const_void_star &input_items,
+               gr_vector_void_star &output_items);
+    };
+
+  } /* namespace channels */
+} /* namespace gr */
+
+#endif /* INCLUDED_CHANNELS_IMPAIRMENTS_MODEL_IMPL_H */
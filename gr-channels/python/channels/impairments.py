@@ -17,10 +17,11 @@ from phase_noise_gen import *
 from iqbal_gen import *
 from distortion_2_gen import *
 from distortion_3_gen import *
+from channels_swig import impairments_model
 
 class impairments(gr.hier_block2):
 
-    def __init__(self, phase_noise_mag=0, magbal=0, phasebal=0, q_ofs=0, i_ofs=0, freq_offset=0, gamma=0, beta=0):
+    def __init__(self, phase_noise_mag=0, magbal=0, phasebal=0, q_ofs=0, i_ofs=0, freq_offset=0, gamma=0, beta=0, fused=False):
         gr.hier_block2.__init__(
             self, "Radio Impairments Model",
             gr.io_signature(1, 1, gr.sizeof_gr_complex*1),
@@ -38,6 +39,13 @@ class impairments(gr.hier_block2):
         self.freq_offset = freq_offset
         self.gamma = gamma
         self.beta = beta
+        self.fused = fused
+
+        # fused runs the same model in a single block, one buffer and one thread
+        if fused:
+            self.impairments_model = impairments_model(phase_noise_mag, magbal, phasebal, q_ofs, i_ofs, freq_offset, gamma, beta)
+            self.connect((self, 0), (self.impairments_model, 0), (self, 0))
+            return
 
         ##################################################
         # Blocks
@@ -75,55 +83,79 @@ class impairments(gr.hier_block2):
 
     def set_phase_noise_mag(self, phase_noise_mag):
         self.phase_noise_mag = phase_noise_mag
-        self.channels_phase_noise_gen_0_0.set_noise_mag(math.pow(10.0,self.phase_noise_mag/20.0))
+        if self.fused:
+            self.impairments_model.set_phase_noise_mag(self.phase_noise_mag)
+        else:
+            self.channels_phase_noise_gen_0_0.set_noise_mag(math.pow(10.0,self.phase_noise_mag/20.0))
 
     def get_magbal(self):
         return self.magbal
 
     def set_magbal(self, magbal):
         self.magbal = magbal
-        self.channels_iqbal_gen_0.set_magnitude(self.magbal)
+        if self.fused:
+            self.impairments_model.set_magbal(self.magbal)
+        else:
+            self.channels_iqbal_gen_0.set_magnitude(self.magbal)
 
     def get_phasebal(self):
         return self.phasebal
 
     def set_phasebal(self, phasebal):
         self.phasebal = phasebal
-        self.channels_iqbal_gen_0.set_phase(self.phasebal)
+        if self.fused:
+            self.impairments_model.set_phasebal(self.phasebal)
+        else:
+            self.channels_iqbal_gen_0.set_phase(self.phasebal)
 
     def get_q_ofs(self):
         return self.q_ofs
 
     def set_q_ofs(self, q_ofs):
         self.q_ofs = q_ofs
-        self.blocks_add_const_vxx_0.set_k((self.i_ofs + self.q_ofs* 1j, ))
+        if self.fused:
+            self.impairments_model.set_q_ofs(self.q_ofs)
+        else:
+            self.blocks_add_const_vxx_0.set_k((self.i_ofs + self.q_ofs* 1j, ))
 
     def get_i_ofs(self):
         return self.i_ofs
 
     def set_i_ofs(self, i_ofs):
         self.i_ofs = i_ofs
-        self.blocks_add_const_vxx_0.set_k((self.i_ofs + self.q_ofs* 1j, ))
+        if self.fused:
+            self.impairments_model.set_i_ofs(self.i_ofs)
+        else:
+            self.blocks_add_const_vxx_0.set_k((self.i_ofs + self.q_ofs* 1j, ))
 
     def get_freq_offset(self):
         return self.freq_offset
 
     def set_freq_offset(self, freq_offset):
         self.freq_offset = freq_offset
-        self.analog_sig_source_x_0.set_frequency(self.freq_offset)
+        if self.fused:
+            self.impairments_model.set_freq_offset(self.freq_offset)
+        else:
+            self.analog_sig_source_x_0.set_frequency(self.freq_offset)
 
     def get_gamma(self):
         return self.gamma
 
     def set_gamma(self, gamma):
         self.gamma = gamma
-        self.channels_distortion_2_gen_0.set_beta(self.gamma)
+        if self.fused:
+            self.impairments_model.set_gamma(self.gamma)
+        else:
+            self.channels_distortion_2_gen_0.set_beta(self.gamma)
 
     def get_beta(self):
         return self.beta
 
     def set_beta(self, beta):
         self.beta = beta
-        self.channels_distortion_3_gen_0.set_beta(self.beta)
+        if self.fused:
+            self.impairments_model.set_beta(self.beta)
+        else:
+            self.channels_distortion_3_gen_0.set_beta(self.beta)
 
 
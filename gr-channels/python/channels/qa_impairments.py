@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr, gr_unittest, analog, blocks, channels
+
+class test_impairments(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.tb = gr.top_block()
+
+    def tearDown(self):
+        self.tb = None
+
+    def run_model(self, N, params, update=None):
+        src = analog.noise_source_c(analog.GR_GAUSSIAN, 0.5, 7)
+        head = blocks.head(gr.sizeof_gr_complex, N)
+        hier = channels.impairments(*params)
+        fused = channels.impairments(*params, fused=True)
+        if update is not None:
+            update(hier)
+            update(fused)
+        snk_hier = blocks.vector_sink_c()
+        snk_fused = blocks.vector_sink_c()
+        self.tb.connect(src, head)
+        self.tb.connect(head, hier, snk_hier)
+        self.tb.connect(head, fused, snk_fused)
+        self.tb.run()
+        return snk_hier.data(), snk_fused.data()
+
+    def test_001_defaults(self):
+        hier_data, fused_data = self.run_model(10000, ())
+        self.assertEqual(len(fused_data), 10000)
+        self.assertComplexTuplesAlmostEqual(hier_data, fused_data, 4)
+
+    def test_002_all_impairments(self):
+        params = (-20, 0.5, 2.0, 0.01, -0.02, 0.001, 0.05, -0.1)
+        hier_data, fused_data = self.run_model(20000, params)
+        self.assertComplexTuplesAlmostEqual(hier_data, fused_data, 4)
+
+    def test_003_setters(self):
+        def update(model):
+            model.set_phase_noise_mag(-30)
+            model.set_magbal(-1.0)
+            model.set_phasebal(5.0)
+            model.set_q_ofs(0.1)
+            model.set_i_ofs(0.2)
+            model.set_freq_offset(-0.01)
+            model.set_gamma(0.02)
+            model.set_beta(0.03)
+        hier_data, fused_data = self.run_model(5000, (), update)
+        self.assertComplexTuplesAlmostEqual(hier_data, fused_data, 4)
+
+if __name__ == '__main__':
+    gr_unittest.run(test_impairments, "test_impairments.xml")
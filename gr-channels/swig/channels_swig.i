@@ -33,6 +33,7 @@
 #include "gnuradio/channels/cfo_model.h"
 #include "gnuradio/channels/dynamic_channel_model.h"
 #include "gnuradio/channels/fading_model.h"
+#include "gnuradio/channels/impairments_model.h"
 #include "gnuradio/channels/selective_fading_model.h"
 #include "gnuradio/channels/sro_model.h"
 %}
@@ -42,6 +43,7 @@
 %include "gnuradio/channels/cfo_model.h"
 %include "gnuradio/channels/dynamic_channel_model.h"
 %include "gnuradio/channels/fading_model.h"
+%include "gnuradio/channels/impairments_model.h"
 %include "gnuradio/channels/selective_fading_model.h"
 %include "gnuradio/channels/sro_model.h"
 
@@ -50,5 +52,6 @@ GR_SWIG_BLOCK_MAGIC2(channels, channel_model2);
 GR_SWIG_BLOCK_MAGIC2(channels, cfo_model);
 GR_SWIG_BLOCK_MAGIC2(channels, dynamic_channel_model);
 GR_SWIG_BLOCK_MAGIC2(channels, fading_model);
+GR_SWIG_BLOCK_MAGIC2(channels, impairments_model);
 GR_SWIG_BLOCK_MAGIC2(channels, selective_fading_model);
 GR_SWIG_BLOCK_MAGIC2(channels, sro_model);
@@ -19,13 +19,13 @@
 # Boston, MA 02110-1301, USA.
 # 
 
-from gnuradio import gru
 import digital_swig as digital
 import struct
+import numpy
 
 def gen_and_append_crc32(s):
     crc = digital.crc32(s)
-    return s + struct.pack(">I", gru.hexint(crc) & 0xFFFFFFFF)
+    return s + struct.pack(">I", crc & 0xFFFFFFFF)
 
 def check_crc32(s):
     if len(s) < 4:
@@ -36,3 +36,160 @@ def check_crc32(s):
     (expected,) = struct.unpack(">I", s[-4:])
     # print "actual =", hex(actual), "expected =", hex(expected)
     return (actual == expected, msg)
+
+# /////////////////////////////////////////////////////////////////////////////
+#                   batched CRC-32
+# /////////////////////////////////////////////////////////////////////////////
+
+def _make_crc32_tables(n, poly=0x04C11DB7):
+    """
+    Slice-by-n tables for the MSB first CRC-32 used by digital.crc32.
+    Table k holds the CRC of byte i followed by k zero bytes.
+    """
+    tables = numpy.empty((n, 256), numpy.uint32)
+    c = numpy.arange(256, dtype=numpy.uint32) << 24
+    for i in range(8):
+        c = numpy.where(c & 0x80000000, (c << 1) ^ poly, c << 1).astype(numpy.uint32)
+    tables[0] = c
+    for k in range(1, n):
+        tables[k] = (tables[k-1] << 8) ^ tables[0][tables[k-1] >> 24]
+    return tables
+
+_T = _make_crc32_tables(8)
+
+def _byte_array(buf):
+    """
+    View a string or buffer object as a 1-D uint8 array without copying.
+    """
+    if isinstance(buf, memoryview):
+        return numpy.asarray(buf).view(numpy.uint8)
+    return numpy.frombuffer(buf, numpy.uint8)
+
+def crc32_rows(rows):
+    """
+    CRC-32 of every row of a 2-D uint8 array, same as digital.crc32.
+
+    All rows are processed together, eight bytes per step (slice-by-8).
+    The lookups for the last four bytes of each step do not depend on
+    the running CRC, so they are done for all steps up front.
+    """
+    rows = numpy.asarray(rows, numpy.uint8)
+    npkts, L = rows.shape
+    crc = numpy.empty(npkts, numpy.uint32)
+    crc.fill(0xFFFFFFFF)
+
+    nsteps = L // 8
+    if nsteps:
+        body = rows[:,:8*nsteps]
+        tail = _T[3][body[:,4::8]] ^ _T[2][body[:,5::8]] ^ \
+               _T[1][body[:,6::8]] ^ _T[0][body[:,7::8]]
+        for k in range(nsteps):
+            b = body[:,8*k:8*k+4]
+            crc = _T[7][(crc >> 24) ^ b[:,0]] ^ \
+                  _T[6][((crc >> 16) & 0xff) ^ b[:,1]] ^ \
+                  _T[5][((crc >> 8) & 0xff) ^ b[:,2]] ^ \
+                  _T[4][(crc & 0xff) ^ b[:,3]] ^ tail[:,k]
+
+    for j in range(8*nsteps, L):
+        crc = _T[0][(crc >> 24) ^ rows[:,j]] ^ (crc << 8)
+
+    return crc ^ numpy.uint32(0xFFFFFFFF)
+
+def _crc32_bytes(rows):
+    """
+    Big endian CRC-32 of every row as a (npkts, 4) uint8 array.
+    """
+    return crc32_rows(rows).astype('>u4').view(numpy.uint8).reshape(-1, 4)
+
+def _rows_by_length(packets, offsets=None):
+    """
+    Split a batch of packets into groups of equal length.
+
+    Args:
+        packets: 2-D uint8 array, list of strings/buffers, or a single buffer
+        offsets: for a single buffer, the n+1 packet boundaries, so that
+                 packet i is packets[offsets[i]:offsets[i+1]]
+
+    Yields (indexes, rows) where rows is a 2-D uint8 array holding the
+    packets at those indexes.
+    """
+    if isinstance(packets, numpy.ndarray) and packets.ndim == 2:
+        yield numpy.arange(len(packets)), numpy.asarray(packets, numpy.uint8)
+        return
+
+    if offsets is not None:
+        data = _byte_array(packets)
+        offsets = numpy.asarray(offsets, numpy.intp)
+        starts = offsets[:-1]
+        lengths = numpy.diff(offsets)
+        for L in numpy.unique(lengths):
+            indexes = numpy.flatnonzero(lengths == L)
+            yield indexes, data[starts[indexes,numpy.newaxis] + numpy.arange(L)]
+        return
+
+    groups = dict()
+    for i, p in enumerate(packets):
+        groups.setdefault(len(p), list()).append(i)
+    for L, indexes in groups.iteritems():
+        rows = numpy.empty((len(indexes), L), numpy.uint8)
+        for row, i in zip(rows, indexes):
+            row[:] = _byte_array(packets[i])
+        yield numpy.array(indexes, numpy.intp), rows
+
+def _num_packets(packets, offsets):
+    if offsets is not None:
+        return len(offsets) - 1
+    return len(packets)
+
+def crc32_many(packets, offsets=None):
+    """
+    CRC-32 of many packets at once.
+
+    Args:
+        packets: 2-D uint8 array, list of strings/buffers, or a single buffer
+        offsets: packet boundaries when packets is a single buffer
+
+    Returns:
+        numpy uint32 array, one CRC per packet
+    """
+    crcs = numpy.empty(_num_packets(packets, offsets), numpy.uint32)
+    for indexes, rows in _rows_by_length(packets, offsets):
+        crcs[indexes] = crc32_rows(rows)
+    return crcs
+
+def gen_and_append_crc32_many(packets, offsets=None):
+    """
+    Batched gen_and_append_crc32.
+
+    Returns:
+        for a 2-D array, a new 2-D array with the big endian CRC appended
+        to every row; otherwise a list of strings with the CRC appended
+    """
+    if isinstance(packets, numpy.ndarray) and packets.ndim == 2:
+        rows = numpy.asarray(packets, numpy.uint8)
+        out = numpy.empty((rows.shape[0], rows.shape[1]+4), numpy.uint8)
+        out[:,:-4] = rows
+        out[:,-4:] = _crc32_bytes(rows)
+        return out
+
+    result = [None]*_num_packets(packets, offsets)
+    for indexes, rows in _rows_by_length(packets, offsets):
+        for i, row, crc in zip(indexes, rows, _crc32_bytes(rows)):
+            result[i] = row.tostring() + crc.tostring()
+    return result
+
+def check_crc32_many(packets, offsets=None):
+    """
+    Batched check_crc32, each packet ends with its big endian CRC-32.
+
+    Returns:
+        numpy boolean array, True where the CRC matches; packets shorter
+        than 4 bytes fail
+    """
+    ok = numpy.zeros(_num_packets(packets, offsets), numpy.bool_)
+    for indexes, rows in _rows_by_length(packets, offsets):
+        if rows.shape[1] < 4:
+            continue
+        expected = numpy.ascontiguousarray(rows[:,-4:]).view('>u4')[:,0]
+        ok[indexes] = crc32_rows(rows[:,:-4]) == expected
+    return ok
@@ -23,19 +23,14 @@ import struct
 import numpy
 from gnuradio import gru
 import crc
+from crc import _byte_array
 
 def conv_packed_binary_string_to_1_0_string(s):
     """
     '\xAF' --> '10101111'
     """
-    r = []
-    for ch in s:
-        x = ord(ch)
-        for i in range(7,-1,-1):
-            t = (x >> i) & 0x1
-            r.append(t)
-
-    return ''.join(map(lambda x: chr(x + ord('0')), r))
+    bits = numpy.unpackbits(numpy.fromstring(s, numpy.uint8))
+    return (bits + ord('0')).tostring()
 
 def conv_1_0_string_to_packed_binary_string(s):
     """
@@ -58,15 +53,8 @@ def conv_1_0_string_to_packed_binary_string(s):
 
     assert len(s) % 8 == 0
 
-    r = []
-    i = 0
-    while i < len(s):
-        t = 0
-        for j in range(8):
-            t = (t << 1) | (ord(s[i + j]) - ord('0'))
-        r.append(chr(t))
-        i += 8
-    return (''.join(r), padded)
+    bits = numpy.fromstring(s, numpy.uint8) - ord('0')
+    return (numpy.packbits(bits).tostring(), padded)
 
 
 default_access_code = \
@@ -77,10 +65,7 @@ default_preamble = \
 def is_1_0_string(s):
     if not isinstance(s, str):
         return False
-    for ch in s:
-        if not ch in ('0', '1'):
-            return False
-    return True
+    return not s.translate(None, '01')
 
 def string_to_hex_list(s):
     return map(lambda x: hex(ord(x)), s)
@@ -214,6 +199,194 @@ def unmake_packet(whitened_payload_with_crc, whitener_offset=0,
     return ok, payload
 
 
+# /////////////////////////////////////////////////////////////////////////////
+#                   bulk framing and deframing
+# /////////////////////////////////////////////////////////////////////////////
+
+def as_byte_rows(payloads, payload_len=None):
+    """
+    View a batch of equal length payloads as a 2-D uint8 array.
+
+    Args:
+        payloads: 2-D uint8 array, sequence of strings/buffers, or a single buffer
+        payload_len: length of each payload when payloads is a single buffer
+
+    A 2-D array or a single buffer of back to back payloads is used
+    without copying. A sequence of buffers is stacked into a new array.
+    """
+    if isinstance(payloads, numpy.ndarray) and payloads.ndim == 2:
+        return numpy.asarray(payloads, numpy.uint8)
+    if payload_len is not None:
+        return _byte_array(payloads).reshape(-1, payload_len)
+    rows = [_byte_array(p) for p in payloads]
+    if not rows:
+        return numpy.zeros((0, 0), numpy.uint8)
+    return numpy.vstack(rows)
+
+def _whitener_offsets(whitener_offset, npkts):
+    offsets = numpy.asarray(whitener_offset, numpy.intp)
+    if offsets.ndim == 0:
+        offsets = numpy.repeat(offsets, npkts)
+    if offsets.shape != (npkts,):
+        raise ValueError, "need one whitener_offset per packet (%d)" % (npkts,)
+    if len(offsets) and (offsets.min() < 0 or offsets.max() > 15):
+        raise ValueError, "whitener_offset must be between 0 and 15, inclusive"
+    return offsets
+
+def _whitener_mask(offsets, length):
+    """
+    Get the whitening sequence for every row as a (npkts, length) array.
+    """
+    if len(offsets) and offsets.max() + length > len(random_mask_vec8):
+        raise ValueError, "len(payload) must be in [0, %d]" % (len(random_mask_vec8) - offsets.max(),)
+    if len(offsets) and (offsets == offsets[0]).all():
+        o = int(offsets[0])
+        return random_mask_vec8[o:o+length]
+    return random_mask_vec8[offsets[:,numpy.newaxis] + numpy.arange(length)]
+
+def make_headers(payload_len, whitener_offsets):
+    """
+    Vector version of make_header, one 4 byte header row per offset.
+    """
+    val = ((whitener_offsets & 0xf) << 12) | (payload_len & 0x0fff)
+    headers = numpy.empty((len(val), 4), numpy.uint8)
+    headers[:,0] = headers[:,2] = val >> 8
+    headers[:,1] = headers[:,3] = val & 0xff
+    return headers
+
+def make_packet_array(payloads, samples_per_symbol, bits_per_symbol,
+                      preamble=default_preamble, access_code=default_access_code,
+                      pad_for_usrp=True, whitener_offset=0, whitening=True,
+                      calc_crc=True, payload_len=None):
+    """
+    Build many packets of the same payload length in one pass.
+
+    Args:
+        payloads: equal length payloads, see as_byte_rows
+        whitener_offset: one offset for all packets or one per packet
+        payload_len: length of each payload when payloads is a single buffer
+
+    See make_packet for the remaining parameters.
+
+    Returns:
+        2-D uint8 array, row i is identical to make_packet(payloads[i], ...)
+    """
+    if not is_1_0_string(preamble):
+        raise ValueError, "preamble must be a string containing only 0's and 1's (%r)" % (preamble,)
+
+    if not is_1_0_string(access_code):
+        raise ValueError, "access_code must be a string containing only 0's and 1's (%r)" % (access_code,)
+
+    rows = as_byte_rows(payloads, payload_len)
+    npkts, plen = rows.shape
+    offsets = _whitener_offsets(whitener_offset, npkts)
+
+    L = plen + 4 if calc_crc else plen
+    MAXLEN = len(random_mask_tuple)
+    if L > MAXLEN:
+        raise ValueError, "len(payload) must be in [0, %d]" % (MAXLEN,)
+
+    (packed_access_code, padded) = conv_1_0_string_to_packed_binary_string(access_code)
+    (packed_preamble, ignore) = conv_1_0_string_to_packed_binary_string(preamble)
+    prefix = numpy.fromstring(packed_preamble + packed_access_code, numpy.uint8)
+
+    body_start = len(prefix) + 4
+    pkt_len = body_start + L + 1
+    if pad_for_usrp:
+        pkt_len += _npadding_bytes(pkt_len, int(samples_per_symbol), bits_per_symbol)
+
+    pkts = numpy.empty((npkts, pkt_len), numpy.uint8)
+    pkts[:,:len(prefix)] = prefix
+    pkts[:,len(prefix):body_start] = make_headers(L, offsets)
+    body = pkts[:,body_start:body_start+L]
+    if calc_crc:
+        body[:] = crc.gen_and_append_crc32_many(rows)
+    else:
+        body[:] = rows
+    if whitening:
+        body ^= _whitener_mask(offsets, L)
+    pkts[:,body_start+L:] = 0x55
+    return pkts
+
+def unmake_packet_array(whitened_payloads_with_crc, whitener_offset=0,
+                        dewhitening=True, check_crc=True, payload_len=None):
+    """
+    Deframe many packets of the same length in one pass.
+
+    Args:
+        whitened_payloads_with_crc: equal length packets, see as_byte_rows
+        whitener_offset: one offset for all packets or one per packet
+        dewhitening: True if we should run this through the dewhitener
+        check_crc: True if we should check the CRC of the packets
+        payload_len: length of each packet when given a single buffer
+
+    Returns:
+        (ok, payloads): boolean array and 2-D uint8 array of payloads
+    """
+    rows = as_byte_rows(whitened_payloads_with_crc, payload_len)
+    npkts, L = rows.shape
+
+    if dewhitening:
+        rows = rows ^ _whitener_mask(_whitener_offsets(whitener_offset, npkts), L)
+
+    if not check_crc:
+        return numpy.ones(npkts, numpy.bool_), rows
+
+    if L < 4:
+        return numpy.zeros(npkts, numpy.bool_), rows[:,:0]
+
+    return crc.check_crc32_many(rows), rows[:,:-4]
+
+def _group_by_length(buffers):
+    groups = dict()
+    for i, b in enumerate(buffers):
+        groups.setdefault(len(b), list()).append(i)
+    return groups
+
+def make_packets(payloads, samples_per_symbol, bits_per_symbol,
+                 preamble=default_preamble, access_code=default_access_code,
+                 pad_for_usrp=True, whitener_offset=0, whitening=True,
+                 calc_crc=True):
+    """
+    Build a packet for each payload, payloads may differ in length.
+
+    Payloads of the same length are framed together by make_packet_array.
+    whitener_offset is either one offset or a sequence with one per payload.
+
+    Returns:
+        list of packet strings, in the order of payloads
+    """
+    offsets = _whitener_offsets(whitener_offset, len(payloads))
+    pkts = [None]*len(payloads)
+    for indexes in _group_by_length(payloads).itervalues():
+        rows = make_packet_array([payloads[i] for i in indexes],
+                                 samples_per_symbol, bits_per_symbol,
+                                 preamble, access_code, pad_for_usrp,
+                                 offsets[indexes], whitening, calc_crc)
+        for i, row in zip(indexes, rows):
+            pkts[i] = row.tostring()
+    return pkts
+
+def unmake_packets(whitened_payloads_with_crc, whitener_offset=0,
+                   dewhitening=True, check_crc=True):
+    """
+    Deframe a list of packets, packets may differ in length.
+
+    whitener_offset is either one offset or a sequence with one per packet.
+
+    Returns:
+        list of (ok, payload) tuples, in the order of the packets
+    """
+    offsets = _whitener_offsets(whitener_offset, len(whitened_payloads_with_crc))
+    result = [None]*len(whitened_payloads_with_crc)
+    for indexes in _group_by_length(whitened_payloads_with_crc).itervalues():
+        ok, payloads = unmake_packet_array([whitened_payloads_with_crc[i] for i in indexes],
+                                           offsets[indexes], dewhitening, check_crc)
+        for i, pkt_ok, payload in zip(indexes, ok, payloads):
+            result[i] = (bool(pkt_ok), payload.tostring())
+    return result
+
+
 # FYI, this PN code is the output of a 15-bit LFSR
 random_mask_tuple = (
   255,  63,   0,  16,   0,  12,   0,   5, 192,   3,  16,   1, 204,   0,  85, 192,
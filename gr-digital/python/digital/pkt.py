@@ -108,6 +108,33 @@ class mod_pkts(gr.hier_block2):
                 
         self._pkt_input.msgq().insert_tail(msg)
 
+    def send_pkts(self, payloads):
+        """
+        Send many payloads at once.
+
+        The packets are framed together and queued as a single message,
+        which keeps the message queue from limiting the packet rate.
+
+        Args:
+            payloads: list of payloads (strings or buffers)
+        """
+        if not payloads:
+            return
+        if self._use_whitener_offset is True:
+            offsets = [(self._whitener_offset + i) % 16 for i in range(len(payloads))]
+            self._whitener_offset = (self._whitener_offset + len(payloads)) % 16
+        else:
+            offsets = self._whitener_offset
+        pkts = packet_utils.make_packets(payloads,
+                                         self._modulator.samples_per_symbol(),
+                                         self._modulator.bits_per_symbol(),
+                                         self._preamble,
+                                         self._access_code,
+                                         self._pad_for_usrp,
+                                         offsets)
+        msg = gr.message_from_string(''.join(pkts))
+        self._pkt_input.msgq().insert_tail(msg)
+
 
 
 class demod_pkts(gr.hier_block2):
@@ -118,7 +145,8 @@ class demod_pkts(gr.hier_block2):
     app via the callback.
     """
 
-    def __init__(self, demodulator, access_code=None, callback=None, threshold=-1):
+    def __init__(self, demodulator, access_code=None, callback=None, threshold=-1,
+                 runner=None):
         """
 	Hierarchical block for demodulating and deframing packets.
 
@@ -130,6 +158,8 @@ class demod_pkts(gr.hier_block2):
             access_code: AKA sync vector (string of 1's and 0's)
             callback: function of two args: ok, payload (ok: bool; payload: string)
             threshold: detect access_code with up to threshold bits wrong (-1 -> use default) (int)
+            runner: optional gru.msgq_pool_runner to service the packet queue,
+                    the callback then runs in batches on its worker pool
 	"""
 
 	gr.hier_block2.__init__(self, "demod_pkts",
@@ -152,7 +182,18 @@ class demod_pkts(gr.hier_block2):
         self.framer_sink = digital.framer_sink_1(self._rcvd_pktq)
         self.connect(self, self._demodulator, self.correlator, self.framer_sink)
         
-        self._watcher = _queue_watcher_thread(self._rcvd_pktq, callback)
+        if runner is None:
+            self._watcher = _queue_watcher_thread(self._rcvd_pktq, callback)
+        else:
+            self._callback = callback
+            runner.add(self._rcvd_pktq, self._handle_msgs, batch=True)
+
+    def _handle_msgs(self, msgs):
+        pkts = packet_utils.unmake_packets([msg.to_string() for msg in msgs],
+                                           [int(msg.arg1()) for msg in msgs])
+        if self._callback:
+            for ok, payload in pkts:
+                self._callback(ok, payload)
 
 
 class _queue_watcher_thread(_threading.Thread):
@@ -167,7 +208,12 @@ class _queue_watcher_thread(_threading.Thread):
 
     def run(self):
         while self.keep_running:
-            msg = self.rcvd_pktq.delete_head()
-            ok, payload = packet_utils.unmake_packet(msg.to_string(), int(msg.arg1()))
+            # block for one packet, then deframe everything that is pending
+            msgs = [self.rcvd_pktq.delete_head()]
+            while self.rcvd_pktq.count():
+                msgs.append(self.rcvd_pktq.delete_head())
+            pkts = packet_utils.unmake_packets([msg.to_string() for msg in msgs],
+                                               [int(msg.arg1()) for msg in msgs])
             if self.callback:
-                self.callback(ok, payload)
+                for ok, payload in pkts:
+                    self.callback(ok, payload)
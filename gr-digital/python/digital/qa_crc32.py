@@ -22,6 +22,7 @@
 
 import random
 import cmath
+import numpy
 
 from gnuradio import gr, gr_unittest, digital
 
@@ -57,5 +58,29 @@ class test_crc32(gr_unittest.TestCase):
 
         self.assertEqual(expected_result, result)
 
+    def test04_many(self):
+        data = [''.join(chr(random.randint(0, 255)) for i in range(n))
+                for n in (0, 1, 4, 7, 8, 9, 17, 100, 100, 1500)]
+        crcs = digital.crc32_many(data)
+        self.assertEqual(list(crcs), [digital.crc32(d) for d in data])
+
+        pkts = digital.gen_and_append_crc32_many(data)
+        self.assertEqual(pkts, [digital.gen_and_append_crc32(d) for d in data])
+
+        pkts[3] = pkts[3][:-1] + chr(ord(pkts[3][-1]) ^ 0x80)
+        expected = [digital.check_crc32(p)[0] for p in pkts + ['abc']]
+        self.assertEqual(list(digital.check_crc32_many(pkts + ['abc'])), expected)
+
+        buf = ''.join(pkts)
+        offsets = numpy.cumsum([0] + [len(p) for p in pkts])
+        self.assertEqual(list(digital.check_crc32_many(buf, offsets)), expected[:-1])
+
+    def test05_many_array(self):
+        rows = numpy.random.randint(0, 256, (50, 64)).astype(numpy.uint8)
+        pkts = digital.gen_and_append_crc32_many(rows)
+        self.assertEqual(pkts.shape, (50, 68))
+        self.assertTrue(digital.check_crc32_many(pkts).all())
+        self.assertEqual(pkts[7].tostring(), digital.gen_and_append_crc32(rows[7].tostring()))
+
 if __name__ == '__main__':
     gr_unittest.run(test_crc32, "test_crc32.xml")
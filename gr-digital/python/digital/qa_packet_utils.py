@@ -0,0 +1,73 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+import random
+
+from gnuradio import gr, gr_unittest, digital
+from gnuradio.digital import packet_utils
+
+def random_string(n):
+    return ''.join(chr(random.randint(0, 255)) for i in range(n))
+
+class test_packet_utils(gr_unittest.TestCase):
+
+    def test_001_conv_strings(self):
+        s = random_string(37)
+        bits = packet_utils.conv_packed_binary_string_to_1_0_string(s)
+        self.assertEqual(len(bits), 8*len(s))
+        self.assertEqual(packet_utils.conv_1_0_string_to_packed_binary_string(bits), (s, False))
+        self.assertEqual(packet_utils.conv_1_0_string_to_packed_binary_string('101011110'),
+                         ('\x01\x5e', True))
+        self.assertRaises(ValueError, packet_utils.conv_1_0_string_to_packed_binary_string, '012')
+
+    def test_002_make_packets(self):
+        payloads = [random_string(random.choice((0, 10, 100, 1500))) for i in range(40)]
+        offsets = [random.randint(0, 15) for p in payloads]
+        for whitening in (True, False):
+            pkts = packet_utils.make_packets(payloads, 2, 1, whitener_offset=offsets,
+                                             whitening=whitening)
+            for payload, offset, pkt in zip(payloads, offsets, pkts):
+                self.assertEqual(pkt, packet_utils.make_packet(payload, 2, 1,
+                                                               whitener_offset=offset,
+                                                               whitening=whitening))
+
+    def test_003_unmake_packets(self):
+        payloads = [random_string(random.choice((0, 10, 100))) for i in range(40)]
+        offsets = [random.randint(0, 15) for p in payloads]
+        bodies = [packet_utils.whiten(digital.gen_and_append_crc32(p), o)
+                  for p, o in zip(payloads, offsets)]
+        bodies[0] = bodies[0][:-1] + chr(ord(bodies[0][-1]) ^ 0x01)
+        result = packet_utils.unmake_packets(bodies, offsets)
+        self.assertEqual(result[0][0], False)
+        self.assertEqual(result[1:], [(True, p) for p in payloads[1:]])
+
+    def test_004_packet_array(self):
+        payloads = random_string(64*100)
+        pkts = packet_utils.make_packet_array(buffer(payloads), 2, 1, pad_for_usrp=False,
+                                              whitener_offset=5, payload_len=100)
+        self.assertEqual(pkts.shape[0], 64)
+        ok, data = packet_utils.unmake_packet_array(pkts[:,14:-1], whitener_offset=5)
+        self.assertTrue(ok.all())
+        self.assertEqual(data.tostring(), payloads)
+
+if __name__ == '__main__':
+    gr_unittest.run(test_packet_utils, "test_packet_utils.xml")
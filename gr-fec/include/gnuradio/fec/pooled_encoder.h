@@ -0,0 +1,97 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2014 Free Software Foundation, Inc.
+ *
+ * This file is part of GNU Radio
+ *
+ * GNU Radio is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * GNU Radio is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GNU Radio; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_FEC_POOLED_ENCODER_H
+#define INCLUDED_FEC_POOLED_ENCODER_H
+
+#include <gnuradio/fec/api.h>
+#include <gnuradio/fec/generic_encoder.h>
+#include <gnuradio/block.h>
+#include <boost/shared_ptr.hpp>
+#include <vector>
+
+namespace gr {
+  namespace fec {
+
+    /*!
+     * \brief FEC encoder block running a set of encoder variable
+     * objects on a pool of threads.
+     *
+     * \ingroup error_coding_blk
+     *
+     * \details
+     * Like fec.threaded_encoder, this block splits the stream into
+     * frames and encodes them in parallel, one thread per encoder
+     * object. Instead of a fixed deinterleave/interleave tree,
+     * frames go into a shared queue and are taken by whichever
+     * thread is free, so frames that take longer to encode only
+     * hold up their own thread. Frames are put back in order on the
+     * output. Any number of encoder objects may be used.
+     *
+     * The utilization of each thread and the depth of the frame
+     * queue can be read from the block while it runs.
+     */
+    class FEC_API pooled_encoder : virtual public block
+    {
+    public:
+      typedef boost::shared_ptr<pooled_encoder> sptr;
+
+      /*!
+       * Build the pooled encoder block.
+       *
+       * \param encoders The encoder variable objects, one per thread; all
+       *        must have the same frame sizes.
+       * \param input_item_size The size of the input items (often the
+       *        encoder object is used to determine this).
+       * \param output_item_size The size of the output items (often the
+       *        encoder object is used to determine this).
+       * \param queue_size The most frames in flight, 0 for four per
+       *        thread.
+       */
+      static sptr make(std::vector<generic_encoder::sptr> encoders,
+                       size_t input_item_size,
+                       size_t output_item_size,
+                       int queue_size=0);
+
+      //! Number of encoder threads.
+      virtual int nthreads() = 0;
+
+      //! Fraction of the time since start each thread spent in generic_work.
+      virtual std::vector<float> utilization() = 0;
+
+      //! Frames encoded by each thread since start.
+      virtual std::vector<int> frames() = 0;
+
+      //! Frames waiting for a free thread.
+      virtual int queue_depth() = 0;
+
+      //! Most frames that were waiting for a free thread at once.
+      virtual int max_queue_depth() = 0;
+
+      //! Restart the utilization, frame and queue statistics.
+      virtual void reset_stats() = 0;
+    };
+
+  } /* namespace fec */
+} /* namespace gr */
+
+#endif /* INCLUDED_FEC_POOLED_ENCODER_H */
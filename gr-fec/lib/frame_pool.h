@@ -0,0 +1,288 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2014 Free Software Foundation, Inc.
+ *
+ * This file is part of GNU Radio
+ *
+ * GNU Radio is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * GNU Radio is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GNU Radio; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_FEC_FRAME_POOL_H
+#define INCLUDED_FEC_FRAME_POOL_H
+
+#include <gnuradio/thread/thread.h>
+#include <gnuradio/thread/thread_group.h>
+#include <gnuradio/high_res_timer.h>
+#include <boost/bind.hpp>
+#include <boost/cstdint.hpp>
+#include <algorithm>
+#include <cstring>
+#include <deque>
+#include <map>
+#include <vector>
+
+namespace gr {
+  namespace fec {
+
+    /*!
+     * \brief Runs frames through a set of FECAPI coder objects, one
+     * thread per object.
+     *
+     * Frames are copied into a shared queue and taken by whichever
+     * thread is free, so a slow frame only holds up its own thread.
+     * Finished frames are handed back in the order they were
+     * submitted. Each coder object is only ever used by its own
+     * thread.
+     */
+    template<class coder_sptr>
+    class frame_pool
+    {
+    public:
+      struct frame {
+        boost::uint64_t seq;
+        int worker;
+        std::vector<char> in;
+        std::vector<char> out;
+      };
+
+    private:
+      std::vector<coder_sptr> d_coders;
+      size_t d_in_bytes;
+      size_t d_out_bytes;
+      int d_max_frames;
+
+      gr::thread::mutex d_mutex;
+      gr::thread::condition_variable d_queued;
+      gr::thread::condition_variable d_finished;
+      gr::thread::thread_group d_threads;
+      bool d_running;
+
+      std::deque<frame*> d_queue;                   // waiting for a thread
+      std::map<boost::uint64_t, frame*> d_done;     // waiting for the output
+      std::vector<frame*> d_free;
+      boost::uint64_t d_next_in;
+      boost::uint64_t d_next_out;
+
+      std::vector<gr::high_res_timer_type> d_busy;
+      std::vector<int> d_frames;
+      gr::high_res_timer_type d_start_time;
+      int d_max_depth;
+
+      void run(int worker)
+      {
+        gr::thread::scoped_lock lock(d_mutex);
+        while(true) {
+          while(d_running && d_queue.empty())
+            d_queued.wait(lock);
+          if(!d_running)
+            return;
+          frame *f = d_queue.front();
+          d_queue.pop_front();
+
+          lock.unlock();
+          gr::high_res_timer_type t0 = gr::high_res_timer_now();
+          d_coders[worker]->generic_work((void*)&f->in[0], (void*)&f->out[0]);
+          gr::high_res_timer_type t1 = gr::high_res_timer_now();
+          lock.lock();
+
+          f->worker = worker;
+          d_busy[worker] += t1 - t0;
+          d_frames[worker]++;
+          d_done[f->seq] = f;
+          d_finished.notify_all();
+        }
+      }
+
+      void release(frame *f)
+      {
+        d_free.push_back(f);
+      }
+
+    public:
+      frame_pool(const std::vector<coder_sptr> &coders,
+                 size_t in_bytes, size_t out_bytes, int max_frames)
+        : d_coders(coders), d_in_bytes(in_bytes), d_out_bytes(out_bytes),
+          d_max_frames(std::max(max_frames, (int)coders.size())),
+          d_running(false), d_next_in(0), d_next_out(0),
+          d_busy(coders.size(), 0), d_frames(coders.size(), 0),
+          d_start_time(gr::high_res_timer_now()), d_max_depth(0)
+      {
+      }
+
+      ~frame_pool()
+      {
+        stop();
+        for(size_t i = 0; i < d_free.size(); i++)
+          delete d_free[i];
+      }
+
+      void start()
+      {
+        gr::thread::scoped_lock lock(d_mutex);
+        if(d_running)
+          return;
+        d_running = true;
+        d_start_time = gr::high_res_timer_now();
+        for(size_t i = 0; i < d_coders.size(); i++)
+          d_threads.create_thread(boost::bind(&frame_pool::run, this, (int)i));
+      }
+
+      /*!
+       * Stop the threads; frames not handed back yet are dropped.
+       */
+      void stop()
+      {
+        {
+          gr::thread::scoped_lock lock(d_mutex);
+          if(!d_running)
+            return;
+          d_running = false;
+          d_queued.notify_all();
+          d_finished.notify_all();
+        }
+        d_threads.join_all();
+
+        gr::thread::scoped_lock lock(d_mutex);
+        for(size_t i = 0; i < d_queue.size(); i++)
+          release(d_queue[i]);
+        d_queue.clear();
+        typename std::map<boost::uint64_t, frame*>::iterator it;
+        for(it = d_done.begin(); it != d_done.end(); it++)
+          release(it->second);
+        d_done.clear();
+        d_next_out = d_next_in;
+      }
+
+      //! Number of frames submitted and not handed back yet.
+      int outstanding()
+      {
+        gr::thread::scoped_lock lock(d_mutex);
+        return (int)(d_next_in - d_next_out);
+      }
+
+      /*!
+       * Queue up to \p nframes frames of \p in_bytes bytes each.
+       * \return the number of frames queued
+       */
+      int submit(const char *in, int nframes)
+      {
+        gr::thread::scoped_lock lock(d_mutex);
+        int n = std::min(nframes, d_max_frames - (int)(d_next_in - d_next_out));
+        for(int i = 0; i < n; i++) {
+          frame *f;
+          if(d_free.empty()) {
+            f = new frame;
+            f->in.resize(d_in_bytes);
+            f->out.resize(d_out_bytes);
+          }
+          else {
+            f = d_free.back();
+            d_free.pop_back();
+          }
+          memcpy(&f->in[0], in + i*d_in_bytes, d_in_bytes);
+          f->seq = d_next_in++;
+          d_queue.push_back(f);
+        }
+        d_max_depth = std::max(d_max_depth, (int)d_queue.size());
+        if(n > 0)
+          d_queued.notify_all();
+        return n;
+      }
+
+      /*!
+       * Copy up to \p nframes finished frames, in order, to \p out.
+       *
+       * When \p block is set and frames are outstanding, waits until
+       * at least the next frame in order is finished.
+       *
+       * \param workers gets the thread that coded each frame
+       * \return the number of frames copied
+       */
+      int collect(char *out, int nframes, bool block, std::vector<int> &workers)
+      {
+        gr::thread::scoped_lock lock(d_mutex);
+        workers.clear();
+        if(block && nframes > 0) {
+          while(d_running && d_next_out < d_next_in && d_done.count(d_next_out) == 0)
+            d_finished.wait(lock);
+        }
+
+        int n = 0;
+        typename std::map<boost::uint64_t, frame*>::iterator it;
+        while(n < nframes && (it = d_done.find(d_next_out)) != d_done.end()) {
+          frame *f = it->second;
+          memcpy(out + n*d_out_bytes, &f->out[0], d_out_bytes);
+          workers.push_back(f->worker);
+          d_done.erase(it);
+          release(f);
+          d_next_out++;
+          n++;
+        }
+        return n;
+      }
+
+      int nthreads() const
+      {
+        return (int)d_coders.size();
+      }
+
+      const std::vector<coder_sptr> &coders() const
+      {
+        return d_coders;
+      }
+
+      std::vector<float> utilization()
+      {
+        gr::thread::scoped_lock lock(d_mutex);
+        double elapsed = (double)(gr::high_res_timer_now() - d_start_time);
+        std::vector<float> util(d_busy.size(), 0);
+        for(size_t i = 0; i < d_busy.size() && elapsed > 0; i++)
+          util[i] = d_busy[i]/elapsed;
+        return util;
+      }
+
+      std::vector<int> frames()
+      {
+        gr::thread::scoped_lock lock(d_mutex);
+        return d_frames;
+      }
+
+      int queue_depth()
+      {
+        gr::thread::scoped_lock lock(d_mutex);
+        return (int)d_queue.size();
+      }
+
+      int max_queue_depth()
+      {
+        gr::thread::scoped_lock lock(d_mutex);
+        return d_max_depth;
+      }
+
+      void reset_stats()
+      {
+        gr::thread::scoped_lock lock(d_mutex);
+        std::fill(d_busy.begin(), d_busy.end(), 0);
+        std::fill(d_frames.begin(), d_frames.end(), 0);
+        d_start_time = gr::high_res_timer_now();
+        d_max_depth = (int)d_queue.size();
+      }
+    };
+
+  } /* namespace fec */
+} /* namespace gr */
+
+#endif /* INCLUDED_FEC_FRAME_POOL_H */
@@ -0,0 +1,170 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2014 Free Software Foundation, Inc.
+ *
+ * This file is part of GNU Radio
+ *
+ * GNU Radio is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * GNU Radio is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GNU Radio; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include "pooled_decoder_impl.h"
+#include <gnuradio/io_signature.h>
+#include <stdexcept>
+
+namespace gr {
+  namespace fec {
+
+    static void
+    check_decoders(const std::vector<generic_decoder::sptr> &decoders)
+    {
+      if(decoders.empty())
+        throw std::invalid_argument("pooled_decoder: at least one decoder is required");
+      for(size_t i = 1; i < decoders.size(); i++) {
+        if(decoders[i]->get_input_size() != decoders[0]->get_input_size() ||
+           decoders[i]->get_output_size() != decoders[0]->get_output_size())
+          throw std::invalid_argument("pooled_decoder: all decoders must have the same frame sizes");
+      }
+      if(decoders[0]->get_history() != 0)
+        throw std::invalid_argument("pooled_decoder: decoders with history are not supported");
+    }
+
+    pooled_decoder::sptr
+    pooled_decoder::make(std::vector<generic_decoder::sptr> decoders,
+                        size_t input_item_size,
+                        size_t output_item_size,
+                        int queue_size)
+    {
+      // validate before the constructor reads decoders[0]
+      check_decoders(decoders);
+      return gnuradio::get_initial_sptr
+        (new pooled_decoder_impl(decoders, input_item_size,
+                                output_item_size, queue_size));
+    }
+
+    pooled_decoder_impl::pooled_decoder_impl(std::vector<generic_decoder::sptr> decoders,
+                                           size_t input_item_size,
+                                           size_t output_item_size,
+                                           int queue_size)
+      : block("fec_pooled_decoder",
+              io_signature::make(1, 1, input_item_size),
+              io_signature::make(1, 1, output_item_size)),
+        d_pool(decoders,
+               decoders[0]->get_input_size()*input_item_size,
+               decoders[0]->get_output_size()*output_item_size,
+               queue_size > 0 ? queue_size : 4*decoders.size()),
+        d_input_frame(decoders[0]->get_input_size()),
+        d_output_frame(decoders[0]->get_output_size())
+    {
+      set_relative_rate((double)d_output_frame/d_input_frame);
+      set_output_multiple(d_output_frame);
+    }
+
+    pooled_decoder_impl::~pooled_decoder_impl()
+    {
+    }
+
+    bool
+    pooled_decoder_impl::start()
+    {
+      d_pool.start();
+      return block::start();
+    }
+
+    bool
+    pooled_decoder_impl::stop()
+    {
+      d_pool.stop();
+      return block::stop();
+    }
+
+    int
+    pooled_decoder_impl::nthreads()
+    {
+      return d_pool.nthreads();
+    }
+
+    std::vector<float>
+    pooled_decoder_impl::utilization()
+    {
+      return d_pool.utilization();
+    }
+
+    std::vector<int>
+    pooled_decoder_impl::frames()
+    {
+      return d_pool.frames();
+    }
+
+    int
+    pooled_decoder_impl::queue_depth()
+    {
+      return d_pool.queue_depth();
+    }
+
+    int
+    pooled_decoder_impl::max_queue_depth()
+    {
+      return d_pool.max_queue_depth();
+    }
+
+    void
+    pooled_decoder_impl::reset_stats()
+    {
+      d_pool.reset_stats();
+    }
+
+    void
+    pooled_decoder_impl::forecast(int noutput_items,
+                                 gr_vector_int& ninput_items_required)
+    {
+      // frames in flight can be handed out without new input
+      if(d_pool.outstanding() > 0)
+        ninput_items_required[0] = 0;
+      else
+        ninput_items_required[0] = noutput_items/d_output_frame*d_input_frame;
+    }
+
+    int
+    pooled_decoder_impl::general_work(int noutput_items,
+                                     gr_vector_int& ninput_items,
+                                     gr_vector_const_void_star &input_items,
+                                     gr_vector_void_star &output_items)
+    {
+      const char *in = (const char*)input_items[0];
+      char *out = (char*)output_items[0];
+
+      int queued = d_pool.submit(in, ninput_items[0]/d_input_frame);
+      consume_each(queued*d_input_frame);
+
+      // the scheduler is not woken up when a thread finishes a frame,
+      // so wait for one unless new frames were queued
+      int nframes = d_pool.collect(out, noutput_items/d_output_frame,
+                                   queued == 0, d_workers);
+
+      for(int i = 0; i < nframes; i++) {
+        add_item_tag(0, nitems_written(0) + (i+1)*d_output_frame,
+                     pmt::intern(d_pool.coders()[d_workers[i]]->alias()),
+                     pmt::PMT_T, pmt::intern(alias()));
+      }
+      return nframes*d_output_frame;
+    }
+
+  } /* namespace fec */
+} /* namespace gr */
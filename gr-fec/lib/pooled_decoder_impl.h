@@ -0,0 +1,68 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2014 Free Software Foundation, Inc.
+ *
+ * This file is part of GNU Radio
+ *
+ * GNU Radio is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * GNU Radio is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GNU Radio; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifndef INCLUDED_FEC_POOLED_DECODER_IMPL_H
+#define INCLUDED_FEC_POOLED_DECODER_IMPL_H
+
+#include <gnuradio/fec/pooled_decoder.h>
+#include "frame_pool.h"
+
+namespace gr {
+  namespace fec {
+
+    class FEC_API pooled_decoder_impl : public pooled_decoder
+    {
+    private:
+      frame_pool<generic_decoder::sptr> d_pool;
+      int d_input_frame;
+      int d_output_frame;
+      std::vector<int> d_workers;
+
+    public:
+      pooled_decoder_impl(std::vector<generic_decoder::sptr> decoders,
+                         size_t input_item_size,
+                         size_t output_item_size,
+                         int queue_size);
+      ~pooled_decoder_impl();
+
+      bool start();
+      bool stop();
+
+      int nthreads();
+      std::vector<float> utilization();
+      std::vector<int> frames();
+      int queue_depth();
+      int max_queue_depth();
+      void reset_stats();
+
+      void forecast(int noutput_items,
+                    gr_vector_int& ninput_items_required);
+      int general_work(int noutput_items,
+                       gr_vector_int& ninput_items,
+                       gr_vector_const_void_star &input_items,
+                       gr_vector_void_star &output_items);
+    };
+
+  } /* namespace fec */
+} /* namespace gr */
+
+#endif /* INCLUDED_FEC_POOLED_DECODER_IMPL_H */
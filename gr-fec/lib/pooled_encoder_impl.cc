@@ -0,0 +1,163 @@
+/* -*- c++ -*- */
+/*
+ * Copyright 2014 Free Software Foundation, Inc.
+ *
+ * This file is part of GNU Radio
+ *
+ * GNU Radio is free software; you can redistribute it and/or modify
+ * it under the terms of the GNU General Public License as published by
+ * the Free Software Foundation; either version 3, or (at your option)
+ * any later version.
+ *
+ * GNU Radio is distributed in the hope that it will be useful,
+ * but WITHOUT ANY WARRANTY; without even the implied warranty of
+ * MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+ * GNU General Public License for more details.
+ *
+ * You should have received a copy of the GNU General Public License
+ * along with GNU Radio; see the file COPYING.  If not, write to
+ * the Free Software Foundation, Inc., 51 Franklin Street,
+ * Boston, MA 02110-1301, USA.
+ */
+
+#ifdef HAVE_CONFIG_H
+#include "config.h"
+#endif
+
+#include "pooled_encoder_impl.h"
+#include <gnuradio/io_signature.h>
+#include <stdexcept>
+
+namespace gr {
+  namespace fec {
+
+    static void
+    check_encoders(const std::vector<generic_encoder::sptr> &encoders)
+    {
+      if(encoders.empty())
+        throw std::invalid_argument("pooled_encoder: at least one encoder is required");
+      for(size_t i = 1; i < encoders.size(); i++) {
+        if(encoders[i]->get_input_size() != encoders[0]->get_input_size() ||
+           encoders[i]->get_output_size() != encoders[0]->get_output_size())
+          throw std::invalid_argument("pooled_encoder: all encoders must have the same frame sizes");
+      }
+    }
+
+    pooled_encoder::sptr
+    pooled_encoder::make(std::vector<generic_encoder::sptr> encoders,
+                        size_t input_item_size,
+                        size_t output_item_size,
+                        int queue_size)
+    {
+      // validate before the constructor reads encoders[0]
+      check_encoders(encoders);
+      return gnuradio::get_initial_sptr
+        (new pooled_encoder_impl(encoders, input_item_size,
+                                output_item_size, queue_size));
+    }
+
+    pooled_encoder_impl::pooled_encoder_impl(std::vector<generic_encoder::sptr> encoders,
+                                           size_t input_item_size,
+                                           size_t output_item_size,
+                                           int queue_size)
+      : block("fec_pooled_encoder",
+              io_signature::make(1, 1, input_item_size),
+              io_signature::make(1, 1, output_item_size)),
+        d_pool(encoders,
+               encoders[0]->get_input_size()*input_item_size,
+               encoders[0]->get_output_size()*output_item_size,
+               queue_size > 0 ? queue_size : 4*encoders.size()),
+        d_input_frame(encoders[0]->get_input_size()),
+        d_output_frame(encoders[0]->get_output_size())
+    {
+      set_relative_rate((double)d_output_frame/d_input_frame);
+      set_output_multiple(d_output_frame);
+    }
+
+    pooled_encoder_impl::~pooled_encoder_impl()
+    {
+    }
+
+    bool
+    pooled_encoder_impl::start()
+    {
+      d_pool.start();
+      return block::start();
+    }
+
+    bool
+    pooled_encoder_impl::stop()
+    {
+      d_pool.stop();
+      return block::stop();
+    }
+
+    int
+    pooled_encoder_impl::nthreads()
+    {
+      return d_pool.nthreads();
+    }
+
+    std::vector<float>
+    pooled_encoder_impl::utilization()
+    {
+      return d_pool.utilization();
+    }
+
+    std::vector<int>
+    pooled_encoder_impl::frames()
+    {
+      return d_pool.frames();
+    }
+
+    int
+    pooled_encoder_impl::queue_depth()
+    {
+      return d_pool.queue_depth();
+    }
+
+    int
+    pooled_encoder_impl::max_queue_depth()
+    {
+      return d_pool.max_queue_depth();
+    }
+
+    void
+    pooled_encoder_impl::reset_stats()
+    {
+      d_pool.reset_stats();
+    }
+
+    void
+    pooled_encoder_impl::forecast(int noutput_items,
+                                 gr_vector_int& ninput_items_required)
+    {
+      // frames in flight can be handed out without new input
+      if(d_pool.outstanding() > 0)
+        ninput_items_required[0] = 0;
+      else
+        ninput_items_required[0] = noutput_items/d_output_frame*d_input_frame;
+    }
+
+    int
+    pooled_encoder_impl::general_work(int noutput_items,
+                                     gr_vector_int& ninput_items,
+                                     gr_vector_const_void_star &input_items,
+                                     gr_vector_void_star &output_items)
+    {
+      const char *in = (const char*)input_items[0];
+      char *out = (char*)output_items[0];
+
+      int queued = d_pool.submit(in, ninput_items[0]/d_input_frame);
+      consume_each(queued*d_input_frame);
+
+      // the scheduler is not woken up when a thread finishes a frame,
+      // so wait for one unless new frames were queued
+      int nframes = d_pool.collect(out, noutput_items/d_output_frame,
+                                   queued == 0, d_workers);
+
+      return nframes*d_output_frame;
+    }
+
+  } /* namespace fec */
+} /* namespace gr */
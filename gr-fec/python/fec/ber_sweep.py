@@ -0,0 +1,291 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+"""
+Parallel BER curve simulation.
+
+Unlike bercurve_generator, which runs every Es/N0 point in a single
+flowgraph, a ber_sweep runs each point as a series of trials, and each
+trial is a small independent flowgraph (random bytes -> fec_test ->
+vector sinks) in a pool of worker processes. Trials of all points are
+interleaved so the pool stays busy, and a point stops getting new
+trials once it has seen target_errors bit errors, reached max_bits, or
+its confidence interval is narrow enough. Results are written to the
+output file as each point finishes.
+
+Encoder and decoder objects cannot be sent to other processes, so they
+are built in the workers by calling make_encoder(esno) and
+make_decoder(esno) for every trial.
+"""
+
+import csv
+import math
+import multiprocessing
+import os
+
+import numpy
+
+from gnuradio import gr, blocks
+from fec_test import fec_test
+
+#sweep being run, inherited by the worker processes when the pool forks
+_sweep = None
+
+def _run_trial(args):
+    return _sweep.run_trial(*args)
+
+def z_score(confidence):
+    """
+    Two sided standard normal quantile for a confidence level,
+    found by bisection of math.erf.
+    """
+    lo, hi = 0.0, 40.0
+    for i in range(100):
+        mid = 0.5*(lo + hi)
+        if math.erf(mid/math.sqrt(2.0)) < confidence: lo = mid
+        else: hi = mid
+    return 0.5*(lo + hi)
+
+def wilson_interval(errors, bits, confidence=0.95):
+    """
+    Wilson score interval of a bit error rate.
+
+    Returns:
+        (low, high) bounds of the BER
+    """
+    if bits == 0: return (0.0, 1.0)
+    z = z_score(confidence)
+    p = float(errors)/bits
+    denom = 1.0 + z*z/bits
+    center = (p + z*z/(2.0*bits))/denom
+    half = z*math.sqrt(p*(1.0 - p)/bits + z*z/(4.0*bits*bits))/denom
+    return (max(0.0, center - half), min(1.0, center + half))
+
+class ber_point(object):
+    """
+    Accumulated results of one Es/N0 point.
+    """
+
+    def __init__(self, index, esno):
+        self.index = index
+        self.esno = esno
+        self.bits = 0
+        self.errors = 0
+        self.trials = 0
+        self.running = 0
+        self.done = False
+
+    def ber(self):
+        if self.bits == 0: return 0.0
+        return float(self.errors)/self.bits
+
+    def result(self, confidence):
+        low, high = wilson_interval(self.errors, self.bits, confidence)
+        return {
+            'esno' : self.esno,
+            'bits' : self.bits,
+            'errors' : self.errors,
+            'ber' : self.ber(),
+            'ber_low' : low,
+            'ber_high' : high,
+            'trials' : self.trials,
+        }
+
+class ber_sweep(object):
+
+    FIELDS = ('esno', 'bits', 'errors', 'ber', 'ber_low', 'ber_high', 'trials')
+
+    def __init__(self, make_encoder, make_decoder, esno=numpy.arange(0.0, 3.0, .25),
+                 trial_bytes=12500, target_errors=100, max_bits=10000000,
+                 confidence=0.95, rel_precision=None, jobs=None, seed=0,
+                 threading=None, puncpat='11', samp_rate=3200000, output=None):
+        """
+        Args:
+            make_encoder: called with the Es/N0 of a point, returns the
+                          generic encoder (or list of encoders) for fec_test
+            make_decoder: same for the generic decoder
+            esno: the Es/N0 points in dB
+            trial_bytes: random bytes sent through the chain per trial
+            target_errors: stop a point after this many bit errors
+            max_bits: stop a point after this many bits
+            confidence: confidence level of the reported BER interval
+            rel_precision: also stop a point once the half width of its
+                           interval is below this fraction of the BER
+            jobs: worker processes, default is the number of CPUs; with
+                  1 the trials run in this process
+            seed: base seed for the data and the noise of all trials
+            threading: fec_test threading, usually None since the
+                       sweep is already parallel across processes
+            output: file to write the results to as points finish, a
+                    .npy file gets a numpy record array (in 'results'
+                    for .npz) and any other name gets a CSV file
+        """
+        self.make_encoder = make_encoder
+        self.make_decoder = make_decoder
+        self.esno = list(esno)
+        self.trial_bytes = trial_bytes
+        self.target_errors = target_errors
+        self.max_bits = max_bits
+        self.confidence = confidence
+        self.rel_precision = rel_precision
+        self.jobs = jobs or multiprocessing.cpu_count()
+        self.seed = seed
+        self.threading = threading
+        self.puncpat = puncpat
+        self.samp_rate = samp_rate
+        self.output = output
+        self.points = [ber_point(i, e) for i, e in enumerate(self.esno)]
+        self._finished = list()
+
+    def run_trial(self, index, trial):
+        """
+        Run one trial of a point in a flowgraph of its own.
+
+        Returns:
+            (index, bits, errors)
+        """
+        esno = self.esno[index]
+        rng = numpy.random.RandomState([self.seed, index, trial])
+        data = rng.randint(0, 256, self.trial_bytes)
+        noise_seed = int(rng.randint(1, 2**31 - 1))
+
+        tb = gr.top_block()
+        src = blocks.vector_source_b(map(int, data), False)
+        test = fec_test(generic_encoder=self.make_encoder(esno),
+                        generic_decoder=self.make_decoder(esno),
+                        esno=esno, samp_rate=self.samp_rate,
+                        threading=self.threading, puncpat=self.puncpat,
+                        seed=noise_seed)
+        snk_decoded = blocks.vector_sink_b()
+        snk_sent = blocks.vector_sink_b()
+        tb.connect(src, test)
+        tb.connect((test, 0), snk_decoded)
+        tb.connect((test, 1), snk_sent)
+        tb.run()
+
+        #the decoder drops a trailing partial frame
+        decoded = numpy.array(snk_decoded.data(), dtype=numpy.uint8)
+        sent = numpy.array(snk_sent.data(), dtype=numpy.uint8)[:len(decoded)]
+        errors = int(numpy.unpackbits(decoded ^ sent).sum())
+        return (index, 8*len(decoded), errors)
+
+    def point_done(self, point):
+        """
+        Check the stopping rules of a point.
+        """
+        if point.bits >= self.max_bits: return True
+        if point.errors >= self.target_errors: return True
+        if self.rel_precision is not None and point.errors > 0:
+            low, high = wilson_interval(point.errors, point.bits, self.confidence)
+            if 0.5*(high - low) <= self.rel_precision*point.ber(): return True
+        return False
+
+    def run(self):
+        """
+        Run the sweep until every point is done.
+
+        Returns:
+            list of result dictionaries, one per Es/N0 point
+        """
+        global _sweep
+        _sweep = self
+        self._finished = list()
+        self._start_output()
+        if self.jobs <= 1:
+            for point in self.points:
+                while not point.done:
+                    self._update(*self.run_trial(point.index, point.trials))
+        else:
+            #fork after setting _sweep so the workers see it
+            pool = multiprocessing.Pool(self.jobs)
+            try:
+                self._run_pool(pool)
+            finally:
+                pool.terminate()
+                pool.join()
+        return self.results()
+
+    def results(self):
+        return [point.result(self.confidence) for point in self.points]
+
+    def _run_pool(self, pool):
+        pending = list()
+        next_trial = dict((point.index, 0) for point in self.points)
+        while True:
+            #keep jobs trials in flight, the points with the fewest bits first
+            candidates = sorted((p for p in self.points if not p.done),
+                                key=lambda p: (p.bits + p.running*8*self.trial_bytes, p.index))
+            while candidates and len(pending) < self.jobs:
+                point = candidates[0]
+                pending.append(pool.apply_async(_run_trial, ((point.index, next_trial[point.index]),)))
+                next_trial[point.index] += 1
+                point.running += 1
+                candidates.sort(key=lambda p: (p.bits + p.running*8*self.trial_bytes, p.index))
+            if not pending: return
+            pending[0].wait(0.01)
+            for result in [r for r in pending if r.ready()]:
+                pending.remove(result)
+                index, bits, errors = result.get()
+                self.points[index].running -= 1
+                self._update(index, bits, errors)
+
+    def _update(self, index, bits, errors):
+        point = self.points[index]
+        #trials still in flight when a point finished are dropped, so
+        #the results match what was written out
+        if point.done: return
+        point.bits += bits
+        point.errors += errors
+        point.trials += 1
+        if bits == 0:
+            raise RuntimeError("Es/N0 %g: a trial decoded no data, check that trial_bytes holds at least one frame" % point.esno)
+        if self.point_done(point):
+            point.done = True
+            self._finished.append(point)
+            self._write_output()
+
+    def _start_output(self):
+        if self.output is None: return
+        if not self._numpy_output():
+            with open(self.output, 'wb') as f:
+                csv.writer(f).writerow(self.FIELDS)
+
+    def _numpy_output(self):
+        return os.path.splitext(self.output)[1] in ('.npy', '.npz')
+
+    def _write_output(self):
+        if self.output is None: return
+        point = self._finished[-1]
+        if not self._numpy_output():
+            with open(self.output, 'ab') as f:
+                result = point.result(self.confidence)
+                csv.writer(f).writerow([result[field] for field in self.FIELDS])
+            return
+        #numpy files cannot be appended to, rewrite with every finished point
+        records = numpy.array(
+            [tuple(p.result(self.confidence)[field] for field in self.FIELDS) for p in self._finished],
+            dtype=[(field, numpy.float64) for field in self.FIELDS])
+        tmp = self.output + '.tmp'
+        with open(tmp, 'wb') as f:
+            if self.output.endswith('.npz'): numpy.savez(f, results=records)
+            else: numpy.save(f, records)
+        os.rename(tmp, self.output)
@@ -161,6 +161,11 @@ class extended_decoder(gr.hier_block2):
                                                 fec.get_decoder_input_item_size(decoder_obj_list[0]),
                                                 fec.get_decoder_output_item_size(decoder_obj_list[0])))
 
+        elif threading == 'pooled':
+            self.blocks.append(fec.pooled_decoder(decoder_obj_list,
+                                                  fec.get_decoder_input_item_size(decoder_obj_list[0]),
+                                                  fec.get_decoder_output_item_size(decoder_obj_list[0])))
+
         else:
             self.blocks.append(fec.decoder(decoder_obj_list[0],
                                            fec.get_decoder_input_item_size(decoder_obj_list[0]),
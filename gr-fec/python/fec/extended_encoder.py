@@ -55,6 +55,10 @@ class extended_encoder(gr.hier_block2):
             self.blocks.append(threaded_encoder(encoder_obj_list,
                                                 gr.sizeof_char,
                                                 gr.sizeof_char))
+        elif threading == 'pooled':
+            self.blocks.append(fec.pooled_encoder(encoder_obj_list,
+                                                  gr.sizeof_char,
+                                                  gr.sizeof_char))
         else:
             self.blocks.append(fec.encoder(encoder_obj_list[0],
                                            gr.sizeof_char,
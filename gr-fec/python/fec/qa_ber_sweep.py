@@ -0,0 +1,74 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr, gr_unittest
+import fec_swig as fec
+import ber_sweep
+import os
+import tempfile
+
+frame_size = 30
+
+def make_encoder(esno):
+    return fec.dummy_encoder_make(frame_size*8)
+
+def make_decoder(esno):
+    return fec.dummy_decoder.make(frame_size*8)
+
+class test_ber_sweep(gr_unittest.TestCase):
+
+    def test_000_interval(self):
+        self.assertAlmostEqual(ber_sweep.z_score(0.95), 1.959964, 5)
+        low, high = ber_sweep.wilson_interval(10, 1000)
+        self.assertTrue(low < 0.01 < high)
+        self.assertEqual(ber_sweep.wilson_interval(0, 0), (0.0, 1.0))
+
+    def test_001_max_bits(self):
+        sweep = ber_sweep.ber_sweep(make_encoder, make_decoder, esno=[20.0],
+                                    trial_bytes=10*frame_size, target_errors=100,
+                                    max_bits=3*80*frame_size, jobs=1)
+        results = sweep.run()
+        self.assertEqual(len(results), 1)
+        self.assertEqual(results[0]['trials'], 3)
+        self.assertEqual(results[0]['bits'], 3*80*frame_size)
+        self.assertEqual(results[0]['errors'], 0)
+
+    def test_002_target_errors(self):
+        fd, output = tempfile.mkstemp(suffix='.csv')
+        os.close(fd)
+        try:
+            sweep = ber_sweep.ber_sweep(make_encoder, make_decoder, esno=[-10.0, 0.0],
+                                        trial_bytes=10*frame_size, target_errors=50,
+                                        max_bits=10**6, jobs=2, output=output)
+            results = sweep.run()
+            for result in results:
+                self.assertTrue(result['errors'] >= 50)
+                self.assertTrue(result['ber_low'] <= result['ber'] <= result['ber_high'])
+            self.assertTrue(results[0]['ber'] > results[1]['ber'])
+            lines = open(output).read().split()
+            self.assertEqual(lines[0], ','.join(ber_sweep.ber_sweep.FIELDS))
+            self.assertEqual(len(lines), 3)
+        finally:
+            os.remove(output)
+
+if __name__ == '__main__':
+    gr_unittest.run(test_ber_sweep, "test_ber_sweep.xml")
@@ -20,7 +20,7 @@
 # Boston, MA 02110-1301, USA.
 #
 
-from gnuradio import gr, gr_unittest
+from gnuradio import gr, gr_unittest, blocks
 import fec_swig as fec
 from _qa_helper import _qa_helper
 
@@ -186,5 +186,52 @@ class test_fecapi_dummy(gr_unittest.TestCase):
 
         self.assertRaises(AttributeError, lambda: extended_decoder(dec, threading=threading, puncpat="11"))
 
+    def test_parallelism0_03(self):
+        frame_size = 30
+        enc = fec.dummy_encoder_make(frame_size*8)
+        dec = fec.dummy_decoder.make(frame_size*8)
+        threading = 'pooled'
+        self.test = _qa_helper(10*frame_size, enc, dec, threading)
+        self.tb.connect(self.test)
+        self.tb.run()
+
+        data_in = self.test.snk_input.data()
+        data_out =self.test.snk_output.data()
+
+        self.assertEqual(data_in, data_out)
+
+    def test_parallelism1_07(self):
+        frame_size = 30
+        dims = 3
+        enc = map((lambda a: fec.dummy_encoder_make(frame_size*8)), range(0,dims))
+        dec = map((lambda a: fec.dummy_decoder.make(frame_size*8)), range(0,dims))
+        threading = 'pooled'
+        self.test = _qa_helper(10*frame_size, enc, dec, threading)
+        self.tb.connect(self.test)
+        self.tb.run()
+
+        data_in = self.test.snk_input.data()
+        data_out =self.test.snk_output.data()
+
+        self.assertEqual(data_in, data_out)
+
+    def test_parallelism1_08(self):
+        frame_size = 30
+        dims = 3
+        nframes = 20
+        enc = map((lambda a: fec.dummy_encoder_make(frame_size*8)), range(0,dims))
+        data = tuple([(i*7 + i/5) & 1 for i in range(nframes*frame_size*8)])
+        src = blocks.vector_source_b(data, False)
+        pool = fec.pooled_encoder(enc, gr.sizeof_char, gr.sizeof_char)
+        snk = blocks.vector_sink_b()
+        self.tb.connect(src, pool, snk)
+        self.tb.run()
+
+        self.assertEqual(data, snk.data())
+        self.assertEqual(pool.nthreads(), dims)
+        self.assertEqual(sum(pool.frames()), nframes)
+        self.assertEqual(len(pool.utilization()), dims)
+
+
 if __name__ == '__main__':
     gr_unittest.run(test_fecapi_dummy, "test_fecapi_dummy.xml")
@@ -35,11 +35,16 @@
 %nodefaultctor gr::fec::generic_decoder;
 %template(generic_decoder_sptr) boost::shared_ptr<gr::fec::generic_decoder>;
 
+%template(generic_encoder_sptr_vector) std::vector<boost::shared_ptr<gr::fec::generic_encoder> >;
+%template(generic_decoder_sptr_vector) std::vector<boost::shared_ptr<gr::fec::generic_decoder> >;
+
 %{
 #include "gnuradio/fec/generic_decoder.h"
 #include "gnuradio/fec/generic_encoder.h"
 #include "gnuradio/fec/decoder.h"
 #include "gnuradio/fec/encoder.h"
+#include "gnuradio/fec/pooled_decoder.h"
+#include "gnuradio/fec/pooled_encoder.h"
 #include "gnuradio/fec/tagged_decoder.h"
 #include "gnuradio/fec/tagged_encoder.h"
 #include "gnuradio/fec/async_decoder.h"
@@ -68,6 +73,8 @@
 %include "gnuradio/fec/generic_encoder.h"
 %include "gnuradio/fec/decoder.h"
 %include "gnuradio/fec/encoder.h"
+%include "gnuradio/fec/pooled_decoder.h"
+%include "gnuradio/fec/pooled_encoder.h"
 %include "gnuradio/fec/tagged_decoder.h"
 %include "gnuradio/fec/tagged_encoder.h"
 %include "gnuradio/fec/async_decoder.h"
@@ -93,6 +100,8 @@
 
 GR_SWIG_BLOCK_MAGIC2(fec, decoder);
 GR_SWIG_BLOCK_MAGIC2(fec, encoder);
+GR_SWIG_BLOCK_MAGIC2(fec, pooled_decoder);
+GR_SWIG_BLOCK_MAGIC2(fec, pooled_encoder);
 GR_SWIG_BLOCK_MAGIC2(fec, tagged_decoder);
 GR_SWIG_BLOCK_MAGIC2(fec, tagged_encoder);
 GR_SWIG_BLOCK_MAGIC2(fec, async_decoder);
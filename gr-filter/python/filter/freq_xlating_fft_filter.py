@@ -20,7 +20,6 @@
 #
 
 import math
-import cmath
 
 from gnuradio import gr
 from gnuradio.blocks import rotator_cc
@@ -33,6 +32,12 @@ __all__ = [ 'freq_xlating_fft_filter_ccc' ]
 
 class freq_xlating_fft_filter_ccc(gr.hier_block2):
 
+    # The input is mixed down before the filter rather than rotating
+    # the taps and mixing the filter output. Both give the same result,
+    # but this way a retune only changes the phase increment of the
+    # rotator: the taps and the state of the FFT filter are left alone,
+    # so retuning is cheap and does not disturb the output.
+
     def __init__(self, decim, taps, center_freq, samp_rate):
         gr.hier_block2.__init__(
             self,
@@ -48,26 +53,21 @@ class freq_xlating_fft_filter_ccc(gr.hier_block2):
         self.samp_rate   = samp_rate
 
         # Sub blocks
-        self._filter = fft_filter_ccc(decim, taps)
         self._rotator = rotator_cc(0.0)
+        self._filter = fft_filter_ccc(decim, taps)
 
-        self.connect(self, self._filter, self._rotator, self)
+        self.connect(self, self._rotator, self._filter, self)
 
         # Refresh
         self._refresh()
 
-    def _rotate_taps(self, taps, phase_inc):
-        return [ x * cmath.exp(i * phase_inc * 1j) for i,x in enumerate(taps) ]
-
     def _refresh(self):
         phase_inc = (2.0 * math.pi * self.center_freq) / self.samp_rate
-        rtaps = self._rotate_taps(self.taps, phase_inc)
-        self._filter.set_taps(rtaps)
-        self._rotator.set_phase_inc(- self.decim * phase_inc)
+        self._rotator.set_phase_inc(- phase_inc)
 
     def set_taps(self, taps):
         self.taps = taps
-        self._refresh()
+        self._filter.set_taps(taps)
 
     def set_center_freq(self, center_freq):
         self.center_freq = center_freq
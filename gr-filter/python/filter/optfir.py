@@ -25,9 +25,20 @@ Routines for designing optimal FIR filters.
 For a great intro to how all this stuff works, see section 6.6 of
 "Digital Signal Processing: A Practical Approach", Emmanuael C. Ifeachor
 and Barrie W. Jervis, Adison-Wesley, 1993.  ISBN 0-201-54413-X.
+
+Designs are cached: the taps of every pm_remez run are kept in memory
+and in an on-disk cache, so starting the same flowgraph again does not
+redo the design. The cache directory is set with the optfir_cache_dir
+option of the [filter] preferences section (default
+~/.gnuradio/optfir_cache) and the cache is turned off by setting
+optfir_cache to false. The directory keeps at most optfir_cache_max_files
+designs (default 1000, 0 for no limit), the least recently used ones are
+removed first.
 '''
 
 import math, cmath
+import os, hashlib, tempfile
+from gnuradio import gr
 import filter_swig as filter
 
 # ----------------------------------------------------------------
@@ -52,9 +63,86 @@ def low_pass (gain, Fs, freq1, freq2, passband_ripple_db, stopband_atten_db,
     (n, fo, ao, w) = remezord ([freq1, freq2], desired_ampls,
                                [passband_dev, stopband_dev], Fs)
     # The remezord typically under-estimates the filter order, so add 2 taps by default
-    taps = filter.pm_remez (n + nextra_taps, fo, ao, w, "bandpass")
+    taps = _pm_remez (n + nextra_taps, fo, ao, w)
     return taps
 
+def low_pass_relaxed (gain, Fs, freq1, freq2, passband_ripple_db, stopband_atten_db,
+                      max_ripple_db=1.0, ripple_step_db=0.01, nextra_taps=2):
+    """
+    Builds a low pass filter like low_pass, relaxing the pass band
+    ripple when pm_remez does not converge.
+
+    The ripple is searched in steps of ripple_step_db below
+    max_ripple_db. Instead of trying every step in turn, the steps are
+    bisected for the smallest ripple that converges, and the ripple
+    found is cached with the taps. Convergence is not monotonic in the
+    ripple, so when the largest ripple does not converge the steps are
+    tried in turn.
+
+    Args:
+        gain: Filter gain in the passband (linear)
+        Fs: Sampling rate (sps)
+        freq1: End of pass band (in Hz)
+        freq2: Start of stop band (in Hz)
+        passband_ripple_db: Smallest pass band ripple to try in dB
+        stopband_atten_db: Stop band attenuation in dB (should be large, >= 60)
+        max_ripple_db: Give up at this pass band ripple in dB (default=1.0)
+        ripple_step_db: Resolution of the ripple search in dB (default=0.01)
+        nextra_taps: Extra taps to use in the filter (default=2)
+    """
+    key = ('low_pass_relaxed', gain, Fs, freq1, freq2, passband_ripple_db,
+           stopband_atten_db, max_ripple_db, ripple_step_db, nextra_taps)
+
+    def design(ripple):
+        try:
+            return low_pass(gain, Fs, freq1, freq2, ripple,
+                            stopband_atten_db, nextra_taps)
+        except RuntimeError:
+            return None
+
+    ripple = _cache_get(key)
+    if ripple is not None:
+        taps = design(ripple[0])
+        if taps is not None:
+            if ripple[0] != passband_ripple_db:
+                _relaxed_warning(ripple[0])
+            return taps
+
+    ripples = [passband_ripple_db]
+    while ripples[-1] + ripple_step_db < max_ripple_db:
+        ripples.append(passband_ripple_db + len(ripples)*ripple_step_db)
+
+    taps = design(ripples[0])
+    if taps is None:
+        lo, hi = 0, len(ripples) - 1
+        if hi > lo:
+            taps = design(ripples[hi])
+        if taps is not None:
+            # ripples[lo] does not converge, ripples[hi] does
+            while hi - lo > 1:
+                mid = (lo + hi) // 2
+                mid_taps = design(ripples[mid])
+                if mid_taps is None:
+                    lo = mid
+                else:
+                    hi, taps = mid, mid_taps
+        else:
+            # fall back to trying every step in turn
+            for hi in range(1, len(ripples) - 1):
+                taps = design(ripples[hi])
+                if taps is not None:
+                    break
+        if taps is None:
+            raise RuntimeError("optfir could not generate an appropriate filter.")
+        _relaxed_warning(ripples[hi])
+        _cache_put(key, [ripples[hi]])
+    else:
+        _cache_put(key, [ripples[0]])
+    return taps
+
+def _relaxed_warning (ripple_db):
+    print("Warning: set ripple to %.4f dB. If this is a problem, adjust the attenuation or create your own filter taps." % (ripple_db))
+
 def band_pass (gain, Fs, freq_sb1, freq_pb1, freq_pb2, freq_sb2,
                passband_ripple_db, stopband_atten_db,
                nextra_taps=2):
@@ -80,7 +168,7 @@ def band_pass (gain, Fs, freq_sb1, freq_pb1, freq_pb2, freq_sb2,
     (n, fo, ao, w) = remezord (desired_freqs, desired_ampls,
                                desired_ripple, Fs)
     # The remezord typically under-estimates the filter order, so add 2 taps by default
-    taps = filter.pm_remez (n + nextra_taps, fo, ao, w, "bandpass")
+    taps = _pm_remez (n + nextra_taps, fo, ao, w)
     return taps
 
 def complex_band_pass (gain, Fs, freq_sb1, freq_pb1, freq_pb2, freq_sb2,
@@ -140,7 +228,7 @@ def band_reject (gain, Fs, freq_pb1, freq_sb1, freq_sb2, freq_pb2,
     if((n+nextra_taps)%2 == 1):
         n += 1
     # The remezord typically under-estimates the filter order, so add 2 taps by default
-    taps = filter.pm_remez (n + nextra_taps, fo, ao, w, "bandpass")
+    taps = _pm_remez (n + nextra_taps, fo, ao, w)
     return taps
 
 
@@ -169,11 +257,126 @@ def high_pass (gain, Fs, freq1, freq2, passband_ripple_db, stopband_atten_db,
         n += 1
 
     # The remezord typically under-estimates the filter order, so add 2 taps by default
-    taps = filter.pm_remez (n + nextra_taps, fo, ao, w, "bandpass")
+    taps = _pm_remez (n + nextra_taps, fo, ao, w)
     return taps
 
 # ----------------------------------------------------------------
 
+_tap_cache = {}
+
+def _cache_dir ():
+    """The on-disk tap cache directory, or None if caching is off"""
+    prefs = gr.prefs()
+    if not prefs.get_bool('filter', 'optfir_cache', True):
+        return None
+    default = os.path.join(os.path.expanduser('~'), '.gnuradio', 'optfir_cache')
+    return prefs.get_string('filter', 'optfir_cache_dir', default)
+
+def _cache_file (key):
+    path = _cache_dir()
+    if not path:
+        return None
+    return os.path.join(path, hashlib.sha1(key).hexdigest() + '.taps')
+
+def _cache_get (key):
+    """Look up a sequence of numbers in the memory and disk caches"""
+    key = repr(key)
+    path = _cache_file(key)
+    if path is None:
+        return None
+    if key in _tap_cache:
+        return _tap_cache[key]
+    try:
+        with open(path) as f:
+            lines = f.read().splitlines()
+    except IOError:
+        return None
+    # the first line holds the key, in case of a hash collision
+    if not lines or lines[0] != key:
+        return None
+    try:
+        value = tuple(float(x) for x in lines[1:])
+    except ValueError:
+        return None
+    # the modification time orders the files for _cache_trim
+    try:
+        os.utime(path, None)
+    except OSError:
+        pass
+    _tap_cache[key] = value
+    return value
+
+def _cache_put (key, value):
+    """Store a sequence of numbers in the memory and disk caches"""
+    key = repr(key)
+    value = tuple(value)
+    path = _cache_file(key)
+    if path is None:
+        return
+    _tap_cache[key] = value
+    # write to a temporary file and rename it into place so readers
+    # never see a partial file
+    try:
+        if not os.path.isdir(os.path.dirname(path)):
+            os.makedirs(os.path.dirname(path))
+        fd, tmp = tempfile.mkstemp(dir=os.path.dirname(path))
+        with os.fdopen(fd, 'w') as f:
+            f.write('\n'.join([key] + [repr(float(x)) for x in value]) + '\n')
+        os.rename(tmp, path)
+    except (IOError, OSError):
+        return
+    _cache_trim(os.path.dirname(path), os.path.basename(path))
+
+def _cache_trim (path, keep):
+    """Remove the least recently used files past optfir_cache_max_files, except keep"""
+    limit = gr.prefs().get_long('filter', 'optfir_cache_max_files', 1000)
+    if limit <= 0:
+        return
+    try:
+        names = [name for name in os.listdir(path) if name.endswith('.taps')]
+    except OSError:
+        return
+    if len(names) <= limit:
+        return
+    files = []
+    for name in names:
+        if name == keep:
+            continue
+        try:
+            files.append((os.path.getmtime(os.path.join(path, name)), name))
+        except OSError:
+            pass
+    files.sort()
+    for mtime, name in files[:len(files) + 1 - limit]:
+        try:
+            os.remove(os.path.join(path, name))
+        except OSError:
+            pass
+
+def _pm_remez (order, fo, ao, w):
+    """filter.pm_remez for a bandpass design, through the tap cache"""
+    key = ('pm_remez', order, tuple(fo), tuple(ao), tuple(w))
+    taps = _cache_get(key)
+    if taps is None:
+        taps = filter.pm_remez (order, fo, ao, w, "bandpass")
+        _cache_put(key, taps)
+    return taps
+
+def clear_cache ():
+    """Remove all cached designs, in memory and on disk"""
+    _tap_cache.clear()
+    path = _cache_dir()
+    if not path or not os.path.isdir(path):
+        return
+    for name in os.listdir(path):
+        if name.endswith('.taps'):
+            try:
+                os.remove(os.path.join(path, name))
+            except OSError:
+                pass
+
+# ----------------------------------------------------------------
+
 def stopband_atten_to_dev (atten_db):
     """Convert a stopband attenuation in dB to an absolute value"""
     return 10**(-atten_db/20)
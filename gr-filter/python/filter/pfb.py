@@ -52,19 +52,7 @@ class channelizer_ccf(gr.hier_block2):
             bw = 0.4
             tb = 0.2
             ripple = 0.1
-            made = False
-            while not made:
-                try:
-                    self._taps = optfir.low_pass(1, self._nchans, bw, bw+tb, ripple, atten)
-                    made = True
-                except RuntimeError:
-                    ripple += 0.01
-                    made = False
-                    print("Warning: set ripple to %.4f dB. If this is a problem, adjust the attenuation or create your own filter taps." % (ripple))
-
-                    # Build in an exit strategy; if we've come this far, it ain't working.
-                    if(ripple >= 1.0):
-                        raise RuntimeError("optfir could not generate an appropriate filter.")
+            self._taps = optfir.low_pass_relaxed(1, self._nchans, bw, bw+tb, ripple, atten)
 
         self.s2ss = blocks.stream_to_streams(gr.sizeof_gr_complex, self._nchans)
         self.pfb = filter.pfb_channelizer_ccf(self._nchans, self._taps,
@@ -112,19 +100,7 @@ class interpolator_ccf(gr.hier_block2):
             bw = 0.4
             tb = 0.2
             ripple = 0.99
-            made = False
-            while not made:
-                try:
-                    self._taps = optfir.low_pass(self._interp, self._interp, bw, bw+tb, ripple, atten)
-                    made = True
-                except RuntimeError:
-                    ripple += 0.01
-                    made = False
-                    print("Warning: set ripple to %.4f dB. If this is a problem, adjust the attenuation or create your own filter taps." % (ripple))
-
-                    # Build in an exit strategy; if we've come this far, it ain't working.
-                    if(ripple >= 1.0):
-                        raise RuntimeError("optfir could not generate an appropriate filter.")
+            self._taps = optfir.low_pass_relaxed(self._interp, self._interp, bw, bw+tb, ripple, atten)
 
         self.pfb = filter.pfb_interpolator_ccf(self._interp, self._taps)
 
@@ -161,19 +137,7 @@ class decimator_ccf(gr.hier_block2):
             bw = 0.4
             tb = 0.2
             ripple = 0.1
-            made = False
-            while not made:
-                try:
-                    self._taps = optfir.low_pass(1, self._decim, bw, bw+tb, ripple, atten)
-                    made = True
-                except RuntimeError:
-                    ripple += 0.01
-                    made = False
-                    print("Warning: set ripple to %.4f dB. If this is a problem, adjust the attenuation or create your own filter taps." % (ripple))
-
-                    # Build in an exit strategy; if we've come this far, it ain't working.
-                    if(ripple >= 1.0):
-                        raise RuntimeError("optfir could not generate an appropriate filter.")
+            self._taps = optfir.low_pass_relaxed(1, self._decim, bw, bw+tb, ripple, atten)
 
         self.s2ss = blocks.stream_to_streams(gr.sizeof_gr_complex, self._decim)
         self.pfb = filter.pfb_decimator_ccf(self._decim, self._taps, self._channel,
@@ -240,19 +204,7 @@ class arb_resampler_ccf(gr.hier_block2):
                 tb = (percent/2.0)*halfband
                 ripple = 0.1
 
-                made = False
-                while not made:
-                    try:
-                        self._taps = optfir.low_pass(self._size, self._size, bw, bw+tb, ripple, atten)
-                        made = True
-                    except RuntimeError:
-                        ripple += 0.01
-                        made = False
-                        print("Warning: set ripple to %.4f dB. If this is a problem, adjust the attenuation or create your own filter taps." % (ripple))
-
-                        # Build in an exit strategy; if we've come this far, it ain't working.
-                        if(ripple >= 1.0):
-                            raise RuntimeError("optfir could not generate an appropriate filter.")
+                self._taps = optfir.low_pass_relaxed(self._size, self._size, bw, bw+tb, ripple, atten)
 
         self.pfb = filter.pfb_arb_resampler_ccf(self._rate, self._taps, self._size)
         #print "PFB has %d taps\n" % (len(self._taps),)
@@ -314,19 +266,7 @@ class arb_resampler_fff(gr.hier_block2):
                 tb = (percent/2.0)*halfband
                 ripple = 0.1
 
-                made = False
-                while not made:
-                    try:
-                        self._taps = optfir.low_pass(self._size, self._size, bw, bw+tb, ripple, atten)
-                        made = True
-                    except RuntimeError:
-                        ripple += 0.01
-                        made = False
-                        print("Warning: set ripple to %.4f dB. If this is a problem, adjust the attenuation or create your own filter taps." % (ripple))
-
-                        # Build in an exit strategy; if we've come this far, it ain't working.
-                        if(ripple >= 1.0):
-                            raise RuntimeError("optfir could not generate an appropriate filter.")
+                self._taps = optfir.low_pass_relaxed(self._size, self._size, bw, bw+tb, ripple, atten)
 
         self.pfb = filter.pfb_arb_resampler_fff(self._rate, self._taps, self._size)
         #print "PFB has %d taps\n" % (len(self._taps),)
@@ -369,19 +309,7 @@ class arb_resampler_ccc(gr.hier_block2):
             tb = 0.2
             ripple = 0.1
             #self._taps = filter.firdes.low_pass_2(self._size, self._size, bw, tb, atten)
-            made = False
-            while not made:
-                try:
-                    self._taps = optfir.low_pass(self._size, self._size, bw, bw+tb, ripple, atten)
-                    made = True
-                except RuntimeError:
-                    ripple += 0.01
-                    made = False
-                    print("Warning: set ripple to %.4f dB. If this is a problem, adjust the attenuation or create your own filter taps." % (ripple))
-
-                    # Build in an exit strategy; if we've come this far, it ain't working.
-                    if(ripple >= 1.0):
-                        raise RuntimeError("optfir could not generate an appropriate filter.")
+            self._taps = optfir.low_pass_relaxed(self._size, self._size, bw, bw+tb, ripple, atten)
 
         self.pfb = filter.pfb_arb_resampler_ccc(self._rate, self._taps, self._size)
         #print "PFB has %d taps\n" % (len(self._taps),)
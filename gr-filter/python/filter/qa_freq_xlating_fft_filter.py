@@ -142,5 +142,24 @@ class test_freq_xlating_filter(gr_unittest.TestCase):
         result_data = dst.data()
         self.assert_fft_ok(expected_data, result_data)
 
+    def test_fft_filter_ccc_003(self):
+        self.generate_ccc_source()
+
+        decim = 4
+        lo = sig_source_c(self.fs, -self.fc, 1, len(self.src_data))
+        despun = mix(lo, self.src_data)
+        expected_data = fir_filter(despun, self.taps, decim)
+
+        # retuning leaves the filter taps alone
+        src = blocks.vector_source_c(self.src_data)
+        op  = filter.freq_xlating_fft_filter_ccc(decim, self.taps, 0.1, self.fs)
+        op.set_center_freq(self.fc)
+        self.assertComplexTuplesAlmostEqual(op._filter.taps(), self.taps, 6)
+        dst = blocks.vector_sink_c()
+        self.tb.connect(src, op, dst)
+        self.tb.run()
+        result_data = dst.data()
+        self.assert_fft_ok(expected_data, result_data)
+
 if __name__ == '__main__':
     gr_unittest.run(test_freq_xlating_filter, "test_freq_xlating_filter.xml")
@@ -0,0 +1,106 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr, gr_unittest, filter
+from gnuradio.filter import optfir
+import os, shutil, tempfile
+
+class test_optfir(gr_unittest.TestCase):
+
+    def setUp(self):
+        prefs = gr.prefs()
+        default = os.path.join(os.path.expanduser('~'), '.gnuradio', 'optfir_cache')
+        self.saved_prefs = (prefs.get_string('filter', 'optfir_cache_dir', default),
+                            prefs.get_long('filter', 'optfir_cache_max_files', 1000))
+        self.low_pass = optfir.low_pass
+        self.cache_dir = tempfile.mkdtemp()
+        prefs.set_string('filter', 'optfir_cache_dir', self.cache_dir)
+        optfir.clear_cache()
+
+    def tearDown(self):
+        optfir.clear_cache()
+        optfir.low_pass = self.low_pass
+        prefs = gr.prefs()
+        prefs.set_string('filter', 'optfir_cache_dir', self.saved_prefs[0])
+        prefs.set_long('filter', 'optfir_cache_max_files', self.saved_prefs[1])
+        shutil.rmtree(self.cache_dir)
+
+    def test_001_cache(self):
+        taps = optfir.low_pass(1, 8, 0.4, 0.6, 0.1, 80)
+        self.assertEqual(len(os.listdir(self.cache_dir)), 1)
+
+        # the cached taps match a fresh design
+        expected = filter.pm_remez(len(taps) - 1, [0, 0.1, 0.15, 1], [1, 1, 0, 0],
+                                   [1, optfir.passband_ripple_to_dev(0.1)/optfir.stopband_atten_to_dev(80)],
+                                   "bandpass")
+        self.assertFloatTuplesAlmostEqual(taps, expected, 6)
+
+        # and are read back from disk
+        optfir._tap_cache.clear()
+        self.assertEqual(optfir.low_pass(1, 8, 0.4, 0.6, 0.1, 80), taps)
+
+        optfir.clear_cache()
+        self.assertEqual(os.listdir(self.cache_dir), [])
+
+    def test_002_relaxed(self):
+        taps = optfir.low_pass_relaxed(1, 8, 0.4, 0.6, 0.1, 80)
+        self.assertEqual(taps, optfir.low_pass(1, 8, 0.4, 0.6, 0.1, 80))
+
+        # the ripple found is cached with the taps
+        optfir._tap_cache.clear()
+        self.assertEqual(optfir.low_pass_relaxed(1, 8, 0.4, 0.6, 0.1, 80), taps)
+
+    def test_003_relaxed_fallback(self):
+        # only 0.15 dB converges, so bisecting from 1 dB finds nothing
+        tried = []
+        def low_pass(gain, Fs, freq1, freq2, ripple, atten, nextra_taps):
+            tried.append(ripple)
+            if abs(ripple - 0.15) > 1e-9:
+                raise RuntimeError("no convergence")
+            return (ripple,)
+        optfir.low_pass = low_pass
+        taps = optfir.low_pass_relaxed(1, 8, 0.4, 0.6, 0.1, 80, ripple_step_db=0.01)
+        self.assertAlmostEqual(0.15, taps[0])
+        self.assertAlmostEqual(0.99, max(tried))
+
+        # and the ripple found is cached
+        optfir._tap_cache.clear()
+        del tried[:]
+        self.assertEqual(optfir.low_pass_relaxed(1, 8, 0.4, 0.6, 0.1, 80), taps)
+        self.assertEqual(1, len(tried))
+
+        self.assertRaises(RuntimeError, optfir.low_pass_relaxed,
+                          1, 8, 0.4, 0.6, 0.1, 70, max_ripple_db=0.12)
+
+    def test_004_cache_bound(self):
+        gr.prefs().set_long('filter', 'optfir_cache_max_files', 3)
+        designs = [optfir.low_pass(1, 8, 0.4, 0.6, 0.1, 60.0 + 2*i) for i in range(6)]
+        self.assertEqual(3, len(os.listdir(self.cache_dir)))
+
+        # the latest design is kept on disk
+        optfir._tap_cache.clear()
+        n = len(os.listdir(self.cache_dir))
+        self.assertEqual(optfir.low_pass(1, 8, 0.4, 0.6, 0.1, 70.0), designs[-1])
+        self.assertEqual(n, len(os.listdir(self.cache_dir)))
+
+if __name__ == '__main__':
+    gr_unittest.run(test_optfir, "test_optfir.xml")
@@ -21,9 +21,10 @@
 #
 
 from gnuradio import gr, blocks
+from gnuradio.gru import file_sample_source
 from gnuradio.eng_option import eng_option
 from optparse import OptionParser
-import os, sys
+import os, sys, collections
 
 os.environ['GR_CONF_CONTROLPORT_ON'] = 'False'
 
@@ -54,15 +55,31 @@ except ImportError:
     from plot_time_form import *
     from plot_time_raster_form import *
 
+# Memory mapped sources of the files read most recently, keyed on the
+# filename, type and size so a file that grew is mapped again. The
+# plotters step through a few files at a time, and each source holds
+# its file and pyramid mapped, so only the last few are kept. Least
+# recently used sources are dropped, which unmaps their files.
+SAMPLE_SOURCE_CACHE_SIZE = 4
+_sources = collections.OrderedDict()
+
+def sample_source(filename, dtype):
+    key = (filename, dtype, os.path.getsize(filename))
+    if key in _sources:
+        src = _sources.pop(key)
+    else:
+        src = file_sample_source(filename, dtype)
+        while len(_sources) >= SAMPLE_SOURCE_CACHE_SIZE:
+            _sources.popitem(last=False)
+    _sources[key] = src
+    return src
+
 def read_samples(filename, start, in_size, min_size, dtype, dtype_size):
     # Read in_size number of samples from file
-    fhandle = open(filename, 'r')
-    fhandle.seek(start*dtype_size, 0)
-    data = scipy.fromfile(fhandle, dtype=dtype, count=in_size)
+    data = sample_source(filename, dtype).read(start, in_size)
     data_min = 1.1*data.min()
     data_max = 1.1*data.max()
     data = data.tolist()
-    fhandle.close()
 
     if(min_size > 0):
         if(len(data) < in_size):
@@ -100,13 +117,10 @@ def read_samples_b(filename, start, in_size, min_size=0):
 
 def read_samples_c(filename, start, in_size, min_size=0):
     # Complex samples are handled differently
-    fhandle = open(filename, 'r')
-    fhandle.seek(start*gr.sizeof_gr_complex, 0)
-    data = scipy.fromfile(fhandle, dtype=scipy.complex64, count=in_size)
+    data = sample_source(filename, scipy.complex64).read(start, in_size)
     data_min = 1.1*float(min(data.real.min(), data.imag.min()))
     data_max = 1.1*float(max(data.real.max(), data.imag.max()))
     data = data.tolist()
-    fhandle.close()
 
     if(min_size > 0):
         if(len(data) < in_size):
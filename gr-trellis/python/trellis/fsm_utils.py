@@ -25,6 +25,7 @@ import re
 import math
 import sys
 import operator
+import collections
 import numpy
 
 #from gnuradio import trellis
@@ -65,6 +66,25 @@ def base2dec(s,base):
     return num
 
 
+######################################################################
+# Vectorized dec2base: the digits of 0,...,'count'-1 to base 'base'
+# as a 'count' x 'l' array (most significant symbol first).
+######################################################################
+def base_digits(count,base,l):
+    num=numpy.arange(count)
+    digits=numpy.empty((count,l),dtype=int)
+    for i in range(l):
+        digits[:,l-i-1]=num%base
+        num=num//base
+    return digits
+
+
+######################################################################
+# Lookup tables are cached on (constellation, channel, normalize), so
+# re-estimating an unchanged channel does not rebuild the table.
+######################################################################
+ISI_LOOKUP_CACHE_SIZE = 8
+_isi_lookup_cache = collections.OrderedDict()
 
 
 ######################################################################
@@ -79,6 +99,14 @@ def make_isi_lookup(mod,channel,normalize):
     dim=mod[0]
     constellation = mod[1]
 
+    key=(tuple(constellation),tuple(channel),bool(normalize))
+    if key in _isi_lookup_cache:
+        normalized,lookup=_isi_lookup_cache.pop(key)
+        _isi_lookup_cache[key]=(normalized,lookup)
+        if normalize:
+            channel[:]=normalized
+        return (1,list(lookup))
+
     if normalize:
         p = 0
         for i in range(len(channel)):
@@ -86,14 +114,29 @@ def make_isi_lookup(mod,channel,normalize):
         for i in range(len(channel)):
             channel[i] = channel[i]/math.sqrt(p)
 
-    lookup=range(len(constellation)**len(channel))
-    for o in range(len(constellation)**len(channel)):
-        ss=dec2base(o,len(constellation),len(channel))
-        ll=0
-        for i in range(len(channel)):
-            ll=ll+constellation[ss[i]]*channel[i]
-        lookup[o]=ll
-    return (1,lookup)
+    # same order of additions as symbol by symbol, so the table is identical
+    ss=base_digits(len(constellation)**len(channel),len(constellation),len(channel))
+    exact=_is_exact(constellation) and _is_exact(channel)
+    points=numpy.array(constellation,dtype=object if exact else None)
+    ll=0
+    for i in range(len(channel)):
+        ll=ll+points[ss[:,i]]*channel[i]
+    lookup=numpy.asarray(ll).tolist()
+    if not isinstance(lookup,list):
+        # no channel taps: a single zero output
+        lookup=[lookup]*len(ss)
+
+    _isi_lookup_cache[key]=(list(channel),lookup)
+    while len(_isi_lookup_cache) > ISI_LOOKUP_CACHE_SIZE:
+        _isi_lookup_cache.popitem(last=False)
+    return (1,list(lookup))
+
+
+######################################################################
+# Integer tables are kept as python integers (no overflow).
+######################################################################
+def _is_exact(values):
+    return all(isinstance(v,(int,long)) for v in values)
 
 
 
@@ -120,16 +163,13 @@ def make_cpm_signals(K,P,M,L,q,frac):
     w=math.pi*h*(M-1)*t-2*math.pi*h*(M-1)*qq+math.pi*h*(L-1)*(M-1)
 
     X=(M**L)*P
-    PSI=numpy.empty((X,Q))
-    for x in range(X):
-       xv=dec2base(x/P,M,L)
-       xv=numpy.append(xv, x%P)
-       qq1=numpy.zeros(Q)
-       for m in range(L):
-          qq1=qq1+xv[m]*q[m*Q:m*Q+Q]
-       psi=2*math.pi*h*xv[-1]+4*math.pi*h*qq1+w
-       #print psi
-       PSI[x]=psi
+    # state x is the symbols dec2base(x/P,M,L) followed by the phase x%P
+    xv=base_digits(M**L,M,L).repeat(P,axis=0)
+    phase=numpy.tile(numpy.arange(P),M**L)[:,numpy.newaxis]
+    qq1=numpy.zeros((X,Q))
+    for m in range(L):
+       qq1=qq1+xv[:,m:m+1]*q[m*Q:m*Q+Q]
+    PSI=2*math.pi*h*phase+4*math.pi*h*qq1+w
     PSI = numpy.transpose(PSI)
     SS=numpy.exp(1j*PSI) # contains all signals as columns
     #print SS
@@ -66,6 +66,50 @@ class test_trellis (gr_unittest.TestCase):
         i = trellis.interleaver(K,IN)
         self.assertEqual((K,IN,DIN),(i.K(),i.INTER(),i.DEINTER()))
 
+    def test_001_isi_lookup(self):
+        from gnuradio.trellis import fsm_utils
+        mod = fsm_utils.pam4
+        channel = [0.5, 1.0, -0.25]
+        L = len(channel)
+        (dim, lookup) = fsm_utils.make_isi_lookup(mod, list(channel), False)
+        self.assertEqual(dim, 1)
+        self.assertEqual(len(lookup), len(mod[1])**L)
+        for o in range(len(lookup)):
+            ss = fsm_utils.dec2base(o, len(mod[1]), L)
+            ll = 0
+            for i in range(L):
+                ll = ll + mod[1][ss[i]]*channel[i]
+            self.assertEqual(lookup[o], ll)
+        # normalization is applied to the channel, also from the cache
+        for i in range(2):
+            normalized = list(channel)
+            fsm_utils.make_isi_lookup(mod, normalized, True)
+            self.assertAlmostEqual(sum(c**2 for c in normalized), 1.0)
+
+    def test_002_isi_lookup(self):
+        from gnuradio.trellis import fsm_utils
+        for normalize in (False, True, True):
+            self.assertEqual((1, [0]), fsm_utils.make_isi_lookup(fsm_utils.pam2, [], normalize))
+
+    def test_001_cpm_signals(self):
+        from gnuradio.trellis import fsm_utils
+        (K, P, M, L, Q) = (1, 2, 2, 2, 8)
+        q = [0.5*(i + 1)/(L*Q) for i in range(L*Q)]
+        (f0, SS, S, F, Sf, Ff, N) = fsm_utils.make_cpm_signals(K, P, M, L, q, 0.99)
+        # the signals, state by state
+        h = (1.0*K)/P
+        t = [(i + 0.0)/Q for i in range(Q)]
+        qq = [sum(q[m*Q + i] for m in range(L)) for i in range(Q)]
+        for x in range((M**L)*P):
+            xv = fsm_utils.dec2base(x/P, M, L)
+            for i in range(Q):
+                psi = math.pi*h*(M - 1)*t[i] - 2*math.pi*h*(M - 1)*qq[i] \
+                    + math.pi*h*(L - 1)*(M - 1) + 2*math.pi*h*(x % P) \
+                    + 4*math.pi*h*sum(xv[m]*q[m*Q + i] for m in range(L))
+                self.assertComplexAlmostEqual(SS[i][x], complex(math.cos(psi), math.sin(psi)), 6)
+        self.assertAlmostEqual(f0, -h*(M - 1)/2)
+        self.assertEqual((N, (M**L)*P), Sf.shape)
+
     def test_001_viterbi(self):
         """
         Runs some coding/decoding tests with a few different FSM
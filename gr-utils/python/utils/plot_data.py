@@ -35,18 +35,21 @@ except ImportError:
     raise SystemExit, 1
 
 from optparse import OptionParser
+from gnuradio.gru import file_sample_source
 
 class plot_data:
     def __init__(self, datatype, filenames, options):
-        self.hfile = list()
+        self.sources = list()
         self.legend_text = list()
         for f in filenames:
-            self.hfile.append(open(f, "r"))
+            self.sources.append(file_sample_source(f, datatype))
             self.legend_text.append(f)
 
         self.block_length = options.block
         self.start = options.start
+        self.position = self.start
         self.sample_rate = options.sample_rate
+        self.overview = False
 
         self.datatype = datatype
         self.sizeof_data = datatype().nbytes    # number of bytes per sample in file
@@ -79,19 +82,28 @@ class plot_data:
         self.xlim = self.sp_f.get_xlim()
 
         self.manager = get_current_fig_manager()
+        connect('draw_event', self.zoom)
         connect('key_press_event', self.click)
         show()
 
-    def get_data(self, hfile):
-        self.text_file_pos.set_text("File Position: %d" % (hfile.tell()//self.sizeof_data))
-        try:
-            f = scipy.fromfile(hfile, dtype=self.datatype, count=self.block_length)
-        except MemoryError:
+    def get_data(self, source):
+        self.text_file_pos.set_text("File Position: %d" % (self.position))
+        f = source.read(self.position, self.block_length)
+        if(len(f) == 0):
             print "End of File"
         else:
             self.f = scipy.array(f)
             self.time = scipy.array([i*(1/self.sample_rate) for i in range(len(self.f))])
 
+    def get_overview(self, source, xlim):
+        # Min/max envelope of the samples within xlim from the file's pyramid
+        start = int(floor(xlim[0]*self.sample_rate))
+        stop = int(ceil(xlim[1]*self.sample_rate)) + 1
+        npoints = int(self.fig.get_figwidth()*self.fig.dpi)
+        pos, mins, maxs, means = source.summary(start, stop, npoints)
+        self.time = scipy.repeat(pos, 2) / self.sample_rate
+        self.f = scipy.column_stack((mins, maxs)).ravel()
+
     def make_plots(self):
         self.sp_f = self.fig.add_subplot(2,1,1, position=[0.075, 0.2, 0.875, 0.6])
         self.sp_f.set_title(("Amplitude"), fontsize=self.title_font_size, fontweight="bold")
@@ -102,11 +114,8 @@ class plot_data:
         maxval = -1e12
         minval = 1e12
 
-        for hf in self.hfile:
-            # if specified on the command-line, set file pointer
-            hf.seek(self.sizeof_data*self.start, 1)
-
-            self.get_data(hf)
+        for src in self.sources:
+            self.get_data(src)
 
             # Subplot for real and imaginary parts of signal
             self.plot_f += plot(self.time, self.f, 'o-')
@@ -122,21 +131,52 @@ class plot_data:
     def update_plots(self):
         maxval = -1e12
         minval = 1e12
-        for hf,p in zip(self.hfile,self.plot_f):
-            self.get_data(hf)
+        for src,p in zip(self.sources,self.plot_f):
+            if self.overview:
+                self.get_overview(src, self.xlim)
+            else:
+                self.get_data(src)
             p.set_data([self.time, self.f])
-            maxval = max(maxval, self.f.max())
-            minval = min(minval, self.f.min())
+            if(len(self.f) > 0):
+                maxval = max(maxval, self.f.max())
+                minval = min(minval, self.f.min())
 
         self.sp_f.set_ylim([1.5*minval, 1.5*maxval])
 
         draw()
 
+    def toggle_overview(self):
+        self.overview = not self.overview
+        if self.overview:
+            # Show the whole of the longest file
+            nsamples = max([len(src) for src in self.sources])
+            self.xlim = [0, max(1, nsamples-1) / self.sample_rate]
+            self.text_file_pos.set_text("File Position: overview")
+        else:
+            # Go back to stepping through blocks from the left of the view
+            self.position = max(0, int(self.xlim[0]*self.sample_rate))
+            self.xlim = [0, max(1, self.block_length-1) / self.sample_rate]
+        self.sp_f.set_xlim(self.xlim)
+        self.update_plots()
+
+    def zoom(self, event):
+        # In overview mode, refine the envelope to the new time span
+        newxlim = list(self.sp_f.get_xlim())
+        if self.overview and newxlim != list(self.xlim):
+            self.xlim = newxlim
+            self.update_plots()
+
     def click(self, event):
         forward_valid_keys = [" ", "down", "right"]
         backward_valid_keys = ["up", "left"]
 
-        if(find(event.key, forward_valid_keys)):
+        if(event.key == "o"):
+            self.toggle_overview()
+
+        elif(self.overview):
+            return
+
+        elif(find(event.key, forward_valid_keys)):
             self.step_forward()
 
         elif(find(event.key, backward_valid_keys)):
@@ -149,15 +189,19 @@ class plot_data:
         self.step_forward()
 
     def step_forward(self):
+        if(self.overview):
+            return
+        if(self.position + self.block_length >= max([len(src) for src in self.sources])):
+            print "End of File"
+            return
+        self.position += self.block_length
         self.update_plots()
 
     def step_backward(self):
-        for hf in self.hfile:
-            # Step back in file position
-            if(hf.tell() >= 2*self.sizeof_data*self.block_length ):
-                hf.seek(-2*self.sizeof_data*self.block_length, 1)
-            else:
-                hf.seek(-hf.tell(),1)
+        if(self.overview):
+            return
+        # Step back in file position
+        self.position = max(0, self.position - self.block_length)
         self.update_plots()
 
 
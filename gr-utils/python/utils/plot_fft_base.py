@@ -34,16 +34,18 @@ except ImportError:
     raise SystemExit, 1
 
 from optparse import OptionParser
+from gnuradio.gru import file_sample_source
 
 class plot_fft_base:
     def __init__(self, datatype, filename, options):
-        self.hfile = open(filename, "r")
         self.block_length = options.block
         self.start = options.start
+        self.position = self.start
         self.sample_rate = options.sample_rate
 
         self.datatype = getattr(scipy, datatype)
         self.sizeof_data = self.datatype().nbytes    # number of bytes per sample in file
+        self.source = file_sample_source(filename, self.datatype)
 
         self.axis_font_size = 16
         self.label_font_size = 18
@@ -79,13 +81,12 @@ class plot_fft_base:
         show()
 
     def get_data(self):
-        self.position = self.hfile.tell()/self.sizeof_data
         self.text_file_pos.set_text("File Position: %d" % (self.position))
-        try:
-            self.iq = scipy.fromfile(self.hfile, dtype=self.datatype, count=self.block_length)
-        except MemoryError:
+        iq = self.source.read(self.position, self.block_length)
+        if(len(iq) == 0):
             print "End of File"
         else:
+            self.iq = scipy.array(iq)
             self.iq_fft = self.dofft(self.iq)
 
             tstep = 1.0 / self.sample_rate
@@ -109,9 +110,6 @@ class plot_fft_base:
         return freq
 
     def make_plots(self):
-        # if specified on the command-line, set file pointer
-        self.hfile.seek(self.sizeof_data*self.start, 1)
-
         # Subplot for real and imaginary parts of signal
         self.sp_iq = self.fig.add_subplot(2,2,1, position=[0.075, 0.2, 0.4, 0.6])
         self.sp_iq.set_title(("I&Q"), fontsize=self.title_font_size, fontweight="bold")
@@ -195,15 +193,16 @@ class plot_fft_base:
         self.step_forward()
 
     def step_forward(self):
+        if(self.position + self.block_length >= len(self.source)):
+            print "End of File"
+            return
+        self.position += self.block_length
         self.get_data()
         self.update_plots()
 
     def step_backward(self):
         # Step back in file position
-        if(self.hfile.tell() >= 2*self.sizeof_data*self.block_length ):
-            self.hfile.seek(-2*self.sizeof_data*self.block_length, 1)
-        else:
-            self.hfile.seek(-self.hfile.tell(),1)
+        self.position = max(0, self.position - self.block_length)
         self.get_data()
         self.update_plots()
 
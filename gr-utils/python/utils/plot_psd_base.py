@@ -36,13 +36,16 @@ except ImportError:
 from optparse import OptionParser
 from scipy import log10
 from gnuradio.eng_option import eng_option
+from gnuradio.gru import file_sample_source
 
 class plot_psd_base:
     def __init__(self, datatype, filename, options):
-        self.hfile = open(filename, "r")
         self.block_length = options.block
         self.start = options.start
+        self.position = self.start
         self.sample_rate = options.sample_rate
+        self.overview = False
+        self.max_psd_samples = 1 << 20  # most samples read for a PSD in overview mode
         self.psdfftsize = options.psd_size
         self.specfftsize = options.spec_size
 
@@ -50,6 +53,7 @@ class plot_psd_base:
 
         self.datatype = getattr(scipy, datatype) #scipy.complex64
         self.sizeof_data = self.datatype().nbytes    # number of bytes per sample in file
+        self.source = file_sample_source(filename, self.datatype)
 
         self.axis_font_size = 16
         self.label_font_size = 18
@@ -87,30 +91,40 @@ class plot_psd_base:
         show()
 
     def get_data(self):
-        self.position = self.hfile.tell()/self.sizeof_data
         self.text_file_pos.set_text("File Position: %d" % self.position)
-        try:
-            self.iq = scipy.fromfile(self.hfile, dtype=self.datatype, count=self.block_length)
-        except MemoryError:
+        iq = self.source.read(self.position, self.block_length)
+        if(len(iq) > 0):
+            self.iq = scipy.array(iq)
+            tstep = 1.0 / self.sample_rate
+            #self.time = scipy.array([tstep*(self.position + i) for i in xrange(len(self.iq))])
+            self.time = scipy.array([tstep*(i) for i in xrange(len(self.iq))])
+
+            self.iq_psd, self.freq = self.dopsd(self.iq)
+            return True
+        else:
             print "End of File"
             return False
+
+    def get_overview_psd(self, start, stop):
+        ''' PSD of the samples in [start, stop); long spans are estimated
+        from PSD sized segments spread evenly over the span '''
+        stop = min(stop, len(self.source))
+        if(stop - start <= self.max_psd_samples):
+            iq = scipy.array(self.source.read(start, stop - start))
+            overlap = None
         else:
-            # retesting length here as newer version of scipy does not throw a MemoryError, just
-            # returns a zero-length array
-            if(len(self.iq) > 0):
-                tstep = 1.0 / self.sample_rate
-                #self.time = scipy.array([tstep*(self.position + i) for i in xrange(len(self.iq))])
-                self.time = scipy.array([tstep*(i) for i in xrange(len(self.iq))])
-
-                self.iq_psd, self.freq = self.dopsd(self.iq)
-                return True
-            else:
-                print "End of File"
-                return False
-
-    def dopsd(self, iq):
+            nsegs = self.max_psd_samples // self.psdfftsize
+            starts = scipy.linspace(start, stop - self.psdfftsize, nsegs).astype(int)
+            iq = scipy.concatenate([self.source.read(s, self.psdfftsize) for s in starts])
+            overlap = 0
+        if(len(iq) < self.psdfftsize):
+            return None
+        return self.dopsd(iq, overlap)
+
+    def dopsd(self, iq, overlap=None):
         ''' Need to do this here and plot later so we can do the fftshift '''
-        overlap = self.psdfftsize/4
+        if overlap is None:
+            overlap = self.psdfftsize/4
         winfunc = scipy.blackman
         psd,freq = mlab.psd(iq, self.psdfftsize, self.sample_rate,
                             window = lambda d: d*winfunc(self.psdfftsize),
@@ -119,9 +133,6 @@ class plot_psd_base:
         return (psd, freq)
 
     def make_plots(self):
-        # if specified on the command-line, set file pointer
-        self.hfile.seek(self.sizeof_data*self.start, 1)
-
         iqdims = [[0.075, 0.2, 0.4, 0.6], [0.075, 0.55, 0.4, 0.3]]
         psddims = [[0.575, 0.2, 0.4, 0.6], [0.575, 0.55, 0.4, 0.3]]
         specdims = [0.2, 0.125, 0.6, 0.3]
@@ -181,6 +192,45 @@ class plot_psd_base:
                               window = lambda d: d*winfunc(self.specfftsize),
                               noverlap = overlap, xextent=[t.min(), t.max()])
 
+    def draw_overview(self, xlim):
+        # Min/max envelopes of I and Q within xlim from the file's pyramid
+        start = max(0, int(floor(xlim[0]*self.sample_rate)))
+        stop = int(ceil(xlim[1]*self.sample_rate)) + 1
+        npoints = int(self.fig.get_figwidth()*self.fig.dpi)
+        pos, mins, maxs, means = self.source.summary(start, stop, npoints)
+        if(len(pos) == 0):
+            return
+        t = scipy.repeat(pos, 2) / self.sample_rate
+        reals = scipy.column_stack((mins.real, maxs.real)).ravel()
+        imags = scipy.column_stack((mins.imag, maxs.imag)).ravel()
+        self.plot_iq[0].set_data([t, reals])
+        self.plot_iq[1].set_data([t, imags])
+        self.sp_iq.set_ylim([1.5*min([reals.min(), imags.min()]),
+                             1.5*max([reals.max(), imags.max()])])
+        self.text_file_pos.set_text("File Position: %d" % start)
+
+        r = self.get_overview_psd(start, stop)
+        if r is not None:
+            self.draw_psd(r[1], r[0])
+
+    def toggle_overview(self):
+        self.overview = not self.overview
+        if self.overview:
+            # Show the whole file, markers are no use on an envelope
+            self.xlim = scipy.array([0, max(1, len(self.source)-1) / self.sample_rate])
+            self.sp_iq.set_xlim(self.xlim)
+            for p in self.plot_iq:
+                p.set_marker("")
+            self.draw_overview(self.xlim)
+            draw()
+        else:
+            # Go back to stepping through blocks from the left of the view
+            self.position = max(0, int(self.xlim[0]*self.sample_rate))
+            for p in self.plot_iq:
+                p.set_marker("o")
+            if(self.get_data()):
+                self.update_plots()
+
     def update_plots(self):
         self.draw_time(self.time, self.iq)
         self.draw_psd(self.freq, self.iq_psd)
@@ -195,7 +245,12 @@ class plot_psd_base:
     def zoom(self, event):
         newxlim = scipy.array(self.sp_iq.get_xlim())
         curxlim = scipy.array(self.xlim)
-        if(newxlim[0] != curxlim[0] or newxlim[1] != curxlim[1]):
+        if(self.overview):
+            if(newxlim[0] != curxlim[0] or newxlim[1] != curxlim[1]):
+                self.xlim = newxlim
+                self.draw_overview(self.xlim)
+                draw()
+        elif(newxlim[0] != curxlim[0] or newxlim[1] != curxlim[1]):
             #xmin = max(0, int(ceil(self.sample_rate*(newxlim[0] - self.position))))
             #xmax = min(int(ceil(self.sample_rate*(newxlim[1] - self.position))), len(self.iq))
             xmin = max(0, int(ceil(self.sample_rate*(newxlim[0]))))
@@ -215,7 +270,13 @@ class plot_psd_base:
         forward_valid_keys = [" ", "down", "right"]
         backward_valid_keys = ["up", "left"]
 
-        if(find(event.key, forward_valid_keys)):
+        if(event.key == "o"):
+            self.toggle_overview()
+
+        elif(self.overview):
+            return
+
+        elif(find(event.key, forward_valid_keys)):
             self.step_forward()
 
         elif(find(event.key, backward_valid_keys)):
@@ -228,16 +289,21 @@ class plot_psd_base:
         self.step_forward()
 
     def step_forward(self):
+        if(self.overview):
+            return
+        if(self.position + self.block_length >= len(self.source)):
+            print "End of File"
+            return
+        self.position += self.block_length
         r = self.get_data()
         if(r):
             self.update_plots()
 
     def step_backward(self):
+        if(self.overview):
+            return
         # Step back in file position
-        if(self.hfile.tell() >= 2*self.sizeof_data*self.block_length ):
-            self.hfile.seek(-2*self.sizeof_data*self.block_length, 1)
-        else:
-            self.hfile.seek(-self.hfile.tell(),1)
+        self.position = max(0, self.position - self.block_length)
         r = self.get_data()
         if(r):
             self.update_plots()
@@ -245,7 +311,7 @@ class plot_psd_base:
     @staticmethod
     def setup_options():
         usage="%prog: [options] input_filename"
-        description = "Takes a GNU Radio binary file (with specified data type using --data-type) and displays the I&Q data versus time as well as the power spectral density (PSD) plot. The y-axis values are plotted assuming volts as the amplitude of the I&Q streams and converted into dBm in the frequency domain (the 1/N power adjustment out of the FFT is performed internally). The script plots a certain block of data at a time, specified on the command line as -B or --block. The start position in the file can be set by specifying -s or --start and defaults to 0 (the start of the file). By default, the system assumes a sample rate of 1, so in time, each sample is plotted versus the sample number. To set a true time and frequency axis, set the sample rate (-R or --sample-rate) to the sample rate used when capturing the samples. Finally, the size of the FFT to use for the PSD and spectrogram plots can be set independently with --psd-size and --spec-size, respectively. The spectrogram plot does not display by default and is turned on with -S or --enable-spec."
+        description = "Takes a GNU Radio binary file (with specified data type using --data-type) and displays the I&Q data versus time as well as the power spectral density (PSD) plot. The y-axis values are plotted assuming volts as the amplitude of the I&Q streams and converted into dBm in the frequency domain (the 1/N power adjustment out of the FFT is performed internally). The script plots a certain block of data at a time, specified on the command line as -B or --block. The start position in the file can be set by specifying -s or --start and defaults to 0 (the start of the file). By default, the system assumes a sample rate of 1, so in time, each sample is plotted versus the sample number. To set a true time and frequency axis, set the sample rate (-R or --sample-rate) to the sample rate used when capturing the samples. Finally, the size of the FFT to use for the PSD and spectrogram plots can be set independently with --psd-size and --spec-size, respectively. The spectrogram plot does not display by default and is turned on with -S or --enable-spec. Pressing 'o' toggles an overview of the whole file that can be zoomed down to single samples; the PSD then covers the zoomed span."
 
         parser = OptionParser(option_class=eng_option, conflict_handler="resolve",
                               usage=usage, description=description)
@@ -0,0 +1,156 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr_unittest
+import os, re, sys, json, shutil, tempfile, subprocess
+
+GRCC = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'grcc')
+GRC_BLOCKS = os.path.join(os.path.dirname(os.path.abspath(__file__)),
+                          '..', '..', '..', 'grc', 'blocks')
+
+BLOCK = """  <block>
+    <key>{0}</key>
+{1}  </block>
+"""
+
+PARAM = """    <param>
+      <key>{0}</key>
+      <value>{1}</value>
+    </param>
+"""
+
+def flow_graph(fg_id, hier=False, value=0, uses=()):
+    """
+    A flow graph with a variable, using the hier blocks in uses.
+    """
+    options = [('id', fg_id), ('generate_options', 'hb' if hier else 'no_gui'),
+               ('category', 'Custom')]
+    blocks = [('options', options),
+              ('variable', [('id', 'value'), ('value', value)])]
+    for i, key in enumerate(uses):
+        blocks.append((key, [('id', '{0}_{1}'.format(key, i))]))
+    return "<?xml version='1.0' encoding='ASCII'?>\n<flow_graph>\n{0}</flow_graph>\n".format(
+        ''.join(BLOCK.format(key, ''.join(PARAM.format(*p) for p in params))
+                for key, params in blocks))
+
+class test_grcc(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.src = os.path.join(self.dir, 'src')
+        self.out = os.path.join(self.dir, 'out')
+        os.mkdir(self.src)
+        self.env = dict(os.environ)
+        self.env['GRC_HIER_PATH'] = os.path.join(self.dir, 'hier')
+        self.env['GRC_BLOCKS_PATH'] = os.path.abspath(GRC_BLOCKS)
+        self.env['GRC_BLOCK_CACHE_PATH'] = ''
+        self.env['GRC_PREFS_PATH'] = os.path.join(self.dir, 'prefs')
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, name, *args, **kwargs):
+        path = os.path.join(self.src, name + '.grc')
+        with open(path, 'w') as fp:
+            fp.write(flow_graph(*args, **kwargs))
+        return path
+
+    def grcc(self, *args):
+        """
+        Run a batch, returns (exit status, compiled files, skipped files)
+        """
+        p = subprocess.Popen([sys.executable, GRCC, '-d', self.out] + list(args) + [self.src],
+                             stdout=subprocess.PIPE, stderr=subprocess.STDOUT, env=self.env)
+        output = p.communicate()[0]
+        compiled = set(re.findall(r'^\s*\d+\.\d+s (\S+)$', output, re.M))
+        skipped = set(re.findall(r'^skipped  (\S+)$', output, re.M))
+        return p.returncode, compiled, skipped
+
+    def manifest(self):
+        with open(os.path.join(self.out, '.grcc_manifest')) as fp:
+            return json.load(fp)
+
+    def test_001_jobs(self):
+        files = set(self.write('top%d' % i, 'qa_top%d' % i) for i in range(4))
+        status, compiled, skipped = self.grcc('-j', '2')
+        self.assertEqual(0, status)
+        self.assertEqual(files, compiled)
+        self.assertEqual(set(), skipped)
+        for i in range(4):
+            self.assertTrue(os.path.exists(os.path.join(self.out, 'qa_top%d.py' % i)))
+
+    def test_002_manifest(self):
+        files = set(self.write('top%d' % i, 'qa_top%d' % i) for i in range(2))
+        self.grcc('-j', '1')
+        manifest = self.manifest()
+        self.assertEqual(files, set(manifest.keys()))
+        for entry in manifest.itervalues():
+            self.assertEqual(40, len(entry['hash']))
+            self.assertTrue(entry['outputs'])
+            self.assertTrue(all(os.path.exists(f) for f in entry['outputs']))
+
+        # unchanged files are skipped, a missing output is compiled again
+        status, compiled, skipped = self.grcc()
+        self.assertEqual((0, set(), files), (status, compiled, skipped))
+        os.remove(os.path.join(self.out, 'qa_top0.py'))
+        status, compiled, skipped = self.grcc()
+        self.assertEqual(set([os.path.join(self.src, 'top0.grc')]), compiled)
+
+        # an edited file is compiled again
+        edited = self.write('top1', 'qa_top1', value=1)
+        status, compiled, skipped = self.grcc()
+        self.assertEqual(set([edited]), compiled)
+        self.assertNotEqual(manifest[edited]['hash'], self.manifest()[edited]['hash'])
+
+    def test_003_force(self):
+        files = set(self.write('top%d' % i, 'qa_top%d' % i) for i in range(2))
+        self.grcc()
+        status, compiled, skipped = self.grcc('--force')
+        self.assertEqual((0, files, set()), (status, compiled, skipped))
+
+    def test_004_hier_blocks(self):
+        # hier blocks using hier blocks compile in one batch
+        hb1 = self.write('a_hb1', 'qa_hb1', hier=True)
+        hb2 = self.write('b_hb2', 'qa_hb2', hier=True, uses=['qa_hb1'])
+        top = self.write('c_top', 'qa_top', uses=['qa_hb2'])
+        other = self.write('d_other', 'qa_other')
+        status, compiled, skipped = self.grcc('-j', '2')
+        self.assertEqual(0, status)
+        self.assertEqual(set([hb1, hb2, top, other]), compiled)
+
+        # editing a hier block compiles the flow graphs using it
+        self.write('a_hb1', 'qa_hb1', hier=True, value=1)
+        status, compiled, skipped = self.grcc()
+        self.assertEqual(0, status)
+        self.assertEqual(set([hb1, hb2, top]), compiled)
+        self.assertEqual(set([other]), skipped)
+
+    def test_005_failure(self):
+        good = self.write('good', 'qa_good')
+        bad = self.write('bad', 'qa_bad', uses=['qa_no_such_block'])
+        status, compiled, skipped = self.grcc()
+        self.assertEqual(1, status)
+        self.assertEqual(set([good]), compiled)
+        self.assertEqual(set([good]), set(self.manifest().keys()))
+
+if __name__ == '__main__':
+    gr_unittest.run(test_grcc, "test_grcc.xml")
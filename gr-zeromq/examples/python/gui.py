@@ -51,8 +51,8 @@ class gui(QtGui.QMainWindow):
 
         # ZeroMQ
         self.probe_manager = zeromq.probe_manager()
-        self.probe_manager.add_socket(probe_adr_server, 'float32', self.plot_data_server)
-        self.probe_manager.add_socket(probe_adr_client, 'float32', self.plot_data_client)
+        self.probe_manager.add_socket(probe_adr_server, 'float32', self.plot_data_server, conflate=True)
+        self.probe_manager.add_socket(probe_adr_client, 'float32', self.plot_data_client, conflate=True)
 
         self.rpc_mgr_server = zeromq.rpc_manager()
         self.rpc_mgr_server.set_request_socket(rpc_adr_server)
@@ -98,17 +98,25 @@ class gui(QtGui.QMainWindow):
         # start update timer
         self.update_timer.start(30)
 
+    # send a call from a Qt slot; a flow graph that is gone or slow
+    # must not hang or take down the GUI
+    def rpc_request(self, rpc_mgr, id_str, args=None):
+        try:
+            return rpc_mgr.request(id_str, args, timeout=0.2)
+        except RuntimeError as e:
+            print e
+
     def start_fg_server(self):
-        self.rpc_mgr_server.request("start_fg")
+        self.rpc_request(self.rpc_mgr_server, "start_fg")
 
     def stop_fg_server(self):
-        self.rpc_mgr_server.request("stop_fg")
+        self.rpc_request(self.rpc_mgr_server, "stop_fg")
 
     def start_fg_client(self):
-        self.rpc_mgr_client.request("start_fg")
+        self.rpc_request(self.rpc_mgr_client, "start_fg")
 
     def stop_fg_client(self):
-        self.rpc_mgr_client.request("stop_fg")
+        self.rpc_request(self.rpc_mgr_client, "stop_fg")
 
     # plot the data from the queues
     def plot_data(self, plot, samples):
@@ -130,13 +138,13 @@ class gui(QtGui.QMainWindow):
         self.plot_data(self.gui.qwtPlotClient, samples)
 
     def set_waveform(self, waveform_str):
-        self.rpc_mgr_server.request("set_waveform",str(waveform_str))
+        self.rpc_request(self.rpc_mgr_server, "set_waveform", [str(waveform_str)])
 
     def set_gain(self, gain):
         self.rpc_set_gain(gain)
 
     def rpc_set_gain(self, gain):
-        self.rpc_mgr_server.request("set_k",gain)
+        self.rpc_request(self.rpc_mgr_server, "set_k", [gain])
 
 ###############################################################################
 # Options Parser
@@ -23,28 +23,111 @@ import zmq
 import threading
 import numpy
 
+class probe_socket():
+    """
+    A SUB socket of the probe manager and its counters.
+    """
+    def __init__(self, socket, address, data_type, callback_func, conflate):
+        self.socket = socket
+        self.address = address
+        self.data_type = numpy.dtype(data_type)
+        self.callback_func = callback_func
+        self.conflate = conflate
+        self.received = 0
+        self.conflated = 0
+
 class probe_manager():
-    def __init__(self):
+    def __init__(self, max_messages=1000):
+        """
+        Args:
+            max_messages: most messages delivered per socket in one
+                          pass, so a busy socket cannot starve the others
+        """
         self.zmq_context = zmq.Context()
         self.poller = zmq.Poller()
         self.interfaces = []
+        self.max_messages = max_messages
+        self.keep_running = False
+        self.watcher_thread = None
+
+    def add_socket(self, address, data_type, callback_func, conflate=False):
+        """
+        Subscribe to a probe.
 
-    def add_socket(self, address, data_type, callback_func):
+        The callback gets a read only numpy array viewing the message
+        buffer, copy it if it is kept after the callback returns. With
+        conflate set, only the latest message of each pass is delivered
+        and the older ones are counted as conflated, which suits displays.
+        """
         socket = self.zmq_context.socket(zmq.SUB)
         socket.setsockopt(zmq.SUBSCRIBE, "")
         socket.connect(address)
-        # use a tuple to store interface elements
-        self.interfaces.append((socket, data_type, callback_func))
+        self.interfaces.append(probe_socket(socket, address, data_type,
+                                            callback_func, conflate))
         self.poller.register(socket, zmq.POLLIN)
 
-    def watcher(self):
-        poll = dict(self.poller.poll(0))
+    def watcher(self, timeout=0):
+        """
+        Deliver the messages waiting on all sockets, waiting up to
+        timeout ms for the first one.
+
+        Raises RuntimeError while the start_watcher() thread runs, the
+        sockets are only used from one thread.
+        """
+        if self.watcher_thread is not None:
+            raise RuntimeError("probe_manager: the watcher thread is running")
+        self._watch(timeout)
+
+    def _watch(self, timeout):
+        poll = dict(self.poller.poll(timeout))
         for i in self.interfaces:
-            # i = (socket, data_type, callback_func)
-            if poll.get(i[0]) == zmq.POLLIN:
-                # receive data
-                msg_packed = i[0].recv()
-                # use numpy to unpack the data
-                msg_unpacked = numpy.fromstring(msg_packed, numpy.dtype(i[1]))
-                # invoke callback function
-                i[2](msg_unpacked)
+            if poll.get(i.socket) == zmq.POLLIN:
+                self.drain(i)
+
+    def drain(self, i):
+        latest = None
+        for n in xrange(self.max_messages):
+            try:
+                frame = i.socket.recv(zmq.NOBLOCK, copy=False)
+            except zmq.Again:
+                break
+            i.received += 1
+            if i.conflate:
+                if latest is not None:
+                    i.conflated += 1
+                latest = frame
+            else:
+                i.callback_func(numpy.frombuffer(frame, i.data_type))
+        if latest is not None:
+            i.callback_func(numpy.frombuffer(latest, i.data_type))
+
+    def run(self):
+        while self.keep_running:
+            self._watch(10)
+
+    def start_watcher(self):
+        """
+        Run the watcher in its own thread; the callbacks are then
+        called from that thread.
+        """
+        if self.watcher_thread is not None:
+            raise RuntimeError("probe_manager: the watcher thread is running")
+        self.keep_running = True
+        self.watcher_thread = threading.Thread(target=self.run, args=())
+        self.watcher_thread.daemon = True
+        self.watcher_thread.start()
+
+    def stop_watcher(self):
+        self.keep_running = False
+        if self.watcher_thread is not None:
+            self.watcher_thread.join()
+            self.watcher_thread = None
+
+    def stats(self):
+        """
+        Returns:
+            dict of address -> (received, conflated) message counts;
+            messages ZMQ drops at the SUB socket's receive high water
+            mark never reach the probe manager and are not counted
+        """
+        return dict((i.address, (i.received, i.conflated)) for i in self.interfaces)
@@ -0,0 +1,80 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr, gr_unittest
+from gnuradio import zeromq
+import numpy
+import time
+import zmq
+
+class qa_zeromq_probe (gr_unittest.TestCase):
+
+    def setUp (self):
+        self.context = zmq.Context()
+        self.pub = self.context.socket(zmq.PUB)
+        self.pub.bind("tcp://127.0.0.1:5561")
+        self.probe_manager = zeromq.probe_manager()
+
+    def tearDown (self):
+        self.probe_manager.stop_watcher()
+        self.pub.close(linger=0)
+        # release the port for the next test
+        self.context.term()
+
+    def publish (self, n):
+        time.sleep(0.25)
+        for i in range(n):
+            self.pub.send(numpy.arange(100, dtype=numpy.float32) + i)
+        time.sleep(0.25)
+
+    def test_001_drain (self):
+        data = []
+        self.probe_manager.add_socket("tcp://127.0.0.1:5561", 'float32', lambda x: data.append(x.copy()))
+        self.publish(20)
+        self.probe_manager.watcher()
+        self.assertEqual(len(data), 20)
+        self.assertFloatTuplesAlmostEqual(data[-1], numpy.arange(100) + 19)
+        self.assertEqual(self.probe_manager.stats()["tcp://127.0.0.1:5561"], (20, 0))
+
+    def test_002_conflate (self):
+        data = []
+        self.probe_manager.add_socket("tcp://127.0.0.1:5561", 'float32', lambda x: data.append(x.copy()), conflate=True)
+        self.publish(20)
+        self.probe_manager.watcher()
+        self.assertEqual(len(data), 1)
+        self.assertFloatTuplesAlmostEqual(data[0], numpy.arange(100) + 19)
+        self.assertEqual(self.probe_manager.stats()["tcp://127.0.0.1:5561"], (20, 19))
+
+    def test_003_thread (self):
+        data = []
+        self.probe_manager.add_socket("tcp://127.0.0.1:5561", 'float32', lambda x: data.append(x.copy()))
+        self.probe_manager.start_watcher()
+        self.assertRaises(RuntimeError, self.probe_manager.watcher)
+        self.assertRaises(RuntimeError, self.probe_manager.start_watcher)
+        self.publish(20)
+        self.probe_manager.stop_watcher()
+        self.assertEqual(len(data), 20)
+        self.probe_manager.watcher()
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_zeromq_probe)
@@ -0,0 +1,95 @@
+#!/usr/bin/env python
+# -*- coding: utf-8 -*-
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+from gnuradio import gr, gr_unittest
+from gnuradio import zeromq
+import pmt
+import threading
+import zmq
+
+class qa_zeromq_rpc (gr_unittest.TestCase):
+
+    @classmethod
+    def setUpClass (cls):
+        cls.state = {"k": 1}
+        cls.release = threading.Event()
+        cls.server = zeromq.rpc_manager()
+        cls.server.set_reply_socket("tcp://127.0.0.1:5560")
+        cls.server.add_interface("get_k", lambda: cls.state["k"])
+        cls.server.add_interface("set_k", lambda k: cls.state.update(k=k))
+        cls.server.add_interface("slow", lambda: cls.release.wait(5.0) and "slow")
+        cls.server.add_interface("fail", lambda: 1/0)
+        cls.server.start_watcher()
+        cls.client = zeromq.rpc_manager()
+        cls.client.set_request_socket("tcp://127.0.0.1:5560")
+
+    @classmethod
+    def tearDownClass (cls):
+        cls.client.stop_watcher()
+        cls.server.stop_watcher()
+
+    def setUp (self):
+        self.state["k"] = 1
+
+    def test_001_request (self):
+        self.assertEqual(self.client.request("get_k"), 1)
+        self.client.request("set_k", [3])
+        self.assertEqual(self.client.request("get_k"), 3)
+        self.assertRaises(RuntimeError, lambda: self.client.request("no_such_call"))
+
+    def test_002_concurrent (self):
+        # a slow call does not hold up the ones behind it
+        self.release.clear()
+        slow = self.client.request_async("slow")
+        try:
+            fast = [self.client.request_async("get_k") for i in range(100)]
+            self.assertEqual([f.result(1.0) for f in fast], 100*[1])
+            self.assertFalse(slow.done())
+        finally:
+            self.release.set()
+        self.assertEqual(slow.result(1.0), "slow")
+
+    def test_003_batch (self):
+        futures = self.client.request_batch([("set_k", [5]), ("get_k", None)])
+        self.assertEqual(futures[1].result(1.0), 5)
+
+    def test_004_req_client (self):
+        socket = zmq.Context().socket(zmq.REQ)
+        socket.connect("tcp://127.0.0.1:5560")
+        socket.send(pmt.serialize_str(pmt.to_pmt(("get_k", None))))
+        self.assertEqual(pmt.to_python(pmt.deserialize_str(socket.recv())), 1)
+        socket.close()
+
+    def test_005_req_client_error (self):
+        # a failing call still gets a reply, else the REQ socket is stuck
+        socket = zmq.Context().socket(zmq.REQ)
+        socket.connect("tcp://127.0.0.1:5560")
+        socket.send(pmt.serialize_str(pmt.to_pmt(("fail", None))))
+        self.assertEqual(socket.poll(1000), zmq.POLLIN)
+        self.assertEqual(pmt.to_python(pmt.deserialize_str(socket.recv())), None)
+        socket.send(pmt.serialize_str(pmt.to_pmt(("get_k", None))))
+        self.assertEqual(pmt.to_python(pmt.deserialize_str(socket.recv())), 1)
+        socket.close()
+
+if __name__ == '__main__':
+    gr_unittest.run(qa_zeromq_rpc)
@@ -21,33 +21,101 @@
 
 import zmq
 import pmt
+import struct
 import threading
+import itertools
+from multiprocessing.pool import ThreadPool
 
+# Requests go out on a DEALER socket as [empty, request id, calls] and
+# are answered by a ROUTER socket as [empty, request id, replies], so
+# any number of requests can be in flight at once. calls is a list of
+# (id_str, args) tuples and replies a list of (ok, value) tuples, both
+# as serialized PMTs. A plain REQ socket sending (id_str, args) as
+# [empty, call] is answered with [empty, reply] like before.
 
-class rpc_manager():
+def drain(socket):
+    """Receive every message already queued on a socket"""
+    while True:
+        try:
+            yield socket.recv_multipart(zmq.NOBLOCK)
+        except zmq.Again:
+            return
+
+
+class rpc_future():
+    """
+    Result of a request that may not have been answered yet.
+    """
     def __init__(self):
+        self._done = threading.Event()
+        self._ok = None
+        self._value = None
+
+    def _set(self, ok, value):
+        self._ok = ok
+        self._value = value
+        self._done.set()
+
+    def done(self):
+        return self._done.is_set()
+
+    def result(self, timeout=None):
+        """
+        Wait for the reply and return it. Raises RuntimeError if the
+        call failed on the remote side or no reply came within timeout
+        seconds.
+        """
+        if not self._done.wait(timeout):
+            raise RuntimeError("[RPC] request timed out")
+        if not self._ok:
+            raise RuntimeError("[RPC] remote error: %s" % self._value)
+        return self._value
+
+
+class rpc_manager():
+    def __init__(self, nworkers=4, timeout=1.0):
+        """
+        Args:
+            nworkers: threads running the calls received on the reply socket
+            timeout: seconds request() waits for a reply
+        """
         self.zmq_context = zmq.Context()
-        self.poller_rep = zmq.Poller()
-        self.poller_req_out = zmq.Poller()
-        self.poller_req_in = zmq.Poller()
         self.interfaces = dict()
+        self.nworkers = nworkers
+        self.timeout = timeout
+        self.keep_running = False
+        self.watcher_thread = None
+        self.rep_socket = None
+        self.req_socket = None
+        self.req_thread = None
+        self.pending = dict()
+        self.pending_lock = threading.Lock()
+        self.request_ids = itertools.count()
+        self.inproc = "inproc://rpc_manager_%x" % id(self)
 
     def __del__(self):
         self.stop_watcher()
-        self.watcher_thread.join()
 
     def set_reply_socket(self, address):
-        self.rep_socket = self.zmq_context.socket(zmq.REP)
+        self.rep_socket = self.zmq_context.socket(zmq.ROUTER)
         self.rep_socket.bind(address)
         print "[RPC] reply socket bound to: ", address
-        self.poller_rep.register(self.rep_socket, zmq.POLLIN)
 
     def set_request_socket(self, address):
-        self.req_socket = self.zmq_context.socket(zmq.REQ)
+        self.req_socket = self.zmq_context.socket(zmq.DEALER)
         self.req_socket.connect(address)
         print "[RPC] request socket connected to: ", address
-        self.poller_req_out.register(self.req_socket, zmq.POLLOUT)
-        self.poller_req_in.register(self.req_socket, zmq.POLLIN)
+        # callers hand their requests to the socket's thread over an
+        # inproc socket, zmq sockets must not be shared between threads
+        self.req_pull = self.zmq_context.socket(zmq.PULL)
+        self.req_pull.bind(self.inproc + "_req")
+        self.req_push = self.zmq_context.socket(zmq.PUSH)
+        self.req_push.connect(self.inproc + "_req")
+        self.req_push_lock = threading.Lock()
+        self.req_running = True
+        self.req_thread = threading.Thread(target=self.request_watcher, args=())
+        self.req_thread.daemon = True
+        self.req_thread.start()
 
     def add_interface(self, id_str, callback_func):
         if not self.interfaces.has_key(id_str):
@@ -57,36 +125,158 @@ class rpc_manager():
             print "ERROR: duplicate id_str"
 
     def watcher(self):
-        self.keep_running = True
-        while self.keep_running:
-            # poll for calls
-            socks = dict(self.poller_rep.poll(10))
-            if socks.get(self.rep_socket) == zmq.POLLIN:
-                # receive call
-                msg = self.rep_socket.recv()
-                (id_str, args) = pmt.to_python(pmt.deserialize_str(msg))
-                print "[RPC] request:", id_str, ", args:", args
-                reply = self.callback(id_str, args)
-                self.rep_socket.send(pmt.serialize_str(pmt.to_pmt(reply)))
+        # replies of the worker pool come back over an inproc socket,
+        # written only from the pool's result handler thread
+        rep_pull = self.zmq_context.socket(zmq.PULL)
+        rep_pull.bind(self.inproc + "_rep")
+        rep_push = self.zmq_context.socket(zmq.PUSH)
+        rep_push.connect(self.inproc + "_rep")
+        pool = ThreadPool(self.nworkers)
+        poller = zmq.Poller()
+        poller.register(self.rep_socket, zmq.POLLIN)
+        poller.register(rep_pull, zmq.POLLIN)
+        try:
+            while self.keep_running:
+                socks = dict(poller.poll(10))
+                if socks.get(self.rep_socket) == zmq.POLLIN:
+                    for frames in drain(self.rep_socket):
+                        pool.apply_async(self.handle_call, (frames,),
+                                         callback=rep_push.send_multipart)
+                if socks.get(rep_pull) == zmq.POLLIN:
+                    for frames in drain(rep_pull):
+                        self.rep_socket.send_multipart(frames)
+        finally:
+            pool.close()
+            pool.join()
+            rep_push.close(linger=0)
+            rep_pull.close(linger=0)
+
+    def handle_call(self, frames):
+        # frames are [identity, empty, request id, calls] for batched
+        # requests and [identity, empty, call] for REQ clients. This
+        # always returns a reply: an exception would be dropped by the
+        # pool and a REQ client would wait for its reply forever.
+        try:
+            if len(frames) >= 4:
+                calls = pmt.to_python(pmt.deserialize_str(frames[-1]))
+                replies = [self.call(id_str, args) for (id_str, args) in calls]
+                payload = pmt.serialize_str(pmt.to_pmt(replies))
+                return frames[:-1] + [payload]
+            (id_str, args) = pmt.to_python(pmt.deserialize_str(frames[-1]))
+            (ok, reply) = self.call(id_str, args)
+            if not ok:
+                print "[RPC] ERROR:", reply
+                reply = None
+            return frames[:-1] + [pmt.serialize_str(pmt.to_pmt(reply))]
+        except Exception as e:
+            print "[RPC] ERROR: cannot answer request:", e
+            if len(frames) >= 4:
+                # the requester fails the calls it got no reply for
+                return frames[:-1] + [pmt.serialize_str(pmt.to_pmt([]))]
+            return frames[:-1] + [pmt.serialize_str(pmt.PMT_NIL)]
+
+    def call(self, id_str, args):
+        """
+        Run a call and return (ok, value), where value is the error
+        message if the call failed.
+        """
+        if not self.interfaces.has_key(id_str):
+            return (False, "id_str not found: %s" % id_str)
+        try:
+            return (True, self.callback(id_str, args))
+        except Exception as e:
+            return (False, "%s: %s" % (id_str, e))
 
     def start_watcher(self):
+        self.keep_running = True
         self.watcher_thread = threading.Thread(target=self.watcher,args=())
         self.watcher_thread.daemon = True
         self.watcher_thread.start()
 
     def stop_watcher(self):
         self.keep_running = False
-        self.watcher_thread.join()
-
-    def request(self, id_str, args=None):
-        socks = dict(self.poller_req_out.poll(10))
-        if socks.get(self.req_socket) == zmq.POLLOUT:
-            self.req_socket.send(pmt.serialize_str(pmt.to_pmt((id_str,args))))
-        socks = dict(self.poller_req_in.poll(10))
-        if socks.get(self.req_socket) == zmq.POLLIN:
-            reply = pmt.to_python(pmt.deserialize_str(self.req_socket.recv()))
-            print "[RPC] reply:", reply
-            return reply
+        if self.watcher_thread is not None:
+            self.watcher_thread.join()
+            self.watcher_thread = None
+        if self.req_thread is not None:
+            self.req_running = False
+            self.req_thread.join()
+            self.req_thread = None
+
+    def request_watcher(self):
+        poller = zmq.Poller()
+        poller.register(self.req_socket, zmq.POLLIN)
+        poller.register(self.req_pull, zmq.POLLIN)
+        while self.req_running:
+            socks = dict(poller.poll(10))
+            if socks.get(self.req_pull) == zmq.POLLIN:
+                for frames in drain(self.req_pull):
+                    self.req_socket.send_multipart(frames)
+            if socks.get(self.req_socket) == zmq.POLLIN:
+                for frames in drain(self.req_socket):
+                    (request_id,) = struct.unpack("!Q", frames[-2])
+                    with self.pending_lock:
+                        futures = self.pending.pop(request_id, None)
+                    if futures is None:
+                        continue
+                    replies = pmt.to_python(pmt.deserialize_str(frames[-1]))
+                    for (future, (ok, value)) in zip(futures, replies):
+                        future._set(ok, value)
+                    for future in futures[len(replies):]:
+                        future._set(False, "no reply")
+
+    def request_batch(self, calls):
+        """
+        Send several calls in one message.
+
+        Args:
+            calls: list of (id_str, args) tuples, args is a list or None
+
+        Returns:
+            a list of rpc_future, one per call; the calls run in order
+        """
+        futures = [rpc_future() for c in calls]
+        request_id = self.request_ids.next()
+        with self.pending_lock:
+            self.pending[request_id] = futures
+        payload = pmt.serialize_str(pmt.to_pmt([(id_str, args) for (id_str, args) in calls]))
+        with self.req_push_lock:
+            self.req_push.send_multipart(["", struct.pack("!Q", request_id), payload])
+        return futures
+
+    def request_async(self, id_str, args=None):
+        """
+        Send a call without waiting for the reply.
+
+        Returns:
+            an rpc_future for the reply
+        """
+        return self.request_batch([(id_str, args)])[0]
+
+    def request(self, id_str, args=None, timeout=None):
+        """
+        Send a call and wait for the reply. Raises RuntimeError if the
+        call fails or no reply comes within timeout seconds (default
+        self.timeout).
+        """
+        if timeout is None:
+            timeout = self.timeout
+        future = self.request_async(id_str, args)
+        try:
+            return future.result(timeout)
+        finally:
+            if not future.done():
+                self.cancel(future)
+
+    def cancel(self, future):
+        """
+        Forget a request, a late reply to it is dropped.
+        """
+        with self.pending_lock:
+            for (request_id, futures) in self.pending.items():
+                if future in futures:
+                    del self.pending[request_id]
+                    return
 
     def callback(self, id_str, args):
         if self.interfaces.has_key(id_str):
@@ -40,6 +40,10 @@ class FlowGraph(Element):
         Element.__init__(self, platform)
         self._elements = []
         self._timestamp = time.ctime()
+        #blocks changed since the last rewrite, None for all
+        self._dirty = None
+        #blocks rewritten but not validated since, None for all
+        self._unvalidated = None
         #inital blank import
         self.import_data()
 
@@ -63,10 +67,65 @@ class FlowGraph(Element):
     def __str__(self):
         return 'FlowGraph - %s(%s)' % (self.get_option('title'), self.get_option('id'))
 
+    def mark_dirty(self, element=None):
+        """
+        Note a change, so the next rewrite() and validate() visit the
+        changed block and the blocks connected to it.
+        A param of the options block can affect every block, as does a
+        change of no element in particular. A block id also affects the
+        blocks with the same id, params call this before and after a
+        change so both the old and the new id are seen.
+
+        Args:
+            element: the changed block, param or connection, None for all
+        """
+        if element is not None and element.is_param():
+            param, element = element, element.get_parent()
+            if element is getattr(self, '_options_block', None):
+                element = None
+            elif param.get_key() == 'id' and self._dirty is not None:
+                self._dirty.update(filter(lambda b: b.get_id() == param.get_value(), self.get_blocks()))
+        if element is None:
+            self._dirty = None
+        elif self._dirty is not None:
+            if element.is_connection():
+                self._dirty.add(element.get_source().get_parent())
+                self._dirty.add(element.get_sink().get_parent())
+            else:
+                self._dirty.add(element)
+
+    def _get_rewrite_blocks(self):
+        """
+        Get the blocks changed since the last rewrite and the blocks
+        connected to them, and start tracking changes anew.
+
+        Returns:
+            a set of blocks, None for all blocks
+        """
+        dirty, self._dirty = self._dirty, set()
+        if dirty is None:
+            return None
+        blocks = dirty.intersection(self.get_blocks())
+        for block in list(blocks):
+            for connection in block.get_connections():
+                blocks.add(connection.get_source().get_parent())
+                blocks.add(connection.get_sink().get_parent())
+        return blocks
+
     def rewrite(self):
+        """
+        Rewrite the blocks changed since the last rewrite and their
+        neighbors, or all of them after an import.
+        """
+        blocks = self._get_rewrite_blocks()
+        if blocks is None or self._unvalidated is None:
+            self._unvalidated = None
+        else:
+            self._unvalidated.update(blocks)
+
         def refactor_bus_structure():
 
-            for block in self.get_blocks():
+            for block in (self.get_blocks() if blocks is None else blocks):
                 for direc in ['source', 'sink']:
                     if direc == 'source':
                         get_p = block.get_sources;
@@ -102,9 +161,33 @@ class FlowGraph(Element):
 
 
 
-        for child in self.get_children(): child.rewrite()
+        if blocks is None:
+            for child in self.get_children(): child.rewrite()
+        else:
+            for block in blocks: block.rewrite()
+            for connection in self.get_connections():
+                if connection.get_source().get_parent() in blocks or \
+                        connection.get_sink().get_parent() in blocks:
+                    connection.rewrite()
         refactor_bus_structure();
 
+    def validate(self):
+        """
+        Validate the blocks rewritten since the last validate and their
+        connections. The other blocks keep their error messages.
+        """
+        blocks, self._unvalidated = self._unvalidated, set()
+        if blocks is None or self._dirty is None:
+            return Element.validate(self)
+        #and the ones changed after the last rewrite
+        blocks = blocks.union(self._dirty).intersection(self.get_blocks())
+        del self._error_messages[:]
+        for block in blocks: block.validate()
+        for connection in self.get_connections():
+            if connection.get_source().get_parent() in blocks or \
+                    connection.get_sink().get_parent() in blocks:
+                connection.validate()
+
     def get_option(self, key):
         """
         Get the option for a given key.
@@ -182,6 +265,7 @@ class FlowGraph(Element):
         if key not in self.get_parent().get_block_keys(): return None
         block = self.get_parent().get_new_block(self, key)
         self.get_elements().append(block);
+        self.mark_dirty(block)
         if block._bussify_sink:
             block.bussify({'name':'bus','type':'bus'}, 'sink')
         if block._bussify_source:
@@ -202,6 +286,7 @@ class FlowGraph(Element):
         """
         connection = self.get_parent().Connection(flow_graph=self, porta=porta, portb=portb)
         self.get_elements().append(connection)
+        self.mark_dirty(connection)
         return connection
 
     def remove_element(self, element):
@@ -225,6 +310,7 @@ class FlowGraph(Element):
                 for i in map(lambda a: a.get_connections(), element.get_source().get_associated_ports()):
                     cons_list.extend(i);
                 map(self.remove_element, cons_list);
+            self.mark_dirty(element)
         self.get_elements().remove(element)
 
     def evaluate(self, expr):
@@ -270,6 +356,7 @@ class FlowGraph(Element):
         errors = False
         #remove previous elements
         self._elements = list()
+        self.mark_dirty()
         # set file format
         try:
             instructions = n.find('_instructions') or {}
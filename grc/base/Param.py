@@ -151,7 +151,16 @@ class Param(Element):
             self.set_value(value)
         return value
 
-    def set_value(self, value): self._value = str(value) #must be a string
+    def set_value(self, value):
+        value = str(value) #must be a string
+        if value == self._value: return
+        #tell the flow graph about the old and the new value,
+        #the block may also be one of the platform
+        flow_graph = self.get_parent().get_parent()
+        track = flow_graph.is_flow_graph() and self.get_key() not in ('_coordinate', '_rotation')
+        if track: flow_graph.mark_dirty(self)
+        self._value = value
+        if track: flow_graph.mark_dirty(self)
 
     def get_type(self): return self.get_parent().resolve_dependencies(self._type)
     def get_tab_label(self): return self._tab_label
@@ -17,11 +17,16 @@ along with this program; if not, write to the Free Software
 Foundation, Inc., 51 Franklin Street, Fifth Floor, Boston, MA  02110-1301, USA
 """
 
+import os
+import cPickle as pickle
 from lxml import etree
 from . import odict
 
 xml_failures = {}
 
+#bump when the layout of the parse cache changes
+PARSE_CACHE_VERSION = 1
+
 
 class XMLSyntaxError(Exception):
     def __init__(self, error_log):
@@ -148,3 +153,101 @@ def _to_file(nested_data):
             else: node.extend(_to_file(value))
             nodes.append(node)
     return nodes
+
+
+def file_stamp(path):
+    """
+    Get the modification time and size of a file, used to tell if it changed.
+    """
+    st = os.stat(path)
+    return st.st_mtime, st.st_size
+
+
+class ParseCache(object):
+    """
+    Persistent cache of the nested data parsed from xml files.
+
+    Entries are keyed by file path and are only used while the mtime and
+    size of the file are unchanged, so only changed files get validated
+    and parsed again. Along with the nested data an entry holds a small
+    info value (e.g. the block key) that is available without unpickling
+    the nested data. The whole cache is discarded when its stamp (e.g.
+    the platform version and the dtd files) changes.
+    """
+
+    def __init__(self, cache_file, stamp=None):
+        """
+        Load the cache file if it exists and matches the stamp.
+
+        Args:
+            cache_file: the path of the cache file
+            stamp: any picklable value, the cache is dropped when it differs
+        """
+        self._cache_file = cache_file
+        self._stamp = (PARSE_CACHE_VERSION, stamp)
+        self._entries = dict()
+        self._used = set()
+        self._dirty = False
+        try:
+            with open(cache_file, 'rb') as f:
+                stamp, entries = pickle.load(f)
+            if stamp == self._stamp:
+                self._entries = entries
+        except Exception:
+            pass  # a missing or unreadable cache is rebuilt
+
+    def get(self, xml_file):
+        """
+        Get the cached entry for an xml file.
+
+        Args:
+            xml_file: the xml file path
+
+        Returns:
+            an (info, data) tuple or None if the file changed since it was cached;
+            data is passed to loads() to get the nested data
+        """
+        entry = self._entries.get(xml_file)
+        if entry is None or entry[0] != file_stamp(xml_file):
+            return None
+        self._used.add(xml_file)
+        return entry[1], entry[2]
+
+    def put(self, xml_file, nested_data, info=None):
+        """
+        Store the nested data of an xml file.
+        The data is pickled right away, later changes to it are not cached.
+        """
+        data = pickle.dumps(nested_data, pickle.HIGHEST_PROTOCOL)
+        self._entries[xml_file] = (file_stamp(xml_file), info, data)
+        self._used.add(xml_file)
+        self._dirty = True
+
+    @staticmethod
+    def loads(data):
+        return pickle.loads(data)
+
+    def save(self):
+        """
+        Write the cache file if anything changed.
+        Entries of files that were not used since loading are dropped.
+        """
+        for xml_file in set(self._entries) - self._used:
+            del self._entries[xml_file]
+            self._dirty = True
+        if not self._dirty:
+            return
+        # write to a private file and rename, concurrent loaders never see a partial cache
+        tmp_file = '%s.%d.tmp' % (self._cache_file, os.getpid())
+        try:
+            with open(tmp_file, 'wb') as f:
+                pickle.dump((self._stamp, self._entries), f, pickle.HIGHEST_PROTOCOL)
+            try:
+                os.rename(tmp_file, self._cache_file)
+            except OSError:  # no atomic replace on windows
+                os.remove(self._cache_file)
+                os.rename(tmp_file, self._cache_file)
+            self._dirty = False
+        except (IOError, OSError):
+            pass  # the cache is only an optimization
+        self._used.clear()
@@ -32,7 +32,8 @@ from Constants import BLOCK_TREE_DTD, FLOW_GRAPH_DTD, DOMAIN_DTD
 class Platform(_Element):
     def __init__(self, name, version, key,
                  block_paths, block_dtd, default_flow_graph, generator,
-                 license='', website=None, colors=None):
+                 license='', website=None, colors=None,
+                 block_cache=None, lazy_blocks=False):
         """
         Make a platform from the arguments.
 
@@ -47,6 +48,8 @@ class Platform(_Element):
             colors: a list of title, color_spec tuples
             license: a multi-line license (first line is copyright)
             website: the website url for this platform
+            block_cache: the optional file path to cache the parsed xml files in
+            lazy_blocks: create a block from its xml description on first use
 
         Returns:
             a platform object
@@ -71,8 +74,15 @@ class Platform(_Element):
         #create a dummy flow graph for the blocks
         self._flow_graph = _Element(self)
 
+        self._lazy_blocks = lazy_blocks
+        self._xml_cache = None
+        if block_cache:
+            dtd_stamps = [ParseXML.file_stamp(dtd) for dtd in (block_dtd, BLOCK_TREE_DTD, DOMAIN_DTD)]
+            self._xml_cache = ParseXML.ParseCache(block_cache, stamp=(version, dtd_stamps))
+
         self._blocks = None
         self._blocks_n = None
+        self._blocks_data = None
         self._category_trees_n = None
         self._domains = dict()
         self._connection_templates = dict()
@@ -83,6 +93,7 @@ class Platform(_Element):
         # reset
         self._blocks = odict()
         self._blocks_n = odict()
+        self._blocks_data = dict()
         self._category_trees_n = list()
         self._domains.clear()
         self._connection_templates.clear()
@@ -101,6 +112,31 @@ class Platform(_Element):
                 pass
             except Exception as e:
                 print >> sys.stderr, 'Warning: XML parsing failed:\n\t%s\n\tIgnoring: %s' % (e, xml_file)
+        if self._xml_cache is not None:
+            self._xml_cache.save()
+
+    def parse_xml(self, xml_file, dtd_file, info=None):
+        """
+        Validate and parse an xml file, or get its nested data from the cache.
+
+        Args:
+            xml_file: the xml file path
+            dtd_file: the dtd validator for the file
+            info: function of the nested data, its result is cached along with it
+
+        Returns:
+            a (nested data, info) tuple
+        """
+        if self._xml_cache is not None:
+            entry = self._xml_cache.get(xml_file)
+            if entry is not None:
+                return self._xml_cache.loads(entry[1]), entry[0]
+        ParseXML.validate_dtd(xml_file, dtd_file)
+        n = ParseXML.from_file(xml_file)
+        value = info(n) if info else None
+        if self._xml_cache is not None:
+            self._xml_cache.put(xml_file, n, value)
+        return n, value
 
     def iter_xml_files(self):
         """Iterator for block descriptions and category trees"""
@@ -115,29 +151,50 @@ class Platform(_Element):
 
     def load_block_xml(self, xml_file):
         """Load block description from xml file"""
+        if self._lazy_blocks and self._xml_cache is not None:
+            # only the key is needed until the block is used
+            entry = self._xml_cache.get(xml_file)
+            if entry is not None:
+                key, data = entry
+                if key in self.get_block_keys():  # test against repeated keys
+                    print >> sys.stderr, 'Warning: Block with key "%s" already exists.\n\tIgnoring: %s' % (key, xml_file)
+                else:
+                    self._blocks[key] = None
+                    self._blocks_data[key] = (xml_file, data)
+                return
         # validate and import
-        ParseXML.validate_dtd(xml_file, self._block_dtd)
-        n = ParseXML.from_file(xml_file).find('block')
+        n, key = self.parse_xml(xml_file, self._block_dtd, lambda n: n.find('block').find('key'))
+        n = n.find('block')
         n['block_wrapper_path'] = xml_file  # inject block wrapper path
-        # get block instance and add it to the list of blocks
-        block = self.Block(self._flow_graph, n)
-        key = block.get_key()
+        if self._lazy_blocks:
+            block = None
+        else:
+            # get block instance and add it to the list of blocks
+            block = self.Block(self._flow_graph, n)
+            key = block.get_key()
         if key in self.get_block_keys():  # test against repeated keys
             print >> sys.stderr, 'Warning: Block with key "%s" already exists.\n\tIgnoring: %s' % (key, xml_file)
         else:  # store the block
             self._blocks[key] = block
             self._blocks_n[key] = n
 
+    def get_block_n(self, key):
+        """Get the nested data of a block, unpickle it from the cache on first use"""
+        if key in self._blocks_data:
+            xml_file, data = self._blocks_data.pop(key)
+            n = self._xml_cache.loads(data).find('block')
+            n['block_wrapper_path'] = xml_file  # inject block wrapper path
+            self._blocks_n[key] = n
+        return self._blocks_n[key]
+
     def load_category_tree_xml(self, xml_file):
         """Validate and parse category tree file and add it to list"""
-        ParseXML.validate_dtd(xml_file, BLOCK_TREE_DTD)
-        n = ParseXML.from_file(xml_file).find('cat')
+        n = self.parse_xml(xml_file, BLOCK_TREE_DTD)[0].find('cat')
         self._category_trees_n.append(n)
 
     def load_domain_xml(self, xml_file):
         """Load a domain properties and connection templates from XML"""
-        ParseXML.validate_dtd(xml_file, DOMAIN_DTD)
-        n = ParseXML.from_file(xml_file).find('domain')
+        n = self.parse_xml(xml_file, DOMAIN_DTD)[0].find('domain')
 
         key = n.find('key')
         if not key:
@@ -239,9 +296,14 @@ class Platform(_Element):
     # Access Blocks
     ##############################################
     def get_block_keys(self): return self._blocks.keys()
-    def get_block(self, key): return self._blocks[key]
-    def get_blocks(self): return self._blocks.values()
-    def get_new_block(self, flow_graph, key): return self.Block(flow_graph, n=self._blocks_n[key])
+    def get_blocks(self): return map(self.get_block, self.get_block_keys())
+    def get_new_block(self, flow_graph, key): return self.Block(flow_graph, n=self.get_block_n(key))
+
+    def get_block(self, key):
+        block = self._blocks[key]
+        if block is None:  # lazily loaded
+            block = self._blocks[key] = self.Block(self._flow_graph, self.get_block_n(key))
+        return block
 
     def get_domains(self): return self._domains
     def get_domain(self, key): return self._domains.get(key)
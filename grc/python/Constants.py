@@ -37,8 +37,13 @@ BLOCKS_DIRS = filter( #filter blank strings
     ]).split(PATH_SEP),
 ) + [HIER_BLOCKS_LIB_DIR]
 
+#cache of the parsed block xml files, an empty path disables it
+BLOCK_CACHE_FILE = os.environ.get('GRC_BLOCK_CACHE_PATH',
+                                  os.path.expanduser('~/.grc_block_cache'))
+
 #user settings
 XTERM_EXECUTABLE = _gr_prefs.get_string('grc', 'xterm_executable', 'xterm')
+LAZY_BLOCKS = _gr_prefs.get_bool('grc', 'lazy_blocks', False)
 
 #file creation modes
 TOP_BLOCK_FILE_MODE = stat.S_IRUSR | stat.S_IWUSR | stat.S_IXUSR | stat.S_IRGRP | stat.S_IWGRP | stat.S_IXGRP | stat.S_IROTH
@@ -21,8 +21,12 @@ import expr_utils
 from .. base.FlowGraph import FlowGraph as _FlowGraph
 from .. gui.FlowGraph import FlowGraph as _GUIFlowGraph
 from .. base.odict import odict
+import collections
 import re
 
+#most evaluated expressions kept in the cache
+EVAL_CACHE_SIZE = 10000
+
 _variable_matcher = re.compile('^(variable\w*)$')
 _parameter_matcher = re.compile('^(parameter)$')
 _monitors_searcher = re.compile('(ctrlport_monitor)')
@@ -34,29 +38,137 @@ _bus_struct_src_searcher = re.compile('^(bus_structure_source)$')
 class FlowGraph(_FlowGraph, _GUIFlowGraph):
 
     def __init__(self, **kwargs):
+        #the base constructor imports and rewrites a blank flow graph
+        self._eval_cache = collections.OrderedDict()
+        self._eval_deps = dict()
+        self._renew_eval_ns = True
+        #namespace state kept between renewals
+        self._ns_imports = None
+        self._ns_imports_n = dict()
+        self._ns_code = dict()
+        self._ns_ids = set()
+        self._ns_versions = dict()
+        self._ns_serial = 0
+        self.n = dict()
         _FlowGraph.__init__(self, **kwargs)
         _GUIFlowGraph.__init__(self)
-        self._eval_cache = dict()
 
-    def _eval(self, code, namespace, namespace_hash):
+    def _eval(self, code):
         """
-        Evaluate the code with the given namespace.
+        Evaluate the code in the namespace.
+        Results are cached on the code and the versions of the parameters
+        and variables it uses, so only code that depends on a changed
+        value is evaluated again. The cache is bounded with LRU eviction.
 
         Args:
             code: a string with python code
-            namespace: a dict representing the namespace
-            namespace_hash: a unique hash for the namespace
 
         Returns:
             the resultant object
         """
         if not code: raise Exception, 'Cannot evaluate empty statement.'
-        my_hash = hash(code) ^ namespace_hash
-        #cache if does not exist
-        if not self._eval_cache.has_key(my_hash):
-            self._eval_cache[my_hash] = eval(code, namespace, namespace)
-        #return from cache
-        return self._eval_cache[my_hash]
+        key = (code, tuple(self._ns_versions.get(dep) for dep in self._get_deps(code)))
+        try:
+            #move to the most recently used end
+            e = self._eval_cache.pop(key)
+        except KeyError:
+            e = eval(code, self.n, dict())
+            while len(self._eval_cache) >= EVAL_CACHE_SIZE:
+                self._eval_cache.popitem(last=False)
+        self._eval_cache[key] = e
+        return e
+
+    def _get_deps(self, code):
+        """
+        Get the parameters and variables used by the code.
+        """
+        deps = self._eval_deps.get(code)
+        if deps is None:
+            if len(self._eval_deps) >= EVAL_CACHE_SIZE:
+                self._eval_deps.clear()
+            deps = self._eval_deps[code] = sorted(
+                expr_utils.get_variable_dependencies(code, self._ns_ids))
+        return deps
+
+    def _renew_namespace(self):
+        """
+        Bring the namespace up to date with the imports, parameters and variables.
+        Only the definitions that changed and the ones depending on them are
+        evaluated again; a change in the imports rebuilds the whole namespace.
+        Code is evaluated with scratch locals, so names bound inside it (list
+        comprehension variables) do not leak into the kept namespace.
+
+        Returns:
+            the ids of the definitions evaluated again, None for all
+        """
+        rebuilt = False
+        imports = self.get_imports()
+        if imports != self._ns_imports:
+            rebuilt = True
+            self._ns_imports = imports
+            self._ns_imports_n = dict()
+            for imp in imports:
+                try: exec imp in self._ns_imports_n
+                except: pass
+            self._ns_code.clear()
+            self._ns_versions.clear()
+            self._eval_cache.clear()
+            self.n = dict(self._ns_imports_n)
+        n = self.n
+        #parameters only see the imports, variables see everything before them
+        defs = [(parameter.get_id(), parameter.get_param('value').to_code(), self._ns_imports_n)
+                for parameter in self.get_parameters()]
+        defs += [(variable.get_id(), variable.get_var_value(), n)
+                 for variable in self.get_variables()]
+        ids = set(id for id, code, ns in defs)
+        if ids != self._ns_ids:
+            #dependencies are only tracked between the current definitions,
+            #so when one goes away everything is evaluated again
+            for id in self._ns_ids - ids:
+                self._ns_code.clear()
+                self._ns_versions.pop(id, None)
+                n.pop(id, None)
+            self._ns_ids = ids
+            self._eval_deps.clear()
+            rebuilt = True
+        #evaluate the changed definitions and their dependents in order
+        changed = set()
+        for id, code, ns in defs:
+            if self._ns_code.get(id) == code and \
+                    not changed.intersection(self._get_deps(code)):
+                continue
+            self._ns_code[id] = code
+            self._ns_serial += 1
+            self._ns_versions[id] = self._ns_serial
+            changed.add(id)
+            try: n[id] = eval(code, ns, dict())
+            except: n.pop(id, None)
+        return None if rebuilt else changed
+
+    def _mark_dependents_dirty(self, changed):
+        """
+        Mark the blocks with a param using one of the changed definitions.
+        """
+        for block in self.get_blocks():
+            for param in block.get_params():
+                if changed.intersection(self._get_deps(param.get_value())):
+                    self.mark_dirty(block)
+                    break
+
+    def _get_rewrite_blocks(self):
+        """
+        Virtual sinks and sources pass types along by stream id, so when
+        one of them is affected, all of them and their neighbors are.
+        """
+        blocks = _FlowGraph._get_rewrite_blocks(self)
+        if blocks and any(b.is_virtual_sink() or b.is_virtual_source() for b in blocks):
+            for block in self.get_blocks():
+                if block.is_virtual_sink() or block.is_virtual_source():
+                    blocks.add(block)
+                    for connection in block.get_connections():
+                        blocks.add(connection.get_source().get_parent())
+                        blocks.add(connection.get_sink().get_parent())
+        return blocks
 
     def get_hier_block_stream_io(self, direction):
         """
@@ -236,7 +348,8 @@ class FlowGraph(_FlowGraph, _GUIFlowGraph):
 
     def rewrite(self):
         """
-        Flag the namespace to be renewed.
+        Renew the namespace, mark the blocks using a changed definition
+        and rewrite the changed blocks.
         """
         def reconnect_bus_blocks():
             for block in self.get_blocks():
@@ -257,7 +370,12 @@ class FlowGraph(_FlowGraph, _GUIFlowGraph):
                                 self.remove_element(elt);
                             for j in sink:
                                 self.connect(source, j);
-        self._renew_eval_ns = True
+        self._renew_eval_ns = False
+        changed = self._renew_namespace()
+        if changed is None:
+            self.mark_dirty()
+        elif changed:
+            self._mark_dependents_dirty(changed)
         _FlowGraph.rewrite(self);
         reconnect_bus_blocks();
 
@@ -274,29 +392,6 @@ class FlowGraph(_FlowGraph, _GUIFlowGraph):
         """
         if self._renew_eval_ns:
             self._renew_eval_ns = False
-            #reload namespace
-            n = dict()
-            #load imports
-            for imp in self.get_imports():
-                try: exec imp in n
-                except: pass
-            #load parameters
-            np = dict()
-            for parameter in self.get_parameters():
-                try:
-                    e = eval(parameter.get_param('value').to_code(), n, n)
-                    np[parameter.get_id()] = e
-                except: pass
-            n.update(np) #merge param namespace
-            #load variables
-            for variable in self.get_variables():
-                try:
-                    e = eval(variable.get_var_value(), n, n)
-                    n[variable.get_id()] = e
-                except: pass
-            #make namespace public
-            self.n = n
-            self.n_hash = hash(str(n))
+            self._renew_namespace()
         #evaluate
-        e = self._eval(expr, self.n, self.n_hash)
-        return e
+        return self._eval(expr)
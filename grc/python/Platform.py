@@ -29,15 +29,19 @@ from Param import Param as _Param
 from Generator import Generator
 from Constants import \
     HIER_BLOCKS_LIB_DIR, BLOCK_DTD, \
-    DEFAULT_FLOW_GRAPH, BLOCKS_DIRS, PREFS_FILE
+    DEFAULT_FLOW_GRAPH, BLOCKS_DIRS, PREFS_FILE, \
+    BLOCK_CACHE_FILE, LAZY_BLOCKS
 import Constants
 
 COLORS = [(name, color) for name, key, sizeof, color in Constants.CORE_TYPES]
 
 class Platform(_Platform, _GUIPlatform):
-    def __init__(self):
+    def __init__(self, lazy_blocks=LAZY_BLOCKS):
         """
         Make a platform for gnuradio.
+
+        Args:
+            lazy_blocks: create a block from its xml description on first use
         """
         #ensure hier dir
         if not os.path.exists(HIER_BLOCKS_LIB_DIR): os.mkdir(HIER_BLOCKS_LIB_DIR)
@@ -54,6 +58,8 @@ class Platform(_Platform, _GUIPlatform):
             default_flow_graph=DEFAULT_FLOW_GRAPH,
             generator=Generator,
             colors=COLORS,
+            block_cache=BLOCK_CACHE_FILE,
+            lazy_blocks=lazy_blocks,
         )
 
         _GUIPlatform.__init__(
@@ -0,0 +1,143 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+import os, shutil, tempfile
+
+DUP_BLOCK = """<?xml version="1.0"?>
+<block>
+  <name>{0}</name>
+  <key>qa_dup</key>
+  <category>QA</category>
+  <make>None</make>
+</block>
+"""
+
+# the platform reads its paths on import
+_tmp_dir = tempfile.mkdtemp()
+_dup_dir = os.path.join(_tmp_dir, 'blocks')
+os.mkdir(_dup_dir)
+DUP_FILES = list()
+for name in ('QA Dup A', 'QA Dup B'):
+    DUP_FILES.append(os.path.join(_dup_dir, 'qa_dup_%s.xml' % name[-1].lower()))
+    with open(DUP_FILES[-1], 'w') as fp:
+        fp.write(DUP_BLOCK.format(name))
+CACHE_FILE = os.path.join(_tmp_dir, 'block_cache')
+
+os.environ['GRC_HIER_PATH'] = os.path.join(_tmp_dir, 'hier')
+os.environ['GRC_BLOCKS_PATH'] = os.pathsep.join([
+    os.path.join(os.path.dirname(os.path.abspath(__file__)), '..', 'blocks'), _dup_dir])
+os.environ['GRC_BLOCK_CACHE_PATH'] = CACHE_FILE
+
+from gnuradio import gr_unittest
+try:
+    from grc.base import ParseXML
+    from grc.python.Platform import Platform
+except ImportError:
+    from gnuradio.grc.base import ParseXML
+    from gnuradio.grc.python.Platform import Platform
+
+class test_block_cache(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.dir = tempfile.mkdtemp()
+        self.cache_file = os.path.join(self.dir, 'cache')
+        if os.path.exists(CACHE_FILE):
+            os.remove(CACHE_FILE)
+
+    def tearDown(self):
+        shutil.rmtree(self.dir)
+
+    def write(self, name, text):
+        path = os.path.join(self.dir, name)
+        with open(path, 'w') as fp:
+            fp.write(text)
+        return path
+
+    def fill(self, xml_file, stamp):
+        cache = ParseXML.ParseCache(self.cache_file, stamp)
+        n = ParseXML.from_file(xml_file)
+        cache.put(xml_file, n, info='a')
+        cache.save()
+        return n
+
+    def test_001_parse_cache(self):
+        xml_file = self.write('a.xml', '<a><b>1</b></a>')
+        self.assertEqual(None, ParseXML.ParseCache(self.cache_file, 's').get(xml_file))
+        n = self.fill(xml_file, 's')
+
+        cache = ParseXML.ParseCache(self.cache_file, 's')
+        info, data = cache.get(xml_file)
+        self.assertEqual('a', info)
+        self.assertEqual(n, cache.loads(data))
+
+        # a changed file is parsed again
+        self.write('a.xml', '<a><b>22</b></a>')
+        self.assertEqual(None, cache.get(xml_file))
+
+    def test_002_stamp(self):
+        xml_file = self.write('a.xml', '<a><b>1</b></a>')
+        dtd_file = self.write('a.dtd', '<!ELEMENT a (b)>\n')
+        stamp = lambda version: (version, [ParseXML.file_stamp(dtd_file)])
+        self.fill(xml_file, stamp('3.7'))
+        self.assertNotEqual(None, ParseXML.ParseCache(self.cache_file, stamp('3.7')).get(xml_file))
+
+        # a new platform version or a changed dtd drops the cache
+        self.assertEqual(None, ParseXML.ParseCache(self.cache_file, stamp('3.8')).get(xml_file))
+        self.write('a.dtd', '<!ELEMENT a (b)>\n<!ELEMENT b (#PCDATA)>\n')
+        self.assertEqual(None, ParseXML.ParseCache(self.cache_file, stamp('3.7')).get(xml_file))
+
+        # so does a new cache layout
+        self.fill(xml_file, stamp('3.7'))
+        version = ParseXML.PARSE_CACHE_VERSION
+        try:
+            ParseXML.PARSE_CACHE_VERSION = version + 1
+            self.assertEqual(None, ParseXML.ParseCache(self.cache_file, stamp('3.7')).get(xml_file))
+        finally:
+            ParseXML.PARSE_CACHE_VERSION = version
+
+    def test_003_lazy_blocks(self):
+        # parsed on the first run, from the cache on the second
+        lazy_platforms = [Platform(lazy_blocks=True) for run in range(2)]
+        eager = Platform(lazy_blocks=False)
+        fg = eager.get_new_flow_graph()
+        for lazy in lazy_platforms:
+            self.assertEqual(eager.get_block_keys(), lazy.get_block_keys())
+            lazy_fg = lazy.get_new_flow_graph()
+            for key in ('options', 'variable', 'parameter', 'pad_source', 'qa_dup'):
+                self.assertEqual(eager.get_block_n(key), lazy.get_block_n(key))
+                self.assertEqual(eager.get_block(key).get_name(), lazy.get_block(key).get_name())
+                self.assertEqual(fg.get_new_block(key).export_data(),
+                                 lazy_fg.get_new_block(key).export_data())
+
+    def test_004_duplicate_keys(self):
+        # the first block with a key is kept, lazily or not
+        for lazy in (True, True, False):
+            platform = Platform(lazy_blocks=lazy)
+            self.assertEqual(1, platform.get_block_keys().count('qa_dup'))
+            self.assertEqual('QA Dup A', platform.get_block('qa_dup').get_name())
+            self.assertEqual(DUP_FILES[0], platform.get_block_n('qa_dup')['block_wrapper_path'])
+
+if __name__ == '__main__':
+    try:
+        gr_unittest.run(test_block_cache, "test_block_cache.xml")
+    finally:
+        shutil.rmtree(_tmp_dir)
@@ -0,0 +1,168 @@
+#!/usr/bin/env python
+#
+# Copyright 2014 Free Software Foundation, Inc.
+#
+# This file is part of GNU Radio
+#
+# GNU Radio is free software; you can redistribute it and/or modify
+# it under the terms of the GNU General Public License as published by
+# the Free Software Foundation; either version 3, or (at your option)
+# any later version.
+#
+# GNU Radio is distributed in the hope that it will be useful,
+# but WITHOUT ANY WARRANTY; without even the implied warranty of
+# MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+# GNU General Public License for more details.
+#
+# You should have received a copy of the GNU General Public License
+# along with GNU Radio; see the file COPYING.  If not, write to
+# the Free Software Foundation, Inc., 51 Franklin Street,
+# Boston, MA 02110-1301, USA.
+#
+
+import os, shutil, tempfile
+
+# the platform reads its paths on import
+_tmp_dir = tempfile.mkdtemp()
+os.environ['GRC_HIER_PATH'] = os.path.join(_tmp_dir, 'hier')
+os.environ['GRC_BLOCKS_PATH'] = os.path.join(
+    os.path.dirname(os.path.abspath(__file__)), '..', 'blocks')
+os.environ['GRC_BLOCK_CACHE_PATH'] = ''
+
+from gnuradio import gr_unittest
+try:
+    from grc.python.Platform import Platform
+except ImportError:
+    from gnuradio.grc.python.Platform import Platform
+
+class test_flow_graph(gr_unittest.TestCase):
+
+    def setUp(self):
+        self.platform = Platform()
+        self.fg = self.platform.get_new_flow_graph()
+        self.fg.import_data()
+
+    def tearDown(self):
+        self.fg = None
+        self.platform = None
+
+    def add(self, id, value=None, key='variable'):
+        block = self.fg.get_new_block(key)
+        block.get_param('id').set_value(id)
+        if value is not None: block.get_param('value').set_value(value)
+        return block
+
+    def evaluate_all(self, fg):
+        fg.rewrite()
+        values = dict()
+        for block in fg.get_variables() + fg.get_parameters():
+            try: values[block.get_id()] = fg.evaluate(block.get_id())
+            except Exception: values[block.get_id()] = 'error'
+        return values
+
+    def check(self):
+        """
+        The incrementally updated namespace of the flow graph is the
+        one of a new flow graph evaluated from scratch.
+        """
+        incremental = self.evaluate_all(self.fg)
+        fresh = self.platform.get_new_flow_graph()
+        fresh.import_data(self.fg.export_data())
+        full = self.evaluate_all(fresh)
+        self.assertEqual(full, incremental)
+        self.assertEqual(sorted(fresh.n.keys()), sorted(self.fg.n.keys()))
+        self.fg.validate()
+        fresh.validate()
+        self.assertEqual(sorted(fresh.get_error_messages()),
+                         sorted(self.fg.get_error_messages()))
+        return incremental
+
+    def visited(self):
+        """
+        Rewrite and validate, returns the ids of the blocks validated.
+        """
+        ids = list()
+        for block in self.fg.get_blocks():
+            block.validate = lambda block=block, validate=block.validate: \
+                (ids.append(block.get_id()), validate())
+        self.fg.rewrite()
+        self.fg.validate()
+        for block in self.fg.get_blocks():
+            del block.validate
+        return sorted(ids)
+
+    def test_001_edit(self):
+        a = self.add('a', '2')
+        self.add('b', '[i*a for i in range(3)]')
+        self.add('c', 'a + len(b)')
+        self.add('p', '4', key='parameter')
+        self.assertEqual({'a': 2, 'b': [0, 2, 4], 'c': 5, 'p': 4}, self.check())
+        a.get_param('value').set_value('3')
+        self.assertEqual({'a': 3, 'b': [0, 3, 6], 'c': 6, 'p': 4}, self.check())
+
+    def test_002_no_leaks(self):
+        self.add('b', '[i for i in range(3)]')
+        self.check()
+        self.assertFalse('i' in self.fg.n)
+        # a name bound by an earlier evaluation stays undefined
+        self.add('d', 'i')
+        self.assertEqual('error', self.check()['d'])
+        self.fg.evaluate('[j for j in range(2)]')
+        self.assertFalse('j' in self.fg.n)
+
+    def test_003_rename(self):
+        a = self.add('a', '1')
+        self.add('b', 'a + 1')
+        self.check()
+        a.get_param('id').set_value('a2')
+        self.assertEqual({'a2': 1, 'b': 'error'}, self.check())
+        self.assertFalse('a' in self.fg.n)
+        a.get_param('id').set_value('a')
+        self.assertEqual({'a': 1, 'b': 2}, self.check())
+
+    def test_004_delete(self):
+        a = self.add('a', '1')
+        self.add('b', 'a*10')
+        c = self.add('c', 'b + 1')
+        self.check()
+        self.fg.remove_element(c)
+        self.assertEqual({'a': 1, 'b': 10}, self.check())
+        self.fg.remove_element(a)
+        self.assertEqual({'b': 'error'}, self.check())
+        self.assertFalse('a' in self.fg.n)
+
+    def test_005_dirty_blocks(self):
+        a = self.add('a', '1')
+        b = self.add('b', '2')
+        self.add('c', 'a + 1')
+        src = self.add('src', key='pad_source')
+        snk = self.add('snk', key='pad_sink')
+        self.fg.connect(src.get_sources()[0], snk.get_sinks()[0])
+        self.visited()
+        self.assertEqual([], self.visited())
+        # a changed block, the blocks using it and its neighbors
+        b.get_param('value').set_value('3')
+        self.assertEqual(['b'], self.visited())
+        a.get_param('value').set_value('5')
+        self.assertEqual(['a', 'c'], self.visited())
+        src.get_param('label').set_value('in0')
+        self.assertEqual(['snk', 'src'], self.visited())
+        self.check()
+
+    def test_006_duplicate_id(self):
+        self.add('a', '1')
+        b = self.add('b', '2')
+        self.check()
+        errors = self.fg.get_error_messages()
+        b.get_param('id').set_value('a')
+        self.check()
+        self.assertNotEqual(errors, self.fg.get_error_messages())
+        b.get_param('id').set_value('b')
+        self.check()
+        self.assertEqual(errors, self.fg.get_error_messages())
+
+if __name__ == '__main__':
+    try:
+        gr_unittest.run(test_flow_graph, "test_flow_graph.xml")
+    finally:
+        shutil.rmtree(_tmp_dir)